@@ -8,12 +8,18 @@ Render Configuration:
     - Start Command: uvicorn backend.main:app --host 0.0.0.0 --port $PORT
 """
 import os
-from typing import List, Optional
+import threading
+from typing import List, Literal, Optional
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated, NotRequired, TypedDict
 
 # Import pipeline modules
 import sys
@@ -24,6 +30,20 @@ from src.scoring import calculate_pain_score
 from src.solution_generator import generate_solutions
 from src.competitor_detector import detect_competitors
 from src.revenue_estimator import estimate_revenue_potential
+from src.records import records_to_dicts
+from src.pipeline import iter_pipeline, run_pipeline, SummaryAccumulator
+from src.ranking import rank, top_k
+from src.rules import rules_store
+from src.search_index import SearchIndex, index_path
+from src.trends import TrendEngine, day_to_iso, trends_path
+from src import snapshot
+from src.serialization import dumps, project_record, project_records
+from src.rate_limit import (
+    ConcurrencyLimiter,
+    InMemoryBucketStore,
+    TokenBucketLimiter,
+    retry_after_header,
+)
 
 # =============================================================================
 # FastAPI App Configuration
@@ -51,6 +71,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# =============================================================================
+# Admission Control
+# =============================================================================
+
+# Hard cap on items per analyze request and on the raw request body size
+ANALYZE_MAX_ITEMS = int(os.environ.get("ANALYZE_MAX_ITEMS", "5000"))
+ANALYZE_MAX_BODY_BYTES = int(os.environ.get("ANALYZE_MAX_BODY_BYTES", str(20 * 1024 * 1024)))
+# Seconds clients are asked to wait when all analysis slots are busy
+ANALYZE_RETRY_AFTER = float(os.environ.get("ANALYZE_RETRY_AFTER", "5"))
+
+# Concurrent analyses across this worker; extra requests get 503 immediately
+analysis_slots = ConcurrencyLimiter(int(os.environ.get("ANALYZE_MAX_CONCURRENT", "4")))
+
+# API keys that get their own rate-limit budget (comma-separated). Any other
+# key is ignored and the caller is limited by client address, so made-up keys
+# can neither dodge the limit nor flood the bucket store.
+API_KEYS = frozenset(k.strip() for k in os.environ.get("API_KEYS", "").split(",") if k.strip())
+
+# Per-API-key token bucket (requests per minute, with burst). Swap the store
+# for a shared backend to enforce the budget across workers.
+rate_limiter = TokenBucketLimiter(
+    rate=float(os.environ.get("RATE_LIMIT_PER_MINUTE", "60")) / 60.0,
+    capacity=float(os.environ.get("RATE_LIMIT_BURST", "20")),
+    store=InMemoryBucketStore(),
+)
+
 # =============================================================================
 # Pydantic Models
 # =============================================================================
@@ -68,6 +114,9 @@ class RedditItem(BaseModel):
     subreddit: str
     date: str
     full_link: str
+    score: Optional[int] = None
+    num_comments: Optional[int] = None
+    upvote_ratio: Optional[float] = None
 
 
 class PainPoint(BaseModel):
@@ -89,10 +138,13 @@ class PainPoint(BaseModel):
 
 class AnalyzeRequest(BaseModel):
     """Request body for analyze endpoint."""
-    items: List[RedditItem]
+    items: List[RedditItem] = Field(max_length=ANALYZE_MAX_ITEMS)
     include_solutions: bool = True
     include_competitors: bool = True
     include_revenue: bool = True
+    top_k: Optional[int] = Field(None, ge=1, description="Return only the K best records")
+    rank_by: Literal["pain_score", "revenue_potential_score", "severity_rating"] = "pain_score"
+    scoring_profile: Literal["default", "legacy", "trending"] = "default"
 
 
 class AnalyzeResponse(BaseModel):
@@ -103,6 +155,40 @@ class AnalyzeResponse(BaseModel):
     summary: dict
 
 
+class _RedditItemDict(TypedDict):
+    """Dict-shaped twin of RedditItem used by the batch fast path."""
+    title: str
+    selftext: NotRequired[Optional[str]]
+    subreddit: str
+    date: str
+    full_link: str
+    score: NotRequired[Optional[int]]
+    num_comments: NotRequired[Optional[int]]
+    upvote_ratio: NotRequired[Optional[float]]
+
+
+class _AnalyzeRequestDict(TypedDict):
+    """Dict-shaped twin of AnalyzeRequest used by the batch fast path."""
+    items: List[_RedditItemDict]
+    include_solutions: NotRequired[bool]
+    include_competitors: NotRequired[bool]
+    include_revenue: NotRequired[bool]
+    top_k: NotRequired[Optional[Annotated[int, Field(ge=1)]]]
+    rank_by: NotRequired[Literal["pain_score", "revenue_potential_score", "severity_rating"]]
+    scoring_profile: NotRequired[Literal["default", "legacy", "trending"]]
+
+
+# Validates the raw JSON body in one pass and yields plain dicts, so items
+# need no per-item model_dump() before entering the pipeline.
+_ANALYZE_REQUEST_ADAPTER = TypeAdapter(_AnalyzeRequestDict)
+
+# PainPoint field -> default, used to serialize records without building models
+PAIN_POINT_FIELDS = {
+    name: (None if field.is_required() else field.default)
+    for name, field in PainPoint.model_fields.items()
+}
+
+
 class ScanRequest(BaseModel):
     """Request for scanning subreddits."""
     subreddits: List[str] = Field(default=["SaaS", "startups"])
@@ -130,8 +216,104 @@ async def health_check():
     )
 
 
-@app.post("/api/analyze", response_model=AnalyzeResponse, tags=["Analysis"])
-async def analyze_pain_points(request: AnalyzeRequest):
+def _client_key(request: Request) -> str:
+    """Identify the caller for rate limiting: configured API key, else client address."""
+    api_key = request.headers.get("x-api-key")
+    if not api_key:
+        auth = request.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            api_key = auth[7:].strip()
+    if api_key and api_key in API_KEYS:
+        return f"key:{api_key}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _check_rate_limit(request: Request) -> None:
+    allowed, retry_after = rate_limiter.take(_client_key(request))
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": retry_after_header(retry_after)},
+        )
+
+
+async def _read_body_limited(request: Request) -> bytes:
+    """Read the request body, rejecting it with 413 once it exceeds the cap."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > ANALYZE_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > ANALYZE_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _parse_analyze_request(request: Request) -> dict:
+    """Rate-limit, size-check and validate an AnalyzeRequest body.
+
+    The body is validated in a single pydantic-core pass.
+
+    Raises:
+        HTTPException: 429 when the caller is over its rate limit, 413 when
+            the body or item count exceeds the configured limits.
+        RequestValidationError: With the same 422 payload FastAPI produces.
+    """
+    _check_rate_limit(request)
+    raw = await _read_body_limited(request)
+    try:
+        body = _ANALYZE_REQUEST_ADAPTER.validate_json(raw)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        for err in errors:
+            err["loc"] = ("body", *err["loc"])
+        raise RequestValidationError(errors)
+    if len(body["items"]) > ANALYZE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items: {len(body['items'])} (max {ANALYZE_MAX_ITEMS})",
+        )
+    for item in body["items"]:
+        item.setdefault("selftext", "")
+    return body
+
+
+def _acquire_analysis_slot() -> None:
+    if not analysis_slots.try_acquire():
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, try again later",
+            headers={"Retry-After": retry_after_header(ANALYZE_RETRY_AFTER)},
+        )
+
+
+def _pipeline_options(body: dict) -> dict:
+    return {
+        "include_solutions": body.get("include_solutions", True),
+        "include_competitors": body.get("include_competitors", True),
+        "include_revenue": body.get("include_revenue", True),
+        "scoring_profile": body.get("scoring_profile", "default"),
+    }
+
+
+_ANALYZE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": AnalyzeRequest.model_json_schema()}},
+    }
+}
+
+
+@app.post(
+    "/api/analyze",
+    tags=["Analysis"],
+    responses={200: {"model": AnalyzeResponse}},
+    openapi_extra=_ANALYZE_OPENAPI,
+)
+async def analyze_pain_points(request: Request):
     """Analyze Reddit posts and extract pain-points with scoring.
     
     This endpoint takes raw Reddit post data and returns:
@@ -141,48 +323,233 @@ async def analyze_pain_points(request: AnalyzeRequest):
     - Solution suggestions
     - Competition analysis
     - Revenue potential estimates
+
+    The body is validated once with a TypeAdapter and the response is
+    serialized directly from the pipeline records (orjson when available),
+    skipping per-record pydantic models and response_model re-validation.
     """
+    body = await _parse_analyze_request(request)
+    _acquire_analysis_slot()
     try:
-        # Convert Pydantic models to dicts
-        items = [item.model_dump() for item in request.items]
+        # Run pipeline on compact records in a worker thread so the event
+        # loop keeps serving other requests; expand to dicts only for the response
+        records = await run_in_threadpool(run_pipeline, body["items"], **_pipeline_options(body))
         
-        # Run pipeline
-        records = transform_to_schema(items)
-        records = calculate_pain_score(records)
-        
-        if request.include_solutions:
-            records = generate_solutions(records)
-        
-        if request.include_competitors:
-            records = detect_competitors(records)
-        
-        if request.include_revenue:
-            records = estimate_revenue_potential(records)
+        # Summary covers the whole batch, even when only the top K are returned
+        acc = SummaryAccumulator()
+        for rec in records:
+            acc.add(rec)
         
-        # Sort by pain_score descending
-        records.sort(key=lambda x: x.get("pain_score", 0), reverse=True)
+        # Rank by the requested score, descending; ties keep input order
+        rank_by = body.get("rank_by", "pain_score")
+        if body.get("top_k"):
+            ranked = top_k(records, body["top_k"], key=rank_by)
+        else:
+            ranked = rank(records, key=rank_by)
         
-        # Generate summary
-        summary = {
-            "total_analyzed": len(records),
-            "avg_pain_score": sum(r.get("pain_score", 0) for r in records) / len(records) if records else 0,
-            "categories": {},
-            "top_opportunity": records[0].get("pain_summary", "N/A") if records else "N/A",
+        payload = {
+            "success": True,
+            "count": len(ranked),
+            "pain_points": project_records(ranked, PAIN_POINT_FIELDS),
+            "summary": acc.summary(),
         }
-        
-        for rec in records:
-            cat = rec.get("category", "Other")
-            summary["categories"][cat] = summary["categories"].get(cat, 0) + 1
-        
-        return AnalyzeResponse(
-            success=True,
-            count=len(records),
-            pain_points=[PainPoint(**r) for r in records],
-            summary=summary,
-        )
+        return Response(content=dumps(payload), media_type="application/json")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        analysis_slots.release()
+
+
+def _ndjson_line(kind: str, data) -> bytes:
+    return dumps({"type": kind, "data": data}) + b"\n"
+
+
+@app.post("/api/analyze/stream", tags=["Analysis"], openapi_extra=_ANALYZE_OPENAPI)
+async def analyze_pain_points_stream(request: Request):
+    """Streaming variant of ``/api/analyze`` returning NDJSON.
+
+    Each pain point is emitted as soon as it has been processed, in input
+    order, as ``{"type": "pain_point", "data": {...}}``. The last line is
+    ``{"type": "summary", "data": {...}}`` with the same summary block as the
+    batch endpoint (including the top opportunity). If processing fails
+    mid-stream, an ``{"type": "error", "data": {"detail": ...}}`` line is
+    emitted instead of the summary.
+    """
+    body = await _parse_analyze_request(request)
+    _acquire_analysis_slot()
+    release = _once(analysis_slots.release)
+
+    def generate():
+        acc = SummaryAccumulator()
+        try:
+            for rec in iter_pipeline(body["items"], **_pipeline_options(body)):
+                acc.add(rec)
+                yield _ndjson_line("pain_point", project_record(rec, PAIN_POINT_FIELDS))
+        except Exception as e:
+            yield _ndjson_line("error", {"detail": str(e)})
+            return
+        finally:
+            release()
+        yield _ndjson_line("summary", acc.summary())
+
+    # Sync generator: Starlette iterates it in a worker thread, so blocking
+    # stages (e.g. competitor lookups) do not stall the event loop. The slot
+    # is also released as a background task in case the client disconnects
+    # before the generator finishes.
+    return StreamingResponse(
+        generate(), media_type="application/x-ndjson", background=BackgroundTask(release)
+    )
+
+
+def _once(fn):
+    """Wrap ``fn`` so only the first call has an effect (thread-safe)."""
+    lock = threading.Lock()
+    called = []
+
+    def wrapper():
+        with lock:
+            if called:
+                return
+            called.append(True)
+        fn()
+
+    return wrapper
+
+
+# Opened on first search; the index file is written by the CLI pipeline
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def _get_search_index() -> Optional[SearchIndex]:
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            path = index_path()
+            if not os.path.exists(path):
+                return None
+            _search_index = SearchIndex(path)
+        return _search_index
+
+
+@app.get("/api/search", tags=["Search"])
+async def search_pain_points(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words that must all appear; append * for prefix"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    subreddit: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+):
+    """Full-text search over all indexed posts, best BM25 match first."""
+    _check_rate_limit(request)
+    index = _get_search_index()
+    if index is None:
+        hits = []
+    else:
+        hits = await run_in_threadpool(
+            index.search, q, limit=limit, offset=offset, subreddit=subreddit, category=category
+        )
+    payload = {"success": True, "query": q, "count": len(hits), "results": hits}
+    return Response(content=dumps(payload), media_type="application/json")
+
+
+# Trend state written by the CLI; reloaded only when the file changes
+_trends_cache: dict = {"mtime": None, "engine": None}
+
+
+def _load_trends() -> Optional[TrendEngine]:
+    path = trends_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _trends_cache["mtime"] != mtime:
+        _trends_cache["engine"] = TrendEngine.load(path)
+        _trends_cache["mtime"] = mtime
+    return _trends_cache["engine"]
+
+
+@app.get("/api/trends/rising", tags=["Trends"])
+async def rising_pain_points(
+    limit: int = Query(10, ge=1, le=100),
+    min_recent: int = Query(2, ge=1, description="Minimum posts in the latest window"),
+):
+    """Category/subreddit pairs whose pain-point volume is accelerating.
+
+    Growth compares the latest rolling window with the one before it, as of
+    the newest crawled day; ties are broken by the exponentially decayed
+    activity score.
+    """
+    engine = await run_in_threadpool(_load_trends)
+    if engine is None or engine.latest_day is None:
+        return {"success": True, "as_of": None, "count": 0, "rising": []}
+    rows = engine.rising(limit=limit, min_recent=min_recent)
+    return {
+        "success": True,
+        "as_of": day_to_iso(engine.latest_day),
+        "window_days": engine.window_buckets * engine.bucket_days,
+        "count": len(rows),
+        "rising": rows,
+    }
+
+
+# Records snapshot written by the CLI; re-mapped only when the file changes
+_snapshot_cache: dict = {"mtime": None, "snapshot": None}
+
+
+def _load_snapshot() -> Optional[snapshot.Snapshot]:
+    if not snapshot.available():
+        return None
+    path = snapshot.snapshot_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _snapshot_cache["mtime"] != mtime:
+        _snapshot_cache["snapshot"] = snapshot.open_snapshot(path)
+        _snapshot_cache["mtime"] = mtime
+    return _snapshot_cache["snapshot"]
+
+
+def _query_snapshot(
+    category: Optional[str], subreddit: Optional[str], rank_by: Optional[str], offset: int, limit: int
+) -> Optional[dict]:
+    snap = _load_snapshot()
+    if snap is None:
+        return None
+    view = snap.select(category=category, subreddit=subreddit)
+    if rank_by is not None:
+        rows = view.top(offset + limit, key=rank_by)[offset:]
+    else:
+        rows = view.rows(offset=offset, limit=limit)
+    return {"total": len(view), "rows": rows}
+
+
+@app.get("/api/records", tags=["Records"])
+async def list_records(
+    category: Optional[str] = None,
+    subreddit: Optional[str] = None,
+    rank_by: Optional[Literal["pain_score", "revenue_potential_score", "severity_rating"]] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Page through the records of the latest CLI run.
+
+    Reads the memory-mapped Arrow snapshot (``SNAPSHOT_PATH``), so only the
+    returned rows are materialized. Without ``rank_by`` rows come in crawl
+    order. Returns no records when no snapshot exists or pyarrow is missing.
+    """
+    result = await run_in_threadpool(_query_snapshot, category, subreddit, rank_by, offset, limit)
+    if result is None:
+        return {"success": True, "total": 0, "count": 0, "records": []}
+    return {
+        "success": True,
+        "total": result["total"],
+        "count": len(result["rows"]),
+        "records": result["rows"],
+    }
 
 
 @app.get("/api/categories", tags=["Reference"])
@@ -199,6 +566,20 @@ async def get_categories():
     }
 
 
+@app.get("/api/rules", tags=["Reference"])
+async def get_rules():
+    """Active keyword rules (reloaded automatically when the rules file changes)."""
+    store = rules_store()
+    rules = await run_in_threadpool(store.get)
+    return {
+        "path": store.path,
+        "digest": rules.digest,
+        "version": rules.version,
+        "rule_sets": {name: len(rs.rules) for name, rs in rules.rule_sets.items()},
+        "last_error": store.last_error,
+    }
+
+
 @app.get("/api/demo", tags=["Demo"])
 async def demo_analysis():
     """Run a demo analysis with sample data."""
@@ -226,18 +607,17 @@ async def demo_analysis():
         },
     ]
     
-    records = transform_to_schema(sample_items)
+    records = transform_to_schema(sample_items, compact=True)
     records = calculate_pain_score(records)
     records = generate_solutions(records)
     records = detect_competitors(records)
-    records = estimate_revenue_potential(records)
-    records.sort(key=lambda x: x.get("pain_score", 0), reverse=True)
+    records = rank(estimate_revenue_potential(records))
     
     return {
         "success": True,
         "message": "Demo analysis completed",
         "count": len(records),
-        "pain_points": records,
+        "pain_points": records_to_dicts(records),
     }
 
 
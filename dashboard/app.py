@@ -1,25 +1,56 @@
 ﻿from flask import Flask, render_template, send_from_directory
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.aggregates import AggregateIndex
+from src import snapshot
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'output')
 
+def _snapshot_view(snap_path, agg_path):
+    """Table rows and rollups from the memory-mapped records snapshot."""
+    snap = snapshot.open_snapshot(snap_path)
+    df = pd.DataFrame(snap.rows(limit=200))
+    try:
+        index = AggregateIndex.load(agg_path)
+    except Exception:
+        index = snap.aggregate_index()
+    return df, index
+
 @app.route('/')
 def index():
     csv_path = os.path.join(OUTPUT_DIR, 'sample_output.csv')
-    if os.path.exists(csv_path):
+    agg_path = os.path.join(OUTPUT_DIR, 'aggregates.json')
+    snap_path = snapshot.snapshot_path()
+    if snapshot.available() and os.path.exists(snap_path):
+        df, index = _snapshot_view(snap_path, agg_path)
+        counts = index.counts('category')
+        pain_avg = float(index.totals().mean('pain')) if len(index) else None
+        table_html = df.to_html(classes='table table-sm', index=False) if not df.empty else "<p>No rows.</p>"
+    elif os.path.exists(csv_path):
         try:
-            df = pd.read_csv(csv_path)
+            # Only the rows shown are read; rollups come from the aggregate index
+            df = pd.read_csv(csv_path, nrows=200)
         except Exception:
             df = pd.DataFrame()
-        counts = df['category'].value_counts().to_dict() if 'category' in df.columns else {}
-        pain_avg = float(df['pain_score'].mean()) if 'pain_score' in df.columns and not df['pain_score'].isna().all() else None
-        table_html = df.head(200).to_html(classes='table table-sm', index=False) if not df.empty else "<p>No rows.</p>"
+        try:
+            index = AggregateIndex.load(agg_path)
+        except Exception:
+            # Older runs without aggregates.json: build the index from the CSV once
+            try:
+                index = AggregateIndex.from_records(pd.read_csv(csv_path).to_dict('records'))
+            except Exception:
+                index = AggregateIndex()
+        counts = index.counts('category')
+        pain_avg = float(index.totals().mean('pain')) if len(index) else None
+        table_html = df.to_html(classes='table table-sm', index=False) if not df.empty else "<p>No rows.</p>"
     else:
         counts = {}
         pain_avg = None
-        table_html = "<p>No output found yet. Run the pipeline first to generate output/sample_output.csv.</p>"
+        table_html = "<p>No output found yet. Run the pipeline with --flat-export first to generate output/sample_output.csv.</p>"
     return render_template('index.html', counts=counts, pain_avg=pain_avg, table_html=table_html)
 
 @app.route('/report')
@@ -32,7 +32,7 @@ def run_pipeline():
     print("Running PainPointRadar Pipeline...")
     print("=" * 60)
     
-    cmd = [sys.executable, "-m", "src.main", "--subreddits", "SaaS,startups", "--limit", "5"]
+    cmd = [sys.executable, "-m", "src.main", "--subreddits", "SaaS,startups", "--limit", "5", "--flat-export"]
     result = subprocess.run(cmd, capture_output=False)
     
     if result.returncode != 0:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Benchmark per-record request/response overhead of /api/analyze.
+
+Compares the previous model-based path (AnalyzeRequest validation, one
+``model_dump()`` per item, one ``PainPoint`` per record, then response_model
+re-validation and serialization) with the batch fast path (single
+TypeAdapter pass over the raw body, direct projection + orjson encoding).
+
+Analysis stages are run once up front and excluded from the timings, so the
+numbers isolate validation and serialization cost. The legacy path validates
+against a copy of AnalyzeRequest without the ANALYZE_MAX_ITEMS cap, so item
+counts above the API limit can still be measured (the fast path does not
+enforce the cap either; the endpoint checks it after validation).
+
+Usage:
+    python scripts/bench_analyze_serialization.py [--items 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.main import (  # noqa: E402
+    AnalyzeRequest,
+    AnalyzeResponse,
+    PainPoint,
+    PAIN_POINT_FIELDS,
+    RedditItem,
+    _ANALYZE_REQUEST_ADAPTER,
+)
+from src.pipeline import run_pipeline, SummaryAccumulator  # noqa: E402
+from src.records import records_to_dicts  # noqa: E402
+from src.serialization import dumps, project_records  # noqa: E402
+
+
+class _UncappedAnalyzeRequest(AnalyzeRequest):
+    """AnalyzeRequest without the per-request item cap."""
+    items: List[RedditItem]
+
+
+def _make_body(n: int) -> bytes:
+    items = [
+        {
+            "title": f"Post {i}: pricing is too expensive and the app is slow",
+            "selftext": "We would pay for a tool that fixes this. " * 4,
+            "subreddit": ("SaaS", "startups", "ProductManagement")[i % 3],
+            "date": "2025-01-01T10:00:00Z",
+            "full_link": f"https://reddit.com/r/SaaS/{i}",
+        }
+        for i in range(n)
+    ]
+    return json.dumps({"items": items, "include_competitors": False}).encode("utf-8")
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    body = _make_body(args.items)
+    records = run_pipeline(json.loads(body)["items"], include_competitors=False)
+    acc = SummaryAccumulator()
+    for rec in records:
+        acc.add(rec)
+    summary = acc.summary()
+
+    def legacy_validate():
+        req = _UncappedAnalyzeRequest.model_validate_json(body)
+        return [item.model_dump() for item in req.items]
+
+    def fast_validate():
+        return _ANALYZE_REQUEST_ADAPTER.validate_json(body)
+
+    def legacy_serialize():
+        resp = AnalyzeResponse(
+            success=True,
+            count=len(records),
+            pain_points=[PainPoint(**r) for r in records_to_dicts(records)],
+            summary=summary,
+        )
+        # FastAPI validates the returned model against response_model again
+        return AnalyzeResponse.model_validate(resp.model_dump()).model_dump_json()
+
+    def fast_serialize():
+        return dumps({
+            "success": True,
+            "count": len(records),
+            "pain_points": project_records(records, PAIN_POINT_FIELDS),
+            "summary": summary,
+        })
+
+    n = args.items
+    rows = [
+        ("validate", _best_of(legacy_validate, args.repeat), _best_of(fast_validate, args.repeat)),
+        ("serialize", _best_of(legacy_serialize, args.repeat), _best_of(fast_serialize, args.repeat)),
+    ]
+    print(f"{n} items, best of {args.repeat}")
+    print(f"{'stage':<10} {'legacy us/rec':>14} {'fast us/rec':>12} {'speedup':>8}")
+    for name, legacy, fast in rows:
+        print(f"{name:<10} {legacy / n * 1e6:>14.2f} {fast / n * 1e6:>12.2f} {legacy / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Benchmark category classification throughput: keyword rules vs model.
+
+Trains a :class:`~src.classifier.HashedLogisticRegression` on synthetic
+labeled posts (each category's vocabulary comes from the bundled rules, so
+the keyword path is a fair baseline), saves and memory-maps it, then
+classifies a held-out set in batches with both classifiers and reports
+throughput and accuracy. Texts are tokenized up front, as
+``transform_to_schema`` does.
+
+Usage:
+    python scripts/bench_classifier.py [--train 5000] [--texts 20000] [--batch-sizes 1,64,1024]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classifier import HashedLogisticRegression, KeywordClassifier, accuracy, load_model  # noqa: E402
+from src.rules import DEFAULT_PATH, load_rules  # noqa: E402
+from src.tokenizer import tokenize_text  # noqa: E402
+
+FILLER = (
+    "the a we our it is was to of and for with that this on in really team "
+    "dashboard export csv report sync mobile search filter onboarding support"
+).split()
+
+
+def _corpus(n, vocab, rng):
+    labels = sorted(vocab)
+    texts, out = [], []
+    for _ in range(n):
+        label = rng.choice(labels)
+        words = [rng.choice(vocab[label]) for _ in range(rng.randint(1, 3))]
+        words += [rng.choice(FILLER) for _ in range(rng.randint(15, 80))]
+        rng.shuffle(words)
+        texts.append(tokenize_text(" ".join(words)))
+        out.append(label)
+    return texts, out
+
+
+def _docs_per_sec(classifier, texts, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        classifier.predict(texts[i:i + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--train", type=int, default=5000)
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    category = load_rules(DEFAULT_PATH).rule_sets["category"]
+    vocab = {rule.value: [t for t in rule.terms if " " not in t] for rule in category.rules}
+
+    train_texts, train_labels = _corpus(args.train, vocab, rng)
+    start = time.perf_counter()
+    model = HashedLogisticRegression.fit(train_texts, train_labels)
+    train_s = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = model.save(os.path.join(tmp, "category.clf"))
+        start = time.perf_counter()
+        model = load_model(path)
+        load_ms = (time.perf_counter() - start) * 1e3
+        print(f"trained on {args.train} texts in {train_s:.1f}s, model {os.path.getsize(path) / 1e6:.1f} MB, load {load_ms:.2f} ms")
+
+        texts, labels = _corpus(args.texts, vocab, rng)
+        keyword = KeywordClassifier()
+        print(f"{'batch':>6} {'keyword docs/s':>15} {'model docs/s':>13}")
+        for size in (int(s) for s in args.batch_sizes.split(",")):
+            print(f"{size:>6} {_docs_per_sec(keyword, texts, size):>15,.0f} {_docs_per_sec(model, texts, size):>13,.0f}")
+        print(f"accuracy: keyword {accuracy(keyword, texts, labels):.3f}, model {accuracy(model, texts, labels):.3f}")
+        del model  # release the memmap before the directory is removed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Benchmark rule matching cost as the number of rules grows.
+
+Compiles synthetic rule files of increasing size (on top of the bundled
+rules) and times :meth:`CompiledRules.evaluate` on synthetic posts, both
+from raw text and from text tokenized once up front (as the pipeline does),
+next to the naive approach the hard-coded lists used (``any(term in text)``
+per rule), whose cost grows linearly with the rule count.
+
+Usage:
+    python scripts/bench_rules.py [--texts 2000] [--sizes 10,100,1000,5000]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rules import DEFAULT_PATH, compile_rules  # noqa: E402
+from src.tokenizer import tokenize_text  # noqa: E402
+
+WORDS = (
+    "pricing export csv slow dashboard crash login webhook api billing invoice "
+    "integration onboarding sync mobile notification report search filter team "
+    "permission import backup latency timeout refund trial upgrade support bug "
+    "the a we our it is was to of and for with that this on in but not really"
+).split()
+
+
+def _word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+
+def _spec(n_rules, rng):
+    """Bundled rules plus ``n_rules`` synthetic topic rules of 3 terms each."""
+    with open(DEFAULT_PATH, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    spec["rule_sets"]["topic"] = {
+        "mode": "sum",
+        "default": 0,
+        "rules": [{"value": 1, "terms": [_word(rng) for _ in range(3)]} for _ in range(n_rules)],
+    }
+    return spec
+
+
+def _naive(spec, text):
+    text = text.lower()
+    return {
+        name: [i for i, rule in enumerate(rs["rules"]) if any(t in text for t in rule["terms"])]
+        for name, rs in spec["rule_sets"].items()
+    }
+
+
+def _time(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--sizes", default="10,100,1000,5000")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))) for _ in range(args.texts)]
+    tokenized = [tokenize_text(t) for t in texts]
+
+    print(f"{'rules':>7} {'compile ms':>11} {'text us':>8} {'tokens us':>10} {'naive us':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        spec = _spec(size, rng)
+        start = time.perf_counter()
+        rules = compile_rules(json.dumps(spec).encode("utf-8"))
+        compile_ms = (time.perf_counter() - start) * 1e3
+        from_text = _time(rules.evaluate, texts)
+        from_tokens = _time(rules.evaluate, tokenized)
+        naive = _time(lambda t: _naive(spec, t), texts)
+        print(f"{len(rules):>7} {compile_ms:>11.1f} {from_text:>8.1f} {from_tokens:>10.1f} {naive:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Benchmark indexing throughput and query latency of the search index.
+
+Builds a throwaway SQLite FTS5 index of synthetic posts, then times a mix
+of selective and common queries (with and without filters).
+
+Usage:
+    python scripts/bench_search.py [--posts 1000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.search_index import SearchIndex  # noqa: E402
+
+WORDS = (
+    "pricing export csv slow dashboard crash login webhook api billing invoice "
+    "integration onboarding sync mobile notification report search filter team "
+    "permission import backup latency timeout refund trial upgrade support bug"
+).split()
+FILLER = [f"w{i}" for i in range(5000)]
+QUERIES = ["export csv", "webhook timeout", "refund", "pricing", "slow dashboard", "invoice*", "sync mobile crash"]
+
+
+def _posts(n, rng):
+    for i in range(n):
+        words = rng.sample(WORDS, 3) + rng.sample(FILLER, 12)
+        yield {
+            "post_url": f"https://reddit.com/r/x/{i}",
+            "post_title": " ".join(words[:6]),
+            "comment_or_content": " ".join(words[3:]),
+            "pain_summary": " ".join(words[:4]),
+            "subreddit": ("SaaS", "startups", "webdev")[i % 3],
+            "category": ("Pricing", "Bugs", "Feature", "Performance", "Other")[i % 5],
+            "pain_score": rng.randint(0, 100),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50_000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as td, SearchIndex(os.path.join(td, "bench.db")) as index:
+        start = time.perf_counter()
+        batch = []
+        for post in _posts(args.posts, rng):
+            batch.append(post)
+            if len(batch) >= args.batch:
+                index.add_records(batch)
+                batch = []
+        index.add_records(batch)
+        index.optimize()
+        elapsed = time.perf_counter() - start
+        print(f"indexed {args.posts} posts in {elapsed:.1f}s ({args.posts / elapsed:,.0f} posts/s)")
+
+        for label, kwargs in (("no filter", {}), ("subreddit filter", {"subreddit": "SaaS"})):
+            latencies = []
+            for i in range(args.queries):
+                q = QUERIES[i % len(QUERIES)]
+                start = time.perf_counter()
+                index.search(q, limit=20, **kwargs)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(f"{label:<17} median {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Incrementally maintained aggregate index over pipeline records.
+
+Records are grouped by ``(subreddit, category, day)``. Each group keeps a
+count, exact sums and a 0-100 histogram of ``pain_score`` and
+``revenue_potential_score``, so means and percentiles of any rollup are
+computed in O(groups) rather than by re-scanning every record. Both scores
+are integers in 0..100 (see :mod:`src.scoring` and
+:mod:`src.revenue_estimator`), which makes histogram percentiles exact.
+
+The backend summary, the HTML report and the dashboard all read from this
+index; the CLI persists it next to the CSV export as ``aggregates.json``.
+
+Example:
+    >>> index = AggregateIndex()
+    >>> index.extend(records)
+    >>> index.rollup("category")["Pricing"]["pain_mean"]
+    >>> index.save("output/aggregates.json")
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from src.records import RecordLike
+
+DIMENSIONS = ("subreddit", "category", "day")
+METRICS = {"pain": "pain_score", "revenue": "revenue_potential_score"}
+PERCENTILES = (50, 90)
+_BINS = 101
+UNKNOWN = "unknown"
+
+GroupKey = Tuple[str, str, str]
+
+
+def day_of(date: Any) -> str:
+    """Return the ``YYYY-MM-DD`` part of an ISO timestamp (or ``unknown``)."""
+    if isinstance(date, str) and len(date) >= 10:
+        return date[:10]
+    return UNKNOWN
+
+
+def _bin(value: Any) -> int:
+    return min(max(int(round(value)), 0), _BINS - 1)
+
+
+class GroupStats:
+    """Count, sums and score histograms for one group (or a merge of groups)."""
+
+    __slots__ = ("count", "sums", "hists")
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {m: 0 for m in METRICS}
+        self.hists = {m: [0] * _BINS for m in METRICS}
+
+    def add(self, rec: RecordLike) -> None:
+        self.count += 1
+        for metric, field in METRICS.items():
+            value = rec.get(field, 0)
+            if not isinstance(value, (int, float)) or value != value:
+                value = 0  # missing, non-numeric or NaN (e.g. a blank CSV cell)
+            self.sums[metric] += value
+            self.hists[metric][_bin(value)] += 1
+
+    def merge(self, other: "GroupStats") -> None:
+        self.count += other.count
+        for metric in METRICS:
+            self.sums[metric] += other.sums[metric]
+            hist, other_hist = self.hists[metric], other.hists[metric]
+            for i, n in enumerate(other_hist):
+                if n:
+                    hist[i] += n
+
+    def mean(self, metric: str) -> float:
+        return self.sums[metric] / self.count if self.count else 0
+
+    def percentile(self, metric: str, q: float) -> Optional[int]:
+        """Nearest-rank ``q``-th percentile of ``metric`` (None when empty)."""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * q // 100))  # ceil without floats
+        seen = 0
+        for value, n in enumerate(self.hists[metric]):
+            seen += n
+            if seen >= rank:
+                return value
+        return _BINS - 1  # pragma: no cover - unreachable, histogram sums to count
+
+    def to_summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count}
+        for metric in METRICS:
+            out[f"{metric}_sum"] = self.sums[metric]
+            out[f"{metric}_mean"] = self.mean(metric)
+            for q in PERCENTILES:
+                out[f"{metric}_p{q}"] = self.percentile(metric, q)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Histograms are stored sparse ({score: n}) to keep the JSON small
+        return {
+            "count": self.count,
+            "sums": dict(self.sums),
+            "hists": {m: {str(i): n for i, n in enumerate(h) if n} for m, h in self.hists.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GroupStats":
+        stats = cls()
+        stats.count = data["count"]
+        stats.sums.update(data["sums"])
+        for metric, sparse in data["hists"].items():
+            for i, n in sparse.items():
+                stats.hists[metric][int(i)] = n
+        return stats
+
+
+class AggregateIndex:
+    """Per ``(subreddit, category, day)`` rollups maintained as records arrive."""
+
+    def __init__(self):
+        self.groups: Dict[GroupKey, GroupStats] = {}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    @staticmethod
+    def key_for(rec: RecordLike) -> GroupKey:
+        return (
+            rec.get("subreddit") or UNKNOWN,
+            rec.get("category") or "Other",
+            day_of(rec.get("date")),
+        )
+
+    def add(self, rec: RecordLike) -> None:
+        """Fold one record into its group."""
+        key = self.key_for(rec)
+        stats = self.groups.get(key)
+        if stats is None:
+            stats = self.groups[key] = GroupStats()
+        stats.add(rec)
+
+    def extend(self, records: Iterable[RecordLike]) -> "AggregateIndex":
+        for rec in records:
+            self.add(rec)
+        return self
+
+    @classmethod
+    def from_records(cls, records: Iterable[RecordLike]) -> "AggregateIndex":
+        return cls().extend(records)
+
+    def merge(self, other: "AggregateIndex") -> None:
+        """Fold another index (e.g. from a later batch) into this one."""
+        for key, stats in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                mine = self.groups[key] = GroupStats()
+            mine.merge(stats)
+
+    def totals(self) -> GroupStats:
+        """Stats over every record in the index."""
+        total = GroupStats()
+        for stats in self.groups.values():
+            total.merge(stats)
+        return total
+
+    def rollup(self, by: Union[str, Sequence[str]] = ()) -> Dict[Any, Dict[str, Any]]:
+        """Roll groups up to the given dimension(s).
+
+        Args:
+            by: A dimension name or sequence of names from :data:`DIMENSIONS`.
+                A single name keys the result by that value; several names key
+                it by a tuple of values.
+
+        Returns:
+            Mapping of dimension value(s) -> :meth:`GroupStats.to_summary`.
+        """
+        names = (by,) if isinstance(by, str) else tuple(by)
+        try:
+            positions = [DIMENSIONS.index(n) for n in names]
+        except ValueError:
+            raise ValueError(f"unknown dimension in {names!r}; expected one of {DIMENSIONS}") from None
+        merged: Dict[Any, GroupStats] = {}
+        for key, stats in self.groups.items():
+            out_key = tuple(key[p] for p in positions)
+            if isinstance(by, str):
+                out_key = out_key[0]
+            target = merged.get(out_key)
+            if target is None:
+                target = merged[out_key] = GroupStats()
+            target.merge(stats)
+        return {k: v.to_summary() for k, v in merged.items()}
+
+    def counts(self, by: str) -> Dict[str, int]:
+        """Record counts per value of one dimension, most frequent first."""
+        counts: Dict[str, int] = {}
+        position = DIMENSIONS.index(by)
+        for key, stats in self.groups.items():
+            counts[key[position]] = counts.get(key[position], 0) + stats.count
+        return dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dimensions": list(DIMENSIONS),
+            "groups": [{"key": list(k), **v.to_dict()} for k, v in self.groups.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AggregateIndex":
+        index = cls()
+        for group in data.get("groups", []):
+            index.groups[tuple(group["key"])] = GroupStats.from_dict(group)
+        return index
+
+    def save(self, path: str) -> str:
+        """Write the index as JSON (atomically) and return ``path``."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "AggregateIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def write_aggregates(records: Iterable[RecordLike], output_dir: str = "output", filename: str = "aggregates.json") -> str:
+    """Build an index over ``records`` and persist it for the dashboard."""
+    return AggregateIndex.from_records(records).save(os.path.join(output_dir, filename))
+
+
+def summarize_threads(records: Iterable[RecordLike]) -> Dict[str, Dict[str, Any]]:
+    """Per-thread rollup of comment records, keyed by ``parent_url``.
+
+    Each summary has the :meth:`GroupStats.to_summary` fields plus the
+    parent ``post_title``, the ``subreddit`` and the thread's most frequent
+    ``top_category``. Records without a ``parent_url`` (submissions) are
+    ignored.
+    """
+    groups: Dict[str, GroupStats] = {}
+    meta: Dict[str, Dict[str, Any]] = {}
+    categories: Dict[str, Dict[str, int]] = {}
+    for rec in records:
+        parent = rec.get("parent_url")
+        if not parent:
+            continue
+        stats = groups.get(parent)
+        if stats is None:
+            stats = groups[parent] = GroupStats()
+            meta[parent] = {"post_title": rec.get("post_title"), "subreddit": rec.get("subreddit")}
+            categories[parent] = {}
+        stats.add(rec)
+        cat = str(rec.get("category") or UNKNOWN)
+        categories[parent][cat] = categories[parent].get(cat, 0) + 1
+    out = {}
+    for parent, stats in groups.items():
+        summary = dict(meta[parent], **stats.to_summary())
+        # max() keeps the first category seen among equally frequent ones
+        summary["top_category"] = max(categories[parent].items(), key=lambda kv: kv[1])[0]
+        out[parent] = summary
+    return out
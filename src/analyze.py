@@ -2,7 +2,8 @@
 
 This module provides functions to transform raw Reddit post data into a structured
 schema suitable for pain-point analysis. It includes category inference based on
-keywords, severity rating heuristics, and text summarization.
+keywords (declared in the rules file, see :mod:`src.rules`), severity rating
+heuristics, and text summarization.
 
 Schema Output Fields:
     - date: ISO 8601 timestamp of the post
@@ -20,21 +21,25 @@ Migration Note:
     (pain_score, suggested_*, competition_level, etc.). These are added by
     other modules (scoring.py, solution_generator.py, competitor_detector.py).
 """
-from typing import List, Dict
+from itertools import islice
+from typing import TYPE_CHECKING, Any, List, Dict, Iterable, Optional, Union
 
-# Keyword categories used for automatic classification
-KEYWORD_CATEGORIES = {
-    "pricing": ["price", "pricing", "cost", "expensive", "subscription"],
-    "bugs": ["bug", "error", "crash", "broken"],
-    "feature": ["feature", "missing", "would be nice", "need"],
-    "performance": ["slow", "latency", "lag", "performance"],
-}
+from src.records import PainPointRecord
+from src.rules import current_rules
+from src.tokenizer import tokenize_text
+
+if TYPE_CHECKING:
+    from src.classifier import CategoryClassifier
+
+# Items classified per call when a model classifier labels categories
+CLASSIFY_BATCH_SIZE = 1024
 
 def _infer_category(text: str) -> str:
     """Infer the pain-point category from text content.
 
-    Analyzes the text for keywords to determine the most likely category.
-    Categories are checked in order: pricing, bugs, feature, performance.
+    Uses the ``category`` rule set of the active rules file (see
+    :mod:`src.rules`); with the bundled rules, categories are checked in
+    order: pricing, bugs, feature, performance.
 
     Args:
         text: The text content to analyze (title + body).
@@ -42,38 +47,27 @@ def _infer_category(text: str) -> str:
     Returns:
         One of: 'Pricing', 'Bugs', 'Feature', 'Performance', or 'Other'.
     """
-    t = text.lower()
-    for cat, kws in KEYWORD_CATEGORIES.items():
-        for k in kws:
-            if k in t:
-                return cat.capitalize()
-    return "Other"
+    return current_rules().classify("category", text)
 
 
 def _infer_severity(text: str) -> int:
     """Infer the severity rating based on emotional intensity.
 
-    Analyzes text for emotional keywords to determine pain severity.
-    Higher severity indicates more urgent or blocking issues.
+    Uses the ``severity`` rule set of the active rules file (see
+    :mod:`src.rules`). Higher severity indicates more urgent or blocking
+    issues.
 
     Args:
         text: The text content to analyze.
 
     Returns:
-        Integer 1-5:
+        Integer 1-5 (bundled rules):
             5 - Critical (urgent, blocking, can't/cannot)
             4 - Major (breaking, serious)
             3 - Moderate (annoying, frustrating)
             2 - Default (no strong indicators)
     """
-    t = text.lower()
-    if any(x in t for x in ["urgent", "critical", "blocking", "can't", "cannot"]):
-        return 5
-    if any(x in t for x in ["major", "breaking", "serious"]):
-        return 4
-    if any(x in t for x in ["annoy", "annoying", "frustrat"]):
-        return 3
-    return 2
+    return current_rules().classify("severity", text)
 
 
 def _summarize(text: str, max_chars: int = 200) -> str:
@@ -97,19 +91,52 @@ def _summarize(text: str, max_chars: int = 200) -> str:
     return t[:max_chars].rsplit(" ", 1)[0] + "..."
 
 
-def transform_to_schema(items: List[Dict]) -> List[Dict]:
+# Raw item key -> record field for Reddit engagement metrics
+ENGAGEMENT_FIELDS = {"score": "post_score", "num_comments": "num_comments", "upvote_ratio": "upvote_ratio"}
+
+
+def _engagement(item: Dict) -> Dict[str, Any]:
+    """Engagement fields present on ``item``; absent ones are left out."""
+    out = {}
+    for raw_key, field in ENGAGEMENT_FIELDS.items():
+        value = item.get(raw_key)
+        if value is not None:
+            out[field] = value
+    return out
+
+
+def _thread_link(item: Dict) -> Dict[str, Any]:
+    """``parent_url`` of a comment item; empty for submissions."""
+    parent = item.get("parent_url")
+    return {"parent_url": parent} if parent else {}
+
+
+def transform_to_schema(
+    items: Iterable[Dict],
+    compact: bool = False,
+    classifier: Optional["CategoryClassifier"] = None,
+) -> List[Union[Dict, PainPointRecord]]:
     """Transform raw Reddit items into the canonical pain-point schema.
 
     Processes a list of raw Reddit post data and converts each into a
     structured record with inferred category, severity, and summary.
 
     Args:
-        items: List of raw Reddit items. Each item should contain:
+        items: Iterable of raw Reddit items. Each item should contain:
             - title: Post title
             - selftext: Post body content
             - subreddit: Subreddit name
             - date: ISO 8601 timestamp
             - full_link: URL to the post
+            - score, num_comments, upvote_ratio: Optional Reddit engagement
+            - parent_url, parent_title: Set on comment items (see
+              :class:`~src.scrape_reddit.CommentFetcher`)
+        compact: If True, return :class:`~src.records.PainPointRecord`
+            instances instead of dicts. Every downstream stage accepts both;
+            use :func:`~src.records.records_to_dicts` at the export boundary.
+        classifier: Optional :class:`~src.classifier.CategoryClassifier`
+            that labels categories instead of the keyword rules. Items are
+            then classified in batches of :data:`CLASSIFY_BATCH_SIZE`.
 
     Returns:
         List of structured records with the following fields:
@@ -122,22 +149,69 @@ def transform_to_schema(items: List[Dict]) -> List[Dict]:
             - category: Inferred category
             - severity_rating: 1-5 severity score
             - notes: Empty string (for user annotations)
+            - post_score, num_comments, upvote_ratio: Engagement, only when
+              the raw item carries it (used by the scoring engine)
+            - parent_url: Only on comment records; ``post_title`` is then
+              the parent post's title
     """
     records = []
-    for it in items:
-        content = (it.get("title", "") or "") + "\n" + (it.get("selftext", "") or "")
-        summary = _summarize(content)
-        category = _infer_category(content)
-        severity = _infer_severity(content)
-        records.append({
-            "date": it.get("date"),
-            "subreddit": it.get("subreddit"),
-            "post_title": it.get("title"),
-            "post_url": it.get("full_link"),
-            "comment_or_content": it.get("selftext"),
-            "pain_summary": summary,
-            "category": category,
-            "severity_rating": severity,
-            "notes": "",
-        })
-    return records
+    rules = current_rules()
+    if classifier is None:
+        for it in items:
+            content = _content(it)
+            # Tokenize once; both labels are set lookups on the same tokens,
+            # which compact records keep for the scoring stage
+            tokens = tokenize_text(content)
+            labels = rules.evaluate(tokens, ("category", "severity"))
+            records.append(_build_record(it, content, tokens, labels["category"], labels["severity"], compact))
+        return records
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, CLASSIFY_BATCH_SIZE))
+        if not chunk:
+            return records
+        contents = [_content(it) for it in chunk]
+        batch = [tokenize_text(c) for c in contents]
+        categories = classifier.predict(batch)
+        for it, content, tokens, category in zip(chunk, contents, batch, categories):
+            severity = rules.classify("severity", tokens)
+            records.append(_build_record(it, content, tokens, category, severity, compact))
+
+
+def _content(item: Dict) -> str:
+    return (item.get("title", "") or "") + "\n" + (item.get("selftext", "") or "")
+
+
+def _build_record(it: Dict, content: str, tokens: Any, category: str, severity: int, compact: bool) -> Union[Dict, PainPointRecord]:
+    summary = _summarize(content)
+    title = it.get("title")
+    if not title and it.get("parent_url"):
+        title = it.get("parent_title")
+    if compact:
+        return PainPointRecord(
+            date=it.get("date"),
+            subreddit=it.get("subreddit"),
+            post_title=title,
+            post_url=it.get("full_link"),
+            comment_or_content=it.get("selftext"),
+            pain_summary=summary,
+            category=category,
+            severity_rating=severity,
+            notes="",
+            **_engagement(it),
+            **_thread_link(it),
+            tokens=tokens,
+        )
+    return {
+        "date": it.get("date"),
+        "subreddit": it.get("subreddit"),
+        "post_title": title,
+        "post_url": it.get("full_link"),
+        "comment_or_content": it.get("selftext"),
+        "pain_summary": summary,
+        "category": category,
+        "severity_rating": severity,
+        "notes": "",
+        **_engagement(it),
+        **_thread_link(it),
+    }
@@ -0,0 +1,229 @@
+"""Asynchronous Browse.ai runner with exponential-backoff polling.
+
+This is the non-blocking counterpart of :mod:`src.browseai_runner`. Instead of
+sleeping the calling thread in a fixed 2s loop, runs are awaited on the event
+loop with exponential backoff and jitter between status polls, so several
+robot runs can be in flight at once and other work (e.g. a concurrent
+Pushshift crawl) can proceed in parallel.
+
+Response handling mirrors the synchronous runner: the POST response is
+returned directly unless it carries both a ``status`` and a ``status_url``,
+in which case the status URL is polled until it reports completion/failure.
+
+Example Usage:
+    >>> import asyncio
+    >>> from src.browseai_async import run_from_env_async
+    >>> result = asyncio.run(run_from_env_async(payload={"limit": 10}))
+"""
+import asyncio
+import inspect
+import os
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from src.browseai_runner import validate_environment
+from src.http_client import async_client
+from src.lazy import lazy_import
+from src.replay import replayable
+
+httpx = lazy_import("httpx")
+
+COMPLETED_STATES = ("completed", "finished", "done")
+FAILED_STATES = ("failed", "error")
+
+CompletionHook = Callable[[Dict[str, Any]], Any]
+
+
+def backoff_delays(
+    initial: float = 1.0,
+    factor: float = 2.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.25,
+    rng: Optional[random.Random] = None,
+) -> Iterator[float]:
+    """Yield an endless sequence of poll delays with exponential growth.
+
+    Each delay is ``min(max_delay, initial * factor**n)`` reduced by a random
+    fraction of up to ``jitter`` so concurrent runs do not poll in lockstep.
+
+    Args:
+        initial: First delay in seconds.
+        factor: Growth factor applied after every poll.
+        max_delay: Upper bound for a single delay.
+        jitter: Fraction (0-1) of each delay that is randomized away.
+        rng: Optional random generator (for deterministic tests).
+    """
+    rng = rng or random.Random()
+    base = initial
+    while True:
+        capped = min(base, max_delay)
+        yield capped * (1 - jitter * rng.random())
+        base *= factor
+
+
+def _check_cancelled() -> None:
+    """Re-raise a cancellation that an awaited HTTP call swallowed.
+
+    httpcore shields connection cleanup from cancellation, so a
+    ``task.cancel()`` landing mid-request can be absorbed and the request
+    returns (or fails) normally while the task is still marked as
+    cancelling.
+    """
+    task = asyncio.current_task()
+    if task is not None and task.cancelling():
+        raise asyncio.CancelledError()
+
+
+async def _notify(hook: Optional[CompletionHook], result: Dict[str, Any]) -> None:
+    if hook is None:
+        return
+    out = hook(result)
+    if inspect.isawaitable(out):
+        await out
+
+
+@replayable("browseai", key_args=("run_url", "payload"))
+async def run_browseai_job_async(
+    run_url: str,
+    api_key: str,
+    payload: Optional[Dict] = None,
+    timeout: float = 300,
+    *,
+    client: Optional["httpx.AsyncClient"] = None,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+    backoff_factor: float = 2.0,
+    jitter: float = 0.25,
+    on_complete: Optional[CompletionHook] = None,
+) -> Dict[str, Any]:
+    """Execute a Browse.ai job without blocking the event loop.
+
+    Args:
+        run_url: The Browse.ai run endpoint URL.
+        api_key: The Browse.ai API key for authentication.
+        payload: Optional JSON payload to send with the request.
+        timeout: Maximum seconds to wait for async job completion (default: 300).
+        client: Optional shared ``httpx.AsyncClient``; a private one is
+            created (and closed) when omitted.
+        initial_delay: First poll delay in seconds.
+        max_delay: Maximum delay between polls.
+        backoff_factor: Multiplier applied to the delay after each poll.
+        jitter: Fraction of each delay that is randomized.
+        on_complete: Optional callback (sync or async) invoked with the final
+            result before it is returned, webhook-style.
+
+    Returns:
+        The JSON response from Browse.ai, either immediately or after polling.
+
+    Raises:
+        httpx.HTTPStatusError: If the run request fails.
+        RuntimeError: If the Browse.ai run fails.
+        TimeoutError: If the run does not complete within the timeout period.
+        asyncio.CancelledError: If the awaiting task is cancelled.
+    """
+    kwargs = dict(
+        initial_delay=initial_delay, max_delay=max_delay, backoff_factor=backoff_factor,
+        jitter=jitter, on_complete=on_complete,
+    )
+    if client is None:
+        async with async_client(timeout=30) as own_client:
+            return await _run_job(own_client, run_url, api_key, payload, timeout, **kwargs)
+    return await _run_job(client, run_url, api_key, payload, timeout, **kwargs)
+
+
+async def _run_job(
+    client: "httpx.AsyncClient",
+    run_url: str,
+    api_key: str,
+    payload: Optional[Dict],
+    timeout: float,
+    *,
+    initial_delay: float,
+    max_delay: float,
+    backoff_factor: float,
+    jitter: float,
+    on_complete: Optional[CompletionHook],
+) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    resp = await client.post(run_url, json=payload or {}, headers=headers)
+    _check_cancelled()
+    resp.raise_for_status()
+    data = resp.json()
+
+    status = data.get("status")
+    status_url = data.get("status_url") or data.get("statusUrl")
+    if not status or not status_url:
+        await _notify(on_complete, data)
+        return data
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delays = backoff_delays(initial_delay, backoff_factor, max_delay, jitter)
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError("Timed out waiting for Browse.ai run to complete")
+        await asyncio.sleep(min(next(delays), remaining))
+        _check_cancelled()
+
+        try:
+            sresp = await client.get(status_url, headers=headers)
+            sresp.raise_for_status()
+            sdata = sresp.json()
+        except (httpx.HTTPError, ValueError):
+            # Transient poll failures are retried on the backoff schedule.
+            _check_cancelled()
+            continue
+        _check_cancelled()
+
+        st = sdata.get("status") or sdata.get("state")
+        if st and st.lower() in COMPLETED_STATES:
+            await _notify(on_complete, sdata)
+            return sdata
+        if st and st.lower() in FAILED_STATES:
+            raise RuntimeError(f"Browse.ai run failed: {sdata}")
+
+
+async def run_browseai_jobs_async(
+    jobs: Sequence[Dict[str, Any]],
+    api_key: str,
+    max_concurrency: int = 4,
+    timeout: float = 300,
+    **kwargs: Any,
+) -> List[Any]:
+    """Run several Browse.ai robots concurrently over one shared client.
+
+    Args:
+        jobs: Sequence of ``{"run_url": ..., "payload": ...}`` dicts.
+        api_key: The Browse.ai API key for authentication.
+        max_concurrency: Maximum number of runs in flight at once.
+        timeout: Per-run timeout in seconds.
+        **kwargs: Extra options forwarded to :func:`run_browseai_job_async`.
+
+    Returns:
+        One entry per job, in order: the run result, or the exception raised
+        by that run (failures of one robot do not cancel the others).
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async with async_client(timeout=30) as client:
+        async def _one(job: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                return await run_browseai_job_async(
+                    job["run_url"], api_key, job.get("payload"), timeout, client=client, **kwargs
+                )
+
+        return await asyncio.gather(*(_one(j) for j in jobs), return_exceptions=True)
+
+
+async def run_from_env_async(payload: Optional[Dict] = None, timeout: float = 300, **kwargs: Any) -> Dict[str, Any]:
+    """Async equivalent of :func:`src.browseai_runner.run_from_env`.
+
+    Raises:
+        EnvironmentError: If required environment variables are missing or empty.
+    """
+    validate_environment()
+    return await run_browseai_job_async(
+        os.environ["BROWSEAI_RUN_URL"], os.environ["BROWSEAI_API_KEY"], payload, timeout, **kwargs
+    )
+
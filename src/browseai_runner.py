@@ -26,7 +26,9 @@ Example Usage:
 import os
 import time
 from typing import Any, Dict, Optional
-import requests
+
+from src.http_client import http
+from src.replay import replayable
 
 
 def validate_environment() -> bool:
@@ -57,6 +59,7 @@ def validate_environment() -> bool:
     return True
 
 
+@replayable("browseai", key_args=("run_url", "payload"))
 def run_browseai_job(run_url: str, api_key: str, payload: Optional[Dict] = None, timeout: int = 300) -> Dict[str, Any]:
     """Execute a Browse.ai job by POSTing to the run endpoint.
 
@@ -76,7 +79,7 @@ def run_browseai_job(run_url: str, api_key: str, payload: Optional[Dict] = None,
     """
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     payload = payload or {}
-    resp = requests.post(run_url, json=payload, headers=headers, timeout=30)
+    resp = http.post(run_url, json=payload, headers=headers, timeout=30)
     resp.raise_for_status()
     data = resp.json()
 
@@ -91,7 +94,7 @@ def run_browseai_job(run_url: str, api_key: str, payload: Optional[Dict] = None,
 
     while time.time() - start < timeout:
         try:
-            sresp = requests.get(status_url, headers=headers, timeout=30)
+            sresp = http.get(status_url, headers=headers, timeout=30)
             sresp.raise_for_status()
             sdata = sresp.json()
         except Exception:
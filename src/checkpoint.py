@@ -0,0 +1,242 @@
+"""Stage-level checkpoints for resumable pipeline runs.
+
+A CLI run is a sequence of :class:`Stage` objects (fetch, transform, score,
+solutions, competitors, revenue). :meth:`RunCheckpoint.run` persists the
+output of every stage as it completes, so a run that dies late (e.g. on
+GitHub timeouts in ``detect_competitors``) can restart from the last
+completed stage with ``--resume`` instead of re-scraping and re-scoring.
+
+Per-record stages can declare a ``batch_size``: their output is then
+checkpointed after every batch and a resumed run continues from the first
+unfinished batch.
+
+Layout of one run (``output/checkpoints/<run id>/``)::
+
+    manifest.json                   run id, argument fingerprint, stage status
+    transform-00000.ndjson.gz       stage output, one or more parts
+    competitors-00000.ndjson.gz     ... one part per finished batch
+    competitors-00001.ndjson.gz
+
+Parts are gzip-compressed NDJSON written to a temporary file and renamed,
+and the manifest is rewritten atomically after each part, so a crash never
+leaves a half-written part referenced. Compact records are stored as their
+raw field state (:meth:`~src.records.PainPointRecord.to_state`), keeping the
+solution template reference instead of the expanded text.
+
+Example:
+    >>> ckpt = RunCheckpoint.latest(fingerprint=args) or RunCheckpoint.create(fingerprint=args)
+    >>> records = ckpt.run([Stage("fetch", fetch), Stage("transform", transform),
+    ...                     Stage("competitors", detect_competitors, batch_size=100)])
+    >>> ckpt.finish()
+"""
+import gzip
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.records import PainPointRecord
+from src.serialization import dumps
+
+DEFAULT_DIR = os.path.join("output", "checkpoints")
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+@dataclass
+class Stage:
+    """One pipeline step.
+
+    Attributes:
+        name: Unique stage name (used in file names and the manifest).
+        fn: Called with the previous stage's output (None for the first
+            stage) and returns this stage's output list.
+        batch_size: For per-record stages, checkpoint every ``batch_size``
+            items; ``fn`` is then called once per batch.
+    """
+
+    name: str
+    fn: Callable[[Any], List[Any]]
+    batch_size: Optional[int] = None
+
+
+def _encode(item: Any) -> Dict[str, Any]:
+    if isinstance(item, PainPointRecord):
+        return {"r": item.to_state()}
+    return {"d": item}
+
+
+def _decode(row: Dict[str, Any]) -> Any:
+    if "r" in row:
+        return PainPointRecord.from_state(row["r"])
+    return row["d"]
+
+
+class RunCheckpoint:
+    """Checkpoint directory and manifest of one run.
+
+    Args:
+        directory: Run directory (created if missing).
+        fingerprint: Arguments that determine the run's output; a run is
+            only resumed with the same fingerprint.
+    """
+
+    def __init__(self, directory: str, fingerprint: Optional[Dict[str, Any]] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, MANIFEST)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                "format": FORMAT_VERSION,
+                "run_id": os.path.basename(os.path.normpath(directory)),
+                "created_at": time.time(),
+                "fingerprint": fingerprint or {},
+                "finished": False,
+                "stages": {},
+            }
+            self._write_manifest()
+
+    # -- run discovery -----------------------------------------------------
+
+    @classmethod
+    def create(cls, root: str = DEFAULT_DIR, fingerprint: Optional[Dict[str, Any]] = None) -> "RunCheckpoint":
+        """Start a new run directory under ``root``."""
+        run_id = time.strftime("%Y%m%d-%H%M%S")
+        directory = os.path.join(root, run_id)
+        n = 1
+        while os.path.exists(directory):
+            n += 1
+            directory = os.path.join(root, f"{run_id}-{n}")
+        return cls(directory, fingerprint)
+
+    @classmethod
+    def latest(cls, root: str = DEFAULT_DIR, fingerprint: Optional[Dict[str, Any]] = None) -> Optional["RunCheckpoint"]:
+        """The most recent unfinished run under ``root``, or None.
+
+        Raises:
+            ValueError: If that run was started with a different fingerprint.
+        """
+        if not os.path.isdir(root):
+            return None
+        candidates = []
+        for name in os.listdir(root):
+            path = os.path.join(root, name, MANIFEST)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                if not manifest.get("finished"):
+                    candidates.append((manifest.get("created_at", 0), name))
+        if not candidates:
+            return None
+        ckpt = cls(os.path.join(root, max(candidates)[1]))
+        if fingerprint is not None and ckpt.manifest.get("fingerprint") != fingerprint:
+            raise ValueError(
+                f"checkpoint {ckpt.run_id} was started with different arguments: {ckpt.manifest.get('fingerprint')}"
+            )
+        return ckpt
+
+    @property
+    def run_id(self) -> str:
+        return self.manifest["run_id"]
+
+    # -- stage state -------------------------------------------------------
+
+    def _write_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, path)
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        return self.manifest["stages"].setdefault(name, {"parts": [], "records": 0, "complete": False})
+
+    def completed(self, name: str) -> bool:
+        return bool(self.manifest["stages"].get(name, {}).get("complete"))
+
+    def records_done(self, name: str) -> int:
+        """Items of ``name`` already checkpointed (all of them once complete)."""
+        return self.manifest["stages"].get(name, {}).get("records", 0)
+
+    def append_part(self, name: str, items: Sequence[Any], complete: bool = False) -> None:
+        """Persist one more part of ``name``'s output."""
+        stage = self._stage(name)
+        part = f"{name}-{len(stage['parts']):05d}.ndjson.gz"
+        path = os.path.join(self.directory, part)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=5) as f:
+            for item in items:
+                f.write(dumps(_encode(item)) + b"\n")
+        os.replace(tmp, path)
+        stage["parts"].append(part)
+        stage["records"] += len(items)
+        stage["complete"] = complete
+        self._write_manifest()
+
+    def mark_complete(self, name: str) -> None:
+        self._stage(name)["complete"] = True
+        self._write_manifest()
+
+    def save(self, name: str, items: Sequence[Any]) -> None:
+        """Persist the whole output of ``name`` and mark it complete."""
+        self.append_part(name, items, complete=True)
+
+    def load(self, name: str) -> List[Any]:
+        """Output of ``name`` checkpointed so far, in order."""
+        out: List[Any] = []
+        for part in self.manifest["stages"].get(name, {}).get("parts", []):
+            with gzip.open(os.path.join(self.directory, part), "rb") as f:
+                out.extend(_decode(json.loads(line)) for line in f)
+        return out
+
+    # -- running -----------------------------------------------------------
+
+    def run(self, stages: Sequence[Stage], log: Callable[[str], Any] = print) -> List[Any]:
+        """Run ``stages`` in order, skipping the ones already checkpointed.
+
+        Only the output of the last completed stage is loaded; earlier
+        stages are not touched.
+        """
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate stage names: {names}")
+        start = 0
+        for i, stage in enumerate(stages):
+            if self.completed(stage.name):
+                start = i + 1
+        data: Any = None
+        if start:
+            data = self.load(stages[start - 1].name)
+            log(f"Resuming run {self.run_id} after stage '{stages[start - 1].name}' ({len(data)} items)")
+        for stage in stages[start:]:
+            data = self._run_stage(stage, data, log)
+        return data
+
+    def _run_stage(self, stage: Stage, data: Any, log: Callable[[str], Any]) -> List[Any]:
+        if not stage.batch_size:
+            out = list(stage.fn(data))
+            self.save(stage.name, out)
+            return out
+        items = list(data or [])
+        done = self.records_done(stage.name)
+        out = self.load(stage.name) if done else []
+        if done:
+            log(f"Resuming stage '{stage.name}' at item {done} of {len(items)}")
+        for start in range(done, len(items), stage.batch_size):
+            batch = list(stage.fn(items[start:start + stage.batch_size]))
+            self.append_part(stage.name, batch)
+            out.extend(batch)
+        self.mark_complete(stage.name)
+        return out
+
+    def finish(self, keep: bool = False) -> None:
+        """Mark the run finished; its files are removed unless ``keep``."""
+        self.manifest["finished"] = True
+        self._write_manifest()
+        if not keep:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,342 @@
+"""Pluggable category classifiers: keyword rules or a local linear model.
+
+``transform_to_schema`` labels categories through a
+:class:`CategoryClassifier`, one batch of tokenized texts at a time. Two
+implementations ship:
+
+- :class:`KeywordClassifier` applies the ``category`` rule set of the
+  active rules file (see :mod:`src.rules`); it is the default.
+- :class:`HashedLogisticRegression` is a multinomial logistic regression
+  over hashed unigram and bigram features, trained from labeled CSV
+  exports and run fully offline on CPU. A batch is vectorized into a CSR
+  matrix (numpy ``indptr``/``indices``/``data`` arrays) and scored with a
+  single gather over the weight matrix, so per-record Python work is
+  limited to hashing the tokens.
+
+Model files hold a small JSON header followed by the raw float32 weight
+matrix, 64-byte aligned, so :func:`load_model` memory-maps the weights
+instead of reading them: loading is constant time and several worker
+processes share one copy in the page cache.
+
+Usage:
+    $ python -m src.main classifier train labeled.csv -o output/category.clf
+    $ python -m src.main classifier eval holdout.csv --model output/category.clf
+    $ python -m src.main --category-model output/category.clf
+
+    >>> model = load_model("output/category.clf")
+    >>> records = transform_to_schema(items, classifier=model)
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.lazy import lazy_import
+from src.rules import current_rules
+from src.tokenizer import TextTokens, tokenize_text
+
+np = lazy_import("numpy")
+
+MAGIC = b"PPRCLF01"
+FORMAT_VERSION = 1
+DEFAULT_FEATURES = 2 ** 18
+_ALIGN = 64
+_HASH_CACHE_SIZE = 1 << 20  # feature string -> hash, cleared when full
+
+Csr = Tuple[Any, Any, Any]  # (indptr, indices, data) numpy arrays
+
+
+class CategoryClassifier:
+    """Interface for category classifiers used by ``transform_to_schema``."""
+
+    name = "base"
+
+    def predict(self, batch: Sequence[TextTokens]) -> List[str]:
+        """Return one category label per tokenized text."""
+        raise NotImplementedError
+
+
+class KeywordClassifier(CategoryClassifier):
+    """Category from the ``category`` rule set of the active rules file."""
+
+    name = "keyword"
+
+    def predict(self, batch: Sequence[TextTokens]) -> List[str]:
+        rules = current_rules()
+        return [rules.classify("category", tokens) for tokens in batch]
+
+
+def _hash(feature: str, mask: int) -> int:
+    # crc32 is stable across processes, unlike the salted built-in hash()
+    return zlib.crc32(feature.encode("utf-8")) & mask
+
+
+class HashedLogisticRegression(CategoryClassifier):
+    """Multinomial logistic regression over hashed n-gram features.
+
+    Args:
+        classes: Category labels, in weight-column order.
+        weights: ``(n_features, n_classes)`` float32 matrix (may be a memmap).
+        bias: Per-class intercepts.
+        ngram: 1 for unigrams only, 2 to add bigrams.
+    """
+
+    name = "hashed-logreg"
+
+    def __init__(self, classes: Sequence[str], weights: Any, bias: Any, ngram: int = 2):
+        n_features = weights.shape[0]
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        if weights.shape[1] != len(classes):
+            raise ValueError("weights must have one column per class")
+        self.classes = list(classes)
+        self.weights = weights
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.ngram = ngram
+        self._mask = n_features - 1
+        self._hash_cache: Dict[str, int] = {}
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    # -- features ----------------------------------------------------------
+
+    def _hashes(self, tokens: TextTokens) -> List[int]:
+        cache, mask = self._hash_cache, self._mask
+        feats = list(tokens.tokens)
+        if self.ngram >= 2:
+            # The cached bigram set: a repeated bigram counts once per text
+            feats.extend(tokens.bigrams)
+        out = []
+        for feat in feats:
+            h = cache.get(feat)
+            if h is None:
+                if len(cache) >= _HASH_CACHE_SIZE:
+                    cache.clear()
+                h = cache[feat] = _hash(feat, mask)
+            out.append(h)
+        return out
+
+    def vectorize(self, batch: Sequence[TextTokens]) -> Csr:
+        """CSR feature matrix of a batch: sublinear tf, L2-normalized rows."""
+        lengths, hashes = [], []
+        for tokens in batch:
+            row = self._hashes(tokens)
+            lengths.append(len(row))
+            hashes.extend(row)
+        n_rows = len(batch)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        # One sort counts every (row, feature) pair and orders the nonzeros
+        # row by row, as CSR needs
+        keys, counts = np.unique(rows * self.n_features + np.asarray(hashes, dtype=np.int64), return_counts=True)
+        rows = keys // self.n_features
+        indices = keys - rows * self.n_features
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        data = 1.0 + np.log(counts.astype(np.float32))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n_rows))
+        if data.size:
+            data = (data / norms[rows]).astype(np.float32)
+        return indptr, indices, data
+
+    # -- inference ---------------------------------------------------------
+
+    def decision_function(self, X: Csr) -> Any:
+        """``X @ weights + bias`` for a CSR matrix, shape ``(n_rows, n_classes)``."""
+        return _csr_dot(X, self.weights) + self.bias
+
+    def predict_proba(self, batch: Sequence[TextTokens]) -> Any:
+        return _softmax(self.decision_function(self.vectorize(batch)))
+
+    def predict(self, batch: Sequence[TextTokens]) -> List[str]:
+        if not len(batch):
+            return []
+        best = np.argmax(self.decision_function(self.vectorize(batch)), axis=1)
+        classes = self.classes
+        return [classes[i] for i in best.tolist()]
+
+    # -- training ----------------------------------------------------------
+
+    @classmethod
+    def fit(
+        cls,
+        batch: Sequence[TextTokens],
+        labels: Sequence[str],
+        n_features: int = DEFAULT_FEATURES,
+        ngram: int = 2,
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        batch_size: int = 64,
+        seed: int = 0,
+    ) -> "HashedLogisticRegression":
+        """Train with mini-batch SGD on softmax cross-entropy.
+
+        Args:
+            batch: Tokenized training texts.
+            labels: Category label per text.
+            n_features: Hash space size (a power of two).
+            ngram: 1 for unigrams, 2 to add bigrams.
+            epochs: Passes over the data.
+            learning_rate: Initial step size (decays as 1/sqrt(epoch)).
+            l2: L2 penalty on the weights touched by each mini-batch.
+            batch_size: Texts per SGD step.
+            seed: Shuffling seed.
+        """
+        if len(batch) != len(labels) or not len(batch):
+            raise ValueError("need one label per text and at least one text")
+        classes = sorted(set(labels))
+        model = cls(classes, np.zeros((n_features, len(classes)), dtype=np.float32), np.zeros(len(classes)), ngram)
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(batch))
+        # Shuffle once, then mini-batches are contiguous CSR row ranges
+        indptr, indices, data = model.vectorize([batch[i] for i in order])
+        class_index = {c: i for i, c in enumerate(classes)}
+        y = np.asarray([class_index[labels[i]] for i in order])
+        onehot = np.eye(len(classes), dtype=np.float32)[y]
+        starts = np.arange(0, len(batch), batch_size)
+        W, b = model.weights, model.bias
+        for epoch in range(epochs):
+            lr = learning_rate / math.sqrt(epoch + 1)
+            for start in rng.permutation(starts):
+                end = min(start + batch_size, len(batch))
+                lo, hi = indptr[start], indptr[end]
+                sub = (indptr[start:end + 1] - lo, indices[lo:hi], data[lo:hi])
+                grad = (_softmax(_csr_dot(sub, W) + b) - onehot[start:end]) / (end - start)
+                rows = np.repeat(np.arange(end - start), np.diff(sub[0]))
+                touched, inverse = np.unique(sub[1], return_inverse=True)
+                update = np.empty((touched.size, len(classes)), dtype=np.float32)
+                for c in range(len(classes)):
+                    update[:, c] = np.bincount(inverse, weights=sub[2] * grad[rows, c], minlength=touched.size)
+                W[touched] -= lr * (update + l2 * W[touched])
+                b -= lr * grad.sum(axis=0)
+        return model
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path: str) -> str:
+        """Write the model file (header + aligned raw weights) and return ``path``."""
+        header = json.dumps({
+            "format": FORMAT_VERSION,
+            "type": self.name,
+            "classes": self.classes,
+            "n_features": self.n_features,
+            "ngram": self.ngram,
+            "bias": [float(v) for v in self.bias],
+        }).encode("utf-8")
+        prefix = len(MAGIC) + 4 + len(header)
+        padding = -prefix % _ALIGN
+        weights = np.ascontiguousarray(self.weights, dtype="<f4")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(b"\0" * padding)
+            f.write(weights.tobytes())
+        return path
+
+
+def _csr_dot(X: Csr, W: Any) -> Any:
+    """Dense ``(n_rows, n_cols)`` product of a CSR matrix and ``W``."""
+    indptr, indices, data = X
+    n_rows = len(indptr) - 1
+    out = np.zeros((n_rows, W.shape[1]), dtype=np.float32)
+    nonempty = np.flatnonzero(np.diff(indptr))
+    if nonempty.size:
+        contrib = W[indices] * data[:, None]
+        # Rows are contiguous runs of nonzeros; empty rows are skipped
+        out[nonempty] = np.add.reduceat(contrib, indptr[nonempty], axis=0)
+    return out
+
+
+def _softmax(scores: Any) -> Any:
+    shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def load_model(path: str) -> HashedLogisticRegression:
+    """Open a model file with memory-mapped weights.
+
+    Raises:
+        ValueError: If the file is not a model written by :meth:`save`.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a classifier model file")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported model format {header.get('format')!r}")
+    prefix = len(MAGIC) + 4 + header_len
+    offset = prefix + (-prefix % _ALIGN)
+    shape = (header["n_features"], len(header["classes"]))
+    weights = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=shape)
+    return HashedLogisticRegression(header["classes"], weights, header["bias"], header["ngram"])
+
+
+def get_classifier(spec: Optional[str] = None) -> CategoryClassifier:
+    """Resolve ``"keyword"`` (or None) or a model file path to a classifier."""
+    if not spec or spec == KeywordClassifier.name:
+        return KeywordClassifier()
+    return load_model(spec)
+
+
+def read_labeled_csv(path: str, label_field: str = "category") -> Tuple[List[TextTokens], List[str]]:
+    """Tokenized texts and labels from a CSV export with corrected labels.
+
+    Texts are built like ``transform_to_schema`` builds them, from
+    ``post_title`` and ``comment_or_content``; rows without a label are
+    skipped.
+    """
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            label = (row.get(label_field) or "").strip()
+            if not label:
+                continue
+            texts.append(tokenize_text(f"{row.get('post_title') or ''}\n{row.get('comment_or_content') or ''}"))
+            labels.append(label)
+    return texts, labels
+
+
+def accuracy(classifier: CategoryClassifier, batch: Sequence[TextTokens], labels: Sequence[str]) -> float:
+    predicted = classifier.predict(batch)
+    return sum(p == y for p, y in zip(predicted, labels)) / len(labels) if len(labels) else 0.0
+
+
+def classifier_cli(argv: Optional[Sequence[str]] = None) -> int:
+    """``python -m src.main classifier`` entry point."""
+    parser = argparse.ArgumentParser(prog="python -m src.main classifier", description="Train or evaluate the category model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="Train a model from a labeled CSV export")
+    train.add_argument("csv", help="CSV with post_title, comment_or_content and category columns")
+    train.add_argument("-o", "--output", default="output/category.clf", help="Model file to write")
+    train.add_argument("--epochs", type=int, default=10)
+    train.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="Hash space size (power of two)")
+    train.add_argument("--label-field", default="category")
+    evaluate = sub.add_parser("eval", help="Compare a model with the keyword rules on a labeled CSV")
+    evaluate.add_argument("csv")
+    evaluate.add_argument("--model", required=True)
+    evaluate.add_argument("--label-field", default="category")
+    args = parser.parse_args(argv)
+
+    texts, labels = read_labeled_csv(args.csv, args.label_field)
+    if not texts:
+        print(f"No labeled rows in {args.csv}")
+        return 1
+    if args.command == "train":
+        model = HashedLogisticRegression.fit(texts, labels, n_features=args.features, epochs=args.epochs)
+        model.save(args.output)
+        print(f"Trained on {len(texts)} rows ({len(model.classes)} classes), training accuracy {accuracy(model, texts, labels):.3f}")
+        print(f"Wrote model -> {args.output}")
+        return 0
+    model = load_model(args.model)
+    print(f"keyword accuracy: {accuracy(KeywordClassifier(), texts, labels):.3f}")
+    print(f"model accuracy:   {accuracy(model, texts, labels):.3f}")
+    return 0
@@ -1,20 +1,28 @@
 """Check for existing competitors across multiple platforms."""
 from typing import List, Dict
-import requests
+
+from src.http_client import http
+from src.tokenizer import split_words
+
+PRODUCTHUNT_KEYWORDS = frozenset(["saas", "tool", "tools", "app", "apps", "platform", "monitor", "tracker"])
+REDDIT_KEYWORDS = frozenset(["management", "optimization", "automation", "integration"])
+
 
 def _search_producthunt(query: str) -> int:
     """Simple heuristic: count if query has been seen on ProductHunt."""
-    common_keywords = ["saas", "tool", "app", "platform", "monitor", "tracker"]
-    if any(kw in query.lower() for kw in common_keywords):
+    if not PRODUCTHUNT_KEYWORDS.isdisjoint(split_words(query)):
         return 2
     return 1
 
 def _search_github(query: str) -> int:
     """Simple GitHub search heuristic."""
     try:
-        resp = requests.get(
+        # Best-effort heuristic: fail fast instead of retrying; repeated
+        # queries are revalidated with the cached ETag
+        resp = http.get(
             f"https://api.github.com/search/repositories?q={query}&sort=stars&per_page=1",
-            timeout=5
+            timeout=5,
+            retries=0,
         )
         if resp.status_code == 200 and resp.json().get("total_count", 0) > 10:
             return 3
@@ -24,7 +32,7 @@ def _search_github(query: str) -> int:
 
 def _search_reddit(query: str) -> int:
     """Estimate Reddit mentions for competitive analysis."""
-    if any(x in query.lower() for x in ["management", "optimization", "automation", "integration"]):
+    if not REDDIT_KEYWORDS.isdisjoint(split_words(query)):
         return 2
     return 1
 
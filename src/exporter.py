@@ -1,7 +1,12 @@
 """Export canonical schema records to CSV and Excel files."""
 from typing import List, Dict
+import csv
 import os
-import pandas as pd
+
+from src.lazy import lazy_import
+from src.records import records_to_dicts
+
+pd = lazy_import("pandas")
 
 DEFAULT_OUTPUT_DIR = "output"
 
@@ -11,14 +16,43 @@ def _ensure_output_dir(path: str):
 def write_csv(records: List[Dict], path: str = None):
     _ensure_output_dir(DEFAULT_OUTPUT_DIR)
     out = path or os.path.join(DEFAULT_OUTPUT_DIR, "sample_output.csv")
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records_to_dicts(records))
     df.to_csv(out, index=False)
     return out
 
+def append_csv(records: List[Dict], path: str = None):
+    """Append records to a CSV, writing the header only when the file is new.
+
+    Columns follow the existing header. When a batch brings fields the header
+    does not have, the file is rewritten once with the widened header (earlier
+    rows get empty cells) instead of dropping the new columns.
+    """
+    out = path or os.path.join(DEFAULT_OUTPUT_DIR, "sample_output.csv")
+    _ensure_output_dir(os.path.dirname(out) or ".")
+    # object dtype keeps integer columns with gaps from turning into floats
+    df = pd.DataFrame(records_to_dicts(records), dtype=object)
+    if not (os.path.exists(out) and os.path.getsize(out)):
+        df.to_csv(out, index=False)
+        return out
+    with open(out, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f), [])
+    added = [c for c in df.columns if c not in header]
+    if not added:
+        df.reindex(columns=header).to_csv(out, mode="a", header=False, index=False)
+        return out
+    # read existing cells verbatim so the rewrite does not reformat them
+    existing = pd.read_csv(out, dtype=str, keep_default_na=False)
+    columns = header + added
+    tmp = f"{out}.tmp"
+    existing.reindex(columns=columns, fill_value="").to_csv(tmp, index=False)
+    df.reindex(columns=columns).to_csv(tmp, mode="a", header=False, index=False)
+    os.replace(tmp, out)
+    return out
+
 def write_excel(records: List[Dict], path: str = None):
     _ensure_output_dir(DEFAULT_OUTPUT_DIR)
     out = path or os.path.join(DEFAULT_OUTPUT_DIR, "sample_output.xlsx")
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records_to_dicts(records))
     df.to_excel(out, index=False)
     return out
 
@@ -0,0 +1,412 @@
+"""Shared, connection-pooled HTTP client for outbound calls.
+
+Pushshift, GitHub and Browse.ai are called through the module-level
+:data:`http` client instead of bare ``requests.get`` / ``requests.post``:
+
+- one keep-alive ``requests.Session`` per host, each with a connection
+  pool of ``pool_maxsize`` (``HTTP_POOL_MAXSIZE``);
+- one retry policy: idempotent requests are retried ``retries`` times
+  (``HTTP_RETRIES``) on connection errors, timeouts and 429/5xx responses,
+  with exponential backoff capped at ``backoff_max``, honoring
+  ``Retry-After``; POSTs are only retried when the caller asks for it;
+- conditional GETs: for a 200 response carrying an ``ETag`` or
+  ``Last-Modified``, the validators, headers and body bytes are cached
+  (LRU, bounded by entry count and total body bytes). Later identical GETs
+  send ``If-None-Match`` / ``If-Modified-Since`` and a ``304`` is answered
+  with a response rebuilt from the cache (GitHub does not count those
+  against its rate limit);
+- per-host :class:`HostStats` with a latency histogram, printed at the end
+  of a CLI run and available from :meth:`HttpClient.stats`.
+
+``requests`` has no HTTP/2 support; :func:`async_client` builds the
+``httpx.AsyncClient`` used by the async Browse.ai runner with HTTP/2
+enabled when the optional ``h2`` package is installed. Its transport
+records every request in the shared client's per-host stats.
+
+Example:
+    >>> from src.http_client import http
+    >>> resp = http.get(url, params={"q": "csv"}, timeout=20)
+    >>> http.stats()["api.github.com"]["latency"]["p95_ms"]
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.lazy import is_available, lazy_import
+
+requests = lazy_import("requests")
+httpx = lazy_import("httpx")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# HTTP/2 needs the optional h2 package (httpx only)
+HTTP2 = is_available("h2")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (see :data:`LATENCY_BUCKETS_MS`)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        i = 0
+        while i < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the ``q``-th percentile."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                if i < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[i])
+                break
+        return round(self.max_s * 1000.0, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_s * 1000.0 / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_s * 1000.0, 1),
+            "buckets_ms": dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+
+@dataclass
+class HostStats:
+    """Outbound request counters for one host."""
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    not_modified: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "not_modified": self.not_modified,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency": self.latency.to_dict(),
+        }
+
+
+def _retry_after(resp: Any) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CachedResponse:
+    """What the conditional-GET cache keeps of a 200 response."""
+
+    url: str
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str]
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+    def to_response(self, request: Any = None) -> Any:
+        """A fresh ``requests.Response`` carrying the cached body."""
+        resp = requests.models.Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.url = self.url
+        resp.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        resp.encoding = self.encoding
+        resp._content = self.content
+        resp.request = request
+        return resp
+
+
+class HttpClient:
+    """Pooled sessions, retries, conditional GETs and latency stats.
+
+    Args:
+        pool_maxsize: Connections kept alive per host.
+        retries: Retries of idempotent requests (POSTs: 0 unless passed
+            per call).
+        backoff_initial: First retry delay in seconds; doubles per retry.
+        backoff_max: Cap on any single delay, ``Retry-After`` included.
+        cache_size: Responses kept for conditional GETs (0 disables them).
+        cache_max_bytes: Total body bytes kept in that cache; larger
+            bodies are not cached.
+        sleep: Injected for tests.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 10,
+        retries: int = 2,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 10.0,
+        cache_size: int = 256,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        sleep: Callable[[float], Any] = time.sleep,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+        self.sleep = sleep
+        self.hosts: Dict[str, HostStats] = {}
+        self._sessions: Dict[str, Any] = {}
+        self._cache: "OrderedDict[Tuple[str, str, str], CachedResponse]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HttpClient":
+        """Client configured from ``HTTP_POOL_MAXSIZE`` and ``HTTP_RETRIES``."""
+        return cls(
+            pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "10")),
+            retries=int(os.environ.get("HTTP_RETRIES", "2")),
+        )
+
+    # -- sessions ----------------------------------------------------------
+
+    def session(self, url: str) -> Any:
+        """The pooled session for ``url``'s host (created on first use)."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled here, not by urllib3
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+            self._cache.clear()
+            self._cache_bytes = 0
+        for session in sessions:
+            session.close()
+
+    # -- requests ----------------------------------------------------------
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        retries: Optional[int] = None,
+        conditional: bool = True,
+        **kwargs: Any,
+    ) -> Any:
+        """Send a request through the host's pooled session.
+
+        Args:
+            method: HTTP method.
+            url: Absolute URL.
+            params, headers, **kwargs: As for ``requests.Session.request``.
+            retries: Override the client's retry count for this call.
+            conditional: Use the ETag/Last-Modified cache (GET only, not
+                for ``stream=True``).
+
+        Returns:
+            The ``requests.Response`` (rebuilt from the cache after a ``304``).
+
+        Raises:
+            requests.ConnectionError, requests.Timeout: After the last retry.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        headers = dict(headers or {})
+        key = cached = None
+        if conditional and self.cache_size and method == "GET" and not kwargs.get("stream"):
+            key = (url, repr(params), repr(sorted(headers.items())))
+            cached = self._cache_get(key)
+            if cached is not None:
+                if cached.etag:
+                    headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    headers["If-Modified-Since"] = cached.last_modified
+
+        stats = self._host_stats(urlsplit(url).netloc)
+        session = self.session(url)
+        delay = self.backoff_initial
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                resp = session.request(method, url, params=params, headers=headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(stats, start, None)
+                if attempt == retries:
+                    raise
+                wait = delay
+            else:
+                self._record(stats, start, resp.status_code)
+                if resp.status_code not in RETRY_STATUSES or attempt == retries:
+                    break
+                wait = _retry_after(resp)
+                wait = delay if wait is None else wait
+                resp.close()
+            with self._lock:
+                stats.retries += 1
+            self.sleep(min(wait, self.backoff_max))
+            delay = min(delay * 2, self.backoff_max)
+
+        if resp.status_code == 304 and cached is not None:
+            with self._lock:
+                stats.not_modified += 1
+            return cached.to_response(resp.request)
+        if key is not None and resp.status_code == 200 and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            self._cache_put(key, resp)
+        return resp
+
+    def _cache_get(self, key: Tuple[str, str, str]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key: Tuple[str, str, str], resp: Any) -> None:
+        content = resp.content
+        if len(content) > self.cache_max_bytes:
+            return
+        entry = CachedResponse(resp.url, dict(resp.headers), content, resp.encoding)
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._cache_bytes -= len(old.content)
+            self._cache[key] = entry
+            self._cache_bytes += len(content)
+            while len(self._cache) > self.cache_size or self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted.content)
+
+    # -- stats -------------------------------------------------------------
+
+    def _host_stats(self, host: str) -> HostStats:
+        with self._lock:
+            stats = self.hosts.get(host)
+            if stats is None:
+                stats = self.hosts[host] = HostStats()
+            return stats
+
+    def _record(self, stats: HostStats, start: float, status: Optional[int]) -> None:
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats.requests += 1
+            stats.latency.observe(elapsed)
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request counters and latency histograms."""
+        with self._lock:
+            return {host: s.to_dict() for host, s in sorted(self.hosts.items())}
+
+    def summary_lines(self) -> List[str]:
+        """One human-readable line per host, for CLI output."""
+        lines = []
+        for host, s in self.stats().items():
+            lat = s["latency"]
+            lines.append(
+                f"{host}: {s['requests']} requests ({s['retries']} retries, {s['errors']} errors, "
+                f"{s['not_modified']} not modified), p50 {lat['p50_ms']} ms, p95 {lat['p95_ms']} ms"
+            )
+        return lines
+
+
+#: Process-wide client shared by every outbound call
+http = HttpClient.from_env()
+
+
+class _StatsTransport:
+    """httpx async transport that records requests in an :class:`HttpClient`'s stats."""
+
+    def __init__(self, inner: Any, client: HttpClient):
+        self.inner = inner
+        self.client = client
+
+    async def handle_async_request(self, request: Any) -> Any:
+        stats = self.client._host_stats(request.url.netloc.decode("ascii"))
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.TransportError:
+            self.client._record(stats, start, None)
+            raise
+        self.client._record(stats, start, response.status_code)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    async def __aenter__(self) -> "_StatsTransport":
+        await self.inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.inner.__aexit__(*exc_info)
+
+
+def async_client(**kwargs: Any) -> "httpx.AsyncClient":
+    """``httpx.AsyncClient`` with the shared pool size, HTTP/2 when available,
+    and its requests counted in :data:`http`'s per-host stats."""
+    transport = httpx.AsyncHTTPTransport(
+        http2=kwargs.pop("http2", HTTP2),
+        limits=kwargs.pop("limits", httpx.Limits(max_keepalive_connections=http.pool_maxsize)),
+    )
+    return httpx.AsyncClient(transport=_StatsTransport(transport, http), **kwargs)
@@ -0,0 +1,101 @@
+"""Deferred imports for heavy or optional dependencies.
+
+pandas, requests, httpx and the Google Sheets client libraries together cost
+most of a second to import, while many code paths (``--help``, replayed
+runs, API requests that never export) never touch them. Modules bind these
+dependencies through :func:`lazy_import` instead of a top-level ``import``;
+the real module is loaded the first time an attribute is accessed.
+
+The proxy forwards attribute reads, writes and deletes to the real module,
+so ``unittest.mock.patch("src.http_client.requests.Session")`` keeps working.
+
+Example:
+    >>> from src.lazy import lazy_import
+    >>> pd = lazy_import("pandas")               # nothing imported yet
+    >>> df = pd.DataFrame([{"a": 1}])            # pandas loads here
+    >>> Credentials = lazy_import("google.oauth2.service_account", "Credentials", optional=True)
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+from typing import Any, Optional
+
+_IMPORT_LOCK = threading.RLock()
+
+
+class LazyModule:
+    """Proxy that imports ``name`` (and optionally fetches ``attr``) on first use."""
+
+    __slots__ = ("_lazy_name", "_lazy_attr", "_lazy_target")
+
+    def __init__(self, name: str, attr: Optional[str] = None):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_attr", attr)
+        object.__setattr__(self, "_lazy_target", None)
+
+    def _load(self) -> Any:
+        target = object.__getattribute__(self, "_lazy_target")
+        if target is None:
+            with _IMPORT_LOCK:
+                target = object.__getattribute__(self, "_lazy_target")
+                if target is None:
+                    target = importlib.import_module(object.__getattribute__(self, "_lazy_name"))
+                    attr = object.__getattribute__(self, "_lazy_attr")
+                    if attr is not None:
+                        target = getattr(target, attr)
+                    object.__setattr__(self, "_lazy_target", target)
+        return target
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, "_lazy_target") is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._load(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = object.__getattribute__(self, "_lazy_name")
+        attr = object.__getattribute__(self, "_lazy_attr")
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy {name}{'.' + attr if attr else ''} ({state})>"
+
+
+def is_available(name: str) -> bool:
+    """Return True if ``name`` can be imported, without importing it.
+
+    Parent packages of a dotted name are imported (that is how the import
+    system locates submodules); the module itself is not.
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str, attr: Optional[str] = None, optional: bool = False) -> Optional[LazyModule]:
+    """Return a proxy for module ``name`` (or its attribute ``attr``).
+
+    Args:
+        name: Absolute module name, e.g. ``"pandas"``.
+        attr: Optional attribute of the module to proxy instead of the module.
+        optional: When True, return ``None`` if the module is not installed,
+            mirroring the ``try: import x / except: x = None`` idiom.
+
+    Returns:
+        A :class:`LazyModule`, or ``None`` for a missing optional dependency.
+    """
+    if optional and not is_available(name):
+        return None
+    return LazyModule(name, attr)
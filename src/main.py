@@ -1,16 +1,34 @@
-﻿"""Minimal CLI to run a Pushshift-based scrape + analysis + export pipeline."""
+﻿"""Minimal CLI to run a Pushshift-based scrape + analysis + export pipeline.
+
+``python -m src.main search QUERY`` searches previously indexed records
+instead (see :mod:`src.search_index`); ``python -m src.main classifier``
+trains and evaluates the optional category model (see :mod:`src.classifier`);
+``python -m src.main schedule`` runs incremental crawls on intervals as a
+long-running process (see :mod:`src.scheduler`).
+"""
 import argparse
 from dotenv import load_dotenv
-from src.scrape_reddit import get_submissions
+from src.scrape_reddit import CommentFetcher
 from src.analyze import transform_to_schema
-from src.exporter import write_csv, write_excel
-from src.browseai_runner import run_from_env
-from src.scoring import calculate_pain_score
+from src.exporter import DEFAULT_OUTPUT_DIR, write_csv, write_excel
+from src import snapshot
+from src.aggregates import AggregateIndex, summarize_threads
+from src.scoring import PROFILES, calculate_pain_score
 from src.solution_generator import generate_solutions
 from src.competitor_detector import detect_competitors
 from src.revenue_estimator import estimate_revenue_potential
 from src.pdf_reporter import generate_report
+from src import replay
+from src.checkpoint import DEFAULT_DIR as DEFAULT_CHECKPOINT_DIR, RunCheckpoint, Stage
+from src.classifier import classifier_cli, get_classifier
+from src.partitions import PartitionedDataset, dataset_path, new_writer_id
+from src.http_client import http
+from src.search_index import index_path, index_records, search_cli
+from src.trends import trends_path, update_trends
+import itertools
+from datetime import datetime, timedelta, timezone
 import os
+import sys
 
 
 def _parse_subreddits(value: str):
@@ -22,63 +40,202 @@ def _parse_subreddits(value: str):
     return parts
 
 
-def main():
+# Connectors selectable with --sources (see src.sources)
+SOURCES = ("pushshift", "browseai")
+
+
+def _parse_sources(value: str):
+    return [p.strip().lower() for p in value.split(",") if p.strip()]
+
+
+def main(argv=None):
     load_dotenv()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "search":
+        return search_cli(argv[1:])
+    if argv and argv[0] == "classifier":
+        return classifier_cli(argv[1:])
+    if argv and argv[0] == "schedule":
+        # The daemon pulls in the source connectors; keep one-shot startup lean
+        from src.scheduler import schedule_cli
+
+        return schedule_cli(argv[1:])
     parser = argparse.ArgumentParser(description="PainPointRadar research demo")
     parser.add_argument("--subreddits", default="SaaS,startups", help="Comma-separated subreddit names (no r/) or with r/")
     parser.add_argument("--keywords", default="", help="Comma-separated keywords to filter (optional)")
     parser.add_argument("--limit", type=int, default=25, help="Number of posts to fetch per subreddit")
-    args = parser.parse_args()
+    parser.add_argument("--record", action="store_true", help="Record raw source responses to NDJSON snapshots")
+    parser.add_argument("--replay", action="store_true", help="Replay source responses from snapshots (no network)")
+    parser.add_argument("--snapshot-dir", default=None, help="Snapshot directory for --record/--replay (default: output/snapshots)")
+    parser.add_argument("--scoring-profile", default="default", choices=sorted(PROFILES), help="Scoring profile: engagement/recency weighting (legacy = original scores)")
+    parser.add_argument("--sources", default="auto", help="Comma-separated sources to crawl concurrently (pushshift, browseai); 'auto' prefers Browse.ai when configured and falls back to Pushshift")
+    parser.add_argument("--comments-top", type=int, default=0, help="Also fetch comments for the N most discussed posts (Pushshift only; 0 = off)")
+    parser.add_argument("--comments-max-requests", type=int, default=50, help="Total Pushshift requests allowed for comment fetching")
+    parser.add_argument("--category-model", default=None, help="Label categories with a trained model file (see 'classifier train') instead of the keyword rules")
+    parser.add_argument("--resume", action="store_true", help="Resume the last interrupted run from its last completed stage")
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_DIR, help="Directory for per-stage checkpoints (default: output/checkpoints)")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="Keep the checkpoint files after a successful run")
+    parser.add_argument("--competitor-batch-size", type=int, default=100, help="Records per competitor-detection checkpoint")
+    parser.add_argument("--no-index", action="store_true", help="Do not add results to the full-text search index")
+    parser.add_argument("--dataset-dir", default=None, help="Partitioned output dataset (default: output/dataset or DATASET_PATH)")
+    parser.add_argument("--retain-days", type=int, default=0, help="Delete dataset partitions older than N days (0 = keep all)")
+    parser.add_argument("--flat-export", action="store_true", help="Also publish this run as output/sample_output.csv/.xlsx, output/aggregates.json, the snapshot and output/validation_report.html (overwritten by every run; read by the dashboard)")
+    args = parser.parse_args(argv)
+
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    if args.record or args.replay:
+        os.environ[replay.MODE_ENV] = "record" if args.record else "replay"
+    if args.snapshot_dir:
+        os.environ[replay.DIR_ENV] = args.snapshot_dir
 
     subs = _parse_subreddits(args.subreddits)
     kw = [k.strip() for k in args.keywords.split(",") if k.strip()] if args.keywords else None
 
-    print(f"Fetching up to {args.limit} posts per subreddit for: {subs}")
+    # Every source is a connector crawled on one shared executor (per-source
+    # rate limits, a global concurrency cap, retries and metrics). In auto
+    # mode Browse.ai is preferred when configured and Pushshift, crawled
+    # concurrently, is used only when Browse.ai fails or returns nothing.
+    from src.sources import BrowseAISource, FetchExecutor, PushshiftSource
+    from src.stream_ingest import peek_items
+
+    auto = args.sources == "auto"
+    if auto:
+        names = ["browseai", "pushshift"] if BrowseAISource.configured() else ["pushshift"]
+    else:
+        names = _parse_sources(args.sources)
+    unknown = sorted(set(names) - set(SOURCES))
+    if unknown or not names:
+        parser.error(f"unknown source(s): {', '.join(unknown)} (choose from {', '.join(SOURCES)})")
 
-    # If Browse.ai run endpoint is configured, prefer using it. The Browse.ai
-    # run endpoint is expected to accept a JSON payload and return JSON with
-    # either the results directly or a `status_url` that this helper can poll.
-    raw = []
+    # Each stage's output is checkpointed; --resume restarts an interrupted
+    # run after its last completed stage (or batch, for competitors)
+    fingerprint = {
+        key: getattr(args, key)
+        for key in ("subreddits", "keywords", "limit", "sources", "scoring_profile", "comments_top", "comments_max_requests", "category_model")
+    }
     try:
-        if os.environ.get("BROWSEAI_RUN_URL") and os.environ.get("BROWSEAI_API_KEY"):
-            print("Detected Browse.ai configuration, triggering Browse.ai run...")
-            payload = {"subreddits": subs, "keywords": kw or [], "limit": args.limit}
-            resp = run_from_env(payload=payload, timeout=300)
-            # Expect `resp` to contain a list of items in `data` or `results`.
-            raw = resp.get("data") or resp.get("results") or []
-            print(f"Browse.ai run returned {len(raw)} items (raw)")
-    except Exception as e:
-        print(f"Browse.ai run failed or not usable: {e}. Falling back to Pushshift.")
-
-    if not raw:
-        raw = get_submissions(subs, keywords=kw, limit_per_sub=args.limit)
-    print(f"Fetched {len(raw)} raw items")
-
-    records = transform_to_schema(raw)
-    print(f"Transformed to {len(records)} structured records")
+        checkpoint = RunCheckpoint.latest(args.checkpoint_dir, fingerprint) if args.resume else None
+    except ValueError as e:
+        parser.error(str(e))
+    if checkpoint is None:
+        if args.resume:
+            print("No interrupted run to resume; starting a new one")
+        checkpoint = RunCheckpoint.create(args.checkpoint_dir, fingerprint)
+
+    comment_fetcher = None
+
+    def _crawl(_):
+        # Fetching streams into the transform, so both form the first stage
+        nonlocal comment_fetcher
+        print(f"Fetching up to {args.limit} posts per subreddit for: {subs}")
+        connectors = []
+        if "browseai" in names:
+            print("Triggering Browse.ai run...")
+            connectors.append(BrowseAISource.from_env({"subreddits": subs, "keywords": kw or [], "limit": args.limit}))
+        pushshift = PushshiftSource(subs, keywords=kw, limit_per_sub=args.limit)
+        if "pushshift" in names:
+            connectors.append(pushshift)
+        executor = FetchExecutor()
+        results = executor.run(connectors)
+        for name, m in executor.metrics.items():
+            errors = f", errors: {'; '.join(m.errors)}" if m.errors else ""
+            print(f"  {name}: {m.requests} requests, {m.pages} pages, {m.retries} retries in {m.elapsed_s:.1f}s{errors}")
+
+        sources = []
+        if "browseai" in results:
+            browse_items = peek_items(results["browseai"])
+            if browse_items is not None:
+                print("Streaming raw items from Browse.ai")
+                sources.append(browse_items)
+            elif auto:
+                print("Browse.ai run failed or returned nothing. Falling back to Pushshift.")
+        if "pushshift" in results and not (auto and sources):
+            submissions = list(results["pushshift"])
+            print(f"Fetched {len(submissions)} Pushshift submissions")
+            sources.append(submissions)
+            if args.comments_top > 0:
+                # Comments stream into the transform after their submissions
+                # Comment requests share the Pushshift bucket and concurrency cap
+                comment_fetcher = CommentFetcher(
+                    top_n=args.comments_top, max_requests=args.comments_max_requests,
+                    executor=executor, source=pushshift,
+                )
+                sources.append(comment_fetcher.iter_comments(submissions))
+        raw = itertools.chain.from_iterable(sources)
+
+        classifier = get_classifier(args.category_model) if args.category_model else None
+        records = transform_to_schema(raw, compact=True, classifier=classifier)
+        print(f"Transformed to {len(records)} structured records")
+        if comment_fetcher is not None:
+            print(f"Fetched {comment_fetcher.total_comments} comments from {len(comment_fetcher.thread_stats)} threads ({comment_fetcher.requests_used} requests)")
+        return records
+
+    def _step(message, fn):
+        def run(records):
+            print(message)
+            return fn(records)
+        return run
 
     # Apply 5 advanced features
-    print("Calculating pain-point scores...")
-    records = calculate_pain_score(records)
-    
-    print("Generating suggested solutions...")
-    records = generate_solutions(records)
-    
-    print("Detecting competitors...")
-    records = detect_competitors(records)
-    
-    print("Estimating revenue potential...")
-    records = estimate_revenue_potential(records)
-
-    # Export to CSV and Excel
-    out_csv = write_csv(records)
-    out_xlsx = write_excel(records)
-    print(f"Wrote CSV -> {out_csv}")
-    print(f"Wrote Excel -> {out_xlsx}")
+    records = checkpoint.run([
+        Stage("transform", _crawl),
+        Stage("score", _step("Calculating pain-point scores...", lambda recs: calculate_pain_score(recs, profile=args.scoring_profile))),
+        Stage("solutions", _step("Generating suggested solutions...", generate_solutions)),
+        Stage("competitors", _step("Detecting competitors...", detect_competitors), batch_size=args.competitor_batch_size),
+        Stage("revenue", _step("Estimating revenue potential...", estimate_revenue_potential)),
+    ])
+
+    # Partitioned by day and subreddit; concurrent runs write separate parts
+    run_id = new_writer_id()
+    dataset = PartitionedDataset(args.dataset_dir or dataset_path())
+    parts = dataset.write(records, writer_id=run_id)
+    print(f"Wrote {sum(p.rows for p in parts)} records in {len(parts)} partitions -> {dataset.root}")
+    if args.retain_days > 0:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=args.retain_days)).strftime("%Y-%m-%d")
+        print(f"Expired {dataset.expire(before=cutoff)} partitions before {cutoff}")
+
+    # Per-run artifacts go to their own directory so concurrent runs never
+    # overwrite each other; --flat-export publishes them at the fixed paths
+    # the dashboard, API and workflow read instead
+    if args.flat_export:
+        out_csv = write_csv(records)
+        out_xlsx = write_excel(records)
+        out_dir = os.path.dirname(out_csv) or "."
+        print(f"Wrote CSV -> {out_csv}")
+        print(f"Wrote Excel -> {out_xlsx}")
+        snap_path = snapshot.snapshot_path()
+    else:
+        out_dir = os.path.join(DEFAULT_OUTPUT_DIR, "runs", run_id)
+        snap_path = os.path.join(out_dir, "records.arrow")
+    if snapshot.available():
+        out_snap = snapshot.write_snapshot(records, snap_path)
+        print(f"Wrote snapshot -> {out_snap}")
+
+    # Rollups for the dashboard and report, built once
+    index = AggregateIndex.from_records(records)
+    out_agg = index.save(os.path.join(out_dir, "aggregates.json"))
+    print(f"Wrote aggregates -> {out_agg}")
+
+    if args.comments_top > 0:
+        threads = sorted(summarize_threads(records).items(), key=lambda kv: kv[1]["pain_mean"], reverse=True)
+        for url, thread in threads[:3]:
+            print(f"  Thread: {thread['post_title']} ({thread['count']} comments, mean pain {thread['pain_mean']:.1f}, {thread['top_category']})")
+
+    # Keep the full-text index of every crawl up to date for search
+    if not args.no_index:
+        n_indexed = index_records(records, index_path())
+        print(f"Indexed {n_indexed} records -> {index_path()}")
+
+    # Fold only this crawl into the persisted trend state
+    trend_engine, n_new = update_trends(records, trends_path())
+    print(f"Updated trends with {n_new} new records -> {trends_path()}")
+    for row in trend_engine.rising(limit=3):
+        print(f"  Rising: {row['category']} in r/{row['subreddit']} ({row['prior_count']} -> {row['recent_count']} posts)")
     
     # Generate PDF/HTML report
     print("Generating validation report...")
-    report_path = generate_report(records)
+    report_path = generate_report(records, output_dir=out_dir, index=index)
     print(f"Generated report -> {report_path}")
 
     # Optionally push to Google Sheets if service account JSON provided
@@ -94,7 +251,13 @@ def main():
         except Exception as e:
             print(f"Failed to push to Google Sheets: {e}")
 
+    # Outbound latency per host (Pushshift, GitHub, Browse.ai)
+    for line in http.summary_lines():
+        print(f"  HTTP {line}")
+
+    checkpoint.finish(keep=args.keep_checkpoint)
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
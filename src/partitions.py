@@ -0,0 +1,236 @@
+"""Partitioned, compressed record output.
+
+``write_csv`` keeps a single ``output/sample_output.csv`` that every run
+overwrites, so the CLI only writes it with ``--flat-export``. By default
+runs write a dataset partitioned by day and subreddit::
+
+    output/dataset/
+        _manifest/20250102-101500-4242-1a2b3c4d.json    one manifest per write
+        date=2025-01-02/subreddit=SaaS/part-20250102-101500-4242-1a2b3c4d.csv.gz
+        date=2025-01-02/subreddit=startups/part-...csv.gz
+        date=unknown/subreddit=SaaS/part-...csv.gz
+
+Every write gets a unique writer id. Its part files and its manifest carry
+that id, so concurrent writers never touch the same file and need no lock.
+Parts are written first and the manifest last, both through a temporary file
+and a rename. A part is therefore only visible to readers once its write has
+fully committed. Readers load the manifests (a few KB each) and prune
+partitions by day range and subreddit before opening any data file.
+
+Example:
+    >>> dataset = PartitionedDataset()
+    >>> dataset.write(records)
+    >>> rows = list(dataset.iter_rows(start="2025-01-01", subreddits=["SaaS"]))
+    >>> dataset.expire(before="2024-12-01")
+"""
+import csv
+import gzip
+import json
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.aggregates import UNKNOWN, day_of
+from src.lazy import lazy_import
+from src.records import RecordLike, records_to_dicts
+
+pd = lazy_import("pandas")
+
+PATH_ENV = "DATASET_PATH"
+DEFAULT_PATH = os.path.join("output", "dataset")
+MANIFEST_DIR = "_manifest"
+FORMAT_VERSION = 1
+COMPRESSLEVEL = 6
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def dataset_path() -> str:
+    """Dataset root from ``DATASET_PATH`` (default ``output/dataset``)."""
+    return os.environ.get(PATH_ENV) or DEFAULT_PATH
+
+
+def new_writer_id() -> str:
+    """Unique id for one write: timestamp, process id and a random suffix."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _safe(value: str) -> str:
+    return _UNSAFE.sub("_", value) or UNKNOWN
+
+
+def _cell(value: Any) -> Any:
+    return "" if value is None else value
+
+
+@dataclass
+class PartInfo:
+    """One data file of the dataset, as listed in a manifest."""
+
+    path: str
+    date: str
+    subreddit: str
+    rows: int
+    bytes: int
+
+
+class PartitionedDataset:
+    """Day/subreddit partitioned gzip CSV records under ``root``.
+
+    Args:
+        root: Dataset directory (created on first write).
+        max_workers: Threads used to compress and write partitions.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_workers: int = 4):
+        self.root = root or dataset_path()
+        self.max_workers = max(1, max_workers)
+
+    # -- writing -----------------------------------------------------------
+
+    @staticmethod
+    def partition_of(rec: RecordLike) -> Tuple[str, str]:
+        """``(day, subreddit)`` partition key of a record."""
+        return day_of(rec.get("date")), rec.get("subreddit") or UNKNOWN
+
+    def write(self, records: Iterable[RecordLike], writer_id: Optional[str] = None) -> List[PartInfo]:
+        """Write ``records`` as one new part per partition and commit a manifest.
+
+        Every part of one write has the same header: the union of the
+        records' fields in first-seen order.
+
+        Returns:
+            The parts written, in partition order.
+        """
+        rows = records_to_dicts(records)
+        if not rows:
+            return []
+        writer_id = writer_id or new_writer_id()
+        columns = list({name: None for row in rows for name in row})
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(self.partition_of(row), []).append(row)
+        keys = sorted(groups)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            parts = list(pool.map(lambda key: self._write_part(key, groups[key], columns, writer_id), keys))
+        self._write_manifest(writer_id, {
+            "format": FORMAT_VERSION,
+            "writer": writer_id,
+            "created_at": time.time(),
+            "columns": columns,
+            "parts": [asdict(p) for p in parts],
+        })
+        return parts
+
+    def _write_part(self, key: Tuple[str, str], rows: Sequence[Dict[str, Any]], columns: Sequence[str], writer_id: str) -> PartInfo:
+        day, subreddit = key
+        rel = os.path.join(f"date={_safe(day)}", f"subreddit={_safe(subreddit)}", f"part-{writer_id}.csv.gz")
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", newline="", compresslevel=COMPRESSLEVEL) as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows([_cell(row.get(c)) for c in columns] for row in rows)
+        os.replace(tmp, path)
+        return PartInfo(path=rel.replace(os.sep, "/"), date=day, subreddit=subreddit, rows=len(rows), bytes=os.path.getsize(path))
+
+    def _write_manifest(self, writer_id: str, manifest: Dict[str, Any]) -> None:
+        directory = os.path.join(self.root, MANIFEST_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{writer_id}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+
+    # -- reading -----------------------------------------------------------
+
+    def manifests(self) -> List[Dict[str, Any]]:
+        """Committed manifests, oldest first."""
+        directory = os.path.join(self.root, MANIFEST_DIR)
+        if not os.path.isdir(directory):
+            return []
+        out = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                    out.append(json.load(f))
+        return sorted(out, key=lambda m: m.get("created_at", 0))
+
+    def parts(
+        self, start: Optional[str] = None, end: Optional[str] = None, subreddits: Optional[Iterable[str]] = None
+    ) -> List[PartInfo]:
+        """Parts whose partition matches the filters, without opening them.
+
+        Args:
+            start: First day to include (``YYYY-MM-DD``, inclusive).
+            end: Last day to include (inclusive).
+            subreddits: Subreddit names to include (case-insensitive).
+
+        Undated records (``date=unknown``) are only returned when no day
+        bound is given.
+        """
+        wanted = {s.casefold() for s in subreddits} if subreddits is not None else None
+        out = []
+        for manifest in self.manifests():
+            for raw in manifest.get("parts", []):
+                part = PartInfo(**raw)
+                if start is not None or end is not None:
+                    if part.date == UNKNOWN:
+                        continue
+                    if (start is not None and part.date < start) or (end is not None and part.date > end):
+                        continue
+                if wanted is not None and part.subreddit.casefold() not in wanted:
+                    continue
+                out.append(part)
+        return out
+
+    def iter_rows(self, start: Optional[str] = None, end: Optional[str] = None, subreddits: Optional[Iterable[str]] = None) -> Iterator[Dict[str, str]]:
+        """Stream rows of the matching partitions as string dicts."""
+        for part in self.parts(start, end, subreddits):
+            with gzip.open(os.path.join(self.root, part.path), "rt", encoding="utf-8", newline="") as f:
+                yield from csv.DictReader(f)
+
+    def read_frame(self, start: Optional[str] = None, end: Optional[str] = None, subreddits: Optional[Iterable[str]] = None) -> "pd.DataFrame":
+        """Matching partitions concatenated into one DataFrame."""
+        frames = [pd.read_csv(os.path.join(self.root, p.path), compression="gzip") for p in self.parts(start, end, subreddits)]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    # -- retention ---------------------------------------------------------
+
+    def expire(self, before: str) -> int:
+        """Delete dated partitions older than ``before``; return parts removed.
+
+        Each manifest is rewritten without the expired parts (or removed
+        once empty) before its files are deleted. Manifests of concurrent
+        writers are separate files, so they are not affected.
+        """
+        removed = 0
+        directory = os.path.join(self.root, MANIFEST_DIR)
+        for manifest in self.manifests():
+            parts = manifest.get("parts", [])
+            keep = [p for p in parts if p["date"] == UNKNOWN or p["date"] >= before]
+            if len(keep) == len(parts):
+                continue
+            if keep:
+                self._write_manifest(manifest["writer"], dict(manifest, parts=keep))
+            else:
+                os.remove(os.path.join(directory, f"{manifest['writer']}.json"))
+            for part in parts:
+                if part not in keep:
+                    path = os.path.join(self.root, part["path"])
+                    if os.path.exists(path):
+                        os.remove(path)
+                    removed += 1
+                    try:
+                        os.removedirs(os.path.dirname(path))
+                    except OSError:
+                        pass  # partition still holds parts of other writes
+        return removed
@@ -1,11 +1,31 @@
 ﻿"""Generate PDF/HTML validation reports for investors and founders."""
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Optional
 from datetime import datetime
 import os
 
-def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Validation Report") -> str:
-    """Generate HTML content for report."""
-    
+from src.aggregates import AggregateIndex
+from src.ranking import top_k
+from src.records import records_to_dicts
+
+if TYPE_CHECKING:
+    from src.snapshot import Snapshot
+
+def _generate_html_content(
+    records: List[Dict],
+    title: str = "PainPointRadar Validation Report",
+    index: Optional[AggregateIndex] = None,
+) -> str:
+    """Generate HTML content for report.
+
+    Averages and the category breakdown come from ``index`` (built from
+    ``records`` when not supplied).
+    """
+    if index is None:
+        index = AggregateIndex.from_records(records)
+    totals = index.totals()
+    # Only the ten best records are shown; callers need not pre-sort
+    top = top_k(records, 10)
+
     html = f"""<!DOCTYPE html>
 <html>
 <head>
@@ -32,13 +52,13 @@ def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Val
         
         <div class="summary">
             <h2>ðŸ“Š Executive Summary</h2>
-            <p><strong>Total Pain-Points Analyzed:</strong> {len(records)}</p>
+            <p><strong>Total Pain-Points Analyzed:</strong> {totals.count}</p>
 """
     
     if records:
-        avg_pain = int(sum(r.get('pain_score', 0) for r in records) / len(records))
-        avg_revenue = int(sum(r.get('revenue_potential_score', 0) for r in records) / len(records))
-        top_opportunity = records[0].get('pain_summary', 'N/A')
+        avg_pain = int(totals.mean("pain"))
+        avg_revenue = int(totals.mean("revenue"))
+        top_opportunity = top[0].get('pain_summary', 'N/A')
         html += f"""
             <p><strong>Average Pain Score:</strong> {avg_pain}/100</p>
             <p><strong>Average Revenue Potential:</strong> {avg_revenue}/100</p>
@@ -56,7 +76,7 @@ def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Val
             </tr>
 """
         
-        for rec in records[:10]:
+        for rec in top:
             html += f"""
             <tr>
                 <td>{rec.get('pain_summary', 'N/A')[:50]}</td>
@@ -70,10 +90,38 @@ def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Val
         html += """
         </table>
         
+        <h2>Pain by Category</h2>
+        <table>
+            <tr>
+                <th>Category</th>
+                <th>Pain-Points</th>
+                <th>Avg Pain Score</th>
+                <th>Median Pain Score</th>
+                <th>Avg Revenue Potential</th>
+            </tr>
+"""
+        
+        by_category = index.rollup("category")
+        for cat in index.counts("category"):
+            stats = by_category[cat]
+            html += f"""
+            <tr>
+                <td>{cat}</td>
+                <td>{stats['count']}</td>
+                <td>{int(stats['pain_mean'])}</td>
+                <td>{stats['pain_p50']}</td>
+                <td>{int(stats['revenue_mean'])}</td>
+            </tr>
+"""
+        
+        html += """
+        </table>
+        
         <h2>ðŸ’¡ Suggested Solutions & Market Sizing</h2>
 """
         
-        for idx, rec in enumerate(records[:5], 1):
+        # Solution fields are template references until serialized
+        for idx, rec in enumerate(records_to_dicts(top[:5]), 1):
             html += f"""
         <div class="metric">
             <h3>{idx}. {rec.get('suggested_product_idea', 'N/A')}</h3>
@@ -98,7 +146,7 @@ def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Val
             </tr>
 """
         
-        for rec in records[:5]:
+        for rec in top[:5]:
             comp = rec.get('competition_level', 'Medium')
             difficulty = "High" if comp == "High" else ("Medium" if comp == "Medium" else "Low")
             html += f"""
@@ -123,15 +171,25 @@ def _generate_html_content(records: List[Dict], title: str = "PainPointRadar Val
     
     return html
 
-def generate_report(records: List[Dict], output_dir: str = "output") -> str:
+def generate_report(records: List[Dict], output_dir: str = "output", index: Optional[AggregateIndex] = None) -> str:
     """Save HTML report and return path."""
     os.makedirs(output_dir, exist_ok=True)
     
     output_path = os.path.join(output_dir, "validation_report.html")
-    html_content = _generate_html_content(records)
+    html_content = _generate_html_content(records, index=index)
     
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html_content)
     
     return output_path
 
+
+def generate_report_from_snapshot(snap: "Snapshot", output_dir: str = "output", index: Optional[AggregateIndex] = None) -> str:
+    """Save the HTML report for a memory-mapped records snapshot.
+
+    Only the top rows and the aggregate columns are read from ``snap``;
+    pass ``index`` (e.g. from ``aggregates.json``) to skip the latter.
+    """
+    if index is None:
+        index = snap.aggregate_index()
+    return generate_report(snap.top(10), output_dir=output_dir, index=index)
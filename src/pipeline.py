@@ -0,0 +1,90 @@
+"""Shared analysis pipeline used by the API.
+
+Wraps the individual stages (analyze -> scoring -> solutions -> competitors
+-> revenue) so the batch endpoint and the streaming endpoint run exactly the
+same steps. Scoring is batch-level (recurrence points depend on how often a
+category/subreddit pair occurs in the batch), so it always runs over the
+whole batch; the remaining stages are per-record and can be applied one
+record at a time as results are emitted.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.aggregates import AggregateIndex
+from src.analyze import transform_to_schema
+from src.classifier import CategoryClassifier
+from src.competitor_detector import detect_competitors
+from src.records import RecordLike
+from src.revenue_estimator import estimate_revenue_potential
+from src.scoring import ScoringProfile, calculate_pain_score
+from src.solution_generator import generate_solutions
+
+
+def iter_pipeline(
+    items: Iterable[Dict],
+    include_solutions: bool = True,
+    include_competitors: bool = True,
+    include_revenue: bool = True,
+    scoring_profile: Union[str, ScoringProfile, None] = None,
+    classifier: Optional[CategoryClassifier] = None,
+) -> Iterator[RecordLike]:
+    """Yield fully processed records one at a time, in input order.
+
+    Args:
+        items: Raw Reddit items (see :func:`src.analyze.transform_to_schema`).
+        include_solutions: Attach solution template references.
+        include_competitors: Run competitor detection.
+        include_revenue: Run revenue estimation.
+        scoring_profile: Scoring profile or profile name (see
+            :data:`src.scoring.PROFILES`); the default profile when omitted.
+        classifier: Category classifier (see :mod:`src.classifier`); the
+            keyword rules when omitted.
+
+    Yields:
+        Compact records with all requested stages applied.
+    """
+    records = calculate_pain_score(transform_to_schema(items, compact=True, classifier=classifier), profile=scoring_profile)
+    for rec in records:
+        batch = [rec]
+        if include_solutions:
+            generate_solutions(batch)
+        if include_competitors:
+            detect_competitors(batch)
+        if include_revenue:
+            estimate_revenue_potential(batch)
+        yield rec
+
+
+def run_pipeline(items: Iterable[Dict], **options: Any) -> List[RecordLike]:
+    """Run the whole pipeline and return the processed records in input order."""
+    return list(iter_pipeline(items, **options))
+
+
+class SummaryAccumulator:
+    """Incrementally build the response ``summary`` block.
+
+    Produces the same values as summarizing a list sorted by ``pain_score``
+    descending: the top opportunity is the first record with the highest
+    score. Counts and means are read from an :class:`AggregateIndex`, which
+    is exposed as ``index`` for callers that want finer rollups.
+    """
+
+    def __init__(self, index: Optional[AggregateIndex] = None):
+        self.index = index if index is not None else AggregateIndex()
+        self._top_score: Optional[Any] = None
+        self._top_summary = "N/A"
+
+    def add(self, rec: RecordLike) -> None:
+        self.index.add(rec)
+        score = rec.get("pain_score", 0)
+        if self._top_score is None or score > self._top_score:
+            self._top_score = score
+            self._top_summary = rec.get("pain_summary", "N/A")
+
+    def summary(self) -> Dict[str, Any]:
+        totals = self.index.totals()
+        return {
+            "total_analyzed": totals.count,
+            "avg_pain_score": totals.mean("pain"),
+            "categories": self.index.counts("category"),
+            "top_opportunity": self._top_summary,
+        }
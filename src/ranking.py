@@ -0,0 +1,135 @@
+"""Top-K selection of records by a score column without a full sort.
+
+Ties are always broken by input order (earlier record wins), matching what a
+stable ``sorted(..., reverse=True)`` would return, so the API and the report
+rank identically whichever path is used.
+
+- :func:`top_k` / :class:`TopK` keep a heap of at most ``k`` entries:
+  O(n log k) time and O(k) memory, usable on streams. :class:`TopK` can
+  be fed one record at a time.
+- :func:`top_k_indices` works on a numpy score column with
+  ``argpartition``: O(n) for the selection plus O(k log k) to order it.
+- :func:`rank` is the full stable sort for callers that need every record.
+
+Example:
+    >>> best = top_k(records, 10)                           # by pain_score
+    >>> cheap = top_k(records, 5, key="revenue_potential_score")
+    >>> idx = top_k_indices(np.asarray(scores), 10)
+"""
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.lazy import lazy_import
+from src.records import RecordLike
+
+np = lazy_import("numpy")
+
+DEFAULT_KEY = "pain_score"
+
+KeyLike = Union[str, Callable[[Any], Any]]
+
+
+def score_getter(key: KeyLike = DEFAULT_KEY, default: Any = 0) -> Callable[[Any], Any]:
+    """Return a function mapping a record to its score (missing -> ``default``)."""
+    if callable(key):
+        return key
+
+    def get(rec: RecordLike) -> Any:
+        value = rec.get(key, default)
+        return default if value is None else value
+
+    return get
+
+
+class TopK:
+    """Running top-``k`` over a stream of records.
+
+    Example:
+        >>> best = TopK(10)
+        >>> for rec in iter_pipeline(items):
+        ...     best.add(rec)
+        >>> best.result()
+    """
+
+    def __init__(self, k: int, key: KeyLike = DEFAULT_KEY):
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        self.k = k
+        self._score = score_getter(key)
+        # Min-heap of (score, -seq, record); the root is the weakest kept
+        # entry, and among equal scores the latest arrival is evicted first.
+        self._heap: List[Tuple[Any, int, Any]] = []
+        self._seq = 0
+
+    def add(self, rec: Any) -> None:
+        score = self._score(rec)
+        seq = self._seq
+        self._seq += 1
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, (score, -seq, rec))
+        elif heap and score > heap[0][0]:
+            # Equal scores never displace an earlier record
+            heapq.heapreplace(heap, (score, -seq, rec))
+
+    def extend(self, records: Iterable[Any]) -> "TopK":
+        for rec in records:
+            self.add(rec)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def result(self) -> List[Any]:
+        """Kept records, best first (ties in arrival order)."""
+        return [rec for _, _, rec in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+def top_k(records: Iterable[Any], k: int, key: KeyLike = DEFAULT_KEY) -> List[Any]:
+    """Return the ``k`` highest-scoring records, best first, ties by input order."""
+    if k < 0:
+        raise ValueError("k must be non-negative")
+    # heapq.nlargest keeps a k-sized heap and is documented to equal
+    # sorted(..., reverse=True)[:k], i.e. stable on ties
+    return heapq.nlargest(k, records, key=score_getter(key))
+
+
+def rank(records: Sequence[Any], key: KeyLike = DEFAULT_KEY) -> List[Any]:
+    """Return all records sorted by score descending (stable)."""
+    return sorted(records, key=score_getter(key), reverse=True)
+
+
+def top_k_indices(scores: Any, k: int) -> "np.ndarray":
+    """Indices of the ``k`` largest values of a 1-D score column, best first.
+
+    Equal scores are ordered by index. Selection uses ``argpartition`` to
+    find the k-th largest value, so only the selected entries are sorted.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[0]
+    k = min(max(k, 0), n)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k == n:
+        return np.argsort(-scores, kind="stable")
+    threshold = scores[np.argpartition(scores, n - k)[n - k]]
+    above = np.flatnonzero(scores > threshold)
+    # Fill the remaining slots with the earliest entries equal to the threshold
+    ties = np.flatnonzero(scores == threshold)[: k - above.shape[0]]
+    chosen = np.concatenate((above, ties))
+    return chosen[np.argsort(-scores[chosen], kind="stable")]
+
+
+def top_k_columnar(records: Sequence[Any], k: int, key: KeyLike = DEFAULT_KEY, scores: Optional[Any] = None) -> List[Any]:
+    """Top-``k`` of an in-memory batch via :func:`top_k_indices`.
+
+    Args:
+        records: Indexable batch of records.
+        k: Number of records to return.
+        key: Score field or callable (ignored when ``scores`` is given).
+        scores: Optional precomputed score column aligned with ``records``.
+    """
+    if scores is None:
+        get = score_getter(key)
+        scores = np.fromiter((get(r) for r in records), dtype=np.float64, count=len(records))
+    return [records[i] for i in top_k_indices(scores, k)]
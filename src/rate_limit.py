@@ -0,0 +1,175 @@
+"""Rate limiting and admission-control primitives.
+
+- :class:`TokenBucketLimiter` enforces a per-key request rate (e.g. per API
+  key) on top of a pluggable :class:`BucketStore`. The in-memory store is
+  the default; a shared store (Redis, database) can implement the same
+  single ``take`` method so multiple workers share one budget.
+- :class:`ConcurrencyLimiter` bounds how many expensive operations run at
+  once and rejects immediately instead of queueing when full, so callers
+  can answer 503 + Retry-After rather than letting latency pile up.
+
+Both are thread-safe; they are used from request handlers and from worker
+threads alike.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+class BucketStore:
+    """Storage backend interface for token buckets.
+
+    Implementations must make :meth:`take` atomic per key.
+    """
+
+    def take(self, key: str, cost: float, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+        """Try to remove ``cost`` tokens from ``key``'s bucket.
+
+        Args:
+            key: Bucket identifier (API key, client address, source name...).
+            cost: Tokens required by this request.
+            rate: Refill rate in tokens per second.
+            capacity: Maximum bucket size (burst).
+            now: Current monotonic time in seconds.
+
+        Returns:
+            ``(allowed, retry_after)`` where ``retry_after`` is the number of
+            seconds until ``cost`` tokens will be available (0 when allowed).
+        """
+        raise NotImplementedError
+
+
+class InMemoryBucketStore(BucketStore):
+    """Process-local bucket store with LRU eviction of idle keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            if tokens >= cost:
+                allowed, retry_after = True, 0.0
+                tokens -= cost
+            else:
+                allowed, retry_after = False, (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class TokenBucketLimiter:
+    """Per-key token-bucket rate limiter.
+
+    Args:
+        rate: Sustained rate in tokens per second.
+        capacity: Burst size; defaults to ``max(1, rate)``.
+        store: Bucket storage backend (default: :class:`InMemoryBucketStore`).
+        clock: Monotonic clock, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        store: Optional[BucketStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.store = store if store is not None else InMemoryBucketStore()
+        self.clock = clock
+
+    def take(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consume ``cost`` tokens for ``key``; see :meth:`BucketStore.take`."""
+        if cost > self.capacity:
+            # Can never succeed; report the time a full bucket would need.
+            return False, cost / self.rate
+        return self.store.take(key, cost, self.rate, self.capacity, self.clock())
+
+
+def retry_after_header(seconds: float) -> str:
+    """Format a Retry-After header value (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+class ConcurrencyLimiter:
+    """Non-blocking bound on concurrent operations.
+
+    Example:
+        >>> limiter = ConcurrencyLimiter(4)
+        >>> if limiter.try_acquire():
+        ...     try:
+        ...         do_work()
+        ...     finally:
+        ...         limiter.release()
+    """
+
+    def __init__(self, max_concurrent: int):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self._sem = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free; never blocks."""
+        if not self._sem.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._in_flight <= 0:
+                raise ValueError("release() called more times than acquire()")
+            self._in_flight -= 1
+        self._sem.release()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+
+class RequestBudget:
+    """Thread-safe cap on the total number of requests a job may make.
+
+    Unlike :class:`TokenBucketLimiter` the budget never refills; it bounds
+    the total fan-out of one run (e.g. comment fetching across threads).
+    """
+
+    def __init__(self, max_requests: int):
+        if max_requests < 0:
+            raise ValueError("max_requests must be non-negative")
+        self.max_requests = max_requests
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self, n: int = 1) -> bool:
+        """Spend ``n`` requests if that many remain; never blocks."""
+        with self._lock:
+            if self._used + n > self.max_requests:
+                return False
+            self._used += n
+            return True
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def remaining(self) -> int:
+        return self.max_requests - self._used
@@ -0,0 +1,217 @@
+"""Compact in-memory representation of pain-point records.
+
+Every pipeline stage historically passed plain dicts around, and each stage
+added its own keys (``pain_score``, ``suggested_*``, ``competition_level``,
+revenue fields...). On large crawls those per-record dicts dominate memory.
+
+:class:`PainPointRecord` is a ``__slots__`` dataclass holding the same fields.
+It implements the small mapping surface the stages rely on (``get``,
+``[]``, ``in``, ``setdefault``) so ``calculate_pain_score``,
+``generate_solutions``, ``detect_competitors`` and
+``estimate_revenue_potential`` accept it unchanged. Fields that a stage has
+not written yet behave like missing dict keys, so ``rec.get("pain_score", 50)``
+keeps its dict semantics.
+
+Memory savings come from:
+    - no per-instance ``__dict__`` (slots only)
+    - interned ``subreddit``/``category`` strings shared by all records
+    - solution fields stored as a single template key; the ``suggested_*``
+      values are resolved from ``RESOLVED_SOLUTIONS`` on access
+
+Convert back to dicts only at the API/export boundary with
+:func:`records_to_dicts`.
+"""
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.solution_generator import SOLUTION_FIELDS, resolve_solution
+
+
+class _Unset:
+    """Sentinel type for fields that no stage has written yet."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "UNSET"
+
+
+UNSET: Any = _Unset()
+
+# Low-cardinality string fields that are interned on assignment.
+_INTERNED_FIELDS = frozenset({"subreddit", "category", "competition_level", "recommended_pricing"})
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True, eq=False)
+class PainPointRecord:
+    """Slots-based pain-point record accepted by every pipeline stage.
+
+    Field order matches the column order the dict-based pipeline produced, so
+    exports keep the same layout. Keys that are not schema fields are kept in
+    an ``extra`` dict that is only allocated when first needed.
+    """
+
+    date: Any = UNSET
+    subreddit: Any = UNSET
+    post_title: Any = UNSET
+    post_url: Any = UNSET
+    comment_or_content: Any = UNSET
+    pain_summary: Any = UNSET
+    category: Any = UNSET
+    severity_rating: Any = UNSET
+    notes: Any = UNSET
+    post_score: Any = UNSET
+    num_comments: Any = UNSET
+    upvote_ratio: Any = UNSET
+    parent_url: Any = UNSET
+    pain_score: Any = UNSET
+    solution_key: Any = UNSET
+    competition_level: Any = UNSET
+    ph_score: Any = UNSET
+    github_score: Any = UNSET
+    reddit_score: Any = UNSET
+    revenue_potential_score: Any = UNSET
+    estimated_market_size: Any = UNSET
+    estimated_target_audience: Any = UNSET
+    recommended_pricing: Any = UNSET
+    estimated_arr_potential: Any = UNSET
+    extra: Optional[Dict[str, Any]] = None
+    # Cached text tokens (see src.tokenizer); not a schema field
+    tokens: Any = field(default=None, repr=False)
+
+    def __post_init__(self):
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+
+    # -- mapping protocol used by the pipeline stages -----------------------
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, UNSET)
+        if value is UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _SLOT_SET:
+            setattr(self, key, _intern(value) if key in _INTERNED_FIELDS else value)
+        else:
+            # Unknown keys and explicit overrides of template-backed fields.
+            self._extra()[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, UNSET) is not UNSET
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for ``key`` or ``default`` if it has not been set."""
+        if key in _SLOT_SET:
+            value = getattr(self, key)
+            return default if value is UNSET else value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        if key in SOLUTION_FIELDS and self.solution_key is not UNSET:
+            return resolve_solution(self.solution_key)[key]
+        return default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, UNSET)
+        if value is UNSET:
+            self[key] = default
+            return default
+        return value
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over the keys that are set, in export column order."""
+        for name in _SLOT_NAMES:
+            if name == "solution_key":
+                if self.solution_key is not UNSET:
+                    yield from (k for k in SOLUTION_FIELDS if not (self.extra and k in self.extra))
+                continue
+            if getattr(self, name) is not UNSET:
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def _extra(self) -> Dict[str, Any]:
+        if self.extra is None:
+            self.extra = {}
+        return self.extra
+
+    # -- conversion --------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expand to a plain dict (template fields resolved, unset fields omitted)."""
+        return {k: self.get(k) for k in self.keys()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PainPointRecord":
+        """Build a record from a dict produced by the dict-based pipeline."""
+        rec = cls()
+        for key, value in data.items():
+            rec[key] = value
+        return rec
+
+    def to_state(self) -> Dict[str, Any]:
+        """Fields as stored: set slots only, ``solution_key`` unresolved, ``extra`` nested.
+
+        Unlike :meth:`to_dict` this round-trips exactly through
+        :meth:`from_state` (used for checkpoints).
+        """
+        state = {name: getattr(self, name) for name in _SLOT_NAMES if getattr(self, name) is not UNSET}
+        if self.extra:
+            state["extra"] = dict(self.extra)
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "PainPointRecord":
+        """Rebuild a record from :meth:`to_state` output."""
+        state = dict(state)
+        extra = state.pop("extra", None)
+        rec = cls(**state)
+        rec.extra = extra or None
+        return rec
+
+
+_SLOT_NAMES = tuple(f.name for f in fields(PainPointRecord) if f.name not in ("extra", "tokens"))
+_SLOT_SET = frozenset(_SLOT_NAMES)
+
+
+RecordLike = Union[Dict[str, Any], PainPointRecord]
+
+
+def _expand_dict(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a dict's ``solution_key`` with the resolved ``suggested_*`` fields."""
+    out = {}
+    for key, value in rec.items():
+        if key == "solution_key":
+            for field, resolved in resolve_solution(value).items():
+                out.setdefault(field, rec.get(field, resolved))
+        else:
+            out[key] = value
+    return out
+
+
+def to_plain_dict(rec: RecordLike) -> Dict[str, Any]:
+    """Convert one record to a plain dict with template fields expanded."""
+    if isinstance(rec, PainPointRecord):
+        return rec.to_dict()
+    if "solution_key" in rec:
+        return _expand_dict(rec)
+    return rec
+
+
+def records_to_dicts(records: Iterable[RecordLike]) -> List[Dict[str, Any]]:
+    """Convert records to plain dicts at the API/export boundary.
+
+    :class:`PainPointRecord` instances are expanded with
+    :meth:`PainPointRecord.to_dict`. Dicts carrying a ``solution_key`` are
+    copied with the lazily referenced ``suggested_*`` fields resolved; other
+    dicts are passed through unchanged.
+    """
+    return [to_plain_dict(r) for r in records]
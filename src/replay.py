@@ -0,0 +1,160 @@
+"""Record/replay layer for scraping sources.
+
+Re-running the pipeline while tuning heuristics refetches from Pushshift or
+Browse.ai every time, which is slow and rate-limited. Functions decorated
+with :func:`replayable` can instead record their raw responses to
+gzip-compressed NDJSON snapshots and later replay them offline.
+
+Configuration (read at call time, so the CLI can set it after import):
+    SCRAPE_REPLAY_MODE: ``off`` (default), ``record`` or ``replay``.
+    SCRAPE_SNAPSHOT_DIR: Snapshot directory (default: ``output/snapshots``).
+
+Snapshot layout:
+    ``<dir>/<source>-<sha1 of request>.ndjson.gz`` where the first line is a
+    header (source, request, kind) and each following line is one raw item
+    (list and streamed responses) or the whole response (dict responses).
+
+In ``replay`` mode a missing snapshot raises :class:`ReplayMissError` instead
+of touching the network, so replayed runs are fully deterministic.
+"""
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+MODE_ENV = "SCRAPE_REPLAY_MODE"
+DIR_ENV = "SCRAPE_SNAPSHOT_DIR"
+DEFAULT_SNAPSHOT_DIR = os.path.join("output", "snapshots")
+MODES = ("off", "record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no snapshot exists for a request."""
+
+
+def current_mode() -> str:
+    """Return the configured replay mode.
+
+    Raises:
+        ValueError: If SCRAPE_REPLAY_MODE is set to an unknown value.
+    """
+    mode = os.environ.get(MODE_ENV, "off").strip().lower() or "off"
+    if mode not in MODES:
+        raise ValueError(f"{MODE_ENV} must be one of {', '.join(MODES)}, got {mode!r}")
+    return mode
+
+
+def snapshot_dir() -> str:
+    return os.environ.get(DIR_ENV) or DEFAULT_SNAPSHOT_DIR
+
+
+def snapshot_path(source: str, request: Dict[str, Any], directory: Optional[str] = None) -> str:
+    """Return the snapshot file path for a source/request pair."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory or snapshot_dir(), f"{source}-{digest}.ndjson.gz")
+
+
+def write_snapshot(path: str, source: str, request: Dict[str, Any], response: Any, kind: Optional[str] = None) -> None:
+    """Atomically write a response snapshot as gzip NDJSON.
+
+    ``kind="list"`` writes any iterable of items one line at a time without
+    materializing it; by default only ``list`` responses are stored as items.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    kind = kind or ("list" if isinstance(response, list) else "object")
+    rows = response if kind == "list" else [response]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"source": source, "request": request, "kind": kind}, default=str) + "\n")
+        for row in rows:
+            f.write(json.dumps(row, default=str) + "\n")
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: str) -> Any:
+    """Load a response previously written by :func:`write_snapshot`."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        rows = [json.loads(line) for line in f if line.strip()]
+    if header.get("kind") == "list":
+        return rows
+    return rows[0] if rows else {}
+
+
+def iter_snapshot(path: str) -> Iterator[Any]:
+    """Stream the items of a list snapshot one line at a time."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()  # header
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replayable(source: str, key_args: Sequence[str], stream: bool = False) -> Callable:
+    """Decorate a fetch function so its responses can be recorded/replayed.
+
+    Args:
+        source: Short source name used in snapshot file names.
+        key_args: Names of the arguments that identify a request. Secrets
+            (API keys) and tuning knobs (timeouts) should be left out.
+        stream: The function returns an iterable of items (e.g. a large
+            export). Recording writes the items to the snapshot as they are
+            produced, and both record and replay return an iterator over the
+            snapshot, so the items are never held in memory at once.
+
+    Works for both regular and ``async`` functions (``stream`` for regular
+    functions only).
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+
+        def _request(args, kwargs) -> Dict[str, Any]:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return {k: bound.arguments.get(k) for k in key_args}
+
+        def _replay(path: str) -> Any:
+            if not os.path.exists(path):
+                raise ReplayMissError(f"No {source} snapshot at {path} (replay mode)")
+            return iter_snapshot(path) if stream else read_snapshot(path)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                mode = current_mode()
+                if mode == "off":
+                    return await fn(*args, **kwargs)
+                request = _request(args, kwargs)
+                path = snapshot_path(source, request)
+                if mode == "replay":
+                    return _replay(path)
+                response = await fn(*args, **kwargs)
+                write_snapshot(path, source, request, response)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = current_mode()
+            if mode == "off":
+                return fn(*args, **kwargs)
+            request = _request(args, kwargs)
+            path = snapshot_path(source, request)
+            if mode == "replay":
+                return _replay(path)
+            response = fn(*args, **kwargs)
+            if stream:
+                write_snapshot(path, source, request, response, kind="list")
+                return iter_snapshot(path)
+            write_snapshot(path, source, request, response)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,362 @@
+"""Declarative keyword rules, compiled into shared lookup tables.
+
+The category, severity, emotional-intensity and buying-signal keyword lists
+live in a rules file (``src/rules.json`` by default, or the file named by
+the ``PAIN_RULES_PATH`` env var; ``.yaml``/``.yml`` files are read when
+PyYAML is installed). A file holds named rule sets::
+
+    {
+      "negators": ["not", "no", "never"],
+      "negation_window": 3,
+      "rule_sets": {
+        "severity": {
+          "mode": "max", "default": 2,
+          "rules": [{"value": 5, "terms": ["urgent", "blocking"], "negation": true}]
+        }
+      }
+    }
+
+Each rule maps its ``terms`` to a ``value``. How the values of the matched
+rules combine depends on the set's ``mode``:
+
+- ``first``: the value of the first matching rule in file order (priority);
+- ``max``: the largest matched value;
+- ``sum``: matched values summed as weights, clipped to ``cap``.
+
+Terms match whole words (see :mod:`src.tokenizer`), case-insensitively:
+``app`` matches "the app" but not "happy" or "apps". A term ending in
+``*`` matches any word starting with it (``frustrat*``), and a term with
+several words matches them as consecutive words (``looking for``). With
+``negation`` a term preceded by one of the ``negators`` within
+``negation_window`` words is ignored ("not expensive").
+
+Compilation indexes the terms of every rule set in hash tables keyed by
+word, prefix and bigram. Matching a tokenized text is a handful of set
+intersections, so its cost depends on the text (and the number of distinct
+prefix lengths), not on the number of rules, and stays flat as rules grow
+into the thousands (see ``scripts/bench_rules.py``). Compiled rules are
+cached by the SHA-256 of the file content, and :class:`RuleStore` re-reads
+the file when it changes, so a long-running API picks up edits without a
+restart.
+
+Example:
+    >>> rules = current_rules()
+    >>> rules.evaluate("The export keeps crashing, it's blocking us")
+    {'category': 'Bugs', 'severity': 5, 'emotional_intensity': 5, 'buying_signals': 0}
+    >>> rules.classify("category", "way too expensive")
+    'Pricing'
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from src.lazy import lazy_import
+from src.tokenizer import TextTokens, split_words, tokenize_text
+
+yaml = lazy_import("yaml", optional=True)
+
+PATH_ENV = "PAIN_RULES_PATH"
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+MODES = ("first", "max", "sum")
+# Rule sets the pipeline reads (analyze and scoring)
+PIPELINE_SETS = ("category", "severity", "emotional_intensity", "buying_signals")
+_CACHE_SIZE = 8
+
+
+class RulesError(ValueError):
+    """Raised when a rules file is malformed."""
+
+
+@dataclass(frozen=True)
+class Rule:
+    value: Any
+    terms: Tuple[str, ...]
+    negation: bool = False
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    mode: str
+    default: Any
+    rules: Tuple[Rule, ...]
+    cap: Optional[float] = None
+
+    def combine(self, matched: Collection[int]) -> Any:
+        """Combine the values of the matched rule indices per :attr:`mode`."""
+        if not matched:
+            return self.default
+        if self.mode == "first":
+            return self.rules[min(matched)].value
+        values = [self.rules[i].value for i in matched]
+        if self.mode == "max":
+            return max(values)
+        total = sum(values)
+        return min(total, self.cap) if self.cap is not None else total
+
+
+def rules_path() -> str:
+    """Rules location from ``PAIN_RULES_PATH`` (default: bundled ``rules.json``)."""
+    return os.environ.get(PATH_ENV) or DEFAULT_PATH
+
+
+# Compiled term entry: (rule set name, rule index, negation enabled)
+_Entry = Tuple[str, int, bool]
+
+
+class CompiledRules:
+    """Rule sets compiled into shared lookup tables; build with :func:`compile_rules`.
+
+    Terms are indexed by kind: single words in one dict, ``word*`` prefixes
+    in one dict per prefix length, and phrases by their first bigram.
+    Matching intersects a text's word and bigram sets with these tables, so
+    its cost depends on the text, not on the number of rules.
+    """
+
+    def __init__(self, spec: Dict[str, Any], digest: str = ""):
+        self.digest = digest
+        self.version = spec.get("version")
+        self.negators = frozenset(split_words(" ".join(spec.get("negators", ()))))
+        self.negation_window = int(spec.get("negation_window", 3))
+        self.rule_sets: Dict[str, RuleSet] = {}
+        self._set_names: List[str] = []
+        self._words: Dict[str, List[_Entry]] = {}
+        self._prefixes: Dict[int, Dict[str, List[_Entry]]] = {}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], _Entry]]] = {}
+        sets = spec.get("rule_sets")
+        if not isinstance(sets, dict) or not sets:
+            raise RulesError("rules file needs a non-empty 'rule_sets' mapping")
+        for name, raw in sets.items():
+            rule_set = _parse_rule_set(name, raw)
+            self.rule_sets[name] = rule_set
+            self._set_names.append(name)
+            for rule_index, rule in enumerate(rule_set.rules):
+                for term in rule.terms:
+                    self._add_term(name, term, (name, rule_index, rule.negation))
+        self._word_keys = frozenset(self._words)
+        self._phrase_keys = frozenset(self._phrases)
+        self._prefix_tables = sorted((n, table, frozenset(table)) for n, table in self._prefixes.items())
+
+    def _add_term(self, set_name: str, term: str, entry: _Entry) -> None:
+        prefix = term.endswith("*")
+        words = split_words(term.rstrip("*"))
+        if not words:
+            raise RulesError(f"rule set {set_name!r}: term {term!r} has no words")
+        if len(words) == 1:
+            if prefix:
+                self._prefixes.setdefault(len(words[0]), {}).setdefault(words[0], []).append(entry)
+            else:
+                self._words.setdefault(words[0], []).append(entry)
+        elif prefix:
+            raise RulesError(f"rule set {set_name!r}: prefix term {term!r} must be a single word")
+        else:
+            self._phrases.setdefault(f"{words[0]} {words[1]}", []).append((words, entry))
+
+    def __len__(self) -> int:
+        return sum(len(s.rules) for s in self.rule_sets.values())
+
+    def _negated(self, tokens: Tuple[str, ...], starts: Iterable[int]) -> bool:
+        """True if every occurrence starting at ``starts`` follows a negator."""
+        window, negators = self.negation_window, self.negators
+        return all(not negators.isdisjoint(tokens[max(0, i - window):i]) for i in starts)
+
+    def matches(self, text: Union[str, TextTokens, None]) -> Dict[str, Set[int]]:
+        """Matched rule indices per rule set name."""
+        tt = text if isinstance(text, TextTokens) else tokenize_text(text)
+        tokens = tt.tokens
+        found: Dict[str, Set[int]] = {}
+
+        def hit(entries: Iterable[_Entry], starts: Callable[[], Iterable[int]]) -> None:
+            negated = None
+            for set_name, rule_index, negation in entries:
+                if negation:
+                    if negated is None:
+                        negated = self._negated(tokens, starts())
+                    if negated:
+                        continue
+                found.setdefault(set_name, set()).add(rule_index)
+
+        for word in tt.words.intersection(self._word_keys):
+            hit(self._words[word], lambda w=word: (i for i, t in enumerate(tokens) if t == w))
+        for n, table, keys in self._prefix_tables:
+            for stem in keys.intersection({w[:n] for w in tt.words if len(w) >= n}):
+                hit(table[stem], lambda s=stem: (i for i, t in enumerate(tokens) if t.startswith(s)))
+        if self._phrase_keys:
+            for bigram in tt.bigrams.intersection(self._phrase_keys):
+                for words, entry in self._phrases[bigram]:
+                    if tt.has_phrase(words):
+                        hit((entry,), lambda p=words: _phrase_starts(tokens, p))
+        return found
+
+    def evaluate(self, text: Union[str, TextTokens, None], sets: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Combined value of every rule set (or just ``sets``) for ``text``.
+
+        ``text`` may be a string or already tokenized :class:`TextTokens`.
+        """
+        matched = self.matches(text)
+        names = self._set_names if sets is None else sets
+        return {name: self.rule_sets[name].combine(matched.get(name, ())) for name in names}
+
+    def classify(self, name: str, text: Union[str, TextTokens, None]) -> Any:
+        """Combined value of one rule set for ``text``."""
+        return self.evaluate(text, (name,))[name]
+
+
+def _phrase_starts(tokens: Tuple[str, ...], words: Tuple[str, ...]) -> Iterable[int]:
+    n = len(words)
+    return (i for i in range(len(tokens) - n + 1) if tokens[i:i + n] == words)
+
+
+def _parse_rule_set(name: str, raw: Any) -> RuleSet:
+    if not isinstance(raw, dict):
+        raise RulesError(f"rule set {name!r} must be a mapping")
+    mode = raw.get("mode", "first")
+    if mode not in MODES:
+        raise RulesError(f"rule set {name!r}: mode must be one of {', '.join(MODES)}, got {mode!r}")
+    rules = []
+    for i, rule in enumerate(raw.get("rules", [])):
+        terms = rule.get("terms") if isinstance(rule, dict) else None
+        if not terms or "value" not in rule:
+            raise RulesError(f"rule set {name!r}: rule {i} needs 'value' and non-empty 'terms'")
+        rules.append(Rule(
+            value=rule["value"],
+            terms=tuple(str(t) for t in terms),
+            negation=bool(rule.get("negation", raw.get("negation", False))),
+        ))
+    if mode != "first" and not all(isinstance(r.value, (int, float)) for r in rules):
+        raise RulesError(f"rule set {name!r}: {mode!r} mode needs numeric values")
+    return RuleSet(name=name, mode=mode, default=raw.get("default"), rules=tuple(rules), cap=raw.get("cap"))
+
+
+_cache: "OrderedDict[str, CompiledRules]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_rules(content: bytes, fmt: str = "json") -> CompiledRules:
+    """Compile rules file content, reusing a cached build of identical content.
+
+    Raises:
+        RulesError: If the content cannot be parsed or is malformed.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    with _cache_lock:
+        cached = _cache.get(digest)
+        if cached is not None:
+            _cache.move_to_end(digest)
+            return cached
+    if fmt == "yaml":
+        if yaml is None:
+            raise RulesError("YAML rules files need PyYAML installed")
+        try:
+            spec = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise RulesError(f"invalid YAML rules: {e}") from e
+    else:
+        try:
+            spec = json.loads(content)
+        except ValueError as e:
+            raise RulesError(f"invalid JSON rules: {e}") from e
+    if not isinstance(spec, dict):
+        raise RulesError("rules file must contain a mapping")
+    compiled = CompiledRules(spec, digest)
+    with _cache_lock:
+        _cache[digest] = compiled
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def load_rules(path: Optional[str] = None) -> CompiledRules:
+    """Read and compile the rules file at ``path`` (default :func:`rules_path`)."""
+    path = path or rules_path()
+    with open(path, "rb") as f:
+        content = f.read()
+    fmt = "yaml" if path.lower().endswith((".yaml", ".yml")) else "json"
+    return compile_rules(content, fmt)
+
+
+class RuleStore:
+    """Current rules for a file, re-read when the file changes.
+
+    The file is stat-ed at most every ``check_interval`` seconds, so
+    :meth:`get` is cheap enough to call per record. If an edited file fails
+    to compile or lacks one of the ``required`` rule sets, the previous
+    rules stay active and the error is kept in :attr:`last_error` until a
+    valid version is saved.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        check_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        required: Sequence[str] = (),
+    ):
+        self.path = path or rules_path()
+        self.check_interval = check_interval
+        self.required = tuple(required)
+        self.clock = clock
+        self.last_error: Optional[str] = None
+        self._rules: Optional[CompiledRules] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CompiledRules:
+        now = self.clock()
+        rules = self._rules
+        if rules is not None and now < self._next_check:
+            return rules
+        with self._lock:
+            if self._rules is not None and now < self._next_check:
+                return self._rules
+            self._next_check = now + self.check_interval
+            try:
+                st = os.stat(self.path)
+            except OSError as e:
+                if self._rules is None:
+                    raise
+                self.last_error = str(e)
+                return self._rules
+            stat = (st.st_mtime_ns, st.st_size)
+            if stat != self._stat:
+                try:
+                    rules = load_rules(self.path)
+                    missing = [name for name in self.required if name not in rules.rule_sets]
+                    if missing:
+                        raise RulesError(f"{self.path} is missing rule sets: {', '.join(missing)}")
+                    self._rules = rules
+                    self.last_error = None
+                except (OSError, RulesError) as e:
+                    if self._rules is None:
+                        raise
+                    self.last_error = str(e)
+                self._stat = stat
+            return self._rules
+
+
+_store: Optional[RuleStore] = None
+_store_lock = threading.Lock()
+
+
+def current_rules() -> CompiledRules:
+    """Rules from the process-wide :class:`RuleStore` for :func:`rules_path`."""
+    global _store
+    store = _store
+    if store is None or store.path != rules_path():
+        with _store_lock:
+            if _store is None or _store.path != rules_path():
+                _store = RuleStore(rules_path(), required=PIPELINE_SETS)
+            store = _store
+    return store.get()
+
+
+def rules_store() -> RuleStore:
+    """The process-wide store behind :func:`current_rules`."""
+    current_rules()
+    return _store
@@ -0,0 +1,352 @@
+"""Long-running crawl scheduler with incremental runs.
+
+``python -m src.main schedule`` keeps one process alive instead of
+re-running the whole CLI from cron. State that is expensive to build stays
+warm between runs: the compiled rules (see :mod:`src.rules`), an optional
+category model, the per-source rate-limit buckets, the search index
+connection and the trend state.
+
+Each :class:`CrawlJob` crawls its subreddits on its own interval. A run
+only processes posts it has not seen before (tracked by ``post_url`` in a
+bounded, persisted :class:`SeenStore`), then appends them to the CSV
+export, upserts them into the search index and folds them into the trend
+state. Scores are computed over each run's new records, so recurrence
+points reflect what a run found rather than the whole history.
+
+A job is never started while its previous run is still in flight; the
+missed slot is counted in its :class:`JobMetrics` instead of piling up.
+
+Usage:
+    $ python -m src.main schedule --subreddits SaaS,startups --interval 3600
+    $ python -m src.main schedule --jobs jobs.json
+
+``jobs.json`` holds a list of jobs::
+
+    [{"name": "saas", "subreddits": ["SaaS"], "interval": 900, "limit": 50},
+     {"name": "startups", "subreddits": ["startups"], "interval": 3600, "keywords": ["pricing"]}]
+"""
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.classifier import CategoryClassifier, get_classifier
+from src.exporter import DEFAULT_OUTPUT_DIR, append_csv
+from src.pipeline import run_pipeline
+from src.rate_limit import InMemoryBucketStore
+from src.search_index import SearchIndex, index_path
+from src.sources import FetchExecutor, PushshiftSource
+from src.trends import TrendEngine, trends_path
+
+DEFAULT_SEEN_PATH = os.path.join(DEFAULT_OUTPUT_DIR, "scheduler_seen.json")
+DEFAULT_CSV_PATH = os.path.join(DEFAULT_OUTPUT_DIR, "incremental_output.csv")
+
+
+@dataclass
+class CrawlJob:
+    """Subreddits crawled together every ``interval`` seconds."""
+
+    name: str
+    subreddits: List[str]
+    interval: float = 3600.0
+    keywords: Optional[List[str]] = None
+    limit: int = 25
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CrawlJob":
+        subs = data.get("subreddits") or []
+        if isinstance(subs, str):
+            subs = [s.strip() for s in subs.split(",") if s.strip()]
+        if not subs:
+            raise ValueError(f"job {data!r} has no subreddits")
+        interval = float(data.get("interval", 3600))
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        return cls(
+            name=data.get("name") or ",".join(subs),
+            subreddits=list(subs),
+            interval=interval,
+            keywords=data.get("keywords") or None,
+            limit=int(data.get("limit", 25)),
+        )
+
+
+@dataclass
+class JobMetrics:
+    """Counters for one job since the scheduler started."""
+
+    runs: int = 0
+    failures: int = 0
+    skipped_overlap: int = 0
+    fetched: int = 0
+    new_records: int = 0
+    last_duration_s: Optional[float] = None
+    last_error: Optional[str] = None
+    last_finished_at: Optional[float] = None
+    next_run_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SeenStore:
+    """Bounded set of processed ``post_url`` values, persisted as JSON.
+
+    The oldest entries are evicted beyond ``max_entries``; posts that old
+    have long dropped out of the "newest N" pages a crawl fetches.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._urls: "OrderedDict[str, None]" = OrderedDict()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._urls = OrderedDict.fromkeys(json.load(f))
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self._urls[url] = None
+            self._urls.move_to_end(url)
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+
+    def save(self) -> None:
+        """Write the set atomically (no-op for in-memory stores)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(self._urls), f)
+        os.replace(tmp, self.path)
+
+
+class IncrementalCrawler:
+    """Runs one job: fetch, keep new posts, process and append.
+
+    Args:
+        seen: Store of processed post URLs.
+        csv_path: CSV export that new records are appended to.
+        search_index: Open search index, or None to skip indexing.
+        trends_file: Trend state path, or None to skip trend updates.
+        scoring_profile: Scoring profile name (see :data:`src.scoring.PROFILES`).
+        classifier: Optional category classifier, loaded once.
+        max_concurrency: Requests in flight per run.
+        retries: Retries per failed page fetch.
+    """
+
+    def __init__(
+        self,
+        seen: SeenStore,
+        csv_path: str = DEFAULT_CSV_PATH,
+        search_index: Optional[SearchIndex] = None,
+        trends_file: Optional[str] = None,
+        scoring_profile: Optional[str] = None,
+        classifier: Optional[CategoryClassifier] = None,
+        max_concurrency: int = 4,
+        retries: int = 2,
+    ):
+        self.seen = seen
+        self.csv_path = csv_path
+        self.search_index = search_index
+        self.trends_file = trends_file
+        self.trends = TrendEngine.load_or_new(trends_file) if trends_file else None
+        self.scoring_profile = scoring_profile
+        self.classifier = classifier
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        # Rate-limit buckets outlive a run, so back-to-back runs stay within limits
+        self.bucket_store = InMemoryBucketStore()
+        self._lock = threading.Lock()
+
+    def fetch(self, job: CrawlJob) -> List[Dict]:
+        executor = FetchExecutor(max_concurrency=self.max_concurrency, retries=self.retries, store=self.bucket_store)
+        source = PushshiftSource(job.subreddits, keywords=job.keywords, limit_per_sub=job.limit)
+        items = list(executor.run([source])[source.name])
+        errors = executor.metrics[source.name].errors
+        if errors and not items:
+            raise RuntimeError("; ".join(errors))
+        return items
+
+    def run(self, job: CrawlJob) -> Dict[str, int]:
+        """Crawl ``job`` and process its new posts; returns ``{"fetched", "new"}``."""
+        items = self.fetch(job)
+        # Shared stores are updated one job at a time
+        with self._lock:
+            fresh, urls = [], set()
+            for item in items:
+                url = item.get("full_link")
+                if url in self.seen or url in urls:
+                    continue
+                urls.add(url)
+                fresh.append(item)
+            if fresh:
+                records = run_pipeline(fresh, scoring_profile=self.scoring_profile, classifier=self.classifier)
+                if self.search_index is not None:
+                    self.search_index.add_records(records)
+                if self.trends is not None:
+                    self.trends.update(records)
+                    self.trends.save(self.trends_file)
+                # The CSV is append-only, so it is written last and the posts
+                # are marked seen right after: a failure in an earlier step
+                # re-processes them next run instead of duplicating rows
+                append_csv(records, self.csv_path)
+                self.seen.add_many(urls)
+                self.seen.save()
+        return {"fetched": len(items), "new": len(fresh)}
+
+
+class Scheduler:
+    """Trigger jobs on their intervals with overlap protection.
+
+    Args:
+        jobs: Jobs to schedule; names must be unique.
+        runner: Called with a job, returns ``{"fetched", "new"}`` counts.
+        max_workers: Jobs that may run at the same time.
+        clock: Monotonic clock (injectable for tests).
+        on_finish: Optional callback ``(job, metrics)`` after every run.
+    """
+
+    def __init__(
+        self,
+        jobs: Sequence[CrawlJob],
+        runner: Callable[[CrawlJob], Dict[str, int]],
+        max_workers: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        on_finish: Optional[Callable[[CrawlJob, JobMetrics], Any]] = None,
+    ):
+        names = [job.name for job in jobs]
+        if not names or len(set(names)) != len(names):
+            raise ValueError(f"need at least one job and unique job names: {names}")
+        self.jobs = list(jobs)
+        self.runner = runner
+        self.clock = clock
+        self.on_finish = on_finish
+        self.metrics: Dict[str, JobMetrics] = {job.name: JobMetrics() for job in jobs}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl")
+        self._running: Dict[str, Future] = {}
+
+    def _run_job(self, job: CrawlJob) -> None:
+        m = self.metrics[job.name]
+        start = self.clock()
+        try:
+            counts = self.runner(job)
+            m.fetched += counts.get("fetched", 0)
+            m.new_records += counts.get("new", 0)
+            m.last_error = None
+        except Exception as e:
+            m.failures += 1
+            m.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            m.runs += 1
+            m.last_finished_at = self.clock()
+            m.last_duration_s = m.last_finished_at - start
+        if self.on_finish is not None:
+            self.on_finish(job, m)
+
+    def tick(self) -> List[str]:
+        """Start every due job; returns the names of the jobs started."""
+        now = self.clock()
+        started = []
+        for job in self.jobs:
+            m = self.metrics[job.name]
+            if now < m.next_run_at:
+                continue
+            # Schedule from the slot, not from completion, so runs don't drift
+            m.next_run_at = max(m.next_run_at + job.interval, now)
+            running = self._running.get(job.name)
+            if running is not None and not running.done():
+                m.skipped_overlap += 1
+                continue
+            self._running[job.name] = self._pool.submit(self._run_job, job)
+            started.append(job.name)
+        return started
+
+    def seconds_until_due(self) -> float:
+        return max(0.0, min(m.next_run_at for m in self.metrics.values()) - self.clock())
+
+    def run_forever(self, stop: Optional[threading.Event] = None, poll: float = 1.0) -> None:
+        """Tick until ``stop`` is set, then wait for in-flight runs."""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                self.tick()
+                stop.wait(min(poll, max(self.seconds_until_due(), 0.01)))
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def _print_metrics(job: CrawlJob, m: JobMetrics) -> None:
+    status = f"failed ({m.last_error})" if m.last_error else "ok"
+    print(
+        f"[{job.name}] run {m.runs} {status} in {m.last_duration_s:.1f}s: "
+        f"{m.new_records} new / {m.fetched} fetched so far, {m.failures} failures, {m.skipped_overlap} overlaps skipped"
+    )
+
+
+def load_jobs(path: str) -> List[CrawlJob]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [CrawlJob.from_dict(item) for item in (data.get("jobs", []) if isinstance(data, dict) else data)]
+
+
+def schedule_cli(argv: Optional[Sequence[str]] = None, stop: Optional[threading.Event] = None) -> int:
+    """``python -m src.main schedule`` entry point."""
+    parser = argparse.ArgumentParser(prog="python -m src.main schedule", description="Crawl subreddits on intervals, processing only new posts")
+    parser.add_argument("--subreddits", default="SaaS,startups", help="Comma-separated subreddits, one job each (ignored with --jobs)")
+    parser.add_argument("--interval", type=float, default=3600, help="Seconds between runs of each job")
+    parser.add_argument("--limit", type=int, default=25, help="Posts fetched per subreddit and run")
+    parser.add_argument("--jobs", default=None, help="JSON file with a list of jobs (name, subreddits, interval, keywords, limit)")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="CSV export new records are appended to")
+    parser.add_argument("--seen", default=DEFAULT_SEEN_PATH, help="File tracking already processed posts")
+    parser.add_argument("--scoring-profile", default="default")
+    parser.add_argument("--category-model", default=None, help="Trained category model file (see 'classifier train')")
+    parser.add_argument("--max-workers", type=int, default=2, help="Jobs that may run at the same time")
+    parser.add_argument("--no-index", action="store_true", help="Do not update the search index")
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        jobs = load_jobs(args.jobs)
+    else:
+        subs = [s.strip() for s in args.subreddits.split(",") if s.strip()]
+        jobs = [CrawlJob.from_dict({"name": s, "subreddits": [s], "interval": args.interval, "limit": args.limit}) for s in subs]
+
+    index = None if args.no_index else SearchIndex(index_path())
+    crawler = IncrementalCrawler(
+        SeenStore(args.seen),
+        csv_path=args.csv,
+        search_index=index,
+        trends_file=trends_path(),
+        scoring_profile=args.scoring_profile,
+        classifier=get_classifier(args.category_model) if args.category_model else None,
+    )
+    scheduler = Scheduler(jobs, crawler.run, max_workers=args.max_workers, on_finish=_print_metrics)
+    if stop is None:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"Scheduling {len(jobs)} job(s): " + ", ".join(f"{j.name} every {j.interval:g}s" for j in jobs))
+    try:
+        scheduler.run_forever(stop)
+    except KeyboardInterrupt:
+        pass  # run_forever already waited for in-flight runs
+    finally:
+        if index is not None:
+            index.close()
+    print(json.dumps({name: m.to_dict() for name, m in scheduler.metrics.items()}, indent=2))
+    return 0
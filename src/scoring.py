@@ -1,64 +1,185 @@
-"""Pain-Point Scoring: Calculate a 0-100 score based on intensity, mentions, and signals."""
-from typing import List, Dict
+"""Pain-Point Scoring: Calculate a 0-100 score based on intensity, mentions, and signals.
+
+Text signals (emotional intensity, buying intent) are extracted per record
+with the ``emotional_intensity`` and ``buying_signals`` rule sets (see
+:mod:`src.rules`), reusing the tokens ``transform_to_schema`` cached on the
+record; every other component is computed column-wise over the whole batch
+with numpy:
+
+    base = emotional + buying + severity + subreddit size + recurrence
+    score = min(int((base + engagement) * recency), 100)
+
+``engagement`` rewards posts with many upvotes/comments (log-scaled and
+weighted by upvote ratio) and ``recency`` decays older posts towards a
+floor. Both are configured by a :class:`ScoringProfile`; records without
+engagement data or a date get no engagement points and no decay, and
+:data:`LEGACY_PROFILE` reproduces the original scores exactly.
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, UTC
+from typing import List, Dict, Optional, Union
+
+from src.lazy import lazy_import
+from src.records import PainPointRecord
+from src.rules import current_rules
+from src.tokenizer import record_tokens
+
+np = lazy_import("numpy")
+
+
+@dataclass(frozen=True)
+class ScoringProfile:
+    """Weights for the engagement and recency components.
+
+    Attributes:
+        engagement_points: Points added for maximal engagement (0 disables).
+        engagement_saturation: Weighted engagement at which the full
+            ``engagement_points`` are reached (log scale).
+        comment_weight: How many upvotes one comment is worth.
+        recency_half_life_days: Age at which the recency factor is halfway
+            between 1 and ``recency_floor`` (None disables decay).
+        recency_floor: Lowest recency multiplier for very old posts.
+    """
+
+    engagement_points: float = 10.0
+    engagement_saturation: float = 1000.0
+    comment_weight: float = 2.0
+    recency_half_life_days: Optional[float] = 180.0
+    recency_floor: float = 0.5
+
+
+DEFAULT_PROFILE = ScoringProfile()
+LEGACY_PROFILE = ScoringProfile(engagement_points=0.0, recency_half_life_days=None)
+TRENDING_PROFILE = ScoringProfile(engagement_points=20.0, recency_half_life_days=30.0, recency_floor=0.25)
+PROFILES = {"default": DEFAULT_PROFILE, "legacy": LEGACY_PROFILE, "trending": TRENDING_PROFILE}
+
+
+def get_profile(profile: Union[str, ScoringProfile, None]) -> ScoringProfile:
+    """Resolve a profile name (see :data:`PROFILES`) or pass a profile through."""
+    if profile is None:
+        return DEFAULT_PROFILE
+    if isinstance(profile, ScoringProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"unknown scoring profile {profile!r}; expected one of {sorted(PROFILES)}") from None
+
 
 def _count_emotional_intensity(text: str) -> int:
-    """Rate emotional intensity (1-5) based on keywords."""
-    text_lower = text.lower()
-    if any(x in text_lower for x in ["urgent", "critical", "blocking", "can't", "cannot", "impossible"]):
-        return 5
-    if any(x in text_lower for x in ["breaking", "serious", "frustrated", "annoyed"]):
-        return 4
-    if any(x in text_lower for x in ["annoying", "issue", "problem", "trouble"]):
-        return 3
-    if any(x in text_lower for x in ["need", "want", "wish", "would be nice"]):
-        return 2
-    return 1
+    """Rate emotional intensity (1-5) with the ``emotional_intensity`` rules."""
+    return current_rules().classify("emotional_intensity", text)
+
 
 def _detect_buying_signals(text: str) -> int:
-    """Detect buying intent signals (0-5)."""
-    text_lower = text.lower()
-    signals = 0
-    if any(x in text_lower for x in ["would pay", "willing to pay", "worth", "pricing", "cost", "subscription"]):
-        signals += 2
-    if any(x in text_lower for x in ["looking for", "anyone using", "recommendation", "tool", "software", "app"]):
-        signals += 2
-    if any(x in text_lower for x in ["vs", "comparison", "alternative", "competitor", "switch"]):
-        signals += 1
-    return min(signals, 5)
-
-def calculate_pain_score(records: List[Dict], subreddit_popularity: Dict[str, int] = None) -> List[Dict]:
-    """Calculate pain-point score (0-100) based on multiple factors."""
+    """Detect buying intent signals (0-5) with the ``buying_signals`` rules."""
+    return current_rules().classify("buying_signals", text)
+
+
+def _day_ordinal(value) -> float:
+    """Day ordinal of an ISO date/timestamp string, NaN when unknown."""
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return float(date.fromisoformat(value[:10]).toordinal())
+        except ValueError:
+            pass
+    return math.nan
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+def engagement_points(post_score, num_comments, upvote_ratio, profile: ScoringProfile = DEFAULT_PROFILE):
+    """Vectorized engagement component (0..``engagement_points``).
+
+    Missing scores/comments count as 0 and a missing ratio as 1; a record with
+    neither score nor comments gets 0 points.
+    """
+    post_score = np.nan_to_num(np.asarray(post_score, dtype=np.float64), nan=0.0)
+    num_comments = np.nan_to_num(np.asarray(num_comments, dtype=np.float64), nan=0.0)
+    ratio = np.nan_to_num(np.asarray(upvote_ratio, dtype=np.float64), nan=1.0)
+    weighted = np.maximum(post_score, 0.0) + profile.comment_weight * np.maximum(num_comments, 0.0)
+    level = np.log1p(weighted * np.clip(ratio, 0.0, 1.0)) / math.log1p(profile.engagement_saturation)
+    return np.minimum(level, 1.0) * profile.engagement_points
+
+
+def recency_factor(age_days, profile: ScoringProfile = DEFAULT_PROFILE):
+    """Vectorized recency multiplier in [``recency_floor``, 1]; NaN ages give 1."""
+    age = np.asarray(age_days, dtype=np.float64)
+    if profile.recency_half_life_days is None:
+        return np.ones_like(age)
+    decay = np.exp2(-np.maximum(age, 0.0) / profile.recency_half_life_days)
+    factor = profile.recency_floor + (1.0 - profile.recency_floor) * decay
+    return np.where(np.isnan(age), 1.0, factor)
+
+
+def calculate_pain_score(
+    records: List[Dict],
+    subreddit_popularity: Dict[str, int] = None,
+    profile: Union[str, ScoringProfile, None] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """Calculate pain-point score (0-100) based on multiple factors.
+
+    Args:
+        records: Batch of records; ``pain_score`` is written on each.
+        subreddit_popularity: Subscriber counts by subreddit name.
+        profile: :class:`ScoringProfile` or profile name (default profile
+            when omitted).
+        now: Reference time for recency decay (default: current UTC time).
+    """
     if not subreddit_popularity:
         subreddit_popularity = {
             "SaaS": 500000,
             "startups": 1000000,
             "ProductManagement": 300000,
         }
-    
+    if not records:
+        return records
+    profile = get_profile(profile)
+
+    # One pass to extract per-record columns; text signals need Python
+    emotional, buying, severity, sub_size, keys = [], [], [], [], []
+    post_score, num_comments, upvote_ratio, day = [], [], [], []
     category_counts = {}
+    rules = current_rules()
     for rec in records:
+        signals = rules.evaluate(record_tokens(rec), ("emotional_intensity", "buying_signals"))
+        if isinstance(rec, PainPointRecord):
+            rec.tokens = None  # scoring is the last stage that reads the text
+        emotional.append(signals["emotional_intensity"])
+        buying.append(signals["buying_signals"])
+        severity.append(rec.get("severity_rating", 2))
+        sub_size.append(subreddit_popularity.get(rec.get("subreddit", ""), 100000))
         key = (rec.get("category"), rec.get("subreddit"))
+        keys.append(key)
         category_counts[key] = category_counts.get(key, 0) + 1
-    
-    max_mentions = max(category_counts.values()) if category_counts else 1
-    
-    for rec in records:
-        severity = rec.get("severity_rating", 2)
-        content = rec.get("pain_summary", "") + " " + rec.get("comment_or_content", "")
-        
-        emotional = _count_emotional_intensity(content) * 4
-        buying = _detect_buying_signals(content) * 4
-        severity_points = (severity - 1) * 5
-        
-        sub = rec.get("subreddit", "")
-        sub_size = subreddit_popularity.get(sub, 100000)
-        subreddit_points = min((sub_size / 1000000) * 20, 20)
-        
-        key = (rec.get("category"), rec.get("subreddit"))
-        mentions = category_counts.get(key, 1)
-        recurrence_points = (mentions / max_mentions) * 20
-        
-        pain_score = int(emotional + buying + severity_points + subreddit_points + recurrence_points)
-        rec["pain_score"] = min(pain_score, 100)
-    
+        post_score.append(_number(rec.get("post_score")))
+        num_comments.append(_number(rec.get("num_comments")))
+        upvote_ratio.append(_number(rec.get("upvote_ratio")))
+        day.append(_day_ordinal(rec.get("date")))
+
+    max_mentions = max(category_counts.values())
+    mentions = np.array([category_counts[k] for k in keys], dtype=np.float64)
+
+    base = (
+        np.array(emotional, dtype=np.float64) * 4
+        + np.array(buying, dtype=np.float64) * 4
+        + (np.array(severity, dtype=np.float64) - 1) * 5
+        + np.minimum(np.array(sub_size, dtype=np.float64) / 1000000 * 20, 20)
+        + mentions / max_mentions * 20
+    )
+    total = base
+    if profile.engagement_points:
+        total = total + engagement_points(post_score, num_comments, upvote_ratio, profile)
+    if profile.recency_half_life_days is not None:
+        today = (now or datetime.now(UTC)).date().toordinal()
+        total = total * recency_factor(today - np.array(day, dtype=np.float64), profile)
+    scores = np.minimum(total.astype(np.int64), 100).tolist()
+
+    for rec, score in zip(records, scores):
+        rec["pain_score"] = score
+
     return records
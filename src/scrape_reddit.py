@@ -1,15 +1,39 @@
-"""Simple Pushshift-based Reddit submissions fetcher for demo purposes."""
-from typing import List, Dict, Optional
-import requests
+"""Simple Pushshift-based Reddit submissions fetcher for demo purposes.
+
+:class:`CommentFetcher` additionally pulls the comment threads of the most
+discussed submissions, within a fixed request budget and item caps.
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set
 from datetime import datetime, UTC
 
+from src.http_client import http
+from src.ranking import top_k
+from src.rate_limit import RequestBudget
+from src.replay import replayable, ReplayMissError
+
+if TYPE_CHECKING:
+    from src.sources import FetchExecutor, SourceConnector
+
 PUSHSHIFT_SUBMISSION_URL = "https://api.pushshift.io/reddit/search/submission/"
+PUSHSHIFT_COMMENT_URL = "https://api.pushshift.io/reddit/search/comment/"
+
 
-def _fetch_submissions(subreddit: str, size: int = 25, query: Optional[str] = None) -> List[Dict]:
+def _iso_date(created_utc: Optional[float]) -> Optional[str]:
+    if not created_utc:
+        return None
+    return datetime.fromtimestamp(created_utc, UTC).isoformat().replace("+00:00", "Z")
+
+@replayable("pushshift", key_args=("subreddit", "size", "query"))
+def _fetch_submissions(subreddit: str, size: int = 25, query: Optional[str] = None, retries: Optional[int] = None) -> List[Dict]:
+    # ``retries`` overrides the shared client's; callers that retry
+    # themselves (the fetch executor) pass 0
     params = {"subreddit": subreddit, "size": size, "sort": "desc", "sort_type": "created_utc"}
     if query:
         params["q"] = query
-    resp = requests.get(PUSHSHIFT_SUBMISSION_URL, params=params, timeout=20)
+    resp = http.get(PUSHSHIFT_SUBMISSION_URL, params=params, timeout=20, retries=retries)
     resp.raise_for_status()
     data = resp.json().get("data", [])
     return data
@@ -17,34 +41,229 @@ def _fetch_submissions(subreddit: str, size: int = 25, query: Optional[str] = No
 def get_submissions(subreddits: List[str], keywords: Optional[List[str]] = None, limit_per_sub: int = 25) -> List[Dict]:
     """Return a list of submissions normalized to a small raw schema.
 
-    Each item contains: created_utc, subreddit, title, permalink, selftext, full_link
+    Each item contains: created_utc, subreddit, title, permalink, selftext, full_link,
+    plus the engagement fields score, num_comments and upvote_ratio (None when
+    the source does not report them).
     """
     results = []
     for sub in subreddits:
         try:
             data = _fetch_submissions(sub, size=limit_per_sub)
+        except ReplayMissError:
+            # Replay runs must be deterministic; never silently drop a subreddit
+            raise
         except Exception:
             data = []
-        for item in data:
-            results.append({
-                "created_utc": item.get("created_utc"),
-                "date": datetime.fromtimestamp(item.get("created_utc", 0), UTC).isoformat().replace("+00:00", "Z") if item.get("created_utc") else None,
-                "subreddit": item.get("subreddit"),
-                "title": item.get("title", ""),
-                "permalink": item.get("permalink", ""),
-                "full_link": item.get("full_link") or ("https://reddit.com" + item.get("permalink", "")),
-                "selftext": item.get("selftext", ""),
-                "id": item.get("id"),
-            })
-
-    # Optionally filter by keywords (very simple): keep items that contain any keyword in title or selftext
-    if keywords:
-        kw_lower = [k.lower() for k in keywords]
-        filtered = []
-        for r in results:
-            text = (r.get("title", "") + " " + r.get("selftext", "")).lower()
-            if any(k in text for k in kw_lower):
-                filtered.append(r)
-        return filtered
-
-    return results
+        results.extend(normalize_submission(item) for item in data)
+    return filter_keywords(results, keywords)
+
+
+def normalize_submission(item: Dict) -> Dict:
+    """Map a Pushshift submission to the raw item schema of :func:`get_submissions`."""
+    return {
+        "created_utc": item.get("created_utc"),
+        "date": _iso_date(item.get("created_utc")),
+        "subreddit": item.get("subreddit"),
+        "title": item.get("title", ""),
+        "permalink": item.get("permalink", ""),
+        "full_link": item.get("full_link") or ("https://reddit.com" + item.get("permalink", "")),
+        "selftext": item.get("selftext", ""),
+        "id": item.get("id"),
+        "score": item.get("score"),
+        "num_comments": item.get("num_comments"),
+        "upvote_ratio": item.get("upvote_ratio"),
+    }
+
+
+def filter_keywords(items: List[Dict], keywords: Optional[List[str]] = None) -> List[Dict]:
+    """Keep items whose title or selftext contains any keyword (all items when none are given)."""
+    if not keywords:
+        return items
+    kw_lower = [k.lower() for k in keywords]
+    filtered = []
+    for r in items:
+        text = ((r.get("title") or "") + " " + (r.get("selftext") or "")).lower()
+        if any(k in text for k in kw_lower):
+            filtered.append(r)
+    return filtered
+
+
+@replayable("pushshift_comments", key_args=("link_id", "size", "before"))
+def _fetch_comments(link_id: str, size: int = 100, before: Optional[int] = None) -> List[Dict]:
+    params = {"link_id": link_id, "size": size, "sort": "desc", "sort_type": "created_utc"}
+    if before:
+        params["before"] = before
+    resp = http.get(PUSHSHIFT_COMMENT_URL, params=params, timeout=20)
+    resp.raise_for_status()
+    return resp.json().get("data", [])
+
+
+class CommentFetcher:
+    """Fetch comments for the top-N submissions with bounded fan-out.
+
+    Threads are fetched concurrently, but every limit is global to the run:
+
+    - ``max_requests``: total Pushshift calls across all threads
+      (:class:`~src.rate_limit.RequestBudget`);
+    - ``max_comments_per_thread``: a viral thread is truncated, not paged
+      to the end;
+    - ``max_total_comments``: iteration stops once this many were yielded.
+
+    At most ``max_workers`` threads are in flight at once and results are
+    consumed in submission order, so no more than ``max_workers *
+    max_comments_per_thread`` raw comments are buffered at any time.
+
+    Given the crawl's :class:`~src.sources.FetchExecutor` and Pushshift
+    connector, every request also goes through
+    :meth:`~src.sources.FetchExecutor.call`: it shares the connector's
+    token bucket and the executor's concurrency cap (``max_workers`` is
+    capped at ``max_concurrency``).
+
+    Comments are yielded as raw items in the submission schema (``selftext``
+    holds the comment body) plus ``parent_url``/``parent_title`` linking them
+    to their post, ready for :func:`~src.analyze.transform_to_schema`.
+    Per-thread fetch stats are collected in :attr:`thread_stats`.
+
+    Example:
+        >>> subs = get_submissions(["SaaS"])
+        >>> fetcher = CommentFetcher(top_n=5, max_requests=20)
+        >>> records = transform_to_schema(itertools.chain(subs, fetcher.iter_comments(subs)))
+    """
+
+    def __init__(
+        self,
+        top_n: int = 10,
+        max_comments_per_thread: int = 500,
+        max_total_comments: int = 5000,
+        max_requests: int = 50,
+        max_workers: int = 4,
+        page_size: int = 100,
+        executor: Optional["FetchExecutor"] = None,
+        source: Optional["SourceConnector"] = None,
+    ):
+        if max_workers < 1 or page_size < 1:
+            raise ValueError("max_workers and page_size must be at least 1")
+        if (executor is None) != (source is None):
+            raise ValueError("executor and source must be given together")
+        self.top_n = top_n
+        self.max_comments_per_thread = max_comments_per_thread
+        self.max_total_comments = max_total_comments
+        self.max_workers = max_workers if executor is None else min(max_workers, executor.max_concurrency)
+        self.executor = executor
+        self.source = source
+        self.page_size = page_size
+        self.budget = RequestBudget(max_requests)
+        # parent_url -> stats, in the order threads were consumed
+        self.thread_stats: Dict[str, Dict[str, Any]] = {}
+        self.total_comments = 0
+        self._stop = threading.Event()
+
+    @property
+    def requests_used(self) -> int:
+        return self.budget.used
+
+    def select_threads(self, submissions: Iterable[Dict]) -> List[Dict]:
+        """The ``top_n`` submissions with the most comments (ties by input order)."""
+        candidates = [s for s in submissions if s.get("id") and (s.get("num_comments") or 0) > 0]
+        return top_k(candidates, self.top_n, key="num_comments")
+
+    def _fetch_thread(self, parent: Dict) -> Dict[str, Any]:
+        """Page through one thread until a cap, the budget or the end is hit."""
+        comments: List[Dict] = []
+        seen: Set[str] = set()
+        before = None
+        overlap = 0  # kept comments from the second ``before`` re-requests
+        truncated = False
+        while not self._stop.is_set():
+            want = min(self.page_size, self.max_comments_per_thread - len(comments))
+            if want <= 0:
+                truncated = True
+                break
+            if not self.budget.try_spend():
+                truncated = True
+                break
+            try:
+                page = self._fetch(parent["id"], size=want + overlap, before=before)
+                exhausted = len(page) < want + overlap
+            except ReplayMissError:
+                raise
+            except Exception:
+                break
+            # ``before`` is exclusive and comments often share a second, so
+            # each page re-requests the second of the oldest kept comment
+            # (``overlap`` extra rows) and drops the ones already kept
+            fresh = [c for c in page if c.get("id") is None or c["id"] not in seen][:want]
+            comments.extend(fresh)
+            seen.update(c["id"] for c in fresh if c.get("id") is not None)
+            last = fresh[-1].get("created_utc") if fresh else None
+            before = last + 1 if last else None
+            overlap = sum(1 for c in comments if c.get("created_utc") == last)
+            if exhausted or not before:
+                break
+        return {"comments": comments, "truncated": truncated}
+
+    def _fetch(self, link_id: str, **kwargs: Any) -> List[Dict]:
+        if self.executor is None:
+            return _fetch_comments(link_id, **kwargs)
+        return self.executor.call(self.source, _fetch_comments, link_id, **kwargs)
+
+    def _comment_item(self, comment: Dict, parent: Dict) -> Dict:
+        permalink = comment.get("permalink")
+        return {
+            "created_utc": comment.get("created_utc"),
+            "date": _iso_date(comment.get("created_utc")),
+            "subreddit": comment.get("subreddit") or parent.get("subreddit"),
+            "title": "",
+            "permalink": permalink or "",
+            "full_link": "https://reddit.com" + permalink if permalink else f"{parent.get('full_link', '')}{comment.get('id', '')}",
+            "selftext": comment.get("body", ""),
+            "id": comment.get("id"),
+            "score": comment.get("score"),
+            "parent_url": parent.get("full_link"),
+            "parent_title": parent.get("title", ""),
+        }
+
+    def iter_comments(self, submissions: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield raw comment items for the most discussed ``submissions``."""
+        self._stop.clear()
+        threads = iter(self.select_threads(submissions))
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="comments")
+        pending: deque = deque()
+
+        def submit_next() -> None:
+            parent = next(threads, None)
+            if parent is not None:
+                pending.append((parent, pool.submit(self._fetch_thread, parent)))
+
+        try:
+            for _ in range(self.max_workers):
+                submit_next()
+            while pending:
+                parent, future = pending.popleft()
+                result = future.result()
+                submit_next()
+                yielded, scores = 0, []
+                for comment in result["comments"]:
+                    if self.total_comments >= self.max_total_comments:
+                        self._stop.set()
+                        break
+                    self.total_comments += 1
+                    yielded += 1
+                    if isinstance(comment.get("score"), (int, float)):
+                        scores.append(comment["score"])
+                    yield self._comment_item(comment, parent)
+                self.thread_stats[parent.get("full_link")] = {
+                    "parent_title": parent.get("title", ""),
+                    "subreddit": parent.get("subreddit"),
+                    "reported_comments": parent.get("num_comments"),
+                    "comments": yielded,
+                    "total_score": sum(scores),
+                    "max_score": max(scores, default=0),
+                    "avg_score": round(sum(scores) / len(scores), 2) if scores else 0.0,
+                    "truncated": result["truncated"] or yielded < len(result["comments"]),
+                }
+                if self._stop.is_set():
+                    break
+        finally:
+            self._stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
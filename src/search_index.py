@@ -0,0 +1,270 @@
+"""Persistent full-text index over stored pain-point records (SQLite FTS5).
+
+Records are upserted by ``post_url`` into a ``posts`` table; an external
+content FTS5 table over ``post_title``, ``comment_or_content`` and
+``pain_summary`` is kept in sync by triggers, so every write updates the
+inverted index incrementally. Queries are ranked with BM25 (title matches
+weigh most) and can be filtered by subreddit and category.
+
+The CLI indexes every run into ``output/search.db`` (override with the
+``SEARCH_INDEX_PATH`` env var); the API serves it from ``/api/search``.
+
+Usage:
+    >>> with SearchIndex("output/search.db") as index:
+    ...     index.add_records(records)
+    ...     hits = index.search("export csv", limit=10, subreddit="SaaS")
+
+    $ python -m src.main search "export csv" --limit 10
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.records import RecordLike
+
+PATH_ENV = "SEARCH_INDEX_PATH"
+DEFAULT_PATH = os.path.join("output", "search.db")
+TEXT_FIELDS = ("post_title", "comment_or_content", "pain_summary")
+META_FIELDS = ("post_url", "date", "subreddit", "category", "pain_score")
+# BM25 column weights, in TEXT_FIELDS order
+BM25_WEIGHTS = (3.0, 1.0, 2.0)
+# Stored in PRAGMA user_version once the schema and rank config are written
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    post_url TEXT NOT NULL UNIQUE,
+    date TEXT,
+    subreddit TEXT,
+    category TEXT,
+    pain_score INTEGER,
+    post_title TEXT,
+    comment_or_content TEXT,
+    pain_summary TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_subreddit ON posts(subreddit);
+CREATE INDEX IF NOT EXISTS posts_category ON posts(category);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    post_title, comment_or_content, pain_summary,
+    content='posts', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts(rowid, post_title, comment_or_content, pain_summary)
+    VALUES (new.id, new.post_title, new.comment_or_content, new.pain_summary);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, post_title, comment_or_content, pain_summary)
+    VALUES ('delete', old.id, old.post_title, old.comment_or_content, old.pain_summary);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, post_title, comment_or_content, pain_summary)
+    VALUES ('delete', old.id, old.post_title, old.comment_or_content, old.pain_summary);
+    INSERT INTO posts_fts(rowid, post_title, comment_or_content, pain_summary)
+    VALUES (new.id, new.post_title, new.comment_or_content, new.pain_summary);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO posts (post_url, date, subreddit, category, pain_score, post_title, comment_or_content, pain_summary)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(post_url) DO UPDATE SET
+    date = excluded.date,
+    subreddit = excluded.subreddit,
+    category = excluded.category,
+    pain_score = excluded.pain_score,
+    post_title = excluded.post_title,
+    comment_or_content = excluded.comment_or_content,
+    pain_summary = excluded.pain_summary
+"""
+
+
+def index_path() -> str:
+    """Index location from ``SEARCH_INDEX_PATH`` (default ``output/search.db``)."""
+    return os.environ.get(PATH_ENV) or DEFAULT_PATH
+
+
+def to_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted, so punctuation and FTS5 operators in user input
+    cannot cause syntax errors; a trailing ``*`` on a word is kept as a
+    prefix search (``export*`` matches "exporting").
+    """
+    terms = []
+    for match in re.finditer(r"(\w+)(\*?)", text, re.UNICODE):
+        word, star = match.groups()
+        terms.append(f'"{word}"{star}')
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """SQLite FTS5 index of pain-point records.
+
+    The connection is shared across threads (API worker threads) and
+    serialized with a lock; SQLite query latency is well below the cost of
+    a request, so this is not a bottleneck.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or index_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # Only the first open writes: later ones (e.g. the API's read
+            # handle) must not take the write lock from running writers
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._create_schema()
+
+    def _create_schema(self) -> None:
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Persist the weighted BM25 as the table's rank function so
+        # ORDER BY rank uses FTS5's optimized ranking path
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        with self._conn:
+            self._conn.execute("INSERT INTO posts_fts(posts_fts, rank) VALUES ('rank', ?)", (f"bm25({weights})",))
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def add_records(self, records: Iterable[RecordLike]) -> int:
+        """Insert or update records (keyed by ``post_url``) in one transaction.
+
+        Records without a ``post_url`` are skipped. Returns the number written.
+        """
+        rows = [
+            (
+                rec.get("post_url"),
+                rec.get("date"),
+                rec.get("subreddit"),
+                rec.get("category"),
+                rec.get("pain_score"),
+                rec.get("post_title"),
+                rec.get("comment_or_content"),
+                rec.get("pain_summary"),
+            )
+            for rec in records
+            if rec.get("post_url")
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        subreddit: Optional[str] = None,
+        category: Optional[str] = None,
+        raw: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Return records matching ``query``, best BM25 match first.
+
+        Args:
+            query: Free text (all words must match) or, with ``raw=True``, an
+                FTS5 query expression (``OR``, ``NEAR``, column filters...).
+            limit: Maximum number of hits.
+            offset: Hits to skip, for paging.
+            subreddit: Only return posts from this subreddit.
+            category: Only return posts in this category.
+            raw: Pass ``query`` to FTS5 unchanged.
+
+        Returns:
+            Dicts with the stored fields, a ``score`` (higher is better) and a
+            highlighted ``snippet`` of the best-matching text.
+
+        Raises:
+            ValueError: If a raw query is not valid FTS5 syntax.
+        """
+        match = query if raw else to_match_query(query)
+        if not match.strip():
+            return []
+        sql = [
+            "SELECT p.*, -posts_fts.rank AS score,",
+            "snippet(posts_fts, -1, '[', ']', '...', 12) AS snippet",
+            "FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid",
+            "WHERE posts_fts MATCH ?",
+        ]
+        params: List[Any] = [match]
+        if subreddit:
+            sql.append("AND p.subreddit = ?")
+            params.append(subreddit)
+        if category:
+            sql.append("AND p.category = ?")
+            params.append(category)
+        sql.append("ORDER BY posts_fts.rank, p.id LIMIT ? OFFSET ?")
+        params += [limit, offset]
+        try:
+            with self._lock:
+                rows = self._conn.execute(" ".join(sql), params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"invalid search query {query!r}: {e}") from e
+        return [_row_to_hit(row) for row in rows]
+
+    def optimize(self) -> None:
+        """Merge FTS5 segments; worthwhile after large bulk loads."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO posts_fts(posts_fts) VALUES ('optimize')")
+
+
+def _row_to_hit(row: sqlite3.Row) -> Dict[str, Any]:
+    hit = {key: row[key] for key in META_FIELDS + TEXT_FIELDS}
+    hit["score"] = row["score"]
+    hit["snippet"] = row["snippet"]
+    return hit
+
+
+def index_records(records: Sequence[RecordLike], path: Optional[str] = None) -> int:
+    """Add ``records`` to the index at ``path`` and return how many were written."""
+    with SearchIndex(path) as index:
+        return index.add_records(records)
+
+
+def search_cli(argv: Optional[Sequence[str]] = None) -> int:
+    """``python -m src.main search`` entry point."""
+    parser = argparse.ArgumentParser(prog="python -m src.main search", description="Search indexed pain points")
+    parser.add_argument("query", help="Words that must all appear (append * for a prefix match)")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of results")
+    parser.add_argument("--subreddit", default=None, help="Only posts from this subreddit")
+    parser.add_argument("--category", default=None, help="Only posts in this category")
+    parser.add_argument("--raw", action="store_true", help="Treat the query as FTS5 syntax (OR, NEAR, column:term)")
+    parser.add_argument("--index", default=None, help=f"Index path (default: ${PATH_ENV} or {DEFAULT_PATH})")
+    args = parser.parse_args(argv)
+
+    path = args.index or index_path()
+    if not os.path.exists(path):
+        print(f"No search index at {path}; run the pipeline first.")
+        return 1
+    with SearchIndex(path) as index:
+        try:
+            hits = index.search(args.query, limit=args.limit, subreddit=args.subreddit, category=args.category, raw=args.raw)
+        except ValueError as e:
+            print(e)
+            return 2
+    for hit in hits:
+        print(f"{hit['score']:6.2f}  r/{hit['subreddit']}  [{hit['category']}]  {hit['post_title']}")
+        print(f"        {hit['snippet']}")
+        print(f"        {hit['post_url']}")
+    print(f"{len(hits)} result(s)")
+    return 0
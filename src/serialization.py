@@ -0,0 +1,40 @@
+"""Fast JSON serialization of pipeline records at the API boundary.
+
+Building a pydantic model per output record and then re-validating the
+response costs more than the analysis itself on large batches. The helpers
+here project records straight onto a fixed field list (the public response
+schema) and encode them with ``orjson`` when it is installed, falling back to
+the standard library ``json`` module otherwise.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Mapping
+
+from src.records import PainPointRecord, RecordLike, to_plain_dict
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def project_record(rec: RecordLike, fields: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return a dict with exactly ``fields`` (name -> default) taken from ``rec``.
+
+    Template-backed solution fields are resolved; keys outside ``fields`` are
+    dropped, matching what a pydantic response model would emit.
+    """
+    # Compact records resolve template fields in get(); no intermediate dict
+    plain = rec if isinstance(rec, PainPointRecord) else to_plain_dict(rec)
+    return {name: plain.get(name, default) for name, default in fields.items()}
+
+
+def project_records(records: Iterable[RecordLike], fields: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Project every record onto ``fields`` (see :func:`project_record`)."""
+    return [project_record(r, fields) for r in records]
@@ -3,27 +3,43 @@
 This module accepts the `GOOGLE_SERVICE_ACCOUNT_JSON` env var which may contain
 either the raw JSON content or a base64-encoded JSON. It writes the JSON to a
 temporary file and uses `gspread` + `google.oauth2.service_account` to authorize
-and push a pandas DataFrame as a sheet.
+and push the records as a sheet.
+
+Small exports go out in one `update` call. Exports larger than `CHUNK_ROWS`
+use `push_to_sheets_chunked`. It streams rows in fixed-size batches with a
+bounded number of requests in flight. It starts a new worksheet ("Sheet1 (2)",
+...) when one reaches `MAX_ROWS_PER_SHEET`. Only the batch being sent is
+converted to strings.
 """
 import os
 import json
 import base64
+import itertools
 import tempfile
-from typing import List, Dict, Optional
-import pandas as pd
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.lazy import lazy_import
+from src.records import RecordLike, records_to_dicts
 
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-except Exception:
-    gspread = None
-    Credentials = None
+# Optional: None when the Sheets client libraries are not installed
+gspread = lazy_import("gspread", optional=True)
+Credentials = lazy_import("google.oauth2.service_account", "Credentials", optional=True)
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive.file",
 ]
 
+# Rows per update request; keeps each request well under the API payload limit
+CHUNK_ROWS = 5000
+# Update requests in flight at once (the API allows ~60 writes/minute/user)
+MAX_IN_FLIGHT = 2
+# Rows per worksheet (header included) before rotating to a new one
+MAX_ROWS_PER_SHEET = 100_000
+
 
 def _decode_sa_json(env_value: str) -> str:
     env_value = env_value.strip()
@@ -49,7 +65,35 @@ def push_to_sheets(
 
     Accepts optional injected `gspread_client` and `credentials_factory` for testability.
     When omitted, uses real libraries and environment configuration.
+    More than `CHUNK_ROWS` records are sent with `push_to_sheets_chunked`.
     """
+    if len(records) > CHUNK_ROWS:
+        return push_to_sheets_chunked(
+            records, spreadsheet_name=spreadsheet_name, worksheet_name=worksheet_name,
+            gspread_client=gspread_client, credentials_factory=credentials_factory,
+        )
+    gspread_client = _authorize(gspread_client, credentials_factory)
+    rows = records_to_dicts(records)
+    columns = _columns(rows)
+    sh = _open_spreadsheet(gspread_client, spreadsheet_name)
+
+    # Try to open or add worksheet
+    try:
+        try:
+            ws = sh.worksheet(worksheet_name)
+        except Exception:
+            ws = sh.add_worksheet(title=worksheet_name, rows=str(max(100, len(rows) + 10)), cols=str(max(10, len(columns))))
+
+        # Clear and set values
+        ws.clear()
+        ws.update([columns] + _values(rows, columns))
+    except Exception as e:
+        raise RuntimeError(f"Failed to write to Google Sheets: {e}")
+
+    return _url(sh)
+
+
+def _authorize(gspread_client, credentials_factory):
     if gspread_client is None or credentials_factory is None:
         # Validate libs present
         if gspread is None or Credentials is None:
@@ -68,36 +112,175 @@ def push_to_sheets(
 
         creds = Credentials.from_service_account_file(sa_path, scopes=SCOPES)
         gspread_client = gspread.authorize(creds)
-    else:
-        # Use injected credentials/client without touching env or filesystem
-        pass
+    return gspread_client
 
-    df = pd.DataFrame(records)
 
+def _open_spreadsheet(gspread_client, spreadsheet_name: str):
     # Try to open existing spreadsheet or create a new one
-    sh = None
     try:
-        sh = gspread_client.open(spreadsheet_name)
+        return gspread_client.open(spreadsheet_name)
     except Exception:
-        sh = gspread_client.create(spreadsheet_name)
+        return gspread_client.create(spreadsheet_name)
 
-    # Try to open or add worksheet
+
+def _url(sh) -> Optional[str]:
+    # Return spreadsheet URL if available
     try:
+        return sh.url
+    except Exception:
+        return None
+
+
+def _columns(rows: Iterable[Dict[str, Any]]) -> List[str]:
+    """Union of the rows' fields in first-seen order (like a DataFrame)."""
+    return list({name: None for row in rows for name in row})
+
+
+def _cell(value: Any) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value)
+
+
+def _values(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> List[List[str]]:
+    return [[_cell(row.get(c)) for c in columns] for row in rows]
+
+
+def _chunks(records: Iterable[RecordLike], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(records)
+    while True:
+        chunk = records_to_dicts(list(itertools.islice(it, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _sheet_title(worksheet_name: str, n: int) -> str:
+    return worksheet_name if n == 1 else f"{worksheet_name} ({n})"
+
+
+def _prepare_worksheet(sh, title: str, rows: int, cols: int):
+    """Open (cleared and resized) or add the worksheet ``title``."""
+    try:
+        ws = sh.worksheet(title)
+    except Exception:
+        return sh.add_worksheet(title=title, rows=str(rows), cols=str(cols))
+    ws.clear()
+    ws.resize(rows=rows, cols=cols)
+    return ws
+
+
+def _delete_stale_worksheets(sh, worksheet_name: str, keep: int) -> None:
+    """Delete ``"<worksheet_name> (n)"`` worksheets for every ``n > keep``."""
+    prefix = f"{worksheet_name} ("
+    for ws in sh.worksheets():
+        title = ws.title
+        if title.startswith(prefix) and title.endswith(")") and title[len(prefix):-1].isdigit():
+            if int(title[len(prefix):-1]) > keep:
+                sh.del_worksheet(ws)
+
+
+def _update(ws, range_name: str, values: List[List[str]], retries: int, backoff: float, sleep: Callable[[float], Any]) -> None:
+    for attempt in range(retries + 1):
         try:
-            ws = sh.worksheet(worksheet_name)
+            ws.update(values=values, range_name=range_name)
+            return
         except Exception:
-            ws = sh.add_worksheet(title=worksheet_name, rows=str(max(100, len(df) + 10)), cols=str(max(10, len(df.columns))))
+            if attempt == retries:
+                raise
+            sleep(backoff * 2 ** attempt)
 
-        # Clear and set values
-        ws.clear()
-        # Convert df to list of lists with header
-        values = [list(df.columns)] + df.fillna("").astype(str).values.tolist()
-        ws.update(values)
+
+def push_to_sheets_chunked(
+    records: Iterable[RecordLike],
+    spreadsheet_name: str = "Reddit Pain Points",
+    worksheet_name: str = "Sheet1",
+    chunk_rows: int = CHUNK_ROWS,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    max_rows_per_sheet: int = MAX_ROWS_PER_SHEET,
+    retries: int = 3,
+    backoff: float = 2.0,
+    gspread_client=None,
+    credentials_factory=None,
+    sleep: Callable[[float], Any] = time.sleep,
+) -> Optional[str]:
+    """Stream records to Google Sheets in batches of ``chunk_rows`` rows.
+
+    Each batch is converted to strings just before it is sent and written to
+    its own range, with at most ``max_in_flight`` update requests running at
+    once. A failed request is retried ``retries`` times with exponential
+    backoff. Worksheets grow as rows arrive. When one holds
+    ``max_rows_per_sheet`` rows, the export continues on
+    ``"<worksheet_name> (2)"`` and so on, and each worksheet gets the header row.
+
+    The header is the union of all records' fields in first-seen order, as in
+    :meth:`src.partitions.PartitionedDataset.write`. A field that first
+    appears in a later batch (e.g. ``parent_url`` on comments, which follow
+    the submissions) is appended as a new column, and once every batch is
+    written the header row of each worksheet is rewritten with the full set.
+    Rotated worksheets left over from an earlier, larger export
+    (``"<worksheet_name> (n)"`` beyond the last one written) are deleted.
+
+    Returns the spreadsheet URL when available.
+    """
+    if chunk_rows < 1 or max_in_flight < 1 or max_rows_per_sheet < 2:
+        raise ValueError("chunk_rows and max_in_flight must be >= 1 and max_rows_per_sheet >= 2")
+    gspread_client = _authorize(gspread_client, credentials_factory)
+    sh = _open_spreadsheet(gspread_client, spreadsheet_name)
+    chunks = _chunks(records, chunk_rows)
+    columns: List[str] = []
+    cols = 10
+
+    pending: Deque[Any] = deque()
+    # [worksheet, columns in its header row, columns in its grid]
+    sheets: List[List[Any]] = []
+    ws = None
+    next_row = capacity = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+
+            def submit(target, row: int, values: List[List[str]]) -> None:
+                while len(pending) >= max_in_flight:
+                    pending.popleft().result()
+                pending.append(pool.submit(_update, target, f"A{row}", values, retries, backoff, sleep))
+
+            for chunk in chunks:
+                known = set(columns)
+                columns += [c for c in _columns(chunk) if c not in known]
+                if len(columns) > cols:
+                    cols = max(len(columns), cols * 2)
+                    if ws is not None:
+                        ws.resize(cols=cols)
+                        sheets[-1][2] = cols
+                values = _values(chunk, columns)
+                while values:
+                    if ws is None or next_row > max_rows_per_sheet:
+                        capacity = min(max_rows_per_sheet, chunk_rows + 1)
+                        ws = _prepare_worksheet(sh, _sheet_title(worksheet_name, len(sheets) + 1), capacity, cols)
+                        sheets.append([ws, len(columns), cols])
+                        submit(ws, 1, [list(columns)])
+                        next_row = 2
+                    take = values[:max_rows_per_sheet - next_row + 1]
+                    values = values[len(take):]
+                    end = next_row + len(take) - 1
+                    if end > capacity:
+                        # Grow geometrically so large exports resize only a few times
+                        capacity = min(max_rows_per_sheet, max(end, capacity * 2))
+                        ws.resize(rows=capacity)
+                    submit(ws, next_row, take)
+                    next_row = end + 1
+            # Fields first seen after a worksheet was started
+            for target, header_cols, grid_cols in sheets:
+                if header_cols < len(columns):
+                    if grid_cols < len(columns):
+                        target.resize(cols=cols)
+                    submit(target, 1, [columns])
+            while pending:
+                pending.popleft().result()
+        if ws is None:
+            _prepare_worksheet(sh, worksheet_name, 100, cols)
+        _delete_stale_worksheets(sh, worksheet_name, max(1, len(sheets)))
     except Exception as e:
         raise RuntimeError(f"Failed to write to Google Sheets: {e}")
 
-    # Return spreadsheet URL if available
-    try:
-        return sh.url
-    except Exception:
-        return None
+    return _url(sh)
@@ -0,0 +1,202 @@
+"""Memory-mapped columnar snapshot of scored records (Arrow IPC / Feather v2).
+
+The CSV and Excel exports are for people; every reload of them re-parses
+text. The CLI also writes the final records as an uncompressed Arrow IPC
+file (the Feather v2 format). Readers memory-map it: opening a snapshot costs
+the same whatever its size. Column buffers are read straight from the page
+cache, with no parsing or copying. The dashboard, the ``/api/records`` endpoint
+and the report read their rows, counts and top-k from it.
+
+pyarrow is an optional dependency. :func:`available` tells callers whether
+snapshots can be written or read, and they fall back to the CSV otherwise.
+
+Example:
+    >>> write_snapshot(records)                        # output/records.arrow
+    >>> snap = open_snapshot()
+    >>> snap.select(category="Bugs").top(10)           # list of dicts
+    >>> snap.counts("subreddit")
+"""
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.aggregates import AggregateIndex
+from src.lazy import lazy_import
+from src.ranking import top_k_indices
+from src.records import RecordLike, records_to_dicts
+
+pa = lazy_import("pyarrow", optional=True)
+# pyarrow.compute is only bound when pyarrow is installed; checking for the
+# submodule would import pyarrow itself
+pc = lazy_import("pyarrow.compute") if pa is not None else None
+
+PATH_ENV = "SNAPSHOT_PATH"
+DEFAULT_PATH = os.path.join("output", "records.arrow")
+FORMAT = "painpoint-snapshot/1"
+# Rows per record batch; bounds the memory used to build each batch
+BATCH_ROWS = 65536
+
+INT_COLUMNS = (
+    "severity_rating", "post_score", "num_comments", "pain_score", "ph_score", "github_score",
+    "reddit_score", "revenue_potential_score", "estimated_market_size", "estimated_target_audience",
+)
+FLOAT_COLUMNS = ("upvote_ratio",)
+# Columns the aggregate index reads (see AggregateIndex.key_for and METRICS)
+AGGREGATE_COLUMNS = ("subreddit", "category", "date", "pain_score", "revenue_potential_score")
+
+
+def available() -> bool:
+    """True if pyarrow is installed."""
+    return pa is not None
+
+
+def snapshot_path() -> str:
+    """Snapshot location from ``SNAPSHOT_PATH`` (default ``output/records.arrow``)."""
+    return os.environ.get(PATH_ENV) or DEFAULT_PATH
+
+
+def _require() -> None:
+    if pa is None:
+        raise RuntimeError("Arrow snapshots need pyarrow (pip install pyarrow)")
+
+
+def _arrow_type(name: str) -> Any:
+    if name in INT_COLUMNS:
+        return pa.int64()
+    if name in FLOAT_COLUMNS:
+        return pa.float64()
+    return pa.string()
+
+
+def _column(rows: Sequence[Dict[str, Any]], name: str, kind: Any) -> Any:
+    values = [row.get(name) for row in rows]
+    if kind == pa.string():
+        values = [None if v is None else str(v) for v in values]
+    elif kind == pa.int64():
+        values = [int(v) if isinstance(v, (int, float)) and v == v else None for v in values]
+    else:
+        values = [float(v) if isinstance(v, (int, float)) else None for v in values]
+    return pa.array(values, type=kind)
+
+
+def write_snapshot(records: Iterable[RecordLike], path: Optional[str] = None) -> str:
+    """Write ``records`` as an uncompressed Arrow IPC file and return its path.
+
+    Score and count columns are int64, ``upvote_ratio`` is float64 and every
+    other field is a string. Columns follow the first-seen order of fields. The
+    file is written next to ``path`` and renamed into place, so readers never
+    map a half-written snapshot.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    _require()
+    out = path or snapshot_path()
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    rows = records_to_dicts(records)
+    names: Dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    schema = pa.schema(
+        [pa.field(name, _arrow_type(name)) for name in names],
+        metadata={"format": FORMAT, "created_at": str(time.time())},
+    )
+    tmp = f"{out}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for start in range(0, len(rows), BATCH_ROWS):
+                batch = rows[start:start + BATCH_ROWS]
+                arrays = [_column(batch, field.name, field.type) for field in schema]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    os.replace(tmp, out)
+    return out
+
+
+class Snapshot:
+    """Read-only view over a snapshot table.
+
+    Tables opened with :func:`open_snapshot` reference the memory-mapped
+    file. :meth:`select` returns a new view over the matching rows.
+    """
+
+    def __init__(self, table: Any, path: Optional[str] = None):
+        self.table = table
+        self.path = path
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.table.column_names)
+
+    def select(self, **equals: Optional[str]) -> "Snapshot":
+        """Rows whose columns equal the given values (None values are ignored).
+
+        Example:
+            >>> snap.select(category="Bugs", subreddit="SaaS")
+        """
+        mask = None
+        for name, value in equals.items():
+            if value is None:
+                continue
+            if name not in self.table.column_names:
+                return Snapshot(self.table.slice(0, 0), self.path)
+            cond = pc.equal(self.table[name], value)
+            mask = cond if mask is None else pc.and_(mask, cond)
+        if mask is None:
+            return self
+        return Snapshot(self.table.filter(mask), self.path)
+
+    def rows(self, offset: int = 0, limit: Optional[int] = None, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Rows ``offset .. offset + limit`` as dicts; only these rows are materialized."""
+        table = self.table.slice(offset, limit) if limit is not None else self.table.slice(offset)
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        return table.to_pylist()
+
+    def scores(self, key: str = "pain_score") -> Any:
+        """Numeric column as a numpy array, missing values as 0."""
+        return pc.fill_null(self.table[key], 0).to_numpy()
+
+    def top(self, k: int, key: str = "pain_score") -> List[Dict[str, Any]]:
+        """The ``k`` best rows by ``key``, ties in file order (see :mod:`src.ranking`)."""
+        if k <= 0 or not len(self) or key not in self.table.column_names:
+            return []
+        idx = top_k_indices(self.scores(key), k)
+        return self.table.take(pa.array(idx, type=pa.int64())).to_pylist()
+
+    def counts(self, column: str) -> Dict[str, int]:
+        """Row counts per value of ``column``, most frequent first."""
+        if column not in self.table.column_names:
+            return {}
+        pairs = pc.value_counts(self.table[column]).to_pylist()
+        counts = {p["values"]: p["counts"] for p in pairs}
+        return dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+
+    def mean(self, column: str) -> Optional[float]:
+        """Mean of a numeric column, or None if it has no values."""
+        if column not in self.table.column_names:
+            return None
+        return pc.mean(self.table[column]).as_py()
+
+    def aggregate_index(self) -> AggregateIndex:
+        """Build the :class:`~src.aggregates.AggregateIndex` from the needed columns only."""
+        return AggregateIndex.from_records(self.rows(columns=AGGREGATE_COLUMNS))
+
+
+def open_snapshot(path: Optional[str] = None) -> Snapshot:
+    """Memory-map the snapshot at ``path`` (default :func:`snapshot_path`).
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+        ValueError: If the file is not a snapshot written by this module.
+    """
+    _require()
+    path = path or snapshot_path()
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"format") != FORMAT.encode():
+        raise ValueError(f"{path} is not a records snapshot")
+    return Snapshot(table, path)
@@ -1,5 +1,5 @@
 """AI-powered solution generator based on pain-point data."""
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 SOLUTION_TEMPLATES = {
     "pricing": {
@@ -44,17 +44,60 @@ SOLUTION_TEMPLATES = {
     }
 }
 
+# Record fields derived from a template, mapped to the template key they come from.
+SOLUTION_FIELDS = {
+    "suggested_product_idea": "idea",
+    "suggested_features": "features",
+    "suggested_mvp": "mvp",
+    "suggested_pricing_model": "pricing_model",
+    "suggested_target_users": "target_users",
+    "suggested_marketing_angle": "marketing",
+}
+
+
+def _resolve_template(template: Dict) -> Dict[str, str]:
+    resolved = {}
+    for field, key in SOLUTION_FIELDS.items():
+        value = template[key]
+        resolved[field] = ", ".join(value) if key == "features" else value
+    return resolved
+
+
+# Fully expanded suggested_* fields per template, computed once at import time.
+RESOLVED_SOLUTIONS = {key: _resolve_template(t) for key, t in SOLUTION_TEMPLATES.items()}
+
+# Lower-cased lookup so 'Pricing' (from _infer_category) and 'pricing' both
+# resolve to the same template instead of falling back to 'Other'.
+_TEMPLATE_KEYS = {key.lower(): key for key in SOLUTION_TEMPLATES}
+
+
+def solution_key_for(category: Optional[str]) -> str:
+    """Return the SOLUTION_TEMPLATES key for a category (case-insensitive).
+
+    Unknown or empty categories map to 'Other'.
+    """
+    if not category:
+        return "Other"
+    return _TEMPLATE_KEYS.get(category.lower(), "Other")
+
+
+def resolve_solution(solution_key: Optional[str]) -> Dict[str, str]:
+    """Return the precomputed suggested_* fields for a template key.
+
+    The returned dict is shared; callers must copy it before mutating.
+    """
+    return RESOLVED_SOLUTIONS.get(solution_key, RESOLVED_SOLUTIONS["Other"])
+
+
 def generate_solutions(records: List[Dict]) -> List[Dict]:
-    """Generate product ideas and solutions for top pain-points."""
+    """Attach a solution template reference to each pain-point record.
+
+    Only a ``solution_key`` is stored per record; the ``suggested_*`` fields
+    are resolved lazily from :data:`RESOLVED_SOLUTIONS` when the record is
+    serialized (see :func:`src.records.records_to_dicts`), so a large run
+    does not carry one copy of every template string per record.
+    """
     for rec in records:
-        category = rec.get("category", "Other")
-        template = SOLUTION_TEMPLATES.get(category, SOLUTION_TEMPLATES["Other"])
-        
-        rec["suggested_product_idea"] = template["idea"]
-        rec["suggested_features"] = ", ".join(template["features"])
-        rec["suggested_mvp"] = template["mvp"]
-        rec["suggested_pricing_model"] = template["pricing_model"]
-        rec["suggested_target_users"] = template["target_users"]
-        rec["suggested_marketing_angle"] = template["marketing"]
-    
+        rec["solution_key"] = solution_key_for(rec.get("category", "Other"))
+
     return records
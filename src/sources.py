@@ -0,0 +1,360 @@
+"""Pluggable source connectors run on one shared async fetch executor.
+
+A :class:`SourceConnector` only knows how to fetch one page of its source
+for a cursor and how to normalize the source's items to the raw item
+schema (see :func:`src.analyze.transform_to_schema`). Connectors never
+loop, sleep or retry themselves; :class:`FetchExecutor` drives every
+connector of a crawl concurrently on one event loop and applies:
+
+- per-source rate limits: one :class:`~src.rate_limit.TokenBucketLimiter`
+  per source (``rate``/``burst`` on the connector), all on one bucket store;
+- a global cap on requests in flight across all sources;
+- unified retries with exponential backoff and jitter
+  (:func:`~src.browseai_async.backoff_delays`); connectors call the shared
+  HTTP client with ``retries=0`` so a page is not retried at both layers;
+- per-source :class:`SourceMetrics` (requests, pages, items, retries,
+  errors, time spent throttled).
+
+Fetches that are not pages of a connector (e.g. the comment threads of
+:class:`~src.scrape_reddit.CommentFetcher`, pulled from worker threads while
+the transform consumes them) go through :meth:`FetchExecutor.call`, which
+applies the same per-source bucket and concurrency cap.
+
+A failing source is recorded in its metrics and does not stop the others;
+replay misses (:class:`~src.replay.ReplayMissError`) always propagate so
+replayed runs stay deterministic.
+
+Example:
+    >>> executor = FetchExecutor(max_concurrency=8)
+    >>> results = executor.run([PushshiftSource(["SaaS", "startups"]), BrowseAISource.from_env()])
+    >>> items = list(results["pushshift"])
+    >>> executor.metrics["pushshift"].requests
+    2
+"""
+import asyncio
+import inspect
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.browseai_async import backoff_delays, run_browseai_job_async
+from src.browseai_runner import validate_environment
+from src.rate_limit import BucketStore, InMemoryBucketStore, TokenBucketLimiter
+from src.replay import ReplayMissError
+from src.scrape_reddit import _fetch_submissions, filter_keywords, normalize_submission
+from src.stream_ingest import export_url_from, fetch_export_items
+
+Sleep = Callable[[float], Awaitable[Any]]
+
+
+@dataclass
+class Page:
+    """One fetched page: raw source items plus the cursor of the next page."""
+
+    items: Iterable[Dict]
+    next_cursor: Any = None
+
+
+@dataclass
+class SourceMetrics:
+    """Counters for one source over a crawl."""
+
+    requests: int = 0
+    pages: int = 0
+    items: int = 0
+    retries: int = 0
+    errors: List[str] = field(default_factory=list)
+    throttled_s: float = 0.0
+    elapsed_s: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SourceConnector:
+    """Interface for a crawlable source.
+
+    Subclasses set ``name`` and implement :meth:`fetch_page`, either as a
+    coroutine or as a blocking function (run in a worker thread).
+
+    Attributes:
+        name: Unique source name; the key of crawl results and metrics.
+        rate: Sustained requests per second allowed for this source.
+        burst: Token-bucket capacity; defaults to ``max(1, rate)``.
+        max_retries: Overrides the executor's retry count when not None
+            (e.g. 0 for requests that must not be repeated).
+        max_pages: Page cap per start cursor; None follows cursors to the end.
+    """
+
+    name = "base"
+    rate: float = 1.0
+    burst: Optional[float] = None
+    max_retries: Optional[int] = None
+    max_pages: Optional[int] = None
+
+    def start_cursors(self) -> Sequence[Any]:
+        """Cursors of the independent page streams to crawl (one stream by default)."""
+        return [None]
+
+    def fetch_page(self, cursor: Any) -> Any:
+        """Fetch the page at ``cursor``; returns a :class:`Page` (or awaitable of one)."""
+        raise NotImplementedError
+
+    def normalize(self, item: Dict) -> Optional[Dict]:
+        """Map a source item to the raw item schema; None drops the item."""
+        return item
+
+
+class PushshiftSource(SourceConnector):
+    """Recent submissions of each subreddit from Pushshift.
+
+    Each subreddit is an independent one-page stream, so subreddits are
+    fetched concurrently within the source's rate limit.
+    """
+
+    name = "pushshift"
+
+    def __init__(
+        self,
+        subreddits: Sequence[str],
+        keywords: Optional[List[str]] = None,
+        limit_per_sub: int = 25,
+        rate: float = 2.0,
+        burst: float = 4.0,
+    ):
+        self.subreddits = list(subreddits)
+        self.keywords = keywords
+        self.limit_per_sub = limit_per_sub
+        self.rate = rate
+        self.burst = burst
+
+    def start_cursors(self) -> Sequence[Any]:
+        return self.subreddits
+
+    def fetch_page(self, cursor: str) -> Page:
+        # The executor retries failed pages; the HTTP client must not as well
+        return Page(_fetch_submissions(cursor, size=self.limit_per_sub, retries=0))
+
+    def normalize(self, item: Dict) -> Optional[Dict]:
+        rec = normalize_submission(item)
+        return rec if filter_keywords([rec], self.keywords) else None
+
+
+class BrowseAISource(SourceConnector):
+    """Items of one Browse.ai robot run.
+
+    Large runs that return an export URL are downloaded to disk and their
+    items are streamed from the file (see :mod:`src.stream_ingest`). Both
+    the run and the export go through the replay layer. A failed run is not
+    retried automatically, as each run is billed.
+    """
+
+    name = "browseai"
+    max_retries = 0
+
+    def __init__(
+        self,
+        run_url: str,
+        api_key: str,
+        payload: Optional[Dict] = None,
+        timeout: float = 300,
+        export_dir: str = os.path.join("output", "exports"),
+        rate: float = 1.0,
+    ):
+        self.run_url = run_url
+        self.api_key = api_key
+        self.payload = payload
+        self.timeout = timeout
+        self.export_dir = export_dir
+        self.rate = rate
+
+    @classmethod
+    def from_env(cls, payload: Optional[Dict] = None, **kwargs: Any) -> "BrowseAISource":
+        """Connector for ``BROWSEAI_RUN_URL``/``BROWSEAI_API_KEY``.
+
+        Raises:
+            EnvironmentError: If either variable is missing or empty.
+        """
+        validate_environment()
+        return cls(os.environ["BROWSEAI_RUN_URL"], os.environ["BROWSEAI_API_KEY"], payload, **kwargs)
+
+    @staticmethod
+    def configured() -> bool:
+        return bool(os.environ.get("BROWSEAI_RUN_URL") and os.environ.get("BROWSEAI_API_KEY"))
+
+    async def fetch_page(self, cursor: Any) -> Page:
+        resp = await run_browseai_job_async(self.run_url, self.api_key, self.payload, self.timeout)
+        export_url = export_url_from(resp)
+        if export_url:
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+            dest = os.path.join(self.export_dir, os.path.basename(export_url.split("?", 1)[0]) or "export.json")
+            return Page(await asyncio.to_thread(fetch_export_items, export_url, dest, headers))
+        return Page(resp.get("data") or resp.get("results") or [])
+
+
+class FetchExecutor:
+    """Run source connectors concurrently under shared limits.
+
+    Args:
+        max_concurrency: Requests in flight at once, across all sources.
+        retries: Retries per page after a failed fetch (connectors may
+            override with ``max_retries``).
+        backoff_initial: First retry delay in seconds.
+        backoff_max: Maximum retry delay.
+        store: Bucket store shared by the per-source rate limiters.
+        clock: Monotonic clock for the rate limiters and metrics.
+        sleep: Coroutine used to wait (injectable for tests).
+        rng: Random generator for backoff jitter.
+        blocking_sleep: Function used to wait in :meth:`call`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        retries: int = 2,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 10.0,
+        store: Optional[BucketStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Sleep] = None,
+        rng: Optional[random.Random] = None,
+        blocking_sleep: Callable[[float], Any] = time.sleep,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.store = store if store is not None else InMemoryBucketStore()
+        self.clock = clock
+        self._sleep = sleep or asyncio.sleep
+        self._rng = rng
+        self._blocking_sleep = blocking_sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, TokenBucketLimiter] = {}
+        self.metrics: Dict[str, SourceMetrics] = {}
+
+    def _limiter(self, connector: SourceConnector) -> TokenBucketLimiter:
+        limiter = self._limiters.get(connector.name)
+        if limiter is None:
+            limiter = TokenBucketLimiter(connector.rate, connector.burst, store=self.store, clock=self.clock)
+            self._limiters[connector.name] = limiter
+        return limiter
+
+    async def _throttle(self, connector: SourceConnector, metrics: SourceMetrics) -> None:
+        limiter = self._limiter(connector)
+        while True:
+            allowed, wait = limiter.take(connector.name)
+            if allowed:
+                return
+            metrics.throttled_s += wait
+            await self._sleep(wait)
+
+    def call(self, connector: SourceConnector, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking request of ``connector`` under the executor's limits.
+
+        Thread-safe. Waits for a token of the connector's bucket (shared with
+        its pages), then for one of ``max_concurrency`` slots, and counts
+        the request in the connector's metrics. Failures are not retried
+        here; ``fn`` is expected to retry transient errors itself.
+        """
+        with self._lock:
+            metrics = self.metrics.setdefault(connector.name, SourceMetrics())
+            limiter = self._limiter(connector)
+        while True:
+            allowed, wait = limiter.take(connector.name)
+            if allowed:
+                break
+            with self._lock:
+                metrics.throttled_s += wait
+            self._blocking_sleep(wait)
+        with self._slots:
+            with self._lock:
+                metrics.requests += 1
+            return fn(*args, **kwargs)
+
+    async def _fetch(self, connector: SourceConnector, cursor: Any, metrics: SourceMetrics, sem: asyncio.Semaphore) -> Page:
+        retries = self.retries if connector.max_retries is None else connector.max_retries
+        delays = backoff_delays(self.backoff_initial, 2.0, self.backoff_max, rng=self._rng)
+        attempt = 0
+        while True:
+            await self._throttle(connector, metrics)
+            async with sem:
+                metrics.requests += 1
+                try:
+                    if inspect.iscoroutinefunction(connector.fetch_page):
+                        return await connector.fetch_page(cursor)
+                    return await asyncio.to_thread(connector.fetch_page, cursor)
+                except ReplayMissError:
+                    raise
+                except Exception:
+                    if attempt >= retries:
+                        raise
+            attempt += 1
+            metrics.retries += 1
+            await self._sleep(next(delays))
+
+    async def _stream(self, connector: SourceConnector, cursor: Any, metrics: SourceMetrics, sem: asyncio.Semaphore) -> List[Page]:
+        pages: List[Page] = []
+        while True:
+            try:
+                page = await self._fetch(connector, cursor, metrics, sem)
+            except ReplayMissError:
+                raise
+            except Exception as e:
+                # The stream stops here; pages already fetched are kept
+                metrics.errors.append(f"{cursor!r}: {type(e).__name__}: {e}" if cursor is not None else f"{type(e).__name__}: {e}")
+                return pages
+            pages.append(page)
+            metrics.pages += 1
+            if page.next_cursor is None or (connector.max_pages is not None and len(pages) >= connector.max_pages):
+                return pages
+            cursor = page.next_cursor
+
+    async def _crawl_source(self, connector: SourceConnector, sem: asyncio.Semaphore) -> List[List[Page]]:
+        metrics = self.metrics[connector.name]
+        start = self.clock()
+        try:
+            return await asyncio.gather(*(self._stream(connector, c, metrics, sem) for c in connector.start_cursors()))
+        finally:
+            metrics.elapsed_s = self.clock() - start
+
+    def _items(self, connector: SourceConnector, streams: List[List[Page]]) -> Iterator[Dict]:
+        metrics = self.metrics[connector.name]
+        for pages in streams:
+            for page in pages:
+                for item in page.items:
+                    rec = connector.normalize(item)
+                    if rec is not None:
+                        metrics.items += 1
+                        yield rec
+
+    async def crawl(self, connectors: Sequence[SourceConnector]) -> Dict[str, Iterator[Dict]]:
+        """Fetch every connector concurrently.
+
+        Returns:
+            ``{source name: iterator of normalized items}`` in connector
+            order; each iterator yields its streams in start-cursor order.
+            Items are normalized (and counted in ``metrics``) as they are
+            consumed, so streamed exports are never held in memory.
+
+        Raises:
+            ValueError: If two connectors share a name.
+            ReplayMissError: If a replayed request has no snapshot.
+        """
+        names = [c.name for c in connectors]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate source names: {names}")
+        self.metrics = {name: SourceMetrics() for name in names}
+        sem = asyncio.Semaphore(self.max_concurrency)
+        fetched = await asyncio.gather(*(self._crawl_source(c, sem) for c in connectors))
+        return {c.name: self._items(c, streams) for c, streams in zip(connectors, fetched)}
+
+    def run(self, connectors: Sequence[SourceConnector]) -> Dict[str, Iterator[Dict]]:
+        """Blocking wrapper around :meth:`crawl`."""
+        return asyncio.run(self.crawl(connectors))
@@ -0,0 +1,249 @@
+"""Streaming ingestion of large Browse.ai result exports.
+
+Large captured-list exports can be hundreds of MB. Parsing them with
+``resp.json()`` keeps the whole payload in memory as one dict before the
+transform stage even starts. This module instead downloads exports to disk
+in chunks and parses them incrementally, yielding one item at a time so they
+can be fed straight into :func:`src.analyze.transform_to_schema`.
+
+Supported formats:
+    - NDJSON / JSON Lines (``.ndjson``, ``.jsonl``): one item per line
+    - JSON: a top-level array, or an object whose ``data``/``results`` key
+      (or an explicit key path) holds the array of items
+    - Either of the above gzip-compressed (``.gz`` suffix)
+
+Only the item currently being decoded is held in memory (plus a read buffer);
+sibling values of the target array are decoded and discarded.
+
+Example Usage:
+    >>> from src.stream_ingest import download_export, iter_export_items
+    >>> path = download_export("https://.../export.json", "output/exports/run.json")
+    >>> records = transform_to_schema(iter_export_items(path), compact=True)
+"""
+import gzip
+import itertools
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, TextIO
+
+from src.http_client import http
+from src.replay import replayable
+
+DEFAULT_ITEM_KEYS = ("data", "results")
+# Response keys that may point at a downloadable result export
+EXPORT_URL_KEYS = ("export_url", "exportUrl", "download_url", "downloadUrl")
+_WS = " \t\r\n"
+
+
+def _open_text(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _is_ndjson(path: str) -> bool:
+    base = path[:-3] if path.endswith(".gz") else path
+    return base.endswith((".ndjson", ".jsonl"))
+
+
+class _JSONStream:
+    """Minimal pull parser over a text file using ``JSONDecoder.raw_decode``.
+
+    The buffer only ever holds the unconsumed tail of the file plus whatever
+    is needed to decode the next value.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text before appending to keep the buffer bounded
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON export: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number/literal ending exactly at the buffer edge may be truncated
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Malformed JSON export: unexpected {sep!r} in array")
+
+    def find_array(self, path: Optional[Sequence[str]], keys: Sequence[str]) -> bool:
+        """Advance to the target array. Returns False if it does not exist.
+
+        With ``path=None`` the input may be a top-level array or an object
+        with one of ``keys`` holding an array; otherwise ``path`` is followed
+        key by key and must end at an array.
+        """
+        if path is not None and not path:
+            if self.peek() != "[":
+                raise ValueError("Malformed JSON export: item path does not point at an array")
+            return True
+        if path is None and self.peek() == "[":
+            return True
+        self.expect("{")
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            if path is not None:
+                wanted = key == path[0]
+            else:
+                wanted = key in keys and self.peek() == "["
+            if wanted:
+                return self.find_array(tuple(path[1:]) if path is not None else (), keys)
+            self.value()  # skip sibling value
+            if self.peek() == ",":
+                self.pos += 1
+        return False
+
+
+def iter_export_items(
+    path: str,
+    item_path: Optional[Sequence[str]] = None,
+    keys: Sequence[str] = DEFAULT_ITEM_KEYS,
+    delete: bool = False,
+) -> Iterator[Dict]:
+    """Incrementally yield items from an export file on disk.
+
+    Args:
+        path: Path to a JSON/NDJSON export (optionally ``.gz``).
+        item_path: Explicit key path to the item array, e.g.
+            ``("result", "capturedLists", "Posts")``. Defaults to a top-level
+            array or the first of ``keys`` holding an array.
+        keys: Candidate top-level keys searched when ``item_path`` is None.
+        delete: Remove the file once it has been fully consumed.
+
+    Yields:
+        One item per array element / NDJSON line.
+
+    Raises:
+        ValueError: If the file is not valid JSON of the expected shape.
+    """
+    try:
+        with _open_text(path) as fp:
+            if _is_ndjson(path):
+                for line in fp:
+                    if line.strip():
+                        yield json.loads(line)
+                return
+            stream = _JSONStream(fp)
+            if stream.find_array(item_path, keys):
+                yield from stream.iter_array()
+    finally:
+        if delete and os.path.exists(path):
+            os.remove(path)
+
+
+def download_export(
+    url: str,
+    dest_path: str,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = 1 << 16,
+    timeout: int = 60,
+) -> str:
+    """Stream a result export to disk without buffering it in memory.
+
+    Args:
+        url: Export download URL.
+        dest_path: File to write; parent directories are created.
+        headers: Optional request headers (e.g. Browse.ai auth).
+        chunk_size: Bytes per write.
+        timeout: Socket timeout in seconds.
+
+    Returns:
+        ``dest_path``.
+
+    Raises:
+        requests.HTTPError: If the download fails.
+    """
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    with http.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        with open(dest_path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+    return dest_path
+
+
+@replayable("browseai_export", key_args=("url",), stream=True)
+def fetch_export_items(url: str, dest_path: str, headers: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+    """Download an export and stream its items, through the replay layer.
+
+    With ``SCRAPE_REPLAY_MODE=record`` the items are also saved to a
+    snapshot; with ``replay`` they are read from it and ``url`` is never
+    fetched. The downloaded file is removed once its items are consumed.
+    """
+    return iter_export_items(download_export(url, dest_path, headers), delete=True)
+
+
+def export_url_from(result: Dict[str, Any]) -> Optional[str]:
+    """Return the export download URL from a Browse.ai run result, if any."""
+    for key in EXPORT_URL_KEYS:
+        if result.get(key):
+            return result[key]
+    return None
+
+
+def peek_items(items: Iterable[Dict]) -> Optional[Iterator[Dict]]:
+    """Return an iterator over ``items`` or None if it is empty.
+
+    Consumes at most one element to check for emptiness.
+    """
+    it = iter(items)
+    first = next(it, None)
+    if first is None:
+        return None
+    return itertools.chain([first], it)
@@ -0,0 +1,95 @@
+"""Shared word tokenization for the keyword classifiers.
+
+Classifiers used to test keywords with substring checks (``"app" in
+text``), which also hit inside other words ("happy", "canvas", "needle").
+Text is instead tokenized once into lower-case words; a keyword then
+matches with an O(1) lookup in the word set, and a two-word phrase with a
+lookup in the bigram set.
+
+Tokens are runs of letters/digits, optionally with an apostrophe suffix, so
+"can't" and "don't" stay single tokens (curly apostrophes are folded to
+``'``).
+
+:func:`record_tokens` caches the tokens on a
+:class:`~src.records.PainPointRecord`: ``transform_to_schema`` tokenizes the
+title and body it classifies and stores the result, and the scoring stage
+reuses it instead of scanning the text again. Plain dict records are
+tokenized on demand.
+
+Example:
+    >>> tokens = tokenize_text("Can't export to CSV, looking for a tool")
+    >>> "tool" in tokens.words, "looking for" in tokens.bigrams
+    (True, True)
+"""
+import re
+from typing import FrozenSet, Optional, Tuple
+
+from src.records import PainPointRecord, RecordLike
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+class TextTokens:
+    """Tokens of one text, with the word set and (lazily) the bigram set."""
+
+    __slots__ = ("tokens", "words", "_bigrams", "_joined")
+
+    def __init__(self, tokens: Tuple[str, ...]):
+        self.tokens = tokens
+        self.words: FrozenSet[str] = frozenset(tokens)
+        self._bigrams: Optional[FrozenSet[str]] = None
+        self._joined: Optional[str] = None
+
+    @property
+    def bigrams(self) -> FrozenSet[str]:
+        """Adjacent token pairs joined by a space (``"looking for"``)."""
+        if self._bigrams is None:
+            tokens = self.tokens
+            self._bigrams = frozenset(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return self._bigrams
+
+    @property
+    def joined(self) -> str:
+        """Tokens joined by single spaces and padded, for longer phrase checks."""
+        if self._joined is None:
+            self._joined = " " + " ".join(self.tokens) + " "
+        return self._joined
+
+    def has_phrase(self, words: Tuple[str, ...]) -> bool:
+        """True if ``words`` occur as consecutive tokens."""
+        if len(words) == 1:
+            return words[0] in self.words
+        if f"{words[0]} {words[1]}" not in self.bigrams:
+            return False
+        return len(words) == 2 or f" {' '.join(words)} " in self.joined
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+def split_words(text: Optional[str]) -> Tuple[str, ...]:
+    """Lower-case word tokens of ``text`` in order."""
+    if not text:
+        return ()
+    return tuple(_TOKEN_RE.findall(text.lower().replace("’", "'")))
+
+
+def tokenize_text(text: Optional[str]) -> TextTokens:
+    return TextTokens(split_words(text))
+
+
+def record_tokens(rec: RecordLike) -> TextTokens:
+    """Tokens of a record's text, cached on compact records.
+
+    Uses the tokens stored by ``transform_to_schema`` when present, and
+    otherwise tokenizes ``pain_summary`` and ``comment_or_content``.
+    """
+    if isinstance(rec, PainPointRecord):
+        if rec.tokens is None:
+            rec.tokens = tokenize_text(_record_text(rec))
+        return rec.tokens
+    return tokenize_text(_record_text(rec))
+
+
+def _record_text(rec: RecordLike) -> str:
+    return f"{rec.get('pain_summary') or ''} {rec.get('comment_or_content') or ''}"
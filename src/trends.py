@@ -0,0 +1,281 @@
+"""Incremental trend detection over stored records.
+
+Records are bucketed by day (or week) per key, ``(category, subreddit)`` by
+default. For each key the engine keeps:
+
+- bucket counts for a bounded retention window, from which rolling counts
+  of the most recent window and the one before it give a growth rate;
+- an exponentially decayed activity score with a configurable half-life,
+  so a burst of recent posts outweighs a steady trickle of old ones.
+
+State is small (one counter per key and bucket) and persisted as JSON, so
+every crawl only folds in its new records; posts already seen (by
+``post_url``) are ignored, because consecutive crawls overlap.
+
+Example:
+    >>> engine = TrendEngine.load_or_new("output/trends.json")
+    >>> engine.update(records)
+    >>> engine.rising(limit=5)
+    >>> engine.save("output/trends.json")
+"""
+import json
+import os
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.records import RecordLike
+
+PATH_ENV = "TRENDS_STATE_PATH"
+DEFAULT_PATH = os.path.join("output", "trends.json")
+DEFAULT_KEY_FIELDS = ("category", "subreddit")
+
+TrendKey = Tuple[str, ...]
+
+
+def trends_path() -> str:
+    """State location from ``TRENDS_STATE_PATH`` (default ``output/trends.json``)."""
+    return os.environ.get(PATH_ENV) or DEFAULT_PATH
+
+
+def parse_day(value: Any) -> Optional[int]:
+    """Return the proleptic ordinal of an ISO date/timestamp, or None."""
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return None
+    return None
+
+
+class _KeyState:
+    __slots__ = ("buckets", "score", "score_day")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.score = 0.0
+        self.score_day: Optional[int] = None
+
+
+class TrendEngine:
+    """Rolling counts, growth rates and decayed scores per key.
+
+    Args:
+        bucket_days: Bucket width in days (1 = daily, 7 = ISO weeks).
+        window_buckets: Buckets per rolling window; growth compares the
+            latest window with the one before it.
+        half_life_days: Half-life of the decayed activity score.
+        retention_buckets: Buckets kept per key; older ones are dropped.
+        key_fields: Record fields that identify a trend series.
+    """
+
+    def __init__(
+        self,
+        bucket_days: int = 1,
+        window_buckets: int = 7,
+        half_life_days: float = 7.0,
+        retention_buckets: int = 90,
+        key_fields: Sequence[str] = DEFAULT_KEY_FIELDS,
+    ):
+        if bucket_days < 1 or window_buckets < 1 or half_life_days <= 0:
+            raise ValueError("bucket_days, window_buckets and half_life_days must be positive")
+        if retention_buckets < 2 * window_buckets:
+            raise ValueError("retention_buckets must cover two windows")
+        self.bucket_days = bucket_days
+        self.window_buckets = window_buckets
+        self.half_life_days = half_life_days
+        self.retention_buckets = retention_buckets
+        self.key_fields = tuple(key_fields)
+        self.keys: Dict[TrendKey, _KeyState] = {}
+        # post_url -> day, pruned with the buckets so it stays bounded
+        self.seen: Dict[str, int] = {}
+        self.latest_day: Optional[int] = None
+
+    # -- ingestion ---------------------------------------------------------
+
+    def _bucket(self, day: int) -> int:
+        if self.bucket_days == 7:
+            # Align weekly buckets to ISO weeks (Monday start)
+            return day - date.fromordinal(day).weekday()
+        return day - day % self.bucket_days
+
+    def _decay(self, days: float) -> float:
+        return 0.5 ** (days / self.half_life_days)
+
+    def add(self, rec: RecordLike) -> bool:
+        """Fold one record in; returns False if it was a duplicate or undated."""
+        url = rec.get("post_url")
+        if url and url in self.seen:
+            return False
+        day = parse_day(rec.get("date"))
+        if day is None:
+            return False
+        if url:
+            self.seen[url] = day
+        key = tuple(str(rec.get(f) or "unknown") for f in self.key_fields)
+        state = self.keys.get(key)
+        if state is None:
+            state = self.keys[key] = _KeyState()
+        bucket = self._bucket(day)
+        state.buckets[bucket] = state.buckets.get(bucket, 0) + 1
+        # Decayed score is kept relative to the newest day seen for the key
+        if state.score_day is None or day >= state.score_day:
+            base = 0.0 if state.score_day is None else state.score * self._decay(day - state.score_day)
+            state.score, state.score_day = base + 1.0, day
+        else:
+            state.score += self._decay(state.score_day - day)
+        if self.latest_day is None or day > self.latest_day:
+            self.latest_day = day
+        return True
+
+    def update(self, records: Iterable[RecordLike]) -> int:
+        """Fold in a crawl's records, prune old buckets; returns records added."""
+        added = sum(1 for rec in records if self.add(rec))
+        self.prune()
+        return added
+
+    def prune(self) -> None:
+        """Drop buckets older than the retention window."""
+        if self.latest_day is None:
+            return
+        cutoff = self._bucket(self.latest_day) - self.retention_buckets * self.bucket_days
+        for key in list(self.keys):
+            state = self.keys[key]
+            for bucket in [b for b in state.buckets if b <= cutoff]:
+                del state.buckets[bucket]
+            if not state.buckets:
+                del self.keys[key]
+        self.seen = {url: day for url, day in self.seen.items() if self._bucket(day) > cutoff}
+
+    # -- queries -----------------------------------------------------------
+
+    def series(self, key: TrendKey, now: Optional[int] = None, buckets: Optional[int] = None) -> List[int]:
+        """Counts for the last ``buckets`` buckets ending at ``now``, oldest first."""
+        now = self.latest_day if now is None else now
+        n = buckets or 2 * self.window_buckets
+        state = self.keys.get(tuple(key))
+        if state is None or now is None:
+            return [0] * n
+        end = self._bucket(now)
+        return [state.buckets.get(end - i * self.bucket_days, 0) for i in range(n - 1, -1, -1)]
+
+    def stats(self, key: TrendKey, now: Optional[int] = None) -> Dict[str, Any]:
+        """Rolling counts, growth and decayed score for one key as of ``now``."""
+        now = self.latest_day if now is None else now
+        series = self.series(key, now)
+        prior, recent = sum(series[: self.window_buckets]), sum(series[self.window_buckets:])
+        state = self.keys.get(tuple(key))
+        score = 0.0
+        if state is not None and now is not None:
+            score = state.score * self._decay(max(now - state.score_day, 0))
+        out = dict(zip(self.key_fields, key))
+        out.update({
+            "recent_count": recent,
+            "prior_count": prior,
+            # Relative growth; an empty prior window counts as 1, so a new
+            # series grows by its recent count
+            "growth": (recent - prior) / max(prior, 1),
+            "decayed_score": round(score, 4),
+            "series": series,
+        })
+        return out
+
+    def rising(self, limit: int = 10, min_recent: int = 2, now: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Keys whose activity is accelerating, fastest-growing first.
+
+        Args:
+            limit: Maximum number of keys returned.
+            min_recent: Ignore keys with fewer posts in the latest window.
+            now: Reference day (date, ISO string or ordinal); defaults to the
+                newest day seen, i.e. "as of the latest crawl".
+        """
+        ref = self._ref_day(now)
+        rows = []
+        for key in self.keys:
+            row = self.stats(key, ref)
+            if row["recent_count"] >= min_recent and row["growth"] > 0:
+                rows.append(row)
+        rows.sort(key=lambda r: (r["growth"], r["decayed_score"]), reverse=True)
+        return rows[:limit]
+
+    def _ref_day(self, now: Any) -> Optional[int]:
+        if now is None:
+            return self.latest_day
+        if isinstance(now, date):
+            return now.toordinal()
+        if isinstance(now, str):
+            day = parse_day(now)
+            if day is None:
+                raise ValueError(f"invalid date {now!r}")
+            return day
+        return int(now)
+
+    # -- persistence -------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": {
+                "bucket_days": self.bucket_days,
+                "window_buckets": self.window_buckets,
+                "half_life_days": self.half_life_days,
+                "retention_buckets": self.retention_buckets,
+                "key_fields": list(self.key_fields),
+            },
+            "latest_day": self.latest_day,
+            "seen": self.seen,
+            "keys": [
+                {
+                    "key": list(k),
+                    "buckets": {str(b): n for b, n in sorted(s.buckets.items())},
+                    "score": s.score,
+                    "score_day": s.score_day,
+                }
+                for k, s in self.keys.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrendEngine":
+        engine = cls(**data["config"])
+        engine.latest_day = data.get("latest_day")
+        engine.seen = dict(data.get("seen", {}))
+        for item in data.get("keys", []):
+            state = _KeyState()
+            state.buckets = {int(b): n for b, n in item["buckets"].items()}
+            state.score, state.score_day = item["score"], item["score_day"]
+            engine.keys[tuple(item["key"])] = state
+        return engine
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Write state as JSON (atomically) and return the path."""
+        path = path or trends_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "TrendEngine":
+        with open(path or trends_path(), "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def load_or_new(cls, path: Optional[str] = None, **kwargs: Any) -> "TrendEngine":
+        """Load saved state, or start a new engine if none exists yet."""
+        path = path or trends_path()
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(**kwargs)
+
+
+def day_to_iso(day: int) -> str:
+    return date.fromordinal(day).isoformat()
+
+
+def update_trends(records: Iterable[RecordLike], path: Optional[str] = None) -> Tuple[TrendEngine, int]:
+    """Fold a crawl into the persisted trend state; returns (engine, added)."""
+    engine = TrendEngine.load_or_new(path)
+    added = engine.update(records)
+    engine.save(path)
+    return engine, added
@@ -0,0 +1,105 @@
+"""Tests for the incremental aggregate index in src/aggregates.py."""
+import math
+import random
+import statistics
+
+import pytest
+
+from src.aggregates import AggregateIndex, GroupStats, summarize_threads, write_aggregates
+from src.records import PainPointRecord
+
+
+def _rec(sub="SaaS", cat="Pricing", date="2025-01-02T10:00:00Z", pain=50, revenue=40):
+    return {"subreddit": sub, "category": cat, "date": date, "pain_score": pain, "revenue_potential_score": revenue}
+
+
+def _nearest_rank(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * q / 100)) - 1]
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(7)
+    subs, cats = ["SaaS", "startups"], ["Pricing", "Bugs", "UX"]
+    return [
+        _rec(rng.choice(subs), rng.choice(cats), f"2025-01-0{rng.randint(1, 3)}T00:00:00Z", rng.randint(0, 100), rng.randint(0, 100))
+        for _ in range(500)
+    ]
+
+
+class TestAggregateIndex:
+    """Tests for grouping, rollups and persistence."""
+
+    def test_groups_by_subreddit_category_day(self):
+        index = AggregateIndex.from_records([_rec(), _rec(pain=70), _rec(cat="Bugs"), _rec(date=None)])
+        assert len(index) == 3
+        assert index.groups[("SaaS", "Pricing", "2025-01-02")].count == 2
+        assert ("SaaS", "Pricing", "unknown") in index.groups
+
+    def test_rollups_match_direct_computation(self, records):
+        index = AggregateIndex.from_records(records)
+        by_cat = index.rollup("category")
+        for cat, stats in by_cat.items():
+            pains = [r["pain_score"] for r in records if r["category"] == cat]
+            assert stats["count"] == len(pains)
+            assert stats["pain_mean"] == pytest.approx(statistics.mean(pains))
+            assert stats["pain_p50"] == _nearest_rank(pains, 50)
+            assert stats["pain_p90"] == _nearest_rank(pains, 90)
+        pair = index.rollup(["subreddit", "category"])[("SaaS", "Bugs")]
+        assert pair["count"] == sum(1 for r in records if r["subreddit"] == "SaaS" and r["category"] == "Bugs")
+        assert index.totals().count == len(records)
+        assert index.rollup()[()]["revenue_sum"] == sum(r["revenue_potential_score"] for r in records)
+
+    def test_counts_ordered_by_frequency(self):
+        index = AggregateIndex.from_records([_rec(cat="A"), _rec(cat="B"), _rec(cat="B")])
+        assert list(index.counts("category").items()) == [("B", 2), ("A", 1)]
+
+    def test_incremental_and_merge_agree(self, records):
+        whole = AggregateIndex.from_records(records)
+        left = AggregateIndex.from_records(records[:200])
+        right = AggregateIndex.from_records(records[200:])
+        left.merge(right)
+        assert left.rollup("day") == whole.rollup("day")
+        left.merge(AggregateIndex.from_records([_rec(sub="new")]))
+        assert left.counts("subreddit")["new"] == 1
+
+    def test_unknown_dimension(self):
+        with pytest.raises(ValueError):
+            AggregateIndex().rollup("author")
+
+    def test_missing_and_invalid_scores_count_as_zero(self):
+        index = AggregateIndex.from_records([{"category": "X"}, _rec(pain=float("nan"), revenue="high")])
+        totals = index.totals()
+        assert totals.count == 2 and totals.sums == {"pain": 0, "revenue": 0}
+        assert index.counts("subreddit") == {"unknown": 1, "SaaS": 1}
+
+    def test_accepts_compact_records(self):
+        rec = PainPointRecord(subreddit="SaaS", category="Bugs", pain_score=90, revenue_potential_score=10)
+        assert AggregateIndex.from_records([rec]).rollup("category")["Bugs"]["pain_p90"] == 90
+
+    def test_save_and_load_roundtrip(self, records, tmp_path):
+        path = write_aggregates(records, output_dir=str(tmp_path))
+        loaded = AggregateIndex.load(path)
+        assert loaded.rollup(["subreddit", "day"]) == AggregateIndex.from_records(records).rollup(["subreddit", "day"])
+
+
+def test_empty_group_stats():
+    stats = GroupStats()
+    assert stats.mean("pain") == 0
+    assert stats.percentile("pain", 50) is None
+
+
+def test_summarize_threads_groups_comments_by_parent():
+    parent = "https://reddit.com/r/SaaS/comments/abc/"
+    records = [
+        dict(_rec(cat="Bugs", pain=80), parent_url=parent, post_title="Thread"),
+        dict(_rec(cat="Pricing", pain=40), parent_url=parent, post_title="Thread"),
+        dict(_rec(cat="Bugs", pain=60), parent_url=parent, post_title="Thread"),
+        _rec(pain=100),  # submission, not part of any thread
+    ]
+    threads = summarize_threads(records)
+    assert list(threads) == [parent]
+    thread = threads[parent]
+    assert thread["count"] == 3 and thread["pain_mean"] == 60
+    assert thread["top_category"] == "Bugs" and thread["post_title"] == "Thread"
@@ -212,3 +212,28 @@ class TestTransformToSchema:
         assert len(result) == 1
         assert result[0]["post_title"] == "Test title"
         assert result[0]["comment_or_content"] is None
+
+    def test_engagement_fields_carried_when_present(self):
+        """Test that Reddit engagement is kept for scoring, in both record forms."""
+        item = dict(FIXTURE_ITEMS[0], score=120, num_comments=45, upvote_ratio=0.93)
+        for compact in (False, True):
+            rec = transform_to_schema([item, FIXTURE_ITEMS[1]], compact=compact)
+            assert (rec[0]["post_score"], rec[0]["num_comments"], rec[0]["upvote_ratio"]) == (120, 45, 0.93)
+            assert "post_score" not in rec[1]
+
+    def test_comment_items_link_to_parent(self):
+        """Test that comment items keep their parent URL and take its title."""
+        comment = {
+            "title": "",
+            "selftext": "This keeps crashing on export",
+            "subreddit": "SaaS",
+            "full_link": "https://reddit.com/r/SaaS/comments/abc/t/c1/",
+            "parent_url": "https://reddit.com/r/SaaS/comments/abc/t/",
+            "parent_title": "Which CRM do you use?",
+        }
+        for compact in (False, True):
+            rec = transform_to_schema([comment, FIXTURE_ITEMS[0]], compact=compact)
+            assert rec[0]["parent_url"] == comment["parent_url"]
+            assert rec[0]["post_title"] == "Which CRM do you use?"
+            assert rec[0]["category"] == "Bugs"
+            assert "parent_url" not in rec[1]
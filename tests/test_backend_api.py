@@ -0,0 +1,238 @@
+"""Tests for the FastAPI backend in backend/main.py."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import ANALYZE_MAX_ITEMS, app
+from src.rate_limit import ConcurrencyLimiter, TokenBucketLimiter
+from tests.test_analyze import FIXTURE_ITEMS
+
+
+@pytest.fixture
+def client():
+    # Fresh rate-limit budget per test so the suite never trips the shared limiter
+    limiter = TokenBucketLimiter(rate=1.0, capacity=100)
+    with patch("src.competitor_detector.http.get", side_effect=Exception("offline")), \
+         patch("backend.main.rate_limiter", limiter):
+        yield TestClient(app)
+
+
+def test_analyze_returns_ranked_pain_points(client):
+    resp = client.post("/api/analyze", json={"items": FIXTURE_ITEMS})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == len(FIXTURE_ITEMS)
+    scores = [p["pain_score"] for p in body["pain_points"]]
+    assert scores == sorted(scores, reverse=True)
+    assert body["summary"]["top_opportunity"] == body["pain_points"][0]["pain_summary"]
+
+
+def test_analyze_stream_emits_ndjson_with_summary_trailer(client):
+    batch = client.post("/api/analyze", json={"items": FIXTURE_ITEMS}).json()
+    with client.stream("POST", "/api/analyze/stream", json={"items": FIXTURE_ITEMS}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+    points = [line["data"] for line in lines if line["type"] == "pain_point"]
+    assert len(points) == len(FIXTURE_ITEMS)
+    assert [p["post_url"] for p in points] == [i["full_link"] for i in FIXTURE_ITEMS]
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["data"] == batch["summary"]
+    assert sorted(points, key=lambda p: p["post_url"]) == sorted(batch["pain_points"], key=lambda p: p["post_url"])
+
+
+def test_analyze_stream_reports_errors_inline(client):
+    with patch("backend.main.iter_pipeline", side_effect=RuntimeError("boom")):
+        resp = client.post("/api/analyze/stream", json={"items": FIXTURE_ITEMS})
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines == [{"type": "error", "data": {"detail": "boom"}}]
+
+
+def test_analyze_validation_errors_match_fastapi_shape(client):
+    resp = client.post("/api/analyze", json={"items": [{"title": 1}]})
+    assert resp.status_code == 422
+    locs = [tuple(err["loc"]) for err in resp.json()["detail"]]
+    assert ("body", "items", 0, "title") in locs
+    assert ("body", "items", 0, "subreddit") in locs
+
+
+def test_analyze_defaults_missing_selftext(client):
+    item = {k: v for k, v in FIXTURE_ITEMS[0].items() if k != "selftext"}
+    resp = client.post("/api/analyze", json={"items": [item], "include_competitors": False})
+    assert resp.status_code == 200
+    point = resp.json()["pain_points"][0]
+    assert point["comment_or_content"] == ""
+    assert point["competition_level"] is None
+
+
+def test_analyze_rejects_too_many_items(client):
+    with patch("backend.main.ANALYZE_MAX_ITEMS", 2):
+        resp = client.post("/api/analyze", json={"items": FIXTURE_ITEMS})
+    assert resp.status_code == 413
+    assert "Too many items" in resp.json()["detail"]
+
+
+def test_analyze_rejects_oversized_body(client):
+    with patch("backend.main.ANALYZE_MAX_BODY_BYTES", 100):
+        resp = client.post("/api/analyze", json={"items": FIXTURE_ITEMS})
+    assert resp.status_code == 413
+
+
+def test_analyze_returns_503_when_all_slots_busy(client):
+    slots = ConcurrencyLimiter(1)
+    assert slots.try_acquire()
+    with patch("backend.main.analysis_slots", slots):
+        resp = client.post("/api/analyze/stream", json={"items": FIXTURE_ITEMS})
+    assert resp.status_code == 503
+    assert int(resp.headers["Retry-After"]) >= 1
+
+
+def test_analysis_slot_released_after_stream(client):
+    slots = ConcurrencyLimiter(1)
+    with patch("backend.main.analysis_slots", slots):
+        for _ in range(2):
+            assert client.post("/api/analyze/stream", json={"items": FIXTURE_ITEMS}).status_code == 200
+            assert client.post("/api/analyze", json={"items": FIXTURE_ITEMS}).status_code == 200
+    assert slots.in_flight == 0
+
+
+def test_rate_limit_per_api_key(client):
+    limiter = TokenBucketLimiter(rate=0.001, capacity=1)
+    with patch("backend.main.rate_limiter", limiter), patch("backend.main.API_KEYS", frozenset({"a", "b"})):
+        ok = client.post("/api/analyze", json={"items": []}, headers={"X-API-Key": "a"})
+        limited = client.post("/api/analyze", json={"items": []}, headers={"X-API-Key": "a"})
+        other = client.post("/api/analyze", json={"items": []}, headers={"Authorization": "Bearer b"})
+    assert ok.status_code == 200
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 1
+    assert other.status_code == 200
+
+
+def test_rate_limit_ignores_unknown_api_keys(client):
+    limiter = TokenBucketLimiter(rate=0.001, capacity=1)
+    with patch("backend.main.rate_limiter", limiter), patch("backend.main.API_KEYS", frozenset({"a"})):
+        ok = client.post("/api/analyze", json={"items": []}, headers={"X-API-Key": "fake-1"})
+        rotated = client.post("/api/analyze", json={"items": []}, headers={"X-API-Key": "fake-2"})
+        known = client.post("/api/analyze", json={"items": []}, headers={"X-API-Key": "a"})
+    assert ok.status_code == 200
+    assert rotated.status_code == 429  # same client address, same bucket
+    assert known.status_code == 200
+    assert set(limiter.store._buckets) == {"ip:testclient", "key:a"}
+
+
+def test_analyze_top_k_and_rank_by(client):
+    full = client.post("/api/analyze", json={"items": FIXTURE_ITEMS}).json()
+    scores = [p["pain_score"] for p in full["pain_points"]]
+    assert scores == sorted(scores, reverse=True)
+
+    resp = client.post("/api/analyze", json={"items": FIXTURE_ITEMS, "top_k": 2, "rank_by": "revenue_potential_score"})
+    data = resp.json()
+    assert data["count"] == 2
+    assert data["summary"]["total_analyzed"] == len(FIXTURE_ITEMS)
+    expected = sorted(full["pain_points"], key=lambda p: p["revenue_potential_score"], reverse=True)[:2]
+    assert [p["revenue_potential_score"] for p in data["pain_points"]] == [p["revenue_potential_score"] for p in expected]
+
+    bad = client.post("/api/analyze", json={"items": FIXTURE_ITEMS, "top_k": 0})
+    assert bad.status_code == 422
+
+
+def test_search_endpoint(client, tmp_path):
+    import backend.main as backend_main
+    from src.search_index import index_records
+
+    path = str(tmp_path / "search.db")
+    with patch.dict(os.environ, {"SEARCH_INDEX_PATH": path}), patch.object(backend_main, "_search_index", None):
+        empty = client.get("/api/search", params={"q": "export"}).json()
+        assert empty["count"] == 0
+        index_records([{"post_url": "u1", "post_title": "CSV export fails", "subreddit": "SaaS"}], path)
+        data = client.get("/api/search", params={"q": "export", "subreddit": "SaaS"}).json()
+        assert data["count"] == 1 and data["results"][0]["post_url"] == "u1"
+        assert client.get("/api/search", params={"q": ""}).status_code == 422
+        backend_main._search_index.close()
+
+
+def test_trends_rising_endpoint(client, tmp_path):
+    from src.trends import update_trends
+
+    path = str(tmp_path / "trends.json")
+    with patch.dict(os.environ, {"TRENDS_STATE_PATH": path}):
+        assert client.get("/api/trends/rising").json()["rising"] == []
+        posts = [
+            {"post_url": f"u{d}-{i}", "date": f"2025-01-{d:02d}T00:00:00Z", "category": "Pricing", "subreddit": "SaaS"}
+            for d in range(1, 15) for i in range(1 if d <= 7 else 3)
+        ]
+        update_trends(posts, path)
+        data = client.get("/api/trends/rising", params={"limit": 5}).json()
+    assert data["as_of"] == "2025-01-14"
+    assert data["window_days"] == 7
+    assert data["rising"][0]["category"] == "Pricing"
+    assert data["rising"][0]["recent_count"] == 21
+
+
+def test_records_endpoint_reads_snapshot(client, tmp_path):
+    path = str(tmp_path / "records.arrow")
+    with patch.dict(os.environ, {"SNAPSHOT_PATH": path}):
+        assert client.get("/api/records").json() == {"success": True, "total": 0, "count": 0, "records": []}
+        pytest.importorskip("pyarrow")
+        from src.snapshot import write_snapshot
+
+        write_snapshot([{"post_url": f"u{i}", "category": "Bugs" if i % 2 else "Pricing", "pain_score": i} for i in range(6)], path)
+        data = client.get("/api/records", params={"category": "Bugs", "rank_by": "pain_score", "limit": 2}).json()
+        page = client.get("/api/records", params={"offset": 4}).json()
+    assert data["total"] == 3 and [r["post_url"] for r in data["records"]] == ["u5", "u3"]
+    assert [r["post_url"] for r in page["records"]] == ["u4", "u5"]
+
+
+def test_analyze_scoring_profile_and_engagement(client):
+    items = [dict(item, date="2015-01-01T00:00:00Z") for item in FIXTURE_ITEMS]
+    legacy = client.post("/api/analyze", json={"items": items, "scoring_profile": "legacy"}).json()
+    default = client.post("/api/analyze", json={"items": items}).json()
+    # Decade-old posts are decayed by the default profile only
+    assert default["summary"]["avg_pain_score"] < legacy["summary"]["avg_pain_score"]
+
+    busy = [dict(items[0], score=5000, num_comments=800, upvote_ratio=0.97)]
+    quiet = client.post("/api/analyze", json={"items": items[:1], "scoring_profile": "trending"}).json()
+    loud = client.post("/api/analyze", json={"items": busy, "scoring_profile": "trending"}).json()
+    assert loud["pain_points"][0]["pain_score"] > quiet["pain_points"][0]["pain_score"]
+
+    assert client.post("/api/analyze", json={"items": items, "scoring_profile": "x"}).status_code == 422
+
+
+def test_rules_endpoint_picks_up_edited_rules(client, tmp_path):
+    import src.rules as rules_module
+
+    path = tmp_path / "rules.json"
+    with open(rules_module.DEFAULT_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+    spec["version"] = 7
+    spec["rule_sets"]["category"]["rules"] = [{"value": "Bugs", "terms": ["glitch"]}]
+    path.write_text(json.dumps(spec))
+    with patch.dict(os.environ, {"PAIN_RULES_PATH": str(path)}), patch.object(rules_module, "_store", None):
+        info = client.get("/api/rules").json()
+        assert info["version"] == 7 and info["rule_sets"]["category"] == 1 and info["last_error"] is None
+        item = dict(FIXTURE_ITEMS[0], title="A glitch", selftext="")
+        assert client.post("/api/analyze", json={"items": [item]}).json()["pain_points"][0]["category"] == "Bugs"
+
+        spec["rule_sets"]["category"]["rules"][0]["value"] = "Performance"
+        path.write_text(json.dumps(spec) + " ")
+        rules_module.rules_store()._next_check = 0.0  # skip the stat throttle
+        assert client.post("/api/analyze", json={"items": [item]}).json()["pain_points"][0]["category"] == "Performance"
+        assert client.get("/api/rules").json()["digest"] != info["digest"]
+
+
+def test_serialization_benchmark_smoke(capsys):
+    import runpy
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bench = runpy.run_path(os.path.join(root, "scripts", "bench_analyze_serialization.py"), run_name="bench")
+    bench["main"](["--items", "30", "--repeat", "1"])
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "30 items, best of 1"
+    assert [line.split()[0] for line in out[2:]] == ["validate", "serialize"]
+    # the legacy path must accept more items than the API allows per request
+    item = {"title": "t", "subreddit": "s", "date": "d", "full_link": "u"}
+    assert bench["_UncappedAnalyzeRequest"].model_validate({"items": [item] * (ANALYZE_MAX_ITEMS + 1)})
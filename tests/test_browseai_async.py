@@ -0,0 +1,182 @@
+"""Tests for the asyncio Browse.ai runner against a local fake server."""
+import asyncio
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.browseai_async import (
+    backoff_delays,
+    run_browseai_job_async,
+    run_browseai_jobs_async,
+    run_from_env_async,
+)
+
+FAST = {"initial_delay": 0.01, "max_delay": 0.05}
+
+
+class FakeBrowseAI(BaseHTTPRequestHandler):
+    """Minimal Browse.ai stand-in.
+
+    POST /run/<name>      -> immediate result ('/run/immediate') or an async run
+    GET  /status/<name>   -> scripted sequence of statuses per run name
+    """
+
+    scripts = {}
+    auth_headers = []
+    polled = threading.Event()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        raw = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        self.auth_headers.append(self.headers.get("Authorization"))
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        name = self.path.rsplit("/", 1)[-1]
+        if name == "immediate":
+            self._send(200, {"data": [payload]})
+        elif name == "boom":
+            self._send(500, {"error": "server"})
+        else:
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            self._send(200, {"status": "running", "status_url": f"{base}/status/{name}"})
+
+    def do_GET(self):
+        self.polled.set()
+        name = self.path.rsplit("/", 1)[-1]
+        script = self.scripts.get(name) or [(200, {"status": "running"})]
+        code, body = script.pop(0) if len(script) > 1 else script[0]
+        self._send(code, body)
+
+
+@pytest.fixture
+def server():
+    FakeBrowseAI.scripts = {}
+    FakeBrowseAI.auth_headers = []
+    FakeBrowseAI.polled = threading.Event()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeBrowseAI)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestBackoffDelays:
+    """Tests for the backoff schedule."""
+
+    def test_grows_exponentially_and_caps(self):
+        delays = backoff_delays(1.0, 2.0, 5.0, jitter=0)
+        assert [next(delays) for _ in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_jitter_only_shortens_delay(self):
+        delays = backoff_delays(1.0, 1.0, 10.0, jitter=0.5, rng=random.Random(0))
+        values = [next(delays) for _ in range(20)]
+        assert all(0.5 <= v <= 1.0 for v in values)
+        assert len(set(values)) > 1
+
+
+class TestRunBrowseaiJobAsync:
+    """Tests for a single async run."""
+
+    def test_immediate_response_and_callback(self, server):
+        seen = []
+        out = asyncio.run(run_browseai_job_async(
+            f"{server}/run/immediate", "sk", {"p": 1}, on_complete=seen.append, **FAST
+        ))
+        assert out == {"data": [{"p": 1}]}
+        assert seen == [out]
+        assert FakeBrowseAI.auth_headers == ["Bearer sk"]
+
+    def test_polls_through_transient_errors_to_completion(self, server):
+        FakeBrowseAI.scripts["a"] = [
+            (200, {"status": "running"}),
+            (503, {"error": "busy"}),
+            (200, "not json"),
+            (200, {"state": "Finished", "data": [1, 2]}),
+        ]
+        seen = []
+
+        async def hook(result):
+            seen.append(result)
+
+        out = asyncio.run(run_browseai_job_async(f"{server}/run/a", "sk", on_complete=hook, **FAST))
+        assert out["data"] == [1, 2]
+        assert seen == [out]
+
+    def test_failed_run_raises_runtimeerror(self, server):
+        FakeBrowseAI.scripts["f"] = [(200, {"status": "failed"})]
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_browseai_job_async(f"{server}/run/f", "sk", **FAST))
+
+    def test_timeout_raises(self, server):
+        with pytest.raises(TimeoutError):
+            asyncio.run(run_browseai_job_async(f"{server}/run/slow", "sk", timeout=0.1, **FAST))
+
+    def test_http_error_on_run_raises(self, server):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(run_browseai_job_async(f"{server}/run/boom", "sk", **FAST))
+
+    def test_cancellation_stops_polling(self, server):
+        async def scenario():
+            task = asyncio.create_task(run_browseai_job_async(f"{server}/run/forever", "sk", timeout=5, **FAST))
+            assert await asyncio.to_thread(FakeBrowseAI.polled.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+
+    def test_cancellation_swallowed_by_client_is_reraised(self):
+        class SwallowingClient:
+            """Absorbs a cancel mid-request, as httpcore's shielded cleanup can."""
+
+            async def post(self, url, **kwargs):
+                body = {"status": "running", "status_url": "http://x/status"}
+                return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+            async def get(self, url, **kwargs):
+                asyncio.current_task().cancel()
+                try:
+                    await asyncio.sleep(0)
+                except asyncio.CancelledError:
+                    pass
+                return httpx.Response(200, json={"status": "running"}, request=httpx.Request("GET", url))
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run_browseai_job_async("http://x/run", "sk", timeout=5, client=SwallowingClient(), **FAST))
+
+
+class TestConcurrentRuns:
+    """Tests for running several robots at once."""
+
+    def test_runs_concurrently_and_isolates_failures(self, server):
+        FakeBrowseAI.scripts["x"] = [(200, {"status": "running"}), (200, {"status": "done", "id": "x"})]
+        FakeBrowseAI.scripts["y"] = [(200, {"status": "done", "id": "y"})]
+        FakeBrowseAI.scripts["z"] = [(200, {"status": "error"})]
+        jobs = [{"run_url": f"{server}/run/{n}"} for n in ("x", "y", "z")]
+        out = asyncio.run(run_browseai_jobs_async(jobs, "sk", max_concurrency=2, **FAST))
+        assert out[0]["id"] == "x"
+        assert out[1]["id"] == "y"
+        assert isinstance(out[2], RuntimeError)
+
+    def test_run_from_env_async(self, server):
+        env = {"BROWSEAI_RUN_URL": f"{server}/run/immediate", "BROWSEAI_API_KEY": "sk"}
+        with patch.dict(os.environ, env, clear=True):
+            out = asyncio.run(run_from_env_async(payload={"k": "v"}, **FAST))
+        assert out == {"data": [{"k": "v"}]}
+
@@ -17,7 +17,7 @@ def test_validate_environment_ok():
 
 
 def test_run_browseai_job_immediate_return():
-    with patch("src.browseai_runner.requests.post") as mock_post:
+    with patch("src.browseai_runner.http.post") as mock_post:
         resp = Mock()
         resp.raise_for_status.return_value = None
         resp.json.return_value = {"result": {"ok": True}}
@@ -29,8 +29,8 @@ def test_run_browseai_job_immediate_return():
 
 def test_run_browseai_job_polls_to_completion():
     # First POST returns async run info; subsequent GET completes
-    with patch("src.browseai_runner.requests.post") as mock_post, \
-         patch("src.browseai_runner.requests.get") as mock_get:
+    with patch("src.browseai_runner.http.post") as mock_post, \
+         patch("src.browseai_runner.http.get") as mock_get:
         post_resp = Mock()
         post_resp.raise_for_status.return_value = None
         post_resp.json.return_value = {"status": "running", "status_url": "https://status"}
@@ -50,8 +50,8 @@ def test_run_browseai_job_polls_to_completion():
 
 
 def test_run_browseai_job_failure_raises_runtimeerror():
-    with patch("src.browseai_runner.requests.post") as mock_post, \
-         patch("src.browseai_runner.requests.get") as mock_get:
+    with patch("src.browseai_runner.http.post") as mock_post, \
+         patch("src.browseai_runner.http.get") as mock_get:
         post_resp = Mock()
         post_resp.raise_for_status.return_value = None
         post_resp.json.return_value = {"status": "running", "status_url": "https://status"}
@@ -67,8 +67,8 @@ def test_run_browseai_job_failure_raises_runtimeerror():
 
 
 def test_run_browseai_job_timeout_raises():
-    with patch("src.browseai_runner.requests.post") as mock_post, \
-         patch("src.browseai_runner.requests.get") as mock_get:
+    with patch("src.browseai_runner.http.post") as mock_post, \
+         patch("src.browseai_runner.http.get") as mock_get:
         post_resp = Mock()
         post_resp.raise_for_status.return_value = None
         post_resp.json.return_value = {"status": "running", "status_url": "https://status"}
@@ -139,7 +139,7 @@ class TestValidateEnvironment:
 class TestRunBrowseaiJob:
     """Tests for run_browseai_job function."""
 
-    @patch("src.browseai_runner.requests.post")
+    @patch("src.browseai_runner.http.post")
     def test_successful_immediate_response(self, mock_post):
         """Test successful Browse.ai job with immediate response (no polling)."""
         mock_response = MagicMock()
@@ -150,7 +150,7 @@ class TestRunBrowseaiJob:
         result = run_browseai_job("http://test.url", "test_key")
         assert result == {"data": [{"id": 1, "title": "Test"}]}
 
-    @patch("src.browseai_runner.requests.post")
+    @patch("src.browseai_runner.http.post")
     def test_request_error_raised(self, mock_post):
         """Test that HTTP errors are raised."""
         mock_response = MagicMock()
@@ -4,8 +4,8 @@ from src.browseai_runner import run_browseai_job
 
 
 def test_run_browseai_job_poll_exception_then_success():
-    with patch("src.browseai_runner.requests.post") as mock_post, \
-         patch("src.browseai_runner.requests.get") as mock_get:
+    with patch("src.browseai_runner.http.post") as mock_post, \
+         patch("src.browseai_runner.http.get") as mock_get:
         post_resp = Mock()
         post_resp.raise_for_status.return_value = None
         post_resp.json.return_value = {"status": "running", "status_url": "https://status"}
@@ -0,0 +1,109 @@
+"""Tests for stage checkpoints and resumable runs in src/checkpoint.py."""
+import json
+import os
+
+import pytest
+
+from src.analyze import transform_to_schema
+from src.checkpoint import MANIFEST, RunCheckpoint, Stage
+from src.records import PainPointRecord
+from src.scoring import calculate_pain_score
+from src.solution_generator import generate_solutions
+
+ITEMS = [{"title": f"Export crashed {i}", "selftext": "urgent", "subreddit": "SaaS", "full_link": f"u{i}"} for i in range(7)]
+
+
+class Boom(Exception):
+    pass
+
+
+def _stages(calls, fail_at=None):
+    def fetch(_):
+        calls.append("fetch")
+        return transform_to_schema(ITEMS, compact=True)
+
+    def score(recs):
+        calls.append("score")
+        return calculate_pain_score(recs)
+
+    def tag(batch):
+        calls.append(("tag", len(batch)))
+        if fail_at is not None and batch[0]["post_url"] == fail_at:
+            raise Boom(fail_at)
+        for rec in batch:
+            rec["competition_level"] = "Low"
+        return batch
+
+    return [
+        Stage("transform", fetch),
+        Stage("score", score),
+        Stage("solutions", generate_solutions),
+        Stage("competitors", tag, batch_size=3),
+    ]
+
+
+class TestRunCheckpoint:
+    """Stage persistence and resume."""
+
+    def test_resume_after_failed_batch(self, tmp_path):
+        root = str(tmp_path)
+        calls = []
+        ckpt = RunCheckpoint.create(root, {"limit": 5})
+        with pytest.raises(Boom):
+            ckpt.run(_stages(calls, fail_at="u3"), log=calls.append)
+        assert calls == ["fetch", "score", ("tag", 3), ("tag", 3)]
+        assert ckpt.completed("solutions") and not ckpt.completed("competitors")
+        assert ckpt.records_done("competitors") == 3
+
+        calls.clear()
+        resumed = RunCheckpoint.latest(root, {"limit": 5})
+        assert resumed.run_id == ckpt.run_id
+        records = resumed.run(_stages(calls), log=calls.append)
+        assert calls == [
+            f"Resuming run {ckpt.run_id} after stage 'solutions' (7 items)",
+            "Resuming stage 'competitors' at item 3 of 7",
+            ("tag", 3), ("tag", 1),
+        ]
+        assert [r["post_url"] for r in records] == [f"u{i}" for i in range(7)]
+        assert all(isinstance(r, PainPointRecord) and r["competition_level"] == "Low" for r in records)
+        assert records[0].solution_key == "bugs" and records[0]["pain_score"] > 0
+
+        # Fully checkpointed runs only load the final output
+        calls.clear()
+        again = resumed.run(_stages(calls), log=lambda msg: None)
+        assert calls == [] and [r.to_dict() for r in again] == [r.to_dict() for r in records]
+
+        resumed.finish()
+        assert not os.path.exists(resumed.directory)
+        assert RunCheckpoint.latest(root) is None
+
+    def test_latest_skips_finished_and_checks_fingerprint(self, tmp_path):
+        root = str(tmp_path / "ckpt")
+        assert RunCheckpoint.latest(root) is None
+        old = RunCheckpoint.create(root, {"limit": 5})
+        old.save("transform", [{"raw": 1}])
+        old.finish(keep=True)
+        assert os.path.exists(os.path.join(old.directory, MANIFEST))
+        assert RunCheckpoint.latest(root) is None
+
+        current = RunCheckpoint.create(root, {"limit": 5})
+        assert current.directory != old.directory  # same second, new directory
+        current.save("transform", [{"raw": 2}])
+        assert RunCheckpoint.latest(root, {"limit": 5}).load("transform") == [{"raw": 2}]
+        with pytest.raises(ValueError, match="different arguments"):
+            RunCheckpoint.latest(root, {"limit": 10})
+
+    def test_parts_are_written_atomically(self, tmp_path):
+        ckpt = RunCheckpoint(str(tmp_path / "run"))
+        ckpt.append_part("competitors", [PainPointRecord(category="Bugs")])
+        with open(os.path.join(ckpt.directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        assert manifest["stages"]["competitors"] == {"parts": ["competitors-00000.ndjson.gz"], "records": 1, "complete": False}
+        assert sorted(os.listdir(ckpt.directory)) == ["competitors-00000.ndjson.gz", MANIFEST]
+
+    def test_empty_batched_stage_and_duplicate_names(self, tmp_path):
+        ckpt = RunCheckpoint(str(tmp_path / "run"))
+        assert ckpt.run([Stage("a", lambda _: []), Stage("b", lambda batch: batch, batch_size=2)]) == []
+        assert ckpt.completed("b")
+        with pytest.raises(ValueError, match="duplicate stage names"):
+            ckpt.run([Stage("a", list), Stage("a", list)])
@@ -0,0 +1,186 @@
+"""Tests for the pluggable category classifiers in src/classifier.py."""
+import csv
+import random
+
+import numpy as np
+import pytest
+
+from src.analyze import transform_to_schema
+from src.classifier import (
+    CategoryClassifier,
+    HashedLogisticRegression,
+    KeywordClassifier,
+    _csr_dot,
+    accuracy,
+    classifier_cli,
+    get_classifier,
+    load_model,
+    read_labeled_csv,
+)
+from src.pipeline import run_pipeline
+from src.tokenizer import tokenize_text
+
+VOCAB = {
+    "Pricing": "invoice plan seats billing tier renewal discount",
+    "Bugs": "exception stacktrace freeze glitch corrupted regression",
+    "Performance": "loading sluggish throughput spinner timeout memory",
+}
+FILLER = "the our it we when after with dashboard team export".split()
+
+
+def _corpus(n, seed=0):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = sorted(VOCAB)[i % len(VOCAB)]
+        words = [rng.choice(VOCAB[label].split()) for _ in range(3)] + [rng.choice(FILLER) for _ in range(6)]
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+        labels.append(label)
+    return texts, labels
+
+
+@pytest.fixture(scope="module")
+def model():
+    texts, labels = _corpus(300)
+    return HashedLogisticRegression.fit([tokenize_text(t) for t in texts], labels, n_features=2 ** 12, epochs=5)
+
+
+class TestKeywordClassifier:
+    """The default classifier matches the category rules."""
+
+    def test_matches_rules(self):
+        batch = [tokenize_text(t) for t in ("pricing is high", "the app crashed", "hello")]
+        assert KeywordClassifier().predict(batch) == ["Pricing", "Bugs", "Other"]
+
+    def test_base_interface(self):
+        with pytest.raises(NotImplementedError):
+            CategoryClassifier().predict([])
+        assert isinstance(get_classifier(None), KeywordClassifier)
+        assert isinstance(get_classifier("keyword"), KeywordClassifier)
+
+
+class TestHashedLogisticRegression:
+    """Feature hashing, sparse scoring and training."""
+
+    def test_vectorize_rows_are_normalized(self, model):
+        indptr, indices, data = model.vectorize([tokenize_text("glitch glitch freeze"), tokenize_text("")])
+        assert indptr.tolist() == [0, 4, 4]  # 2 unigrams + 2 bigrams, then an empty row
+        assert np.isclose((data ** 2).sum(), 1.0)
+        assert indices.max() < model.n_features
+
+    def test_hash_cache_is_bounded(self, model, monkeypatch):
+        monkeypatch.setattr("src.classifier._HASH_CACHE_SIZE", 3)
+        model._hash_cache.clear()
+        before = model.vectorize([tokenize_text("one two three four five")])
+        assert len(model._hash_cache) <= 3
+        assert all(np.array_equal(a, b) for a, b in zip(before, model.vectorize([tokenize_text("one two three four five")])))
+
+    def test_csr_dot_matches_dense(self):
+        rng = np.random.default_rng(1)
+        W = rng.normal(size=(8, 3)).astype(np.float32)
+        X = (np.array([0, 2, 2, 5]), np.array([1, 4, 0, 3, 7]), np.array([1.0, 2.0, 0.5, 1.0, 3.0], dtype=np.float32))
+        dense = np.zeros((3, 8), dtype=np.float32)
+        for row in range(3):
+            for k in range(X[0][row], X[0][row + 1]):
+                dense[row, X[1][k]] = X[2][k]
+        assert np.allclose(_csr_dot(X, W), dense @ W, atol=1e-5)
+
+    def test_learns_held_out_texts(self, model):
+        texts, labels = _corpus(90, seed=7)
+        batch = [tokenize_text(t) for t in texts]
+        assert accuracy(model, batch, labels) > 0.9
+        proba = model.predict_proba(batch[:4])
+        assert proba.shape == (4, 3) and np.allclose(proba.sum(axis=1), 1.0)
+        assert model.predict([]) == []
+
+    def test_rejects_bad_shapes(self):
+        with pytest.raises(ValueError, match="power of two"):
+            HashedLogisticRegression(["a"], np.zeros((10, 1)), [0.0])
+        with pytest.raises(ValueError, match="one column per class"):
+            HashedLogisticRegression(["a", "b"], np.zeros((8, 1)), [0.0])
+        with pytest.raises(ValueError, match="one label per text"):
+            HashedLogisticRegression.fit([tokenize_text("x")], [])
+        assert accuracy(KeywordClassifier(), [], []) == 0.0
+
+
+class TestModelFile:
+    """Save/load round trip with memory-mapped weights."""
+
+    def test_round_trip_is_memory_mapped(self, model, tmp_path):
+        path = model.save(str(tmp_path / "m.clf"))
+        loaded = load_model(path)
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.classes == model.classes and loaded.ngram == model.ngram
+        assert np.array_equal(loaded.weights, model.weights)
+        texts, _ = _corpus(30, seed=3)
+        batch = [tokenize_text(t) for t in texts]
+        assert loaded.predict(batch) == model.predict(batch)
+        assert isinstance(get_classifier(path), HashedLogisticRegression)
+
+    def test_rejects_other_files(self, model, tmp_path):
+        bad = tmp_path / "bad.clf"
+        bad.write_bytes(b"not a model")
+        with pytest.raises(ValueError, match="not a classifier model"):
+            load_model(str(bad))
+        path = model.save(str(tmp_path / "m.clf"))
+        data = bytearray(open(path, "rb").read())
+        data[data.index(b'"format": 1') + 10] = ord("9")
+        bad.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="unsupported model format"):
+            load_model(str(bad))
+
+
+class TestPipelineIntegration:
+    """transform_to_schema and the pipeline classify in batches."""
+
+    def test_transform_uses_classifier_in_batches(self, model, monkeypatch):
+        monkeypatch.setattr("src.analyze.CLASSIFY_BATCH_SIZE", 2)
+        calls = []
+
+        class Fixed(CategoryClassifier):
+            def predict(self, batch):
+                calls.append(len(batch))
+                return ["Custom"] * len(batch)
+
+        items = [{"title": f"Urgent post {i}", "selftext": "it crashed"} for i in range(5)]
+        records = transform_to_schema(items, compact=True, classifier=Fixed())
+        assert calls == [2, 2, 1]
+        assert [r["category"] for r in records] == ["Custom"] * 5
+        assert records[0]["severity_rating"] == 5 and records[0].tokens is not None
+        assert transform_to_schema(iter(items), classifier=Fixed())[4]["category"] == "Custom"
+
+    def test_model_labels_pipeline_records(self, model):
+        items = [{"title": "Billing renewal", "selftext": "the invoice tier and seats", "subreddit": "SaaS"}]
+        assert run_pipeline(items, classifier=model)[0]["category"] == "Pricing"
+
+
+class TestCli:
+    """Training and evaluating from labeled CSV exports."""
+
+    def _write(self, path, rows):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["post_title", "comment_or_content", "category"])
+            writer.writeheader()
+            writer.writerows(rows)
+        return str(path)
+
+    def test_train_and_eval(self, tmp_path, capsys):
+        texts, labels = _corpus(120)
+        rows = [{"post_title": t, "comment_or_content": "", "category": c} for t, c in zip(texts, labels)]
+        rows.append({"post_title": "unlabeled", "comment_or_content": "", "category": ""})
+        path = self._write(tmp_path / "labeled.csv", rows)
+        assert len(read_labeled_csv(path)[0]) == 120
+        out = str(tmp_path / "output" / "m.clf")  # directory does not exist yet
+        assert classifier_cli(["train", path, "-o", out, "--features", "4096", "--epochs", "3"]) == 0
+        assert "Trained on 120 rows (3 classes)" in capsys.readouterr().out
+
+        from src.main import main
+
+        assert main(["classifier", "eval", path, "--model", out]) == 0
+        assert "model accuracy" in capsys.readouterr().out
+
+    def test_empty_csv(self, tmp_path, capsys):
+        path = self._write(tmp_path / "empty.csv", [])
+        assert classifier_cli(["eval", path, "--model", "x"]) == 1
+        assert "No labeled rows" in capsys.readouterr().out
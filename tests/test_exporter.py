@@ -1,6 +1,8 @@
+import csv
 import os
 import tempfile
-from src.exporter import write_csv, write_excel
+
+from src.exporter import append_csv, write_csv, write_excel
 
 
 def test_write_csv_creates_file():
@@ -19,3 +21,18 @@ def test_write_excel_creates_file():
         path = write_excel(records, path=out_path)
         assert os.path.exists(path)
         assert path.endswith(".xlsx")
+
+
+def test_append_csv_widens_header_for_new_columns(tmp_path):
+    out = str(tmp_path / "sub" / "out.csv")
+    append_csv([{"a": 1, "b": "x"}], path=out)
+    append_csv([{"b": "y"}, {"a": 2}], path=out)
+    append_csv([{"b": "z", "c": 3}, {"a": "007"}], path=out)
+    append_csv([{"c": 4}], path=out)
+    with open(out, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["a", "b", "c"], ["1", "x", ""], ["", "y", ""], ["2", "", ""],
+        ["", "z", "3"], ["007", "", ""], ["", "", "4"],
+    ]
+    assert not os.path.exists(out + ".tmp")
@@ -0,0 +1,210 @@
+"""Tests for the shared pooled HTTP client in src/http_client.py."""
+import asyncio
+import json
+import socket
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import requests
+
+from src.http_client import HttpClient, LatencyHistogram, _retry_after, async_client
+
+
+class FakeAPI(BaseHTTPRequestHandler):
+    """Keep-alive test server.
+
+    GET /etag      -> ETag "v1"; 304 when If-None-Match matches
+    GET /modified  -> Last-Modified; 304 when If-Modified-Since is sent
+    GET /flaky     -> 503 (Retry-After: 0) for the first ``failures`` calls
+    POST /flaky    -> same, for POSTs
+    """
+
+    protocol_version = "HTTP/1.1"
+    ports = set()
+    hits = {}
+    failures = 2
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body=None, headers=()):
+        raw = json.dumps(body).encode() if body is not None else b""
+        self.send_response(code)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _handle(self):
+        self.ports.add(self.client_address[1])
+        path = self.path.split("?")[0]
+        n = self.hits[path] = self.hits.get(path, 0) + 1
+        if path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._send(304)
+            return self._send(200, {"n": n, "q": self.path}, [("ETag", '"v1"')])
+        if path == "/modified":
+            if self.headers.get("If-Modified-Since"):
+                return self._send(304)
+            return self._send(200, {"n": n}, [("Last-Modified", formatdate(usegmt=True))])
+        if path == "/flaky" and n <= self.failures:
+            return self._send(503, {"error": "busy"}, [("Retry-After", "0")])
+        return self._send(200, {"n": n})
+
+    do_GET = _handle
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._handle()
+
+
+@pytest.fixture
+def server():
+    FakeAPI.ports = set()
+    FakeAPI.hits = {}
+    FakeAPI.failures = 2
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPI)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    sleeps = []
+    c = HttpClient(retries=2, backoff_initial=0.5, backoff_max=0.75, sleep=sleeps.append)
+    c.sleeps = sleeps
+    yield c
+    c.close()
+
+
+class TestHttpClient:
+    """Pooling, retries, conditional requests and stats."""
+
+    def test_connections_are_reused(self, server, client):
+        for _ in range(3):
+            assert client.get(f"{server}/plain", timeout=5).status_code == 200
+        assert len(FakeAPI.ports) == 1
+        assert client.session(server) is client.session(f"{server}/other")
+        host = server.split("//")[1]
+        stats = client.stats()[host]
+        assert (stats["requests"], stats["statuses"], stats["latency"]["count"]) == (3, {200: 3}, 3)
+        assert client.summary_lines()[0].startswith(f"{host}: 3 requests (0 retries, 0 errors, 0 not modified), p50 ")
+
+    def test_conditional_get_answers_304_from_cache(self, server, client):
+        first = client.get(f"{server}/etag", params={"q": "csv"}, timeout=5)
+        again = client.get(f"{server}/etag", params={"q": "csv"}, timeout=5)
+        assert again is not first and FakeAPI.hits["/etag"] == 2
+        assert (again.status_code, again.json(), again.headers["etag"], again.url) == (200, first.json(), '"v1"', first.url)
+        again.raise_for_status()
+        other = client.get(f"{server}/etag", params={"q": "pdf"}, timeout=5)
+        assert other.json()["n"] == 3  # different query, separate cache entry
+        modified = client.get(f"{server}/modified", timeout=5)
+        assert client.get(f"{server}/modified", timeout=5).json() == modified.json() == {"n": 1}
+        assert client.get(f"{server}/modified", timeout=5, conditional=False).json() == {"n": 3}
+        assert client.stats()[server.split("//")[1]]["not_modified"] == 2
+
+    def test_cache_is_bounded(self, server):
+        client = HttpClient(cache_size=1)
+        client.get(f"{server}/etag", params={"q": "a"}, timeout=5)
+        client.get(f"{server}/etag", params={"q": "b"}, timeout=5)
+        assert client.get(f"{server}/etag", params={"q": "a"}, timeout=5).json()["n"] == 3  # evicted, refetched
+        client.close()
+
+    def test_cache_is_bounded_by_body_bytes(self, server):
+        client = HttpClient(cache_max_bytes=40)
+        body = len(client.get(f"{server}/etag", params={"q": "a"}, timeout=5).content)
+        assert 20 < body <= 40 and client._cache_bytes == body
+        client.get(f"{server}/etag", params={"q": "b"}, timeout=5)  # evicts "a" to stay within 40 bytes
+        assert len(client._cache) == 1 and client._cache_bytes == body
+        next(iter(client._cache.values())).headers["ETag"] = '"stale"'
+        client.get(f"{server}/etag", params={"q": "b"}, timeout=5)  # 200 replaces the entry
+        assert len(client._cache) == 1 and client._cache_bytes == body
+        assert client.get(f"{server}/etag", params={"q": "a"}, timeout=5).json()["n"] == 4
+        client.cache_max_bytes = 10  # too large to cache at all
+        client.get(f"{server}/etag", params={"q": "c"}, timeout=5)
+        assert all(key[1] != repr({"q": "c"}) for key in client._cache)
+        client.close()
+        assert client._cache_bytes == 0
+
+    def test_retries_idempotent_requests_with_retry_after(self, server, client):
+        resp = client.get(f"{server}/flaky", timeout=5)
+        assert resp.status_code == 200 and client.sleeps == [0.0, 0.0]
+        stats = client.stats()[server.split("//")[1]]
+        assert (stats["requests"], stats["retries"], stats["statuses"]) == (3, 2, {200: 1, 503: 2})
+
+    def test_gives_up_and_does_not_retry_posts(self, server, client):
+        FakeAPI.failures = 10
+        assert client.get(f"{server}/flaky", timeout=5, retries=1).status_code == 503
+        assert client.post(f"{server}/flaky", json={}, timeout=5).status_code == 503
+        assert FakeAPI.hits["/flaky"] == 3
+        assert client.post(f"{server}/flaky", json={}, timeout=5, retries=1).status_code == 503
+        assert FakeAPI.hits["/flaky"] == 5
+
+    def test_connection_errors_back_off_then_raise(self, client):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with pytest.raises(requests.ConnectionError):
+            client.get(f"http://127.0.0.1:{port}/", timeout=1)
+        assert client.sleeps == [0.5, 0.75]  # doubled, capped at backoff_max
+        assert client.stats()[f"127.0.0.1:{port}"]["errors"] == 3
+
+
+class TestLatencyHistogram:
+    """Bucketed percentiles."""
+
+    def test_percentiles(self):
+        hist = LatencyHistogram()
+        assert hist.percentile(50) is None and hist.to_dict()["mean_ms"] is None
+        for ms in (3, 7, 40, 40, 12000):
+            hist.observe(ms / 1000.0)
+        data = hist.to_dict()
+        assert (data["p50_ms"], data["p95_ms"], data["max_ms"]) == (50.0, 12000.0, 12000.0)
+        assert data["buckets_ms"]["5"] == 1 and data["buckets_ms"]["inf"] == 1
+
+
+def test_retry_after_parsing():
+    assert _retry_after(SimpleNamespace(headers={"Retry-After": "3"})) == 3.0
+    assert _retry_after(SimpleNamespace(headers={})) is None
+    assert _retry_after(SimpleNamespace(headers={"Retry-After": "soon"})) is None
+    assert 0 < _retry_after(SimpleNamespace(headers={"Retry-After": formatdate(time.time() + 60, usegmt=True)})) <= 60
+
+
+def test_from_env_and_async_client(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_MAXSIZE", "3")
+    monkeypatch.setenv("HTTP_RETRIES", "0")
+    client = HttpClient.from_env()
+    assert (client.pool_maxsize, client.retries) == (3, 0)
+    ac = async_client(timeout=5)
+    assert ac.timeout.read == 5
+    asyncio.run(ac.aclose())
+
+
+def test_async_client_requests_are_counted(server, monkeypatch):
+    shared = HttpClient()
+    monkeypatch.setattr("src.http_client.http", shared)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed = f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+    async def scenario():
+        async with async_client(timeout=5) as ac:
+            assert (await ac.get(f"{server}/plain")).status_code == 200
+            assert (await ac.post(f"{server}/flaky", json={})).status_code == 503
+            with pytest.raises(httpx.ConnectError):
+                await ac.get(closed)
+
+    asyncio.run(scenario())
+    stats = shared.stats()
+    assert stats[server.split("//")[1]]["statuses"] == {200: 1, 503: 1}
+    assert stats[server.split("//")[1]]["latency"]["count"] == 2
+    assert stats[closed.split("//")[1].rstrip("/")]["errors"] == 1
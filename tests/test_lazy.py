@@ -0,0 +1,66 @@
+"""Tests for the deferred-import helpers in src/lazy.py."""
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+
+from src.lazy import LazyModule, is_available, lazy_import
+
+
+@pytest.fixture
+def fake_module():
+    mod = types.ModuleType("fake_heavy_mod")
+    mod.VALUE = 42
+    mod.Thing = lambda x: ("thing", x)
+    with patch.dict(sys.modules, {"fake_heavy_mod": mod}):
+        yield mod
+
+
+class TestLazyModule:
+    """Tests for the module proxy."""
+
+    def test_imports_on_first_attribute_access(self, fake_module):
+        proxy = LazyModule("fake_heavy_mod")
+        assert not proxy.is_loaded
+        assert "not loaded" in repr(proxy)
+        assert proxy.VALUE == 42
+        assert proxy.is_loaded
+        assert "(loaded)" in repr(proxy)
+
+    def test_attribute_proxy_is_callable(self, fake_module):
+        thing = lazy_import("fake_heavy_mod", "Thing")
+        assert thing(1) == ("thing", 1)
+        assert "fake_heavy_mod.Thing" in repr(thing)
+
+    def test_setattr_and_delattr_forward_to_module(self, fake_module):
+        proxy = lazy_import("fake_heavy_mod")
+        proxy.extra = "x"
+        assert fake_module.extra == "x"
+        del proxy.extra
+        assert not hasattr(fake_module, "extra")
+
+    def test_mock_patch_through_proxy(self, fake_module):
+        proxy = lazy_import("fake_heavy_mod")
+        with patch.object(proxy, "VALUE", 7):
+            assert fake_module.VALUE == 7
+        assert fake_module.VALUE == 42
+
+    def test_missing_module_raises_on_use(self):
+        proxy = lazy_import("definitely_not_installed_mod")
+        with pytest.raises(ImportError):
+            proxy.anything
+
+
+class TestOptional:
+    """Tests for optional dependencies."""
+
+    def test_missing_optional_returns_none(self):
+        assert lazy_import("definitely_not_installed_mod", optional=True) is None
+        assert lazy_import("definitely_not_installed_pkg.sub", optional=True) is None
+
+    def test_available_optional_returns_proxy(self, fake_module):
+        assert is_available("fake_heavy_mod")
+        assert isinstance(lazy_import("fake_heavy_mod", optional=True), LazyModule)
+        assert is_available("json")
+        assert not is_available("")
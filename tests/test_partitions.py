@@ -0,0 +1,78 @@
+"""Tests for the day/subreddit partitioned dataset in src/partitions.py."""
+import gzip
+import json
+import os
+import threading
+
+from src.partitions import MANIFEST_DIR, PartitionedDataset, dataset_path
+from src.records import PainPointRecord
+
+
+def _rec(i, day="2025-01-02", sub="SaaS"):
+    return {"post_url": f"u{i}", "date": f"{day}T10:00:00Z" if day else None, "subreddit": sub,
+            "category": "Bugs", "pain_score": i}
+
+
+class TestPartitionedDataset:
+    """Writing, pruning and expiring partitions."""
+
+    def test_write_layout_and_manifest(self, tmp_path):
+        dataset = PartitionedDataset(str(tmp_path / "ds"))
+        records = [_rec(1), _rec(2, sub="r/start ups"), _rec(3, day=None), PainPointRecord(post_url="u4", date="2025-01-03", subreddit="SaaS")]
+        parts = dataset.write(records, writer_id="w1")
+        assert [(p.path, p.rows) for p in parts] == [
+            ("date=2025-01-02/subreddit=SaaS/part-w1.csv.gz", 1),
+            ("date=2025-01-02/subreddit=r_start_ups/part-w1.csv.gz", 1),
+            ("date=2025-01-03/subreddit=SaaS/part-w1.csv.gz", 1),
+            ("date=unknown/subreddit=SaaS/part-w1.csv.gz", 1),
+        ]
+        with gzip.open(os.path.join(dataset.root, parts[0].path), "rt") as f:
+            assert f.read().splitlines() == ["post_url,date,subreddit,category,pain_score", "u1,2025-01-02T10:00:00Z,SaaS,Bugs,1"]
+        with open(os.path.join(dataset.root, MANIFEST_DIR, "w1.json")) as f:
+            manifest = json.load(f)
+        assert manifest["columns"] == ["post_url", "date", "subreddit", "category", "pain_score"]
+        assert manifest["parts"][1]["subreddit"] == "r/start ups" and parts[0].bytes > 0
+        assert dataset.write([]) == []
+
+    def test_prunes_by_day_and_subreddit(self, tmp_path):
+        dataset = PartitionedDataset(str(tmp_path))
+        dataset.write([_rec(1, day="2025-01-01"), _rec(2, day="2025-01-02", sub="startups"), _rec(3, day=None)])
+        dataset.write([_rec(4, day="2025-01-03"), _rec(5, day="2025-01-02")])
+        assert len(dataset.parts()) == 5
+        assert [r["post_url"] for r in dataset.iter_rows(start="2025-01-02")] == ["u2", "u5", "u4"]
+        assert [r["post_url"] for r in dataset.iter_rows(end="2025-01-02", subreddits=["saas"])] == ["u1", "u5"]
+        assert [r["post_url"] for r in dataset.iter_rows(subreddits=["SaaS"])] == ["u1", "u3", "u5", "u4"]
+        frame = dataset.read_frame(start="2025-01-03")
+        assert frame["post_url"].tolist() == ["u4"] and frame["pain_score"].tolist() == [4]
+        assert dataset.read_frame(start="2030-01-01").empty
+        assert PartitionedDataset(str(tmp_path / "missing")).parts() == []
+
+    def test_concurrent_writers_do_not_collide(self, tmp_path):
+        dataset = PartitionedDataset(str(tmp_path), max_workers=2)
+
+        def write(w):
+            dataset.write([_rec(w * 100 + i, day=f"2025-01-0{i % 3 + 1}") for i in range(30)])
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(dataset.manifests()) == 4 and len(dataset.parts()) == 12
+        assert sorted(int(r["pain_score"]) for r in dataset.iter_rows()) == sorted(w * 100 + i for w in range(4) for i in range(30))
+
+    def test_expire_removes_old_partitions(self, tmp_path):
+        dataset = PartitionedDataset(str(tmp_path))
+        dataset.write([_rec(1, day="2025-01-01"), _rec(2, day=None)], writer_id="a")
+        dataset.write([_rec(3, day="2025-01-01", sub="startups")], writer_id="b")
+        dataset.write([_rec(4, day="2025-01-01"), _rec(5, day="2025-02-01")], writer_id="c")
+        assert dataset.expire(before="2025-01-15") == 3
+        assert [r["post_url"] for r in dataset.iter_rows()] == ["u2", "u5"]
+        assert sorted(os.listdir(os.path.join(str(tmp_path), MANIFEST_DIR))) == ["a.json", "c.json"]
+        assert not os.path.exists(os.path.join(str(tmp_path), "date=2025-01-01"))
+        assert dataset.expire(before="2025-01-15") == 0
+
+
+def test_dataset_path_env(monkeypatch):
+    monkeypatch.setenv("DATASET_PATH", "/data/ds")
+    assert dataset_path() == "/data/ds" and PartitionedDataset().root == "/data/ds"
@@ -1,6 +1,7 @@
 import os
 import tempfile
-from src.pdf_reporter import generate_report, _generate_html_content
+from src.aggregates import AggregateIndex
+from src.pdf_reporter import generate_report, generate_report_from_snapshot, _generate_html_content
 
 
 def test_generate_report_creates_html_file():
@@ -32,3 +33,53 @@ def test_generate_html_content_non_empty():
     html = _generate_html_content([])
     assert isinstance(html, str)
     assert "<!DOCTYPE html>" in html
+
+
+def test_report_includes_category_breakdown_from_index():
+    records = [
+        {"pain_summary": "a", "category": "Bugs", "pain_score": 90, "revenue_potential_score": 40},
+        {"pain_summary": "b", "category": "Bugs", "pain_score": 70, "revenue_potential_score": 20},
+        {"pain_summary": "c", "category": "Pricing", "pain_score": 20, "revenue_potential_score": 10},
+    ]
+    for rec in records:
+        rec.update(estimated_market_size=1000, estimated_target_audience=100)
+    html = _generate_html_content(records)
+    assert "Pain by Category" in html
+    assert "<td>Bugs</td>\n                <td>2</td>\n                <td>80</td>" in html
+    assert "Average Pain Score:</strong> 60/100" in html
+
+
+def test_report_ranks_unsorted_records():
+    records = [
+        {"pain_summary": f"item {s}", "category": "Bugs", "pain_score": s,
+         "estimated_market_size": 1, "estimated_target_audience": 1}
+        for s in (10, 95, 40)
+    ]
+    html = _generate_html_content(records)
+    assert "Highest Opportunity:</strong> item 95" in html
+
+
+class _StubSnapshot:
+    """Duck-typed stand-in for src.snapshot.Snapshot (pyarrow is optional)."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def top(self, k):
+        return sorted(self.records, key=lambda r: r["pain_score"], reverse=True)[:k]
+
+    def aggregate_index(self):
+        return AggregateIndex.from_records(self.records)
+
+
+def test_report_from_snapshot_uses_top_rows_and_index(tmp_path):
+    records = [
+        {"pain_summary": f"item {s}", "category": "Bugs", "pain_score": s,
+         "estimated_market_size": 1, "estimated_target_audience": 1}
+        for s in range(12)
+    ]
+    path = generate_report_from_snapshot(_StubSnapshot(records), output_dir=str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    assert "Total Pain-Points Analyzed:</strong> 12" in html
+    assert "Highest Opportunity:</strong> item 11" in html
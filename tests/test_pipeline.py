@@ -0,0 +1,56 @@
+"""Tests for the shared pipeline helpers in src/pipeline.py."""
+from unittest.mock import patch
+
+import pytest
+
+from src.pipeline import iter_pipeline, run_pipeline, SummaryAccumulator
+from src.records import records_to_dicts
+from tests.test_analyze import FIXTURE_ITEMS
+
+
+@pytest.fixture(autouse=True)
+def no_network():
+    with patch("src.competitor_detector.http.get", side_effect=Exception("offline")):
+        yield
+
+
+def test_iter_pipeline_is_lazy_and_applies_all_stages():
+    it = iter_pipeline(FIXTURE_ITEMS)
+    first = next(it)
+    assert "pain_score" in first
+    assert "suggested_product_idea" in first
+    assert "competition_level" in first
+    assert "revenue_potential_score" in first
+    assert len(list(it)) == len(FIXTURE_ITEMS) - 1
+
+
+def test_run_pipeline_respects_stage_flags():
+    out = records_to_dicts(run_pipeline(
+        FIXTURE_ITEMS, include_solutions=False, include_competitors=False, include_revenue=False
+    ))
+    assert len(out) == len(FIXTURE_ITEMS)
+    assert all("pain_score" in r for r in out)
+    assert not any("suggested_product_idea" in r or "competition_level" in r for r in out)
+
+
+def test_summary_matches_sorted_batch_summary():
+    records = run_pipeline(FIXTURE_ITEMS)
+    acc = SummaryAccumulator()
+    for rec in records:
+        acc.add(rec)
+    summary = acc.summary()
+
+    ranked = sorted(records, key=lambda r: r["pain_score"], reverse=True)
+    assert summary["total_analyzed"] == len(records)
+    assert summary["avg_pain_score"] == sum(r["pain_score"] for r in records) / len(records)
+    assert summary["top_opportunity"] == ranked[0]["pain_summary"]
+    assert sum(summary["categories"].values()) == len(records)
+
+
+def test_empty_summary():
+    assert SummaryAccumulator().summary() == {
+        "total_analyzed": 0,
+        "avg_pain_score": 0,
+        "categories": {},
+        "top_opportunity": "N/A",
+    }
@@ -0,0 +1,77 @@
+"""Tests for top-K selection in src/ranking.py."""
+import random
+
+import numpy as np
+import pytest
+
+from src.ranking import TopK, rank, score_getter, top_k, top_k_columnar, top_k_indices
+from src.records import PainPointRecord
+
+
+def _recs(scores):
+    return [{"id": i, "pain_score": s, "revenue_potential_score": 100 - s} for i, s in enumerate(scores)]
+
+
+def _reference(records, k, key="pain_score"):
+    return sorted(records, key=lambda r: r.get(key, 0), reverse=True)[:k]
+
+
+@pytest.fixture
+def many():
+    rng = random.Random(3)
+    return _recs([rng.randint(0, 20) for _ in range(2000)])  # heavy ties
+
+
+class TestTopK:
+    """Tests for the heap-based selection."""
+
+    @pytest.mark.parametrize("k", [0, 1, 10, 1999, 2000, 5000])
+    def test_matches_stable_sort(self, many, k):
+        assert top_k(many, k) == _reference(many, k)
+
+    def test_other_score_column_and_callable(self, many):
+        assert top_k(many, 5, key="revenue_potential_score") == _reference(many, 5, "revenue_potential_score")
+        assert top_k(many, 5, key=lambda r: -r["id"]) == many[:5]
+
+    def test_streaming_accumulator(self, many):
+        best = TopK(10)
+        for rec in iter(many):
+            best.add(rec)
+        assert len(best) == 10
+        assert best.result() == _reference(many, 10)
+        assert TopK(3).extend(many).result() == _reference(many, 3)
+        assert TopK(0).extend(many).result() == []
+
+    def test_missing_and_none_scores_rank_last(self):
+        records = [{"pain_score": None}, {}, {"pain_score": 5}]
+        assert top_k(records, 1) == [{"pain_score": 5}]
+        assert score_getter()({"pain_score": None}) == 0
+
+    def test_compact_records(self):
+        recs = [PainPointRecord(pain_score=s) for s in (3, 9, 9, 1)]
+        assert top_k(recs, 2) == [recs[1], recs[2]]
+        assert rank(recs) == [recs[1], recs[2], recs[0], recs[3]]
+
+    def test_negative_k(self):
+        with pytest.raises(ValueError):
+            TopK(-1)
+
+
+class TestColumnar:
+    """Tests for the argpartition path."""
+
+    @pytest.mark.parametrize("k", [0, 1, 7, 100, 2000, 3000])
+    def test_indices_match_stable_argsort(self, many, k):
+        scores = np.array([r["pain_score"] for r in many])
+        expected = np.argsort(-scores, kind="stable")[:k]
+        assert top_k_indices(scores, k).tolist() == expected.tolist()
+
+    def test_records_and_precomputed_scores(self, many):
+        assert top_k_columnar(many, 10) == _reference(many, 10)
+        scores = [r["revenue_potential_score"] for r in many]
+        assert top_k_columnar(many, 3, scores=scores) == _reference(many, 3, "revenue_potential_score")
+
+
+def test_top_k_rejects_negative_k():
+    with pytest.raises(ValueError):
+        top_k([], -1)
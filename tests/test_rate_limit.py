@@ -0,0 +1,133 @@
+"""Tests for rate limiting primitives in src/rate_limit.py."""
+import threading
+
+import pytest
+
+from src.rate_limit import (
+    BucketStore,
+    ConcurrencyLimiter,
+    InMemoryBucketStore,
+    RequestBudget,
+    TokenBucketLimiter,
+    retry_after_header,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucketLimiter:
+    """Tests for the per-key token bucket."""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=1.0, capacity=3, clock=clock)
+        assert [limiter.take("a")[0] for _ in range(4)] == [True, True, True, False]
+        allowed, retry_after = limiter.take("a")
+        assert not allowed and retry_after == pytest.approx(1.0)
+        clock.now = 2.0
+        assert limiter.take("a") == (True, 0.0)
+        assert limiter.take("a")[0] is True
+        assert limiter.take("a")[0] is False
+
+    def test_keys_are_independent(self):
+        limiter = TokenBucketLimiter(rate=1.0, capacity=1, clock=FakeClock())
+        assert limiter.take("a")[0]
+        assert not limiter.take("a")[0]
+        assert limiter.take("b")[0]
+
+    def test_cost_above_capacity_never_allowed(self):
+        limiter = TokenBucketLimiter(rate=2.0, capacity=4, clock=FakeClock())
+        assert limiter.take("a", cost=10) == (False, 5.0)
+
+    def test_default_capacity_and_validation(self):
+        assert TokenBucketLimiter(rate=0.5).capacity == 1.0
+        assert TokenBucketLimiter(rate=5).capacity == 5
+        with pytest.raises(ValueError):
+            TokenBucketLimiter(rate=0)
+
+    def test_store_evicts_least_recently_used_keys(self):
+        store = InMemoryBucketStore(max_keys=2)
+        limiter = TokenBucketLimiter(rate=1.0, capacity=1, store=store, clock=FakeClock())
+        limiter.take("a")
+        limiter.take("b")
+        limiter.take("c")
+        assert len(store) == 2
+        # 'a' was evicted, so it starts from a full bucket again
+        assert limiter.take("a")[0]
+
+    def test_custom_store_is_used(self):
+        class DenyAll(BucketStore):
+            def take(self, key, cost, rate, capacity, now):
+                return False, 7.0
+
+        assert TokenBucketLimiter(rate=1, store=DenyAll()).take("x") == (False, 7.0)
+        with pytest.raises(NotImplementedError):
+            BucketStore().take("x", 1, 1, 1, 0)
+
+    def test_retry_after_header(self):
+        assert retry_after_header(0.01) == "1"
+        assert retry_after_header(2.2) == "3"
+
+
+class TestConcurrencyLimiter:
+    """Tests for the non-blocking concurrency bound."""
+
+    def test_rejects_when_full_and_recovers(self):
+        limiter = ConcurrencyLimiter(2)
+        assert limiter.try_acquire() and limiter.try_acquire()
+        assert limiter.in_flight == 2
+        assert not limiter.try_acquire()
+        limiter.release()
+        assert limiter.in_flight == 1
+        assert limiter.try_acquire()
+
+    def test_release_from_other_thread(self):
+        limiter = ConcurrencyLimiter(1)
+        assert limiter.try_acquire()
+        t = threading.Thread(target=limiter.release)
+        t.start()
+        t.join()
+        assert limiter.try_acquire()
+
+    def test_over_release_raises(self):
+        limiter = ConcurrencyLimiter(1)
+        with pytest.raises(ValueError):
+            limiter.release()
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(0)
+
+
+class TestRequestBudget:
+    """Tests for the non-refilling request budget."""
+
+    def test_spends_until_exhausted(self):
+        budget = RequestBudget(3)
+        assert budget.try_spend() and budget.try_spend(2)
+        assert not budget.try_spend()
+        assert (budget.used, budget.remaining) == (3, 0)
+
+    def test_concurrent_spending_never_overshoots(self):
+        budget = RequestBudget(100)
+        granted = []
+
+        def worker():
+            granted.append(sum(budget.try_spend() for _ in range(50)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(granted) == 100 and budget.used == 100
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            RequestBudget(-1)
@@ -0,0 +1,143 @@
+"""Tests for the compact PainPointRecord type in src/records.py."""
+import sys
+from unittest.mock import patch, Mock
+
+import pytest
+
+from src.analyze import transform_to_schema
+from src.competitor_detector import detect_competitors
+from src.records import PainPointRecord, UNSET, records_to_dicts
+from src.revenue_estimator import estimate_revenue_potential
+from src.scoring import calculate_pain_score
+from src.solution_generator import generate_solutions, SOLUTION_TEMPLATES
+
+
+RAW_ITEMS = [
+    {
+        "title": "Bug causing crashes on mobile",
+        "selftext": "The app keeps crashing. This is a serious issue.",
+        "subreddit": "startups",
+        "date": "2025-01-02T11:00:00Z",
+        "full_link": "https://reddit.com/r/startups/test2",
+    },
+    {
+        "title": "General feedback about the product",
+        "selftext": "I have some thoughts about the UI design.",
+        "subreddit": "startups",
+        "date": "2025-01-05T14:00:00Z",
+        "full_link": "https://reddit.com/r/startups/test5",
+    },
+]
+
+
+def _run_pipeline(compact):
+    records = transform_to_schema(RAW_ITEMS, compact=compact)
+    records = calculate_pain_score(records)
+    records = generate_solutions(records)
+    with patch("src.competitor_detector.http.get") as mock_get:
+        resp = Mock()
+        resp.status_code = 200
+        resp.json.return_value = {"total_count": 0}
+        mock_get.return_value = resp
+        records = detect_competitors(records)
+    return estimate_revenue_potential(records)
+
+
+class TestPainPointRecord:
+    """Tests for the mapping surface of PainPointRecord."""
+
+    def test_has_no_instance_dict(self):
+        """Test that records use slots only."""
+        rec = PainPointRecord(category="Bugs")
+        assert not hasattr(rec, "__dict__")
+
+    def test_unset_fields_behave_like_missing_keys(self):
+        """Test that unset fields fall back to the get() default."""
+        rec = PainPointRecord()
+        assert rec.get("pain_score", 50) == 50
+        assert rec.get("not_a_field") is None
+        assert "pain_score" not in rec
+        with pytest.raises(KeyError):
+            rec["pain_score"]
+
+    def test_explicit_none_is_kept(self):
+        """Test that an explicit None is distinguishable from unset."""
+        rec = PainPointRecord(comment_or_content=None)
+        assert "comment_or_content" in rec
+        assert rec.get("comment_or_content", "x") is None
+
+    def test_setitem_interns_low_cardinality_strings(self):
+        """Test that category/subreddit strings are shared across records."""
+        a = PainPointRecord(subreddit="".join(["Sa", "aS"]))
+        b = PainPointRecord()
+        b["subreddit"] = "".join(["S", "aaS"])
+        assert a.subreddit is b.subreddit
+        assert a.subreddit is sys.intern("SaaS")
+
+    def test_unknown_keys_go_to_extra(self):
+        """Test that non-schema keys are stored in the lazily created extra dict."""
+        rec = PainPointRecord()
+        assert rec.extra is None
+        rec["custom"] = 1
+        assert rec["custom"] == 1
+        assert rec.extra == {"custom": 1}
+
+    def test_setdefault(self):
+        """Test setdefault only writes missing keys."""
+        rec = PainPointRecord(notes="keep")
+        assert rec.setdefault("notes", "new") == "keep"
+        assert rec.setdefault("pain_score", 10) == 10
+        assert rec.pain_score == 10
+
+    def test_solution_fields_resolve_from_template(self):
+        """Test that suggested_* fields are resolved from the referenced template."""
+        rec = PainPointRecord(solution_key="Other")
+        template = SOLUTION_TEMPLATES["Other"]
+        assert rec["suggested_product_idea"] is template["idea"]
+        assert rec["suggested_features"] == ", ".join(template["features"])
+        assert rec.get("suggested_mvp") == template["mvp"]
+
+    def test_solution_field_override(self):
+        """Test that an explicitly written suggested_* value wins over the template."""
+        rec = PainPointRecord(solution_key="Other")
+        rec["suggested_mvp"] = "custom"
+        out = rec.to_dict()
+        assert out["suggested_mvp"] == "custom"
+        assert list(out).count("suggested_mvp") == 1
+
+    def test_to_dict_omits_unset_and_from_dict_roundtrip(self):
+        """Test dict conversion in both directions."""
+        data = {"date": "2025-01-01", "category": "Bugs", "pain_score": 42, "x": "y"}
+        rec = PainPointRecord.from_dict(data)
+        assert rec.to_dict() == data
+        assert repr(UNSET) == "UNSET"
+
+    def test_state_roundtrip_keeps_solution_key(self):
+        """Test that to_state/from_state round-trip the stored fields exactly."""
+        rec = PainPointRecord(category="Bugs", pain_score=None, solution_key="Bugs")
+        rec["suggested_mvp"] = "custom"
+        state = rec.to_state()
+        assert state == {"category": "Bugs", "pain_score": None, "solution_key": "Bugs", "extra": {"suggested_mvp": "custom"}}
+        restored = PainPointRecord.from_state(state)
+        assert restored.to_dict() == rec.to_dict() and restored.solution_key == "Bugs"
+        assert PainPointRecord.from_state({"category": "Bugs"}).extra is None
+
+
+class TestCompactPipeline:
+    """Tests that every stage accepts compact records."""
+
+    def test_transform_compact_returns_records(self):
+        """Test that compact=True yields PainPointRecord instances."""
+        records = transform_to_schema(RAW_ITEMS, compact=True)
+        assert all(isinstance(r, PainPointRecord) for r in records)
+        assert records[0].category == "Bugs"
+
+    def test_compact_pipeline_matches_dict_pipeline(self):
+        """Test that the compact path exports exactly what the dict path produces."""
+        compact = records_to_dicts(_run_pipeline(compact=True))
+        assert compact == records_to_dicts(_run_pipeline(compact=False))
+
+    def test_records_to_dicts_passes_dicts_through(self):
+        """Test that plain dicts are returned unchanged."""
+        d = {"a": 1}
+        assert records_to_dicts([d])[0] is d
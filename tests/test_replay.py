@@ -0,0 +1,161 @@
+"""Tests for the record/replay layer in src/replay.py."""
+import asyncio
+import json
+import os
+from unittest.mock import patch, Mock
+
+import pytest
+
+from src import replay
+from src.replay import (
+    ReplayMissError,
+    current_mode,
+    read_snapshot,
+    replayable,
+    snapshot_path,
+    write_snapshot,
+)
+from src.scrape_reddit import get_submissions
+from src.browseai_runner import run_browseai_job
+from src.sources import BrowseAISource, FetchExecutor
+
+
+@pytest.fixture
+def snapdir(tmp_path):
+    return str(tmp_path / "snaps")
+
+
+def _env(mode, directory):
+    return patch.dict(os.environ, {replay.MODE_ENV: mode, replay.DIR_ENV: directory})
+
+
+class TestSnapshots:
+    """Tests for snapshot naming and (de)serialization."""
+
+    def test_path_is_stable_and_order_independent(self, snapdir):
+        a = snapshot_path("pushshift", {"subreddit": "SaaS", "size": 5}, snapdir)
+        b = snapshot_path("pushshift", {"size": 5, "subreddit": "SaaS"}, snapdir)
+        c = snapshot_path("pushshift", {"subreddit": "SaaS", "size": 6}, snapdir)
+        assert a == b != c
+        assert a.endswith(".ndjson.gz")
+
+    def test_roundtrip_list_and_object(self, snapdir):
+        path = os.path.join(snapdir, "x.ndjson.gz")
+        write_snapshot(path, "s", {"q": 1}, [{"a": 1}, {"b": 2}])
+        assert read_snapshot(path) == [{"a": 1}, {"b": 2}]
+        write_snapshot(path, "s", {"q": 1}, {"status": "done", "data": [1]})
+        assert read_snapshot(path) == {"status": "done", "data": [1]}
+        assert os.listdir(snapdir) == ["x.ndjson.gz"]
+
+    def test_mode_validation(self):
+        with patch.dict(os.environ, {replay.MODE_ENV: ""}):
+            assert current_mode() == "off"
+        with patch.dict(os.environ, {replay.MODE_ENV: "bogus"}):
+            with pytest.raises(ValueError):
+                current_mode()
+
+
+class TestReplayable:
+    """Tests for the decorator in each mode."""
+
+    def test_record_then_replay_sync(self, snapdir):
+        calls = []
+
+        @replayable("demo", key_args=("query",))
+        def fetch(query, api_key="secret"):
+            calls.append(query)
+            return [{"q": query}]
+
+        with _env("record", snapdir):
+            assert fetch("x") == [{"q": "x"}]
+        with _env("replay", snapdir):
+            assert fetch("x", api_key="other") == [{"q": "x"}]
+            with pytest.raises(ReplayMissError):
+                fetch("y")
+        with _env("off", snapdir):
+            fetch("z")
+        assert calls == ["x", "z"]
+        # API key is not part of the snapshot key or contents
+        with open(snapshot_path("demo", {"query": "x"}, snapdir), "rb") as f:
+            assert b"secret" not in f.read()
+
+    def test_record_then_replay_async(self, snapdir):
+        calls = []
+
+        @replayable("demo", key_args=("query",))
+        async def fetch(query):
+            calls.append(query)
+            return {"q": query}
+
+        with _env("off", snapdir):
+            assert asyncio.run(fetch("x")) == {"q": "x"}
+        with _env("record", snapdir):
+            asyncio.run(fetch("x"))
+        with _env("replay", snapdir):
+            assert asyncio.run(fetch("x")) == {"q": "x"}
+        assert calls == ["x", "x"]
+
+    def test_record_then_replay_stream(self, snapdir):
+        calls = []
+
+        @replayable("demo", key_args=("query",), stream=True)
+        def fetch(query):
+            calls.append(query)
+            return ({"i": i} for i in range(3))
+
+        with _env("record", snapdir):
+            items = fetch("x")
+            assert not isinstance(items, list) and list(items) == [{"i": 0}, {"i": 1}, {"i": 2}]
+        with _env("replay", snapdir):
+            assert list(fetch("x")) == [{"i": 0}, {"i": 1}, {"i": 2}]
+            with pytest.raises(ReplayMissError):
+                fetch("y")
+        assert calls == ["x"]
+
+
+class TestSourceIntegration:
+    """Tests that the scraping sources are wired through the replay layer."""
+
+    def test_pushshift_replay_without_network(self, snapdir):
+        item = {"created_utc": 1700000000, "subreddit": "SaaS", "title": "t", "selftext": "b", "permalink": "/p", "id": "1"}
+        resp = Mock()
+        resp.raise_for_status.return_value = None
+        resp.json.return_value = {"data": [item]}
+        with _env("record", snapdir), patch("src.scrape_reddit.http.get", return_value=resp):
+            recorded = get_submissions(["SaaS"], limit_per_sub=1)
+        with _env("replay", snapdir), patch("src.scrape_reddit.http.get", side_effect=AssertionError("network")):
+            assert get_submissions(["SaaS"], limit_per_sub=1) == recorded
+            with pytest.raises(ReplayMissError):
+                get_submissions(["startups"], limit_per_sub=1)
+
+    def test_browseai_replay_without_network(self, snapdir):
+        resp = Mock()
+        resp.raise_for_status.return_value = None
+        resp.json.return_value = {"data": [{"id": 1}]}
+        with _env("record", snapdir), patch("src.browseai_runner.http.post", return_value=resp):
+            run_browseai_job("https://run", "sk", payload={"p": 1})
+        with _env("replay", snapdir), patch("src.browseai_runner.http.post", side_effect=AssertionError("network")):
+            assert run_browseai_job("https://run", "other-key", payload={"p": 1}) == {"data": [{"id": 1}]}
+
+    def test_browseai_export_replay_without_network(self, snapdir, tmp_path):
+        run_result = {"status": "done", "export_url": "https://x/exports/run.ndjson"}
+
+        def download(url, dest, headers=None):
+            with open(dest, "w") as f:
+                f.write(json.dumps({"title": "from export"}) + "\n")
+            return dest
+
+        async def run(*args, **kwargs):
+            return run_result
+
+        def crawl():
+            source = BrowseAISource("https://run", "sk", export_dir=str(tmp_path))
+            return list(FetchExecutor().run([source])["browseai"])
+
+        with _env("record", snapdir), patch("src.browseai_async._run_job", run), \
+                patch("src.stream_ingest.download_export", side_effect=download):
+            assert crawl() == [{"title": "from export"}]
+        with _env("replay", snapdir), patch("src.browseai_async._run_job", side_effect=AssertionError("network")), \
+                patch("src.stream_ingest.download_export", side_effect=AssertionError("network")):
+            assert crawl() == [{"title": "from export"}]
+        assert not os.path.exists(tmp_path / "run.ndjson")
@@ -0,0 +1,179 @@
+"""Tests for the declarative rule engine in src/rules.py."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+import src.rules as rules_module
+from src.rules import RuleStore, RulesError, compile_rules, current_rules, load_rules, rules_store
+from src.tokenizer import tokenize_text
+
+
+def _compile(rule_sets, **top):
+    return compile_rules(json.dumps(dict(top, rule_sets=rule_sets)).encode("utf-8"))
+
+
+class TestBundledRules:
+    """The bundled rules file reproduces the original keyword heuristics."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("The export keeps crashing, it's blocking us", {"category": "Bugs", "severity": 5, "emotional_intensity": 5, "buying_signals": 0}),
+        ("Too expensive, looking for an alternative", {"category": "Pricing", "severity": 2, "emotional_intensity": 1, "buying_signals": 3}),
+        ("Dashboard is slow and annoying", {"category": "Performance", "severity": 3, "emotional_intensity": 3, "buying_signals": 0}),
+        ("Hello world", {"category": "Other", "severity": 2, "emotional_intensity": 1, "buying_signals": 0}),
+    ])
+    def test_evaluate(self, text, expected):
+        assert current_rules().evaluate(text) == expected
+
+    @pytest.mark.parametrize("text", ["a happy canvas", "the flag is a needle"])
+    def test_keywords_do_not_match_inside_words(self, text):
+        # "app", "vs", "lag" and "need" used to hit as substrings
+        assert current_rules().evaluate(text) == {"category": "Other", "severity": 2, "emotional_intensity": 1, "buying_signals": 0}
+
+    def test_inflections_and_prefixes(self):
+        rules = current_rules()
+        assert rules.classify("category", "The system crashed") == "Bugs"
+        assert rules.classify("severity", "Frustrating!") == 3
+        assert rules.classify("buying_signals", "Apps vs. spreadsheets") == 3
+
+
+class TestCompiledRules:
+    """Tests for rule set modes and matching options."""
+
+    def test_modes(self):
+        rules = _compile({
+            "first": {"mode": "first", "default": "none", "rules": [
+                {"value": "a", "terms": ["alpha"]}, {"value": "b", "terms": ["beta"]}]},
+            "max": {"mode": "max", "default": 0, "rules": [
+                {"value": 1, "terms": ["alpha"]}, {"value": 3, "terms": ["beta"]}]},
+            "sum": {"mode": "sum", "default": 0, "cap": 4, "rules": [
+                {"value": 3, "terms": ["alpha"]}, {"value": 3, "terms": ["beta"]}, {"value": 1, "terms": ["gamma"]}]},
+            "uncapped": {"mode": "sum", "default": 0, "rules": [
+                {"value": 3, "terms": ["alpha"]}, {"value": 3, "terms": ["beta"]}]},
+        })
+        assert rules.evaluate("beta then alpha") == {"first": "a", "max": 3, "sum": 4, "uncapped": 6}
+        assert rules.evaluate("gamma") == {"first": "none", "max": 0, "sum": 1, "uncapped": 0}
+        assert len(rules) == 9
+
+    def test_words_prefixes_and_phrases(self):
+        rules = _compile({"tags": {"mode": "sum", "default": 0, "rules": [
+            {"value": 1, "terms": ["annoy*"]},
+            {"value": 10, "terms": ["app"]},
+            {"value": 100, "terms": ["Rage Quit"]},
+            {"value": 1000, "terms": ["would never pay"]},
+        ]}})
+        assert rules.classify("tags", "ANNOYING app") == 11
+        assert rules.classify("tags", "happy annoy") == 1
+        assert rules.classify("tags", "almost rage-quit") == 100
+        assert rules.classify("tags", "I would never pay") == 1000
+        assert rules.classify("tags", "would never say pay") == 0
+        assert rules.classify("tags", None) == 0
+
+    def test_accepts_pretokenized_text(self):
+        rules = _compile({"c": {"rules": [{"value": "Bugs", "terms": ["crash"]}]}})
+        assert rules.classify("c", tokenize_text("It will crash")) == "Bugs"
+
+    def test_negation(self):
+        rules = _compile(
+            {"pricing": {"mode": "first", "default": None, "negation": True, "rules": [{"value": "Pricing", "terms": ["expensive"]}]}},
+            negators=["not", "never"],
+            negation_window=2,
+        )
+        assert rules.classify("pricing", "it is expensive") == "Pricing"
+        assert rules.classify("pricing", "it is not expensive") is None
+        assert rules.classify("pricing", "not really that expensive") == "Pricing"
+        assert rules.classify("pricing", "Never expensive, but later: expensive!") == "Pricing"
+
+    def test_negation_of_prefixes_and_phrases(self):
+        rules = _compile(
+            {"s": {"mode": "max", "default": 0, "negation": True, "rules": [
+                {"value": 1, "terms": ["frustrat*"]}, {"value": 2, "terms": ["looking for"]}]}},
+            negators=["not"],
+        )
+        assert rules.classify("s", "not frustrating, not looking for anything") == 0
+        assert rules.classify("s", "frustrating") == 1
+        assert rules.classify("s", "now looking for help") == 2
+
+    def test_cache_by_content_hash(self):
+        content = json.dumps({"rule_sets": {"c": {"rules": [{"value": "x", "terms": ["y"]}]}}}).encode()
+        first = compile_rules(content)
+        assert compile_rules(content) is first
+        assert compile_rules(content + b" ") is not first
+
+    @pytest.mark.parametrize("content, message", [
+        (b"{", "invalid JSON"),
+        (b"[]", "must contain a mapping"),
+        (b"{}", "non-empty 'rule_sets'"),
+        (b'{"rule_sets": {"c": []}}', "must be a mapping"),
+        (b'{"rule_sets": {"c": {"mode": "avg"}}}', "mode must be one of"),
+        (b'{"rule_sets": {"c": {"rules": [{"value": 1}]}}}', "needs 'value'"),
+        (b'{"rule_sets": {"c": {"mode": "max", "rules": [{"value": "a", "terms": ["b"]}]}}}', "numeric values"),
+        (b'{"rule_sets": {"c": {"rules": [{"value": "a", "terms": ["--"]}]}}}', "has no words"),
+        (b'{"rule_sets": {"c": {"rules": [{"value": "a", "terms": ["two words*"]}]}}}', "single word"),
+    ])
+    def test_invalid_rules(self, content, message):
+        with pytest.raises(RulesError, match=message):
+            compile_rules(content)
+
+
+class TestLoading:
+    """Tests for rule files on disk and hot reloading."""
+
+    def test_yaml_rules(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "rules.yaml"
+        path.write_text("rule_sets:\n  c:\n    rules:\n      - {value: Bugs, terms: [glitch]}\n")
+        assert load_rules(str(path)).classify("c", "A glitch") == "Bugs"
+        path.write_text("rule_sets: [\n")
+        with pytest.raises(RulesError, match="invalid YAML"):
+            load_rules(str(path))
+
+    def test_yaml_needs_pyyaml(self):
+        with patch.object(rules_module, "yaml", None), pytest.raises(RulesError, match="PyYAML"):
+            compile_rules(b"rule_sets: {}", fmt="yaml")
+
+    def test_store_reloads_changed_file(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rule_sets": {"c": {"rules": [{"value": "A", "terms": ["x"]}]}}}))
+        now = [0.0]
+        store = RuleStore(str(path), check_interval=5.0, clock=lambda: now[0])
+        first = store.get()
+        assert first.classify("c", "x") == "A"
+
+        path.write_text(json.dumps({"rule_sets": {"c": {"rules": [{"value": "B", "terms": ["x"]}]}}}))
+        os.utime(path, ns=(1, 10**18))
+        assert store.get() is first  # within the check interval
+        now[0] = 6.0
+        assert store.get().classify("c", "x") == "B"
+
+    def test_store_keeps_last_good_rules(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rule_sets": {"c": {"rules": [{"value": "A", "terms": ["x"]}]}}}))
+        store = RuleStore(str(path), check_interval=0)
+        good = store.get()
+        path.write_text("{broken")
+        assert store.get() is good and "invalid JSON" in store.last_error
+        required = RuleStore(str(path), check_interval=0, required=("c",))
+        path.write_text(json.dumps({"rule_sets": {"d": {"rules": []}}}))
+        with pytest.raises(RulesError, match="missing rule sets: c"):
+            required.get()
+        path.unlink()
+        assert store.get() is good and store.last_error
+
+    def test_store_raises_without_initial_rules(self, tmp_path):
+        with pytest.raises(OSError):
+            RuleStore(str(tmp_path / "missing.json")).get()
+        (tmp_path / "bad.json").write_text("{}")
+        with pytest.raises(RulesError):
+            RuleStore(str(tmp_path / "bad.json")).get()
+
+    def test_current_rules_follows_env(self, tmp_path):
+        path = tmp_path / "rules.json"
+        with open(rules_module.DEFAULT_PATH, encoding="utf-8") as f:
+            spec = json.load(f)
+        path.write_text(json.dumps(dict(spec, version=2)))
+        with patch.dict(os.environ, {"PAIN_RULES_PATH": str(path)}):
+            assert current_rules().version == 2
+            assert rules_store().path == str(path)
+        assert current_rules().version == 1
@@ -0,0 +1,196 @@
+"""Tests for the crawl scheduler and incremental runs in src/scheduler.py."""
+import csv
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.scheduler import CrawlJob, IncrementalCrawler, JobMetrics, Scheduler, SeenStore, load_jobs, schedule_cli
+from src.search_index import SearchIndex
+from src.trends import TrendEngine
+
+
+def _post(i, sub="SaaS", title="Export keeps crashing"):
+    return {"id": str(i), "title": f"{title} {i}", "selftext": "so annoying", "subreddit": sub,
+            "permalink": f"/r/{sub}/{i}", "created_utc": 1700000000 + i, "num_comments": i}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCrawlJob:
+    """Job definitions from flags and JSON."""
+
+    def test_from_dict(self, tmp_path):
+        job = CrawlJob.from_dict({"subreddits": "SaaS, startups", "interval": 60, "keywords": ["csv"]})
+        assert (job.name, job.subreddits, job.interval, job.keywords, job.limit) == ("SaaS,startups", ["SaaS", "startups"], 60.0, ["csv"], 25)
+        with pytest.raises(ValueError, match="no subreddits"):
+            CrawlJob.from_dict({"name": "empty"})
+        with pytest.raises(ValueError, match="interval"):
+            CrawlJob.from_dict({"subreddits": ["SaaS"], "interval": 0})
+        path = tmp_path / "jobs.json"
+        path.write_text(json.dumps({"jobs": [{"name": "a", "subreddits": ["SaaS"]}]}))
+        assert [j.name for j in load_jobs(str(path))] == ["a"]
+        path.write_text(json.dumps([{"subreddits": ["x"]}, {"subreddits": ["y"]}]))
+        assert [j.name for j in load_jobs(str(path))] == ["x", "y"]
+
+
+class TestSeenStore:
+    """Bounded, persisted set of processed posts."""
+
+    def test_evicts_oldest_and_persists(self, tmp_path):
+        path = str(tmp_path / "seen.json")
+        seen = SeenStore(path, max_entries=3)
+        seen.add_many(["a", "b", "c"])
+        seen.add_many(["a", "d"])  # "a" is refreshed, "b" is the oldest
+        assert "b" not in seen and {"a", "c", "d"} == {u for u in "abcd" if u in seen}
+        seen.save()
+        assert len(SeenStore(path)) == 3
+        SeenStore().save()  # in-memory stores are not written
+
+
+class TestScheduler:
+    """Intervals, overlap protection and job metrics."""
+
+    def test_runs_due_jobs_on_their_intervals(self):
+        clock = FakeClock()
+        calls = []
+        jobs = [CrawlJob("fast", ["a"], interval=10), CrawlJob("slow", ["b"], interval=30)]
+        scheduler = Scheduler(jobs, lambda job: calls.append(job.name) or {"fetched": 2, "new": 1}, clock=clock)
+        try:
+            for t in (0, 5, 10, 20, 30):
+                clock.now = t
+                scheduler.tick()
+                for future in scheduler._running.values():
+                    future.result()
+        finally:
+            scheduler.shutdown()
+        assert calls.count("fast") == 4 and calls.count("slow") == 2
+        m = scheduler.metrics["fast"]
+        assert (m.runs, m.fetched, m.new_records, m.failures) == (4, 8, 4, 0)
+        assert m.next_run_at == 40 and scheduler.seconds_until_due() == 10
+
+    def test_overlapping_run_is_skipped(self):
+        clock = FakeClock()
+        release = threading.Event()
+        finished = []
+        job = CrawlJob("slow", ["a"], interval=10)
+        scheduler = Scheduler([job], lambda job: release.wait(5) and {}, clock=clock,
+                              on_finish=lambda job, m: finished.append(m.runs))
+        try:
+            assert scheduler.tick() == ["slow"]
+            clock.now = 10
+            assert scheduler.tick() == []
+            assert scheduler.metrics["slow"].skipped_overlap == 1
+            release.set()
+            scheduler._running["slow"].result()
+            clock.now = 20
+            assert scheduler.tick() == ["slow"]
+        finally:
+            scheduler.shutdown()
+        assert finished == [1, 2]
+
+    def test_failures_are_recorded(self):
+        def boom(job):
+            raise ConnectionError("pushshift down")
+
+        scheduler = Scheduler([CrawlJob("a", ["a"])], boom)
+        scheduler.tick()
+        scheduler.shutdown()
+        m = scheduler.metrics["a"]
+        assert (m.runs, m.failures, m.last_error) == (1, 1, "ConnectionError: pushshift down")
+        assert isinstance(m, JobMetrics) and m.to_dict()["last_duration_s"] >= 0
+
+    def test_run_forever_stops(self):
+        stop = threading.Event()
+        scheduler = Scheduler([CrawlJob("a", ["a"])], lambda job: stop.set() or {})
+        scheduler.run_forever(stop, poll=0.01)
+        assert scheduler.metrics["a"].runs == 1
+
+    def test_rejects_duplicate_names(self):
+        with pytest.raises(ValueError, match="unique job names"):
+            Scheduler([CrawlJob("a", ["x"]), CrawlJob("a", ["y"])], lambda job: {})
+
+
+class TestIncrementalCrawler:
+    """Only new posts are processed and appended."""
+
+    def test_second_run_processes_only_new_posts(self, tmp_path):
+        pages = {"SaaS": [_post(1), _post(2)]}
+        csv_path = str(tmp_path / "out.csv")
+        index = SearchIndex(str(tmp_path / "search.db"))
+        crawler = IncrementalCrawler(
+            SeenStore(str(tmp_path / "seen.json")), csv_path=csv_path, search_index=index,
+            trends_file=str(tmp_path / "trends.json"),
+        )
+        job = CrawlJob("saas", ["SaaS"])
+        with patch("src.sources._fetch_submissions", side_effect=lambda sub, size, retries: pages[sub]):
+            assert crawler.run(job) == {"fetched": 2, "new": 2}
+            pages["SaaS"] = [_post(3), _post(2)]
+            assert crawler.run(job) == {"fetched": 2, "new": 1}
+            assert crawler.run(job) == {"fetched": 2, "new": 0}
+        with open(csv_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [r["post_url"] for r in rows] == [f"https://reddit.com/r/SaaS/{i}" for i in (1, 2, 3)]
+        assert rows[0]["category"] == "Bugs" and rows[0]["pain_score"]
+        assert len(index) == 3
+        index.close()
+        assert len(TrendEngine.load(str(tmp_path / "trends.json")).seen) == 3
+        assert len(SeenStore(str(tmp_path / "seen.json"))) == 3
+
+    def test_failed_update_does_not_duplicate_csv_rows(self, tmp_path):
+        csv_path = str(tmp_path / "out.csv")
+        index = SearchIndex(str(tmp_path / "search.db"))
+        crawler = IncrementalCrawler(SeenStore(str(tmp_path / "seen.json")), csv_path=csv_path, search_index=index)
+        job = CrawlJob("saas", ["SaaS"])
+        with patch("src.sources._fetch_submissions", return_value=[_post(1), _post(2)]):
+            with patch.object(index, "add_records", side_effect=OSError("disk full")):
+                with pytest.raises(OSError):
+                    crawler.run(job)
+            assert crawler.run(job) == {"fetched": 2, "new": 2}
+        with open(csv_path, newline="") as f:
+            assert len(list(csv.DictReader(f))) == 2
+        assert len(index) == 2
+        index.close()
+
+    def test_fetch_failure_raises(self, tmp_path):
+        crawler = IncrementalCrawler(SeenStore(), csv_path=str(tmp_path / "out.csv"), retries=0)
+        with patch("src.sources._fetch_submissions", side_effect=ConnectionError("down")):
+            with pytest.raises(RuntimeError, match="ConnectionError: down"):
+                crawler.run(CrawlJob("saas", ["SaaS"]))
+
+
+def test_schedule_cli_runs_jobs_until_stopped(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv("TRENDS_STATE_PATH", str(tmp_path / "trends.json"))
+    stop = threading.Event()
+    jobs = tmp_path / "jobs.json"
+    jobs.write_text(json.dumps([{"name": "saas", "subreddits": ["SaaS"], "interval": 3600}]))
+
+    def fetch(sub, size, retries):
+        stop.set()
+        return [_post(1)]
+
+    with patch("src.sources._fetch_submissions", side_effect=fetch):
+        code = schedule_cli(["--jobs", str(jobs), "--csv", str(tmp_path / "out.csv"),
+                             "--seen", str(tmp_path / "seen.json"), "--no-index"], stop=stop)
+    assert code == 0
+    out = capsys.readouterr().out
+    assert "Scheduling 1 job(s): saas every 3600s" in out
+    assert "[saas] run 1 ok" in out and '"new_records": 1' in out
+
+    from src.main import main
+
+    monkeypatch.setenv("SEARCH_INDEX_PATH", str(tmp_path / "search.db"))
+    with patch("src.scheduler.Scheduler.run_forever", side_effect=KeyboardInterrupt) as run_forever, \
+         patch("src.scheduler.signal.signal") as on_signal:
+        assert main(["schedule", "--subreddits", "SaaS,startups", "--interval", "60",
+                     "--seen", str(tmp_path / "seen.json"), "--csv", str(tmp_path / "out.csv")]) == 0
+    assert "SaaS every 60s, startups every 60s" in capsys.readouterr().out
+    run_forever.assert_called_once()
+    on_signal.assert_called_once()
@@ -1,5 +1,16 @@
+from datetime import datetime, UTC
+
 import pytest
 from src.scoring import calculate_pain_score, _count_emotional_intensity, _detect_buying_signals
+from src.scoring import (
+    DEFAULT_PROFILE,
+    LEGACY_PROFILE,
+    PROFILES,
+    ScoringProfile,
+    engagement_points,
+    get_profile,
+    recency_factor,
+)
 
 
 def test_count_emotional_intensity_levels():
@@ -73,3 +84,58 @@ def test_calculate_pain_score_recurrence_effect():
     repeated_scores = [r["pain_score"] for r in out[:-1]]
     single_score = out[-1]["pain_score"]
     assert min(repeated_scores) >= single_score
+
+
+class TestScoringProfiles:
+    """Tests for engagement and recency components."""
+
+    NOW = datetime(2025, 6, 1, tzinfo=UTC)
+
+    def _rec(self, **extra):
+        rec = {
+            "category": "bugs", "subreddit": "SaaS", "severity_rating": 3,
+            "pain_summary": "annoying issue", "comment_or_content": "looking for a tool",
+        }
+        rec.update(extra)
+        return rec
+
+    def test_legacy_profile_ignores_engagement_and_age(self):
+        plain = calculate_pain_score([self._rec()], profile=LEGACY_PROFILE)[0]["pain_score"]
+        busy_old = calculate_pain_score(
+            [self._rec(post_score=5000, num_comments=900, date="2015-01-01T00:00:00Z")],
+            profile="legacy", now=self.NOW,
+        )[0]["pain_score"]
+        # annoying(3)*4 + tool(2)*4 + (3-1)*5 + 0.5M subs -> 10 + recurrence 20
+        assert plain == busy_old == 60
+
+    def test_engagement_adds_points(self):
+        out = calculate_pain_score(
+            [self._rec(), self._rec(post_score=40, num_comments=10, upvote_ratio=0.9), self._rec(post_score=10**6, num_comments=10**4)],
+            profile=ScoringProfile(recency_half_life_days=None),
+        )
+        none, some, viral = (r["pain_score"] for r in out)
+        assert none == 60 and none < some < viral == 70
+
+    def test_recency_decays_older_posts(self):
+        records = [self._rec(date="2025-05-31T00:00:00Z"), self._rec(date="2024-12-03"), self._rec(date="2015-01-01"), self._rec(date="bad date!!")]
+        fresh, half, ancient, undated = (r["pain_score"] for r in calculate_pain_score(records, now=self.NOW))
+        assert (fresh, undated) == (59, 60)  # one day of decay truncates 60 -> 59
+        assert half == 45  # one half-life: 60 * (0.5 + 0.5 * 0.5)
+        assert ancient == 30  # floor
+
+    def test_profile_resolution(self):
+        assert get_profile(None) is DEFAULT_PROFILE
+        assert get_profile("trending") is PROFILES["trending"]
+        custom = ScoringProfile(engagement_points=0)
+        assert get_profile(custom) is custom
+        with pytest.raises(ValueError):
+            get_profile("nope")
+
+    def test_vector_components(self):
+        pts = engagement_points([0, 1000, float("nan")], [0, 0, 500], [None, 1.0, 0.5])
+        assert pts[0] == 0 and pts[1] == pytest.approx(10.0) and 0 < pts[2] <= 10
+        assert recency_factor([0, 180, float("nan")]).tolist() == [1.0, 0.75, 1.0]
+        assert recency_factor([365], LEGACY_PROFILE).tolist() == [1.0]
+
+    def test_empty_batch(self):
+        assert calculate_pain_score([]) == []
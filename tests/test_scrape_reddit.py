@@ -1,5 +1,10 @@
 from unittest.mock import patch, Mock
-from src.scrape_reddit import get_submissions
+
+import pytest
+
+from src.replay import ReplayMissError
+from src.scrape_reddit import CommentFetcher, get_submissions
+from src.sources import FetchExecutor, PushshiftSource
 
 
 def test_get_submissions_normalizes_fields():
@@ -11,8 +16,11 @@ def test_get_submissions_normalizes_fields():
         "full_link": "https://reddit.com/r/SaaS/comments/abc/test/",
         "selftext": "Body",
         "id": "abc",
+        "score": 42,
+        "num_comments": 7,
+        "upvote_ratio": 0.88,
     }
-    with patch("src.scrape_reddit.requests.get") as mock_get:
+    with patch("src.scrape_reddit.http.get") as mock_get:
         resp = Mock()
         resp.raise_for_status.return_value = None
         resp.json.return_value = {"data": [fake_item]}
@@ -25,6 +33,7 @@ def test_get_submissions_normalizes_fields():
         assert rec["title"] == "Test title"
         assert rec["full_link"].startswith("https://reddit.com")
         assert rec["date"].endswith("Z")
+        assert (rec["score"], rec["num_comments"], rec["upvote_ratio"]) == (42, 7, 0.88)
 
 
 def test_get_submissions_keyword_filtering():
@@ -32,7 +41,7 @@ def test_get_submissions_keyword_filtering():
         {"created_utc": 1700000000, "subreddit": "SaaS", "title": "Alpha", "selftext": "x", "permalink": "/p/1", "id": "1"},
         {"created_utc": 1700000001, "subreddit": "SaaS", "title": "Beta", "selftext": "contains keyword", "permalink": "/p/2", "id": "2"},
     ]
-    with patch("src.scrape_reddit.requests.get") as mock_get:
+    with patch("src.scrape_reddit.http.get") as mock_get:
         resp = Mock()
         resp.raise_for_status.return_value = None
         resp.json.return_value = {"data": items}
@@ -45,7 +54,139 @@ def test_get_submissions_keyword_filtering():
 
 def test_get_submissions_handles_fetch_exception():
     # Simulate requests.get raising to cover exception path
-    with patch("src.scrape_reddit.requests.get", side_effect=Exception("network")):
+    with patch("src.scrape_reddit.http.get", side_effect=Exception("network")):
         out = get_submissions(["SaaS"], keywords=None, limit_per_sub=1)
         assert isinstance(out, list)
         assert len(out) == 0
+
+
+def _thread(post_id, num_comments):
+    return {
+        "id": post_id,
+        "subreddit": "SaaS",
+        "title": f"Post {post_id}",
+        "full_link": f"https://reddit.com/r/SaaS/comments/{post_id}/",
+        "num_comments": num_comments,
+    }
+
+
+class FakeCommentAPI:
+    """Serves ``n`` comments per link_id, newest first, paged by ``before``."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.calls = []
+
+    def __call__(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        link, size, before = params["link_id"], params["size"], params.get("before")
+        created = [1700000000 + i for i in range(self.sizes.get(link, 0), 0, -1)]
+        if before:
+            created = [c for c in created if c < before]
+        data = [
+            {"id": f"{link}-{c}", "body": f"comment {c} is broken", "created_utc": c, "score": 2, "permalink": f"/r/SaaS/comments/{link}/x/{c}/"}
+            for c in created[:size]
+        ]
+        resp = Mock()
+        resp.raise_for_status.return_value = None
+        resp.json.return_value = {"data": data}
+        return resp
+
+
+class TestCommentFetcher:
+    """Tests for bounded comment fan-out."""
+
+    def test_fetches_top_threads_and_links_comments(self):
+        subs = [_thread("a", 3), _thread("b", 50), _thread("c", 0), {"title": "no id", "num_comments": 99}, _thread("d", 10)]
+        api = FakeCommentAPI({"a": 3, "b": 5, "d": 2})
+        fetcher = CommentFetcher(top_n=2, page_size=10)
+        with patch("src.scrape_reddit.http.get", side_effect=api):
+            items = list(fetcher.iter_comments(subs))
+        assert [c["link_id"] for c in api.calls] == ["b", "d"]
+        assert len(items) == 7 and fetcher.total_comments == 7
+        first = items[0]
+        assert first["parent_url"] == "https://reddit.com/r/SaaS/comments/b/"
+        assert first["parent_title"] == "Post b" and first["title"] == ""
+        assert first["selftext"].startswith("comment") and first["date"].endswith("Z")
+        assert first["full_link"].startswith("https://reddit.com/r/SaaS/comments/b/x/")
+        stats = fetcher.thread_stats["https://reddit.com/r/SaaS/comments/b/"]
+        assert stats == {
+            "parent_title": "Post b", "subreddit": "SaaS", "reported_comments": 50, "comments": 5,
+            "total_score": 10, "max_score": 2, "avg_score": 2.0, "truncated": False,
+        }
+
+    def test_pages_and_caps_each_thread(self):
+        api = FakeCommentAPI({"v": 10000})
+        fetcher = CommentFetcher(top_n=1, max_comments_per_thread=25, page_size=10)
+        with patch("src.scrape_reddit.http.get", side_effect=api):
+            items = list(fetcher.iter_comments([_thread("v", 10000)]))
+        assert len(items) == 25
+        assert [c["size"] for c in api.calls] == [10, 11, 6]  # one re-requested tie per page
+        assert "before" not in api.calls[0] and api.calls[1]["before"] == 1700009992
+        assert len({i["id"] for i in items}) == 25
+        assert fetcher.thread_stats["https://reddit.com/r/SaaS/comments/v/"]["truncated"] is True
+
+    def test_tied_timestamps_across_pages_are_not_skipped(self):
+        created = [1700000009] * 3 + [1700000005] * 5 + [1700000001] * 2
+        comments = [{"id": f"c{i}", "body": "x", "created_utc": c} for i, c in enumerate(created)]
+
+        def api(url, params=None, timeout=None):
+            rows = [c for c in comments if not params.get("before") or c["created_utc"] < params["before"]]
+            resp = Mock()
+            resp.json.return_value = {"data": rows[:params["size"]]}
+            return resp
+
+        fetcher = CommentFetcher(top_n=1, page_size=4)
+        with patch("src.scrape_reddit.http.get", side_effect=api) as get:
+            items = list(fetcher.iter_comments([_thread("t", 10)]))
+        assert [i["id"] for i in items] == [f"c{i}" for i in range(10)]
+        assert [call.kwargs["params"]["size"] for call in get.call_args_list] == [4, 5, 9]
+        assert fetcher.thread_stats["https://reddit.com/r/SaaS/comments/t/"]["truncated"] is False
+
+    def test_request_budget_is_global(self):
+        api = FakeCommentAPI({k: 100 for k in "abcdef"})
+        fetcher = CommentFetcher(top_n=6, max_requests=5, page_size=10, max_workers=3)
+        with patch("src.scrape_reddit.http.get", side_effect=api):
+            items = list(fetcher.iter_comments([_thread(k, 100) for k in "abcdef"]))
+        assert len(api.calls) == 5 and fetcher.requests_used == 5
+        assert len(items) == 50
+        assert all(s["truncated"] for s in fetcher.thread_stats.values())
+
+    def test_total_comment_cap_stops_iteration(self):
+        api = FakeCommentAPI({k: 30 for k in "abcd"})
+        fetcher = CommentFetcher(top_n=4, max_total_comments=40, page_size=50, max_workers=1)
+        with patch("src.scrape_reddit.http.get", side_effect=api):
+            items = list(fetcher.iter_comments([_thread(k, 30) for k in "abcd"]))
+        assert len(items) == 40
+        assert list(fetcher.thread_stats) == [f"https://reddit.com/r/SaaS/comments/{k}/" for k in "ab"]
+        assert fetcher.thread_stats["https://reddit.com/r/SaaS/comments/b/"]["comments"] == 10
+        assert fetcher.thread_stats["https://reddit.com/r/SaaS/comments/b/"]["truncated"] is True
+
+    def test_fetch_errors_end_the_thread(self):
+        fetcher = CommentFetcher(top_n=1)
+        with patch("src.scrape_reddit.http.get", side_effect=Exception("network")):
+            assert list(fetcher.iter_comments([_thread("a", 5)])) == []
+        assert fetcher.thread_stats["https://reddit.com/r/SaaS/comments/a/"]["comments"] == 0
+
+    def test_replay_miss_is_not_swallowed(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SCRAPE_REPLAY_MODE", "replay")
+        monkeypatch.setenv("SCRAPE_SNAPSHOT_DIR", str(tmp_path))
+        with pytest.raises(ReplayMissError):
+            list(CommentFetcher(top_n=1).iter_comments([_thread("a", 5)]))
+
+    def test_requests_go_through_the_executor(self):
+        api = FakeCommentAPI({"a": 15, "b": 5})
+        executor = FetchExecutor(max_concurrency=2)
+        source = PushshiftSource(["SaaS"], rate=1000.0, burst=1000.0)
+        fetcher = CommentFetcher(top_n=2, page_size=10, max_workers=8, executor=executor, source=source)
+        assert fetcher.max_workers == 2
+        with patch("src.scrape_reddit.http.get", side_effect=api):
+            items = list(fetcher.iter_comments([_thread("a", 15), _thread("b", 5)]))
+        assert len(items) == 20
+        assert executor.metrics["pushshift"].requests == len(api.calls) == 3
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            CommentFetcher(max_workers=0)
+        with pytest.raises(ValueError):
+            CommentFetcher(executor=object())
@@ -0,0 +1,129 @@
+"""Tests for the full-text search index in src/search_index.py."""
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src import search_index
+from src.records import PainPointRecord
+from src.search_index import SearchIndex, index_path, index_records, search_cli, to_match_query
+
+
+def _rec(url, title, content="", summary="", sub="SaaS", cat="Other", score=50):
+    return {
+        "post_url": url, "post_title": title, "comment_or_content": content,
+        "pain_summary": summary, "subreddit": sub, "category": cat,
+        "pain_score": score, "date": "2025-01-01T00:00:00Z",
+    }
+
+
+RECORDS = [
+    _rec("u1", "CSV export keeps failing", "every export times out", "export fails", cat="Bugs"),
+    _rec("u2", "Pricing is too high", "the export add-on costs extra", "pricing", cat="Pricing"),
+    _rec("u3", "Dashboard is slow", "loading takes forever", "slow dashboard", sub="startups", cat="Performance"),
+    _rec("u4", "Love the onboarding", "nothing to complain about"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    ix = SearchIndex(str(tmp_path / "search.db"))
+    ix.add_records(RECORDS)
+    yield ix
+    ix.close()
+
+
+class TestSearchIndex:
+    """Tests for indexing and BM25 search."""
+
+    def test_ranks_title_matches_first(self, index):
+        hits = index.search("export")
+        assert [h["post_url"] for h in hits] == ["u1", "u2"]
+        assert hits[0]["score"] > hits[1]["score"]
+        assert "[export]" in hits[0]["snippet"].lower()
+
+    def test_all_words_must_match_and_stemming(self, index):
+        assert [h["post_url"] for h in index.search("exporting fails")] == ["u1"]
+        assert [h["post_url"] for h in index.search("dash*")] == ["u3"]
+        assert index.search("export dashboard") == []
+
+    def test_filters_and_paging(self, index):
+        assert [h["post_url"] for h in index.search("export", category="Pricing")] == ["u2"]
+        assert index.search("slow", subreddit="SaaS") == []
+        assert [h["post_url"] for h in index.search("export", limit=1, offset=1)] == ["u2"]
+
+    def test_user_input_cannot_break_query_syntax(self, index):
+        assert [h["post_url"] for h in index.search('export" (')] == ["u1", "u2"]
+        assert index.search("  ?!  ") == []
+        assert to_match_query("can't AND export*") == '"can" "t" "AND" "export"*'
+
+    def test_raw_queries(self, index):
+        assert {h["post_url"] for h in index.search("slow OR pricing", raw=True)} == {"u2", "u3"}
+        with pytest.raises(ValueError):
+            index.search('"unterminated', raw=True)
+
+    def test_upsert_updates_index_incrementally(self, index):
+        index.add_records([_rec("u4", "Onboarding export is confusing")])
+        assert len(index) == 4
+        assert {h["post_url"] for h in index.search("export")} == {"u1", "u2", "u4"}
+        assert index.search("complain") == []
+
+    def test_skips_records_without_url_and_accepts_compact(self, index):
+        compact = PainPointRecord(post_url="u5", post_title="Webhook retries missing", subreddit="SaaS")
+        assert index.add_records([{"post_title": "no url"}, compact]) == 1
+        assert index.search("webhook")[0]["post_url"] == "u5"
+        index.optimize()
+        assert index.search("webhook")[0]["post_url"] == "u5"
+
+    def test_reopen_persists(self, tmp_path):
+        path = str(tmp_path / "nested" / "search.db")
+        assert index_records(RECORDS, path) == 4
+        with SearchIndex(path) as ix:
+            assert len(ix) == 4
+            assert ix.search("onboarding")[0]["post_url"] == "u4"
+
+    def test_reopen_does_not_write(self, tmp_path):
+        path = str(tmp_path / "search.db")
+        index_records(RECORDS, path)
+        writer = sqlite3.connect(path, timeout=0)
+        writer.execute("BEGIN IMMEDIATE")  # a scheduler run holding the write lock
+        try:
+            connect = sqlite3.connect
+            with patch("sqlite3.connect", lambda *a, **kw: connect(*a, **{**kw, "timeout": 0})):
+                with SearchIndex(path) as ix:
+                    assert ix.search("onboarding")[0]["post_url"] == "u4"
+        finally:
+            writer.rollback()
+            writer.close()
+
+    def test_index_path_from_env(self):
+        with patch.dict(os.environ, {search_index.PATH_ENV: "/tmp/x.db"}):
+            assert index_path() == "/tmp/x.db"
+        with patch.dict(os.environ, {search_index.PATH_ENV: ""}):
+            assert index_path() == search_index.DEFAULT_PATH
+
+
+class TestSearchCli:
+    """Tests for ``python -m src.main search``."""
+
+    def test_prints_hits(self, tmp_path, capsys):
+        path = str(tmp_path / "s.db")
+        index_records(RECORDS, path)
+        assert search_cli(["export", "--index", path, "--limit", "1"]) == 0
+        out = capsys.readouterr().out
+        assert "CSV export keeps failing" in out and "1 result(s)" in out
+
+    def test_missing_index_and_bad_query(self, tmp_path, capsys):
+        assert search_cli(["x", "--index", str(tmp_path / "none.db")]) == 1
+        path = str(tmp_path / "s.db")
+        index_records(RECORDS, path)
+        assert search_cli(['"oops', "--raw", "--index", path]) == 2
+
+    def test_main_dispatches_subcommand(self, tmp_path, capsys):
+        from src.main import main
+
+        path = str(tmp_path / "s.db")
+        index_records(RECORDS, path)
+        assert main(["search", "slow", "--index", path]) == 0
+        assert "Dashboard is slow" in capsys.readouterr().out
@@ -0,0 +1,36 @@
+"""Tests for API-boundary serialization helpers in src/serialization.py."""
+import json
+from unittest.mock import patch
+
+from src import serialization
+from src.records import PainPointRecord
+from src.serialization import dumps, project_record, project_records
+
+FIELDS = {"category": None, "pain_score": None, "suggested_product_idea": None, "notes": ""}
+
+
+def test_dumps_is_compact_json_bytes():
+    out = dumps({"a": [1, "é"]})
+    assert isinstance(out, bytes)
+    assert json.loads(out) == {"a": [1, "é"]}
+
+
+def test_dumps_falls_back_to_stdlib_json():
+    with patch.object(serialization, "orjson", None):
+        assert dumps({"a": "é"}) == '{"a":"é"}'.encode("utf-8")
+
+
+def test_project_record_fills_defaults_and_drops_extras():
+    rec = {"category": "Bugs", "pain_score": 10, "internal": 1}
+    assert project_record(rec, FIELDS) == {
+        "category": "Bugs", "pain_score": 10, "suggested_product_idea": None, "notes": "",
+    }
+
+
+def test_project_records_resolves_solution_templates():
+    compact = PainPointRecord(category="Bugs", solution_key="bugs")
+    plain = {"category": "Bugs", "solution_key": "bugs"}
+    a, b = project_records([compact, plain], FIELDS)
+    assert a == b
+    assert a["suggested_product_idea"] == "Debugging & error tracking platform"
+    assert a["pain_score"] is None
@@ -1,9 +1,11 @@
 import base64
 import os
+import threading
+import time
 import pytest
 from unittest.mock import patch
 
-from src.sheets_exporter import _decode_sa_json, push_to_sheets
+from src.sheets_exporter import _decode_sa_json, push_to_sheets, push_to_sheets_chunked
 
 
 def test_decode_sa_json_accepts_raw_json():
@@ -97,3 +99,133 @@ def test_push_to_sheets_existing_worksheet_path():
     recs = [{"a": 1, "b": "x"}]
     url = push_to_sheets(recs, spreadsheet_name="X", worksheet_name="Y", gspread_client=fake_client, credentials_factory=lambda: None)
     assert url == "https://fake.url"
+
+
+class _GridWorksheet:
+    """Fake worksheet with a row grid, recording ranged updates."""
+
+    def __init__(self, title, rows, cols, tracker, fail_first=0):
+        self.title = title
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.cells = {}
+        self.resizes = []
+        self.tracker = tracker
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+
+    def clear(self):
+        self.cells.clear()
+
+    def resize(self, rows=None, cols=None):
+        self.rows = rows or self.rows
+        self.cols = cols or self.cols
+        self.resizes.append(self.rows)
+
+    def update(self, values=None, range_name=None):
+        with self._lock:
+            if self.fail_first:
+                self.fail_first -= 1
+                raise ConnectionError("429")
+            self.tracker["active"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        time.sleep(0.002)
+        start = int(range_name[1:])
+        assert start + len(values) - 1 <= self.rows, "update beyond the grid"
+        for i, row in enumerate(values):
+            self.cells[start + i] = row
+        with self._lock:
+            self.tracker["active"] -= 1
+
+
+class _GridSpreadsheet:
+    url = "https://fake.url"
+
+    def __init__(self, existing=(), fail_first=0):
+        self.tracker = {"active": 0, "peak": 0}
+        self.sheets = {t: _GridWorksheet(t, 5, 2, self.tracker) for t in existing}
+        self.fail_first = fail_first
+
+    def worksheet(self, title):
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        ws = self.sheets[title] = _GridWorksheet(title, rows, cols, self.tracker, self.fail_first)
+        return ws
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def del_worksheet(self, ws):
+        del self.sheets[ws.title]
+
+
+class _GridClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open(self, name):
+        return self.spreadsheet
+
+
+def test_chunked_export_rotates_worksheets_and_bounds_requests():
+    sh = _GridSpreadsheet(existing=["Data"])
+    sh.sheets["Data"].cells[99] = ["stale"]
+    recs = ({"id": i, "score": None if i == 3 else float(i)} for i in range(23))
+    url = push_to_sheets_chunked(recs, worksheet_name="Data", chunk_rows=4, max_in_flight=2, max_rows_per_sheet=10,
+                                 gspread_client=_GridClient(sh), credentials_factory=lambda: None)
+    assert url == "https://fake.url"
+    assert list(sh.sheets) == ["Data", "Data (2)", "Data (3)"]
+    rows = []
+    for title in sh.sheets:
+        ws = sh.sheets[title]
+        assert ws.cells[1] == ["id", "score"] and ws.rows <= 10 and ws.cols == 10
+        rows += [ws.cells[r] for r in sorted(ws.cells) if r > 1]
+    assert rows == [[str(i), "" if i == 3 else f"{float(i)}"] for i in range(23)]
+    assert len(sh.sheets["Data (3)"].cells) == 6 and 99 not in sh.sheets["Data"].cells
+    assert sh.sheets["Data"].resizes == [5, 10]  # cleared and regrown geometrically
+    assert sh.tracker["peak"] <= 2
+
+
+def test_chunked_export_header_covers_later_fields_and_drops_stale_sheets():
+    sh = _GridSpreadsheet(existing=["Data", "Data (2)", "Data (3)", "Data (4)", "Data (x)", "Other (5)"])
+    # Comments (with parent_url) follow the submissions, on a later worksheet
+    recs = [{"id": i} for i in range(6)] + [{"id": i, "parent_url": f"p{i}"} for i in range(6, 9)]
+    push_to_sheets_chunked(recs, worksheet_name="Data", chunk_rows=3, max_rows_per_sheet=6,
+                           gspread_client=_GridClient(sh), credentials_factory=lambda: None)
+    assert sorted(sh.sheets) == ["Data", "Data (2)", "Data (x)", "Other (5)"]
+    first, second = sh.sheets["Data"], sh.sheets["Data (2)"]
+    assert first.cells[1] == second.cells[1] == ["id", "parent_url"]
+    assert [first.cells[r] for r in range(2, 7)] == [[str(i)] for i in range(5)]
+    assert [second.cells[r] for r in range(2, 6)] == [["5"], ["6", "p6"], ["7", "p7"], ["8", "p8"]]
+
+    wide = [{"a": 1}] * 3 + [{f"f{i}": i for i in range(12)}] * 2
+    push_to_sheets_chunked(wide, worksheet_name="Data", chunk_rows=3, max_rows_per_sheet=4,
+                           gspread_client=_GridClient(sh), credentials_factory=lambda: None)
+    assert sh.sheets["Data"].cols == sh.sheets["Data (2)"].cols == 20
+    assert sh.sheets["Data"].cells[1] == ["a"] + [f"f{i}" for i in range(12)]
+
+
+def test_chunked_export_retries_then_fails():
+    sleeps = []
+    sh = _GridSpreadsheet(fail_first=2)
+    push_to_sheets_chunked([{"a": 1}], chunk_rows=10, retries=2, backoff=1.0, gspread_client=_GridClient(sh),
+                           credentials_factory=lambda: None, sleep=sleeps.append)
+    assert sleeps == [1.0, 2.0] and sh.sheets["Sheet1"].cells[2] == ["1"]
+
+    sh = _GridSpreadsheet(fail_first=5)
+    with pytest.raises(RuntimeError, match="Failed to write to Google Sheets: 429"):
+        push_to_sheets_chunked([{"a": 1}], retries=1, gspread_client=_GridClient(sh),
+                               credentials_factory=lambda: None, sleep=lambda s: None)
+    with pytest.raises(ValueError):
+        push_to_sheets_chunked([], chunk_rows=0, gspread_client=_GridClient(sh), credentials_factory=lambda: None)
+
+
+def test_large_exports_use_the_chunked_path():
+    sh = _GridSpreadsheet()
+    with patch("src.sheets_exporter.CHUNK_ROWS", 2):
+        push_to_sheets([{"a": i} for i in range(5)], gspread_client=_GridClient(sh), credentials_factory=lambda: None)
+    assert sorted(sh.sheets["Sheet1"].cells) == [1, 2, 3, 4, 5, 6]
+    empty = _GridSpreadsheet()
+    push_to_sheets_chunked([], gspread_client=_GridClient(empty), credentials_factory=lambda: None)
+    assert empty.sheets["Sheet1"].cells == {}
@@ -0,0 +1,72 @@
+"""Tests for the memory-mapped Arrow records snapshot in src/snapshot.py."""
+from unittest.mock import patch
+
+import pytest
+
+from src import snapshot
+from src.aggregates import AggregateIndex
+from src.pdf_reporter import generate_report_from_snapshot
+from src.records import PainPointRecord
+from src.snapshot import open_snapshot, write_snapshot
+
+RECORDS = [
+    PainPointRecord(date=f"2025-01-0{i % 3 + 1}", subreddit="SaaS" if i % 2 else "startups",
+                    post_url=f"u{i}", category="Bugs" if i < 4 else "Pricing",
+                    pain_score=[40, 90, 10, 90, 55, None][i], revenue_potential_score=i, upvote_ratio=0.5,
+                    estimated_market_size=1000, estimated_target_audience=100)
+    for i in range(6)
+]
+
+
+def test_missing_pyarrow_raises(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_PATH", str(tmp_path / "r.arrow"))
+    assert snapshot.snapshot_path() == str(tmp_path / "r.arrow")
+    with patch("src.snapshot.pa", None):
+        assert not snapshot.available()
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            write_snapshot(RECORDS)
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            open_snapshot()
+
+
+class TestSnapshot:
+    """Round trip and queries over a mapped snapshot (needs pyarrow)."""
+
+    @pytest.fixture
+    def snap(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = write_snapshot(RECORDS + [{"post_url": "u6", "category": "Pricing", "extra_field": 3}], str(tmp_path / "out" / "r.arrow"))
+        return open_snapshot(path)
+
+    def test_round_trip_types(self, snap):
+        assert len(snap) == 7 and snap.columns[:3] == ["date", "subreddit", "post_url"]
+        row = snap.rows(offset=1, limit=1)[0]
+        assert (row["post_url"], row["pain_score"], row["upvote_ratio"]) == ("u1", 90, 0.5)
+        assert snap.rows(offset=6)[0]["extra_field"] == "3"
+        assert snap.rows(limit=2, columns=["post_url", "missing"]) == [{"post_url": "u0"}, {"post_url": "u1"}]
+
+    def test_select_top_and_counts(self, snap):
+        # Ties keep file order, like src.ranking.top_k
+        assert [r["post_url"] for r in snap.top(3)] == ["u1", "u3", "u4"]
+        bugs = snap.select(category="Bugs", subreddit=None)
+        assert len(bugs) == 4 and [r["post_url"] for r in bugs.top(10)] == ["u1", "u3", "u0", "u2"]
+        assert len(snap.select(category="Bugs", subreddit="SaaS")) == 2
+        assert len(snap.select(nope="x")) == 0 and snap.select() is snap
+        assert snap.counts("category") == {"Bugs": 4, "Pricing": 3}
+        assert snap.mean("pain_score") == pytest.approx(57.0) and snap.mean("nope") is None
+        assert snap.top(0) == [] and snap.top(3, key="nope") == [] and snap.counts("nope") == {}
+
+    def test_aggregate_index_and_report(self, snap, tmp_path):
+        index = snap.aggregate_index()
+        assert index.to_dict() == AggregateIndex.from_records(snap.rows()).to_dict()
+        path = generate_report_from_snapshot(snap, output_dir=str(tmp_path))
+        assert "Total Pain-Points Analyzed:</strong> 7" in open(path, encoding="utf-8").read()
+
+    def test_rejects_foreign_arrow_files(self, tmp_path):
+        pa = pytest.importorskip("pyarrow")
+        path = str(tmp_path / "other.arrow")
+        table = pa.table({"a": [1]})
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        with pytest.raises(ValueError, match="not a records snapshot"):
+            open_snapshot(path)
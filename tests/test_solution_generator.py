@@ -1,5 +1,12 @@
 import pytest
-from src.solution_generator import generate_solutions, SOLUTION_TEMPLATES
+from src.records import records_to_dicts
+from src.solution_generator import (
+    generate_solutions,
+    resolve_solution,
+    solution_key_for,
+    RESOLVED_SOLUTIONS,
+    SOLUTION_TEMPLATES,
+)
 
 
 def test_generate_solutions_maps_known_categories():
@@ -7,7 +14,7 @@ def test_generate_solutions_maps_known_categories():
         {"category": cat, "pain_summary": f"{cat} related"}
         for cat in ["pricing", "bugs", "feature", "performance"]
     ]
-    out = generate_solutions(records)
+    out = records_to_dicts(generate_solutions(records))
     assert len(out) == len(records)
     for rec in out:
         template = SOLUTION_TEMPLATES.get(rec["category"], SOLUTION_TEMPLATES["Other"])
@@ -17,12 +24,43 @@ def test_generate_solutions_maps_known_categories():
         assert rec["suggested_pricing_model"] == template["pricing_model"]
         assert rec["suggested_target_users"] == template["target_users"]
         assert rec["suggested_marketing_angle"] == template["marketing"]
+        assert "solution_key" not in rec
 
 
 def test_generate_solutions_defaults_to_other():
     records = [{"category": "unknown", "pain_summary": "something"}]
-    out = generate_solutions(records)
+    out = records_to_dicts(generate_solutions(records))
     template = SOLUTION_TEMPLATES["Other"]
     rec = out[0]
     assert rec["suggested_product_idea"] == template["idea"]
-    assert rec["suggested_features"] == ", ".join(template["features"])
\ No newline at end of file
+    assert rec["suggested_features"] == ", ".join(template["features"])
+
+
+def test_generate_solutions_stores_only_template_key():
+    records = [{"category": "Bugs"}]
+    out = generate_solutions(records)
+    assert out[0] == {"category": "Bugs", "solution_key": "bugs"}
+
+
+def test_solution_key_for_normalizes_case():
+    # _infer_category returns capitalized names; templates use lowercase keys
+    assert solution_key_for("Pricing") == "pricing"
+    assert solution_key_for("PERFORMANCE") == "performance"
+    assert solution_key_for("Other") == "Other"
+    assert solution_key_for(None) == "Other"
+    assert solution_key_for("nope") == "Other"
+
+
+def test_resolved_solutions_are_precomputed_and_shared():
+    # Every record of the same category shares the same joined string object
+    a, b = records_to_dicts(generate_solutions([{"category": "Feature"}, {"category": "feature"}]))
+    assert a["suggested_features"] is b["suggested_features"]
+    assert resolve_solution("feature") is RESOLVED_SOLUTIONS["feature"]
+    assert resolve_solution("missing") is RESOLVED_SOLUTIONS["Other"]
+
+
+def test_records_to_dicts_keeps_explicit_overrides():
+    rec = {"category": "Bugs", "suggested_mvp": "custom", "solution_key": "bugs"}
+    out = records_to_dicts([rec])[0]
+    assert out["suggested_mvp"] == "custom"
+    assert out["suggested_product_idea"] == SOLUTION_TEMPLATES["bugs"]["idea"]
@@ -0,0 +1,269 @@
+"""Tests for source connectors and the shared fetch executor in src/sources.py."""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.replay import ReplayMissError
+from src.sources import BrowseAISource, FetchExecutor, Page, PushshiftSource, SourceConnector, SourceMetrics
+
+
+class FakeClock:
+    """Monotonic clock advanced by the executor's (fake) sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class PagedSource(SourceConnector):
+    """Async connector serving ``pages`` pages per cursor, failing on demand."""
+
+    rate = 1000.0
+
+    def __init__(self, name, cursors=("a",), pages=1, failures=0, delay=0.0):
+        self.name = name
+        self.cursors = list(cursors)
+        self.pages = pages
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def start_cursors(self):
+        return self.cursors
+
+    async def fetch_page(self, cursor):
+        self.calls.append(cursor)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("boom")
+        finally:
+            self.in_flight -= 1
+        base, _, n = str(cursor).partition("#")
+        n = int(n or 0)
+        nxt = f"{base}#{n + 1}" if n + 1 < self.pages else None
+        return Page([{"title": f"{self.name}-{base}-{n}"}], nxt)
+
+
+def _titles(items):
+    return [item["title"] for item in items]
+
+
+class TestFetchExecutor:
+    """Concurrency, rate limits, retries and metrics."""
+
+    def test_crawls_sources_concurrently_in_order(self):
+        a = PagedSource("a", cursors=["x", "y"], pages=2, delay=0.01)
+        b = PagedSource("b", cursors=["z"], delay=0.01)
+        executor = FetchExecutor(max_concurrency=3)
+        results = executor.run([a, b])
+        assert list(results) == ["a", "b"]
+        assert _titles(results["a"]) == ["a-x-0", "a-x-1", "a-y-0", "a-y-1"]
+        assert _titles(results["b"]) == ["b-z-0"]
+        assert executor.metrics["a"].pages == 4 and executor.metrics["a"].items == 4
+        assert a.max_in_flight == 2  # both streams of source a were in flight together
+
+    def test_global_concurrency_cap(self):
+        sources = [PagedSource(f"s{i}", cursors=list("abc"), delay=0.01) for i in range(3)]
+        in_flight = []
+
+        original = PagedSource.fetch_page
+
+        async def tracked(self, cursor):
+            in_flight.append(sum(s.in_flight for s in sources))
+            return await original(self, cursor)
+
+        with patch.object(PagedSource, "fetch_page", tracked):
+            FetchExecutor(max_concurrency=2).run(sources)
+        assert len(in_flight) == 9 and max(in_flight) < 2
+
+    def test_per_source_rate_limit(self):
+        clock = FakeClock()
+        slow = PagedSource("slow", cursors=list("abcd"))
+        slow.rate, slow.burst = 1.0, 1.0
+        fast = PagedSource("fast", cursors=list("abcd"))
+        executor = FetchExecutor(clock=clock, sleep=clock.sleep)
+        executor.run([slow, fast])
+        assert executor.metrics["slow"].throttled_s >= 3.0
+        assert executor.metrics["fast"].throttled_s == 0
+        assert executor.metrics["slow"].requests == 4
+
+    def test_blocking_call_shares_bucket_and_cap(self):
+        clock = FakeClock()
+        sleeps = []
+
+        def blocking_sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        source = PagedSource("src")
+        source.rate, source.burst = 1.0, 2.0
+        executor = FetchExecutor(max_concurrency=2, clock=clock, sleep=clock.sleep, blocking_sleep=blocking_sleep)
+        executor.run([source])  # one page: one token of the shared bucket
+        assert executor.call(source, lambda x: x * 2, 21) == 42
+        executor.call(source, lambda: None)
+        assert sleeps == [1.0]
+        assert executor.metrics["src"].requests == 3 and executor.metrics["src"].throttled_s == 1.0
+
+        lock = threading.Lock()
+        in_flight, peak = [0], [0]
+
+        def work():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        fast = PagedSource("fast")
+        threads = [threading.Thread(target=executor.call, args=(fast, work)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2 and executor.metrics["fast"].requests == 6
+
+    def test_retries_with_backoff_then_succeeds(self):
+        clock = FakeClock()
+        source = PagedSource("flaky", failures=2)
+        executor = FetchExecutor(retries=2, backoff_initial=1.0, clock=clock, sleep=clock.sleep)
+        items = executor.run([source])["flaky"]
+        assert _titles(items) == ["flaky-a-0"]
+        m = executor.metrics["flaky"]
+        assert (m.requests, m.retries, m.errors) == (3, 2, [])
+        assert 0.75 <= clock.sleeps[0] <= 1.0 and 1.5 <= clock.sleeps[1] <= 2.0
+
+    def test_failed_source_does_not_stop_others(self):
+        clock = FakeClock()
+        broken = PagedSource("broken", cursors=["x", "y"], failures=10)
+        broken.max_retries = 0
+        ok = PagedSource("ok")
+        executor = FetchExecutor(retries=5, clock=clock, sleep=clock.sleep)
+        results = executor.run([broken, ok])
+        assert list(results["broken"]) == [] and _titles(results["ok"]) == ["ok-a-0"]
+        m = executor.metrics["broken"]
+        assert m.requests == 2 and m.retries == 0
+        assert m.errors == ["'x': ConnectionError: boom", "'y': ConnectionError: boom"]
+
+    def test_max_pages_and_default_cursor(self):
+        class Endless(SourceConnector):
+            name = "endless"
+            rate = 1000.0
+            max_pages = 3
+
+            def fetch_page(self, cursor):  # blocking connectors run in a thread
+                n = (cursor or 0) + 1
+                return Page([{"n": n}], n)
+
+        executor = FetchExecutor()
+        assert [item["n"] for item in executor.run([Endless()])["endless"]] == [1, 2, 3]
+
+    def test_normalize_drops_items_and_counts_on_consumption(self):
+        class Odd(PagedSource):
+            def normalize(self, item):
+                return item if item["title"].endswith(("0", "2")) else None
+
+        executor = FetchExecutor()
+        items = executor.run([Odd("odd", pages=3)])["odd"]
+        assert executor.metrics["odd"].items == 0
+        assert _titles(items) == ["odd-a-0", "odd-a-2"]
+        assert executor.metrics["odd"].to_dict()["items"] == 2
+
+    def test_replay_miss_propagates(self):
+        class Missing(SourceConnector):
+            name = "missing"
+
+            async def fetch_page(self, cursor):
+                raise ReplayMissError("no snapshot")
+
+        with pytest.raises(ReplayMissError):
+            FetchExecutor().run([Missing(), PagedSource("ok")])
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError, match="max_concurrency"):
+            FetchExecutor(max_concurrency=0)
+        with pytest.raises(ValueError, match="duplicate source names"):
+            FetchExecutor().run([PagedSource("a"), PagedSource("a")])
+        with pytest.raises(NotImplementedError):
+            SourceConnector().fetch_page(None)
+        assert SourceConnector().normalize({"a": 1}) == {"a": 1}
+        assert SourceMetrics().to_dict()["errors"] == []
+
+
+class TestPushshiftSource:
+    """One page stream per subreddit, normalized and keyword-filtered."""
+
+    def test_fetches_each_subreddit(self):
+        data = {
+            "SaaS": [{"id": "1", "title": "Export is broken", "permalink": "/r/SaaS/1", "subreddit": "SaaS", "created_utc": 1700000000}],
+            "startups": [{"id": "2", "title": "Hiring", "permalink": "/r/startups/2", "subreddit": "startups"}],
+        }
+        with patch("src.sources._fetch_submissions", side_effect=lambda sub, size, retries: data[sub]) as fetch:
+            source = PushshiftSource(["SaaS", "startups"], keywords=["export"], limit_per_sub=5)
+            executor = FetchExecutor()
+            items = list(executor.run([source])["pushshift"])
+        assert sorted(call.args[0] for call in fetch.call_args_list) == ["SaaS", "startups"]
+        assert fetch.call_args.kwargs == {"size": 5, "retries": 0}
+        assert [i["id"] for i in items] == ["1"]
+        assert items[0]["full_link"] == "https://reddit.com/r/SaaS/1"
+        assert items[0]["date"] == "2023-11-14T22:13:20Z"
+        assert executor.metrics["pushshift"].requests == 2
+
+
+class TestBrowseAISource:
+    """A single robot run, inline or via a streamed export."""
+
+    def test_inline_results(self):
+        run = AsyncMock(return_value={"results": [{"title": "t"}]})
+        with patch("src.sources.run_browseai_job_async", run):
+            source = BrowseAISource("https://run", "sk", {"limit": 1}, timeout=5)
+            assert list(FetchExecutor().run([source])["browseai"]) == [{"title": "t"}]
+        run.assert_awaited_once_with("https://run", "sk", {"limit": 1}, 5)
+
+    def test_export_is_downloaded_and_streamed(self, tmp_path):
+        run = AsyncMock(return_value={"export_url": "https://x/exports/run.ndjson?sig=1"})
+        with patch("src.sources.run_browseai_job_async", run), \
+             patch("src.stream_ingest.download_export", side_effect=lambda url, dest, headers: dest) as download, \
+             patch("src.stream_ingest.iter_export_items", return_value=iter([{"title": "streamed"}])) as iter_items:
+            source = BrowseAISource("https://run", "sk", export_dir=str(tmp_path))
+            assert list(FetchExecutor().run([source])["browseai"]) == [{"title": "streamed"}]
+        dest = str(tmp_path / "run.ndjson")
+        assert download.call_args.args == ("https://x/exports/run.ndjson?sig=1", dest, {"Authorization": "Bearer sk"})
+        iter_items.assert_called_once_with(dest, delete=True)
+
+    def test_failed_run_is_not_retried(self):
+        run = AsyncMock(side_effect=RuntimeError("Browse.ai run failed"))
+        with patch("src.sources.run_browseai_job_async", run):
+            executor = FetchExecutor(retries=3)
+            assert list(executor.run([BrowseAISource("https://run", "sk")])["browseai"]) == []
+        assert run.await_count == 1
+        assert executor.metrics["browseai"].errors == ["RuntimeError: Browse.ai run failed"]
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.delenv("BROWSEAI_RUN_URL", raising=False)
+        monkeypatch.delenv("BROWSEAI_API_KEY", raising=False)
+        assert not BrowseAISource.configured()
+        with pytest.raises(EnvironmentError):
+            BrowseAISource.from_env()
+        monkeypatch.setenv("BROWSEAI_RUN_URL", "https://run")
+        monkeypatch.setenv("BROWSEAI_API_KEY", "sk")
+        source = BrowseAISource.from_env({"limit": 2}, timeout=10)
+        assert BrowseAISource.configured()
+        assert (source.run_url, source.api_key, source.payload, source.timeout) == ("https://run", "sk", {"limit": 2}, 10)
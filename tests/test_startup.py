@@ -0,0 +1,49 @@
+"""Startup budget for the CLI and API (``python -X importtime``).
+
+Heavy dependencies must stay deferred until first use, and importing the
+entry points must stay under a budget. Budgets can be overridden with
+``CLI_IMPORT_BUDGET_MS`` / ``API_IMPORT_BUDGET_MS`` on slow machines.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED = {"pandas", "requests", "httpx", "gspread", "google.oauth2.service_account", "numpy"}
+CLI_BUDGET_MS = float(os.environ.get("CLI_IMPORT_BUDGET_MS", "300"))
+API_BUDGET_MS = float(os.environ.get("API_IMPORT_BUDGET_MS", "1500"))
+
+
+def _importtime(*args):
+    """Run python -X importtime and return (cumulative_us by module, completed process)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        try:
+            cumulative[name.strip()] = int(cum)
+        except ValueError:  # header row
+            continue
+    return cumulative, proc
+
+
+@pytest.mark.parametrize("module, budget_ms", [("src.main", CLI_BUDGET_MS), ("backend.main", API_BUDGET_MS)])
+def test_entry_point_import_budget(module, budget_ms):
+    cumulative, proc = _importtime("-c", f"import {module}")
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert not DEFERRED & cumulative.keys(), f"{module} eagerly imports {sorted(DEFERRED & cumulative.keys())}"
+    assert cumulative[module] / 1000 < budget_ms
+
+
+def test_cli_help_does_not_load_heavy_dependencies():
+    cumulative, proc = _importtime("-m", "src.main", "--help")
+    assert proc.returncode == 0
+    assert "--subreddits" in proc.stdout
+    assert not DEFERRED & cumulative.keys()
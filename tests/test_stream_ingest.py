@@ -0,0 +1,136 @@
+"""Tests for incremental export parsing in src/stream_ingest.py."""
+import gzip
+import io
+import json
+import os
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.stream_ingest import (
+    _JSONStream,
+    download_export,
+    export_url_from,
+    iter_export_items,
+    peek_items,
+)
+
+ITEMS = [
+    {"title": "Pricing hurts", "selftext": "too expensive – really", "n": 1.5},
+    {"title": "Bug", "selftext": "crash [with] {braces}, \"quotes\"", "n": 12345},
+    {"title": "Third", "selftext": "", "n": None},
+]
+
+
+def _write(path, text, gz=False):
+    opener = gzip.open if gz else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+class TestJSONStream:
+    """Tests for the pull parser across chunk boundaries."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+    def test_items_split_across_chunks(self, chunk_size):
+        text = json.dumps({"meta": {"n": [1, 2]}, "data": ITEMS, "tail": 1}, indent=2)
+        stream = _JSONStream(io.StringIO(text), chunk_size=chunk_size)
+        assert stream.find_array(None, ("data",))
+        assert list(stream.iter_array()) == ITEMS
+
+    def test_number_at_buffer_edge_is_not_truncated(self):
+        stream = _JSONStream(io.StringIO("[123456, 7]"), chunk_size=4)
+        assert stream.find_array(None, ())
+        assert list(stream.iter_array()) == [123456, 7]
+
+    def test_malformed_separator_raises(self):
+        stream = _JSONStream(io.StringIO("[1 2]"))
+        stream.find_array(None, ())
+        with pytest.raises(ValueError):
+            list(stream.iter_array())
+
+    def test_scalar_document_raises(self):
+        stream = _JSONStream(io.StringIO("42"))
+        with pytest.raises(ValueError):
+            stream.find_array(None, ("data",))
+
+    def test_unterminated_object_raises(self):
+        stream = _JSONStream(io.StringIO('{"a": 1, '))
+        with pytest.raises(json.JSONDecodeError):
+            stream.find_array(None, ("data",))
+        assert stream.peek() == ""
+
+    def test_truncated_input_raises(self):
+        stream = _JSONStream(io.StringIO('[{"a": '))
+        stream.find_array(None, ())
+        with pytest.raises(json.JSONDecodeError):
+            list(stream.iter_array())
+
+
+class TestIterExportItems:
+    """Tests for file-level export parsing."""
+
+    def test_top_level_array(self, tmp_path):
+        path = _write(tmp_path / "e.json", json.dumps(ITEMS))
+        assert list(iter_export_items(path)) == ITEMS
+
+    def test_results_key_and_gzip(self, tmp_path):
+        path = _write(tmp_path / "e.json.gz", json.dumps({"status": "done", "results": ITEMS}), gz=True)
+        assert list(iter_export_items(path)) == ITEMS
+
+    def test_non_array_candidate_key_is_skipped(self, tmp_path):
+        path = _write(tmp_path / "e.json", json.dumps({"data": {"x": 1}, "results": ITEMS}))
+        assert list(iter_export_items(path)) == ITEMS
+
+    def test_explicit_item_path(self, tmp_path):
+        doc = {"result": {"id": "r1", "capturedLists": {"Other": [1], "Posts": ITEMS}}}
+        path = _write(tmp_path / "e.json", json.dumps(doc))
+        assert list(iter_export_items(path, item_path=("result", "capturedLists", "Posts"))) == ITEMS
+
+    def test_item_path_not_an_array_raises(self, tmp_path):
+        path = _write(tmp_path / "e.json", json.dumps({"result": {"id": "r1"}}))
+        with pytest.raises(ValueError):
+            list(iter_export_items(path, item_path=("result", "id")))
+
+    def test_missing_array_yields_nothing(self, tmp_path):
+        path = _write(tmp_path / "e.json", json.dumps({"status": "done"}))
+        assert list(iter_export_items(path)) == []
+
+    def test_empty_array(self, tmp_path):
+        path = _write(tmp_path / "e.json", "{\"data\": [ ]}")
+        assert list(iter_export_items(path)) == []
+
+    def test_ndjson_and_delete(self, tmp_path):
+        text = "\n".join(json.dumps(i) for i in ITEMS) + "\n\n"
+        path = _write(tmp_path / "e.ndjson.gz", text, gz=True)
+        assert list(iter_export_items(path, delete=True)) == ITEMS
+        assert not os.path.exists(path)
+
+    def test_is_lazy(self, tmp_path):
+        path = _write(tmp_path / "e.jsonl", "\n".join(json.dumps(i) for i in ITEMS))
+        it = iter_export_items(path)
+        assert next(it) == ITEMS[0]
+
+
+class TestDownloadAndHelpers:
+    """Tests for export download and small helpers."""
+
+    def test_download_export_streams_chunks(self, tmp_path):
+        resp = MagicMock()
+        resp.__enter__.return_value = resp
+        resp.iter_content.return_value = [b'{"data": [', b"", b'{"a": 1}]}']
+        dest = str(tmp_path / "sub" / "export.json")
+        with patch("src.stream_ingest.http.get", return_value=resp) as mock_get:
+            out = download_export("https://x/export.json", dest, headers={"Authorization": "Bearer k"})
+        assert out == dest
+        assert mock_get.call_args.kwargs["stream"] is True
+        assert list(iter_export_items(dest)) == [{"a": 1}]
+
+    def test_export_url_from(self):
+        assert export_url_from({"downloadUrl": "https://x"}) == "https://x"
+        assert export_url_from({"data": []}) is None
+
+    def test_peek_items(self):
+        assert peek_items(iter([])) is None
+        assert list(peek_items(iter([1, 2]))) == [1, 2]
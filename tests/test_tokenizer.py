@@ -0,0 +1,40 @@
+"""Tests for the shared tokenizer in src/tokenizer.py."""
+from src.analyze import transform_to_schema
+from src.records import PainPointRecord
+from src.scoring import calculate_pain_score
+from src.tokenizer import record_tokens, split_words, tokenize_text
+
+
+def test_split_words():
+    assert split_words("Can’t export CSV_files, it's 2x slower!") == ("can't", "export", "csv", "files", "it's", "2x", "slower")
+    assert split_words("") == () and split_words(None) == ()
+
+
+def test_token_sets_and_phrases():
+    tokens = tokenize_text("Looking for a tool that would be nice")
+    assert "tool" in tokens.words and "to" not in tokens.words
+    assert "looking for" in tokens.bigrams and len(tokens) == 8
+    assert tokens.has_phrase(("tool",))
+    assert tokens.has_phrase(("would", "be", "nice"))
+    assert not tokens.has_phrase(("would", "be", "great"))
+    assert not tokens.has_phrase(("for", "tool"))
+
+
+def test_record_tokens_cached_on_compact_records():
+    rec = PainPointRecord(pain_summary="Export crashed", comment_or_content=None)
+    tokens = record_tokens(rec)
+    assert tokens.words == {"export", "crashed"}
+    assert record_tokens(rec) is tokens
+    assert "tokens" not in rec.to_dict() and "tokens" not in rec
+    assert record_tokens({"pain_summary": "Export crashed"}).words == tokens.words
+
+
+def test_transform_tokens_are_reused_by_scoring_then_released():
+    item = {"title": "Need a tool", "selftext": "Urgent: the app is broken", "subreddit": "SaaS"}
+    rec = transform_to_schema([item], compact=True)[0]
+    assert {"urgent", "tool", "broken"} <= rec.tokens.words
+    dict_rec = transform_to_schema([item])[0]
+    calculate_pain_score([rec])
+    calculate_pain_score([dict_rec])
+    assert rec.tokens is None
+    assert rec["pain_score"] == dict_rec["pain_score"]
@@ -0,0 +1,125 @@
+"""Tests for incremental trend detection in src/trends.py."""
+import os
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src import trends
+from src.trends import TrendEngine, day_to_iso, parse_day, trends_path, update_trends
+
+START = date(2025, 1, 1)
+
+
+def _posts(cat, sub, per_day, start=START, prefix=None):
+    """One record per post; ``per_day`` lists post counts for consecutive days."""
+    prefix = prefix or f"{cat}-{sub}"
+    out = []
+    for offset, n in enumerate(per_day):
+        day = (start + timedelta(days=offset)).isoformat()
+        out += [
+            {"post_url": f"{prefix}-{offset}-{i}", "date": f"{day}T12:00:00Z", "category": cat, "subreddit": sub}
+            for i in range(n)
+        ]
+    return out
+
+
+@pytest.fixture
+def engine():
+    eng = TrendEngine(window_buckets=7)
+    eng.update(_posts("Pricing", "SaaS", [1] * 7 + [4] * 7))   # accelerating
+    eng.update(_posts("Bugs", "SaaS", [3] * 7 + [3] * 7))      # flat
+    eng.update(_posts("UX", "startups", [5] * 7 + [1] * 7))    # cooling
+    return eng
+
+
+class TestTrendEngine:
+    """Tests for counts, growth and decayed scores."""
+
+    def test_rising_orders_by_growth(self, engine):
+        rising = engine.rising()
+        assert [(r["category"], r["subreddit"]) for r in rising] == [("Pricing", "SaaS")]
+        row = rising[0]
+        assert (row["prior_count"], row["recent_count"]) == (7, 28)
+        assert row["growth"] == pytest.approx(3.0)
+        assert row["series"] == [1] * 7 + [4] * 7
+
+    def test_decayed_score_favours_recent_activity(self, engine):
+        pricing = engine.stats(("Pricing", "SaaS"))["decayed_score"]
+        ux = engine.stats(("UX", "startups"))["decayed_score"]
+        assert pricing > ux
+        later = engine.stats(("Pricing", "SaaS"), now=engine.latest_day + 7)["decayed_score"]
+        assert later == pytest.approx(pricing / 2, rel=1e-3)
+
+    def test_out_of_order_records_match_in_order(self):
+        posts = _posts("Pricing", "SaaS", [1, 2, 3, 4, 5])
+        a, b = TrendEngine(), TrendEngine()
+        a.update(posts)
+        b.update(reversed(posts))
+        assert a.stats(("Pricing", "SaaS")) == b.stats(("Pricing", "SaaS"))
+
+    def test_incremental_updates_skip_seen_and_undated(self, engine):
+        before = engine.stats(("Pricing", "SaaS"))
+        assert engine.update(_posts("Pricing", "SaaS", [1] * 7 + [4] * 7)) == 0
+        assert engine.update([{"post_url": "x", "date": None}, {"date": "garbage!!!!"}]) == 0
+        assert engine.stats(("Pricing", "SaaS")) == before
+        new_day = (START + timedelta(days=14)).isoformat()
+        assert engine.update(_posts("Pricing", "SaaS", [2], start=date.fromisoformat(new_day), prefix="n")) == 2
+        assert engine.stats(("Pricing", "SaaS"))["series"][-1] == 2
+
+    def test_rising_as_of_past_day(self, engine):
+        # In the first week every series is new; the busiest grows fastest
+        assert engine.rising(now=START + timedelta(days=6))[0]["category"] == "UX"
+        assert engine.rising(now=(START + timedelta(days=13)).isoformat())[0]["category"] == "Pricing"
+        assert engine.rising(now=engine.latest_day, limit=0) == []
+        with pytest.raises(ValueError):
+            engine.rising(now="not a date")
+
+    def test_weekly_buckets_align_to_iso_weeks(self):
+        eng = TrendEngine(bucket_days=7, window_buckets=1, retention_buckets=4)
+        eng.update(_posts("Pricing", "SaaS", [1] * 14, start=date(2025, 1, 6)))  # two Mondays
+        assert eng.series(("Pricing", "SaaS")) == [7, 7]
+        eng2 = TrendEngine(bucket_days=2, window_buckets=1, retention_buckets=2)
+        eng2.update(_posts("A", "b", [1, 1]))
+        assert sum(eng2.series(("A", "b"))) == 2
+
+    def test_prune_drops_old_buckets_and_urls(self):
+        eng = TrendEngine(window_buckets=1, retention_buckets=2)
+        eng.update(_posts("Old", "SaaS", [1]))
+        eng.update(_posts("New", "SaaS", [0, 0, 0, 0, 1]))
+        assert ("Old", "SaaS") not in eng.keys
+        assert all(not url.startswith("Old") for url in eng.seen)
+
+    def test_unknown_key_and_empty_engine(self):
+        eng = TrendEngine()
+        eng.prune()
+        assert eng.rising() == []
+        assert eng.series(("x", "y")) == [0] * 14
+        assert eng.stats(("x", "y"))["decayed_score"] == 0
+
+    def test_config_validation(self):
+        with pytest.raises(ValueError):
+            TrendEngine(bucket_days=0)
+        with pytest.raises(ValueError):
+            TrendEngine(window_buckets=7, retention_buckets=10)
+
+    def test_persistence_roundtrip_and_update(self, engine, tmp_path):
+        path = str(tmp_path / "t" / "trends.json")
+        engine.save(path)
+        loaded = TrendEngine.load(path)
+        assert loaded.rising() == engine.rising()
+        assert loaded.seen == engine.seen
+        eng, added = update_trends(_posts("Pricing", "SaaS", [1] * 14), path)
+        assert added == 0 and eng.latest_day == engine.latest_day
+        eng, added = update_trends(_posts("Feature", "SaaS", [1]), str(tmp_path / "fresh.json"))
+        assert added == 1 and os.path.exists(str(tmp_path / "fresh.json"))
+
+
+def test_helpers():
+    assert parse_day("2025-01-02T00:00:00Z") == date(2025, 1, 2).toordinal()
+    assert parse_day(None) is None
+    assert day_to_iso(date(2025, 1, 2).toordinal()) == "2025-01-02"
+    with patch.dict(os.environ, {trends.PATH_ENV: "/tmp/t.json"}):
+        assert trends_path() == "/tmp/t.json"
+    with patch.dict(os.environ, {trends.PATH_ENV: ""}):
+        assert trends_path() == trends.DEFAULT_PATH